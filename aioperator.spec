@@ -40,9 +40,7 @@ a = Analysis(
         # OpenAI
         'openai',
         # APScheduler
-        'apscheduler.schedulers.background',
-        'apscheduler.jobstores.sqlalchemy',
-        'apscheduler.executors.pool',
+        'apscheduler.triggers.cron',
         # Cryptography
         'cryptography.fernet',
         # SQLite
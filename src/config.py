@@ -30,12 +30,66 @@ class BrowserConfig:
     headless: bool
     implicit_wait: int = 10
     page_load_timeout: int = 30
+    pool_size: int = 1             # warm Chromium processes kept for Playwright posts
+    pool_max_uses: int = 50        # contexts a pooled browser serves before it is restarted (0 disables)
+    pool_max_memory_mb: int = 1500  # memory above which a pooled browser is restarted (0 disables)
+    pool_idle_timeout: int = 600   # seconds an unused pooled context or browser stays open
+    selector_half_life_days: float = 14.0  # age at which learned selector hits weigh half
+    block_resources: bool = True   # skip images, media, fonts and trackers while posting
+    screenshots: str = "on_failure"  # off, on_failure, every_step
+    screenshot_frames: int = 8     # last frames kept in memory per post
+    screenshot_quality: int = 50   # JPEG quality of debug screenshots
+    screenshots_max_mb: float = 200.0  # data/screenshots budget; oldest job folders go first
+    session_check_ttl: int = 900   # seconds a session validity verdict is reused
+    session_check_interval: int = 600  # seconds between background session checks (0 disables)
+    session_keepalive_interval: int = 21600  # seconds between session cookie refreshes (0 disables)
+    session_expiry_warning_hours: float = 48.0  # warn when a session cookie expires within this
 
 
 @dataclass
 class DatabaseConfig:
     """Database configuration."""
     path: Path
+    wal: bool = True             # WAL journal lets several processes read while one writes
+    busy_timeout: float = 30.0   # seconds to wait for a lock held by another process
+
+
+@dataclass
+class SchedulerConfig:
+    """Scheduler executor configuration."""
+    max_workers: int = 3
+    misfire_grace_time: int = 300  # seconds
+    account_spacing: int = 300     # min seconds between posts of one account
+    launch_interval: int = 30      # min seconds between any two browser launches
+    max_jitter: int = 900          # max seconds a post may be shifted
+    lease_seconds: int = 120       # how long a claimed post stays owned without a heartbeat
+    heartbeat_interval: int = 30   # seconds between lease renewals
+    max_attempts: int = 3          # claims before a repeatedly abandoned post is failed
+    poll_interval: int = 5         # seconds between lease worker polls
+    drain_timeout: int = 10        # seconds shutdown waits for in-flight posts
+    interactive_slots: int = 1     # worker slots reserved for "Post now"
+    interactive_max_wait: int = 300  # seconds "Post now" may wait for a slot
+    prepare_workers: int = 2       # threads validating posts ahead of publishing
+    session_workers: int = 2       # threads opening browsers and logging in
+    verify_workers: int = 2        # threads checking that published posts went out
+    result_flush_interval: float = 0.25  # max seconds a finished post waits to be stored
+    result_batch_size: int = 100   # queued results that trigger an early write
+    preflight_lead_minutes: int = 10  # check posts this long before they fire (0 disables)
+    preflight_interval: int = 30   # seconds between pre-flight sweeps
+    prewarm_browsers: int = 1      # browsers kept logged in and parked ahead of fire time
+    coalesce_window: int = 600     # seconds ahead to pull same-account posts into one session (0 disables)
+    session_retry_delay: int = 1800  # seconds a post waits for a re-login when its session expired
+
+
+@dataclass
+class ApiConfig:
+    """Local HTTP control API configuration."""
+    enabled: bool = False
+    host: str = "127.0.0.1"
+    port: int = 8765
+    token: str = ""               # required as "Authorization: Bearer <token>" when set
+    batch_size: int = 500         # NDJSON lines stored per transaction
+    max_batch: int = 10000        # max posts in one JSON request
 
 
 @dataclass
@@ -66,12 +120,62 @@ class Config:
         self.browser = BrowserConfig(
             browser_type=os.getenv("BROWSER_TYPE", "chrome"),
             headless=os.getenv("BROWSER_HEADLESS", "false").lower() == "true",
+            pool_size=int(os.getenv("BROWSER_POOL_SIZE", "1")),
+            pool_max_uses=int(os.getenv("BROWSER_POOL_MAX_USES", "50")),
+            pool_max_memory_mb=int(os.getenv("BROWSER_POOL_MAX_MEMORY_MB", "1500")),
+            pool_idle_timeout=int(os.getenv("BROWSER_POOL_IDLE_TIMEOUT", "600")),
+            selector_half_life_days=float(os.getenv("BROWSER_SELECTOR_HALF_LIFE_DAYS", "14")),
+            block_resources=os.getenv("BROWSER_BLOCK_RESOURCES", "true").lower() == "true",
+            screenshots=os.getenv("BROWSER_SCREENSHOTS", "on_failure").lower(),
+            screenshot_frames=int(os.getenv("BROWSER_SCREENSHOT_FRAMES", "8")),
+            screenshot_quality=int(os.getenv("BROWSER_SCREENSHOT_QUALITY", "50")),
+            screenshots_max_mb=float(os.getenv("BROWSER_SCREENSHOTS_MAX_MB", "200")),
+            session_check_ttl=int(os.getenv("BROWSER_SESSION_CHECK_TTL", "900")),
+            session_check_interval=int(os.getenv("BROWSER_SESSION_CHECK_INTERVAL", "600")),
+            session_keepalive_interval=int(os.getenv("BROWSER_SESSION_KEEPALIVE_INTERVAL", "21600")),
+            session_expiry_warning_hours=float(os.getenv("BROWSER_SESSION_EXPIRY_WARNING_HOURS", "48")),
         )
         
         db_path = os.getenv("DATABASE_PATH", "./data/aioperator.db")
         self.database = DatabaseConfig(
             path=Path(db_path) if not Path(db_path).is_absolute() 
-                 else PROJECT_ROOT / db_path
+                 else PROJECT_ROOT / db_path,
+            wal=os.getenv("DATABASE_WAL", "true").lower() == "true",
+            busy_timeout=float(os.getenv("DATABASE_BUSY_TIMEOUT", "30")),
+        )
+        
+        self.scheduler = SchedulerConfig(
+            max_workers=int(os.getenv("SCHEDULER_MAX_WORKERS", "3")),
+            misfire_grace_time=int(os.getenv("SCHEDULER_MISFIRE_GRACE", "300")),
+            account_spacing=int(os.getenv("SCHEDULER_ACCOUNT_SPACING", "300")),
+            launch_interval=int(os.getenv("SCHEDULER_LAUNCH_INTERVAL", "30")),
+            max_jitter=int(os.getenv("SCHEDULER_MAX_JITTER", "900")),
+            lease_seconds=int(os.getenv("SCHEDULER_LEASE_SECONDS", "120")),
+            heartbeat_interval=int(os.getenv("SCHEDULER_HEARTBEAT_INTERVAL", "30")),
+            max_attempts=int(os.getenv("SCHEDULER_MAX_ATTEMPTS", "3")),
+            poll_interval=int(os.getenv("SCHEDULER_POLL_INTERVAL", "5")),
+            drain_timeout=int(os.getenv("SCHEDULER_DRAIN_TIMEOUT", "10")),
+            interactive_slots=int(os.getenv("SCHEDULER_INTERACTIVE_SLOTS", "1")),
+            interactive_max_wait=int(os.getenv("SCHEDULER_INTERACTIVE_MAX_WAIT", "300")),
+            prepare_workers=int(os.getenv("SCHEDULER_PREPARE_WORKERS", "2")),
+            session_workers=int(os.getenv("SCHEDULER_SESSION_WORKERS", "2")),
+            verify_workers=int(os.getenv("SCHEDULER_VERIFY_WORKERS", "2")),
+            result_flush_interval=float(os.getenv("SCHEDULER_RESULT_FLUSH_INTERVAL", "0.25")),
+            result_batch_size=int(os.getenv("SCHEDULER_RESULT_BATCH_SIZE", "100")),
+            preflight_lead_minutes=int(os.getenv("SCHEDULER_PREFLIGHT_LEAD_MINUTES", "10")),
+            preflight_interval=int(os.getenv("SCHEDULER_PREFLIGHT_INTERVAL", "30")),
+            prewarm_browsers=int(os.getenv("SCHEDULER_PREWARM_BROWSERS", "1")),
+            coalesce_window=int(os.getenv("SCHEDULER_COALESCE_WINDOW", "600")),
+            session_retry_delay=int(os.getenv("SCHEDULER_SESSION_RETRY_DELAY", "1800")),
+        )
+        
+        self.api = ApiConfig(
+            enabled=os.getenv("API_ENABLED", "false").lower() == "true",
+            host=os.getenv("API_HOST", "127.0.0.1"),
+            port=int(os.getenv("API_PORT", "8765")),
+            token=os.getenv("API_TOKEN", ""),
+            batch_size=int(os.getenv("API_BATCH_SIZE", "500")),
+            max_batch=int(os.getenv("API_MAX_BATCH", "10000")),
         )
         
         log_path = os.getenv("LOG_FILE", "./logs/aioperator.log")
@@ -93,6 +197,13 @@ class Config:
         if self.browser.browser_type not in ("chrome", "firefox", "brave", "edge"):
             errors.append(f"Invalid BROWSER_TYPE: {self.browser.browser_type}")
         
+        scheduler = self.scheduler
+        if 0 < scheduler.coalesce_window < scheduler.account_spacing:
+            errors.append(
+                f"SCHEDULER_COALESCE_WINDOW ({scheduler.coalesce_window}s) is shorter than "
+                f"SCHEDULER_ACCOUNT_SPACING ({scheduler.account_spacing}s), so posts never share a session"
+            )
+        
         return errors
 
 
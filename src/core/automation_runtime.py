@@ -0,0 +1,177 @@
+"""
+Automation Runtime - One long-lived asyncio loop for all Playwright work.
+
+``asyncio.run`` builds a new event loop and Playwright starts a new driver
+subprocess for every call, and Playwright objects cannot be used outside
+the loop that created them, so nothing could be shared between posts. The
+AutomationRuntime owns a single event loop in a background thread and one
+Playwright instance on it:
+
+- sync callers (GUI workers, scheduled posts) ``submit`` coroutines and get
+  ``concurrent.futures.Future`` handles; cancelling a handle cancels the
+  coroutine
+- several posts run concurrently on the loop, each awaiting its own pages
+- the BrowserPool's browsers and the session manager's login browsers come
+  from the same Playwright instance
+
+``shutdown`` cancels what is still running, runs the registered shutdown
+hooks (such as closing pooled browsers), stops Playwright and the loop.
+The runtime starts again on the next submit.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Awaitable, Callable, Coroutine, TypeVar
+
+from playwright.async_api import Playwright, async_playwright
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+ShutdownHook = Callable[[], Awaitable[None]]
+
+
+class AutomationRuntime:
+    """Background event loop thread that runs every Playwright coroutine."""
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._playwright: Playwright | None = None
+        self._playwright_lock: asyncio.Lock | None = None
+        self._hooks: list[ShutdownHook] = []
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    def in_runtime_thread(self) -> bool:
+        """Whether the caller is running on the runtime's loop."""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Coroutine[object, object, T]) -> "Future[T]":
+        """
+        Schedule a coroutine on the runtime loop.
+
+        Returns:
+            Future with the coroutine's result; ``cancel()`` cancels it
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def run(self, coro: Coroutine[object, object, T], timeout: float | None = None) -> T:
+        """
+        Run a coroutine on the runtime loop and wait for its result.
+
+        The coroutine is cancelled if it does not finish within ``timeout``.
+        Must not be called from the runtime's own loop.
+        """
+        if self.in_runtime_thread():
+            coro.close()
+            raise RuntimeError("AutomationRuntime.run() called from the runtime loop; await instead")
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    async def playwright(self) -> Playwright:
+        """Get the shared Playwright instance, starting it on first use."""
+        if self._playwright_lock is None:
+            self._playwright_lock = asyncio.Lock()
+        async with self._playwright_lock:
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+                logger.info("Playwright driver started")
+            return self._playwright
+
+    def add_shutdown_hook(self, hook: ShutdownHook):
+        """Await ``hook()`` on the loop during shutdown, before Playwright stops."""
+        with self._lock:
+            if hook not in self._hooks:
+                self._hooks.append(hook)
+
+    def shutdown(self, timeout: float = 30.0):
+        """Cancel running work, run the shutdown hooks and stop the loop."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close(), loop).result(timeout)
+        except Exception as e:
+            logger.warning(f"Automation runtime did not shut down cleanly: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        if not loop.is_running():
+            loop.close()
+        logger.info("Automation runtime stopped")
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=self._run_loop, args=(loop,), name="automation-runtime", daemon=True
+                )
+                self._loop, self._thread = loop, thread
+                self._playwright_lock = None
+                thread.start()
+            return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    async def _close(self):
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info(f"Cancelled {len(tasks)} running automation task(s)")
+
+        with self._lock:
+            hooks = list(self._hooks)
+        for hook in hooks:
+            try:
+                await hook()
+            except Exception as e:
+                logger.warning(f"Automation shutdown hook failed: {e}")
+
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.warning(f"Failed to stop Playwright: {e}")
+            self._playwright = None
+
+
+# Singleton automation runtime instance
+_automation_runtime: AutomationRuntime | None = None
+_automation_runtime_lock = threading.Lock()
+
+
+def get_automation_runtime() -> AutomationRuntime:
+    """Get or create the automation runtime instance."""
+    global _automation_runtime
+    with _automation_runtime_lock:
+        if _automation_runtime is None:
+            _automation_runtime = AutomationRuntime()
+        return _automation_runtime
+
+
+def shutdown_automation_runtime():
+    """Stop the automation runtime, if this process started it."""
+    with _automation_runtime_lock:
+        runtime = _automation_runtime
+    if runtime is not None:
+        runtime.shutdown()
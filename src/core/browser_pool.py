@@ -0,0 +1,399 @@
+"""
+Browser Pool - Long-lived Chromium processes shared by Playwright posts.
+
+Launching Chromium and loading the first page costs several seconds and
+hundreds of MB, and the poster used to pay that for every post. The
+BrowserPool keeps up to ``BROWSER_POOL_SIZE`` browsers running and hands
+out one isolated context per account (its own cookies and storage), which
+is kept open between posts, so consecutive posts skip process startup and
+the account's login. Accounts share a running browser with the same launch
+settings; another one is only started for different settings.
+
+Browsers are health-checked before a context is handed out and recycled
+once they have served ``BROWSER_POOL_MAX_USES`` contexts or use more than
+``BROWSER_POOL_MAX_MEMORY_MB``; a busy browser is retired (no new contexts)
+and closed when its last context is released. Contexts and browsers left
+unused for ``BROWSER_POOL_IDLE_TIMEOUT`` seconds are closed.
+
+The pool lives on the AutomationRuntime's event loop and launches its
+browsers from the runtime's Playwright instance; its methods are
+coroutines, and ``run`` is a shortcut for synchronous callers.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Coroutine, TypeVar
+
+from src.config import config
+from src.core.automation_runtime import get_automation_runtime
+
+try:
+    import psutil
+except ImportError:  # Optional; memory is read from /proc on Linux without it
+    psutil = None
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Seconds between idle sweeps
+REAP_INTERVAL = 30.0
+
+
+@dataclass(frozen=True)
+class LaunchSpec:
+    """How a pooled browser is launched; browsers are only shared within a spec."""
+    executable_path: str | None = None
+    headless: bool = True
+    args: tuple[str, ...] = ()
+
+
+@dataclass(eq=False)
+class PooledContext:
+    """One account's browser context."""
+    key: str
+    context: Any
+    browser: "PooledBrowser"
+    in_use: bool = False
+    shared: bool = True  # False for extra contexts opened while the shared one was busy
+    last_used: float = field(default_factory=time.monotonic)
+
+
+@dataclass(eq=False)
+class PooledBrowser:
+    """A running Chromium process and the contexts opened in it."""
+    spec: LaunchSpec
+    browser: Any
+    contexts: dict[str, PooledContext] = field(default_factory=dict)
+    extra: list[PooledContext] = field(default_factory=list)
+    uses: int = 0
+    retiring: bool = False
+    started_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+
+    @property
+    def busy(self) -> bool:
+        return bool(self.extra) or any(c.in_use for c in self.contexts.values())
+
+    @property
+    def open_contexts(self) -> int:
+        return len(self.contexts) + len(self.extra)
+
+
+class BrowserPool:
+    """Hands out per-account contexts from a few warm Chromium processes."""
+
+    def __init__(
+        self,
+        max_browsers: int | None = None,
+        max_uses: int | None = None,
+        max_memory_mb: int | None = None,
+        idle_timeout: float | None = None,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            max_browsers: Chromium processes kept at most
+            max_uses: Contexts a browser serves before it is recycled (0 disables)
+            max_memory_mb: Memory above which a browser is recycled (0 disables)
+            idle_timeout: Seconds an unused context or browser stays open
+        """
+        settings = config.browser
+        self.max_browsers = max(1, max_browsers or settings.pool_size)
+        self.max_uses = settings.pool_max_uses if max_uses is None else max_uses
+        self.max_memory_mb = settings.pool_max_memory_mb if max_memory_mb is None else max_memory_mb
+        self.idle_timeout = settings.pool_idle_timeout if idle_timeout is None else idle_timeout
+
+        self._browsers: list[PooledBrowser] = []
+        self._playwright = None  # The runtime's, fetched on first launch
+        self._cond: asyncio.Condition | None = None
+        self._reaper: asyncio.Task | None = None
+
+    def run(self, coro: Coroutine[object, object, T], timeout: float | None = None) -> T:
+        """Run a coroutine on the automation runtime and wait for its result."""
+        return get_automation_runtime().run(coro, timeout)
+
+    def shutdown(self):
+        """Close every pooled browser."""
+        runtime = get_automation_runtime()
+        if runtime.running:
+            runtime.run(self.close_all(), timeout=30)
+
+    # ==================== Contexts ====================
+
+    @asynccontextmanager
+    async def context(self, key: str, spec: LaunchSpec, **context_options):
+        """
+        Borrow the browser context of an account.
+
+        The context is created with ``context_options`` the first time and
+        reused afterwards; pages opened in it are closed on release.
+
+        Args:
+            key: Account the context belongs to (e.g. "facebook")
+            spec: How to launch the browser if none is running
+            **context_options: Options for ``browser.new_context``
+
+        Yields:
+            A Playwright BrowserContext
+        """
+        pooled = await self._acquire(key, spec, context_options)
+        try:
+            yield pooled.context
+        finally:
+            await self._release(pooled)
+
+    async def discard(self, key: str):
+        """
+        Stop reusing an account's context, e.g. after its session expired.
+
+        An idle context is closed now, one in use when it is released.
+        """
+        for browser in list(self._browsers):
+            pooled = browser.contexts.pop(key, None)
+            if pooled is None:
+                continue
+            if pooled.in_use:
+                pooled.shared = False
+                browser.extra.append(pooled)
+            else:
+                await _close_quietly(pooled.context)
+
+    async def _acquire(self, key: str, spec: LaunchSpec, options: dict) -> PooledContext:
+        cond = self._condition()
+        async with cond:
+            self._ensure_reaper()
+            while True:
+                browser = await self._pick_browser(key, spec)
+                if browser is not None:
+                    break
+                await cond.wait()
+
+            browser.uses += 1
+            browser.last_used = time.monotonic()
+            pooled = browser.contexts.get(key)
+            if pooled is not None and not pooled.in_use:
+                pooled.in_use = True
+                return pooled
+            shared = pooled is None
+            pooled = PooledContext(key=key, context=None, browser=browser, in_use=True, shared=shared)
+            # Reserve the slot before awaiting so concurrent callers see it
+            if shared:
+                browser.contexts[key] = pooled
+            else:
+                browser.extra.append(pooled)
+
+        try:
+            pooled.context = await browser.browser.new_context(**options)
+        except Exception:
+            async with cond:
+                self._forget(pooled)
+                cond.notify_all()
+            raise
+        return pooled
+
+    async def _release(self, pooled: PooledContext):
+        cond = self._condition()
+        for page in list(getattr(pooled.context, "pages", [])):
+            await _close_quietly(page)
+        async with cond:
+            pooled.in_use = False
+            pooled.last_used = pooled.browser.last_used = time.monotonic()
+            browser = pooled.browser
+            if not pooled.shared or browser.retiring:
+                self._forget(pooled)
+                await _close_quietly(pooled.context)
+            if browser.retiring and not browser.busy:
+                await self._close_browser(browser)
+            cond.notify_all()
+
+    async def _pick_browser(self, key: str, spec: LaunchSpec) -> PooledBrowser | None:
+        """Find or launch a healthy browser for ``key`` (condition held)."""
+        for browser in list(self._browsers):
+            if browser.spec == spec and not browser.retiring:
+                await self._check_health(browser)
+
+        candidates = [b for b in self._browsers if b.spec == spec and not b.retiring]
+        # Prefer the browser that already holds the account's context
+        for browser in candidates:
+            if key in browser.contexts:
+                return browser
+        if candidates:
+            return min(candidates, key=lambda b: b.open_contexts)
+
+        if len(self._browsers) >= self.max_browsers:
+            idle = [b for b in self._browsers if not b.busy]
+            if not idle:
+                return None
+            await self._close_browser(min(idle, key=lambda b: b.last_used))
+        return await self._launch(spec)
+
+    async def _check_health(self, browser: PooledBrowser):
+        """Drop crashed browsers and retire worn-out ones (condition held)."""
+        if not browser.browser.is_connected():
+            logger.warning("Pooled browser disconnected; replacing it")
+            self._browsers.remove(browser)
+            return
+
+        reason = None
+        if self.max_uses and browser.uses >= self.max_uses:
+            reason = f"served {browser.uses} contexts"
+        elif self.max_memory_mb:
+            memory = await browser_memory_mb(browser.browser)
+            if memory is not None and memory > self.max_memory_mb:
+                reason = f"uses {memory:.0f} MB"
+        if reason is None:
+            return
+
+        logger.info(f"Recycling pooled browser ({reason})")
+        browser.retiring = True
+        if not browser.busy:
+            await self._close_browser(browser)
+
+    async def _launch(self, spec: LaunchSpec) -> PooledBrowser:
+        if self._playwright is None:
+            self._playwright = await get_automation_runtime().playwright()
+        started = time.monotonic()
+        browser = await self._playwright.chromium.launch(
+            headless=spec.headless,
+            executable_path=spec.executable_path,
+            args=list(spec.args),
+        )
+        pooled = PooledBrowser(spec=spec, browser=browser)
+        self._browsers.append(pooled)
+        logger.info(f"Launched pooled browser in {time.monotonic() - started:.1f}s ({len(self._browsers)} running)")
+        return pooled
+
+    async def _close_browser(self, browser: PooledBrowser):
+        if browser in self._browsers:
+            self._browsers.remove(browser)
+        browser.contexts.clear()
+        browser.extra.clear()
+        await _close_quietly(browser.browser)
+
+    def _forget(self, pooled: PooledContext):
+        browser = pooled.browser
+        if browser.contexts.get(pooled.key) is pooled:
+            del browser.contexts[pooled.key]
+        if pooled in browser.extra:
+            browser.extra.remove(pooled)
+
+    # ==================== Idle reaping ====================
+
+    async def reap_idle(self):
+        """Close contexts and browsers unused for longer than the idle timeout."""
+        cutoff = time.monotonic() - self.idle_timeout
+        async with self._condition():
+            for browser in list(self._browsers):
+                for key, pooled in list(browser.contexts.items()):
+                    if not pooled.in_use and pooled.last_used < cutoff:
+                        del browser.contexts[key]
+                        await _close_quietly(pooled.context)
+                if not browser.busy and not browser.contexts and browser.last_used < cutoff:
+                    logger.info("Closing idle pooled browser")
+                    await self._close_browser(browser)
+
+    async def close_all(self):
+        """Close every browser (the runtime stops Playwright itself)."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        for browser in list(self._browsers):
+            await self._close_browser(browser)
+        self._playwright = None
+        # The condition belongs to this loop; a restarted runtime needs a new one
+        self._cond = None
+
+    def _condition(self) -> asyncio.Condition:
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    def _ensure_reaper(self):
+        if self.idle_timeout > 0 and (self._reaper is None or self._reaper.done()):
+            self._reaper = asyncio.get_running_loop().create_task(self._reap_forever())
+
+    async def _reap_forever(self):
+        while True:
+            await asyncio.sleep(min(REAP_INTERVAL, self.idle_timeout))
+            try:
+                await self.reap_idle()
+            except Exception as e:
+                logger.warning(f"Browser pool idle sweep failed: {e}")
+
+
+async def browser_memory_mb(browser) -> float | None:
+    """
+    Resident memory of a browser's processes, or None if it cannot be read.
+
+    Process IDs come from the DevTools protocol; their memory from psutil
+    when installed, otherwise from /proc (Linux).
+    """
+    try:
+        session = await browser.new_browser_cdp_session()
+        try:
+            info = await session.send("SystemInfo.getProcessInfo")
+        finally:
+            await session.detach()
+    except Exception as e:
+        logger.debug(f"Could not query browser processes: {e}")
+        return None
+
+    total = 0
+    for process in info.get("processInfo", []):
+        rss = _process_rss(process.get("id"))
+        if rss is None:
+            return None
+        total += rss
+    return total / (1024 * 1024)
+
+
+def _process_rss(pid: int | None) -> int | None:
+    """Resident set size of a process in bytes."""
+    if pid is None:
+        return None
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            return 0  # Exited since it was listed
+    if sys.platform.startswith("linux"):
+        try:
+            pages = int(Path(f"/proc/{pid}/statm").read_text().split()[1])
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError, IndexError):
+            return None
+        import resource
+        return pages * resource.getpagesize()
+    return None
+
+
+async def _close_quietly(obj):
+    try:
+        await obj.close()
+    except Exception as e:
+        logger.debug(f"Ignoring error while closing {type(obj).__name__}: {e}")
+
+
+# Singleton browser pool instance
+_browser_pool: BrowserPool | None = None
+_browser_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Get or create the browser pool instance."""
+    global _browser_pool
+    with _browser_pool_lock:
+        if _browser_pool is None:
+            _browser_pool = BrowserPool()
+            get_automation_runtime().add_shutdown_hook(_browser_pool.close_all)
+        return _browser_pool
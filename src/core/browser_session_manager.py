@@ -10,19 +10,28 @@ import logging
 import asyncio
 import os
 import sys
+import threading
+from contextlib import asynccontextmanager
 from pathlib import Path
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional, Dict, List
 
-from playwright.async_api import async_playwright
-
-from src.config import PROJECT_ROOT
+from src.config import PROJECT_ROOT, config
+from src.core.automation_runtime import get_automation_runtime
+from src.core.network_policy import apply_network_policy, get_network_policy
+from src.data.database import get_database
 from src.data.encryption import get_encryption
 
 logger = logging.getLogger(__name__)
 
 
+def session_key(platform: str, account: Optional[str | int] = None) -> str:
+    """Key of an account's session, e.g. "facebook:3" ("facebook" without an account)."""
+    platform = platform.lower()
+    return platform if account is None else f"{platform}:{account}"
+
+
 @dataclass
 class BrowserSession:
     """Stored browser session with cookies."""
@@ -32,11 +41,24 @@ class BrowserSession:
     user_name: Optional[str] = None
     created_at: datetime = field(default_factory=datetime.now)
     last_used: datetime = field(default_factory=datetime.now)
+    account: Optional[str] = None  # None: the platform-wide session from before accounts were tracked
+    origins: List[dict] = field(default_factory=list)  # localStorage per origin
+    
+    @property
+    def key(self) -> str:
+        return session_key(self.platform, self.account)
+    
+    @property
+    def storage_state(self) -> dict:
+        """Playwright storage state (cookies and localStorage) for a new context."""
+        return {"cookies": self.cookies, "origins": self.origins}
     
     def to_dict(self) -> dict:
         return {
             "platform": self.platform,
+            "account": self.account,
             "cookies": self.cookies,
+            "origins": self.origins,
             "user_agent": self.user_agent,
             "user_name": self.user_name,
             "created_at": self.created_at.isoformat(),
@@ -47,7 +69,9 @@ class BrowserSession:
     def from_dict(cls, data: dict) -> "BrowserSession":
         return cls(
             platform=data["platform"],
+            account=data.get("account"),
             cookies=data.get("cookies", []),
+            origins=data.get("origins", []),
             user_agent=data.get("user_agent", ""),
             user_name=data.get("user_name"),
             created_at=datetime.fromisoformat(data.get("created_at", datetime.now().isoformat())),
@@ -90,6 +114,11 @@ class BrowserSessionManager:
     2. App captures cookies automatically
     3. Cookies saved encrypted
     4. Future posts reuse cookies (no re-login needed)
+    
+    Sessions are kept per account under ``session_key(platform, account)``.
+    The platform-wide session saved before sessions were per account is
+    handed to the platform's account only while it has just one; with
+    several accounts, each has to log in on its own.
     """
     
     SESSIONS_FILE = PROJECT_ROOT / "data" / "browser_sessions.enc"
@@ -116,6 +145,9 @@ class BrowserSessionManager:
     def __init__(self):
         self.encryption = get_encryption()
         self.sessions: Dict[str, BrowserSession] = {}
+        # Guards ``sessions`` and the sessions file: the keep-alive, the probe
+        # and the automation loop all update them
+        self._lock = threading.RLock()
         self.browser_configs: Dict[str, BrowserConfig] = {}
         self._load_sessions()
         self._load_browser_configs()
@@ -130,8 +162,8 @@ class BrowserSessionManager:
             decrypted = self.encryption.decrypt(encrypted)
             data = json.loads(decrypted)
             
-            for platform, session_data in data.items():
-                self.sessions[platform] = BrowserSession.from_dict(session_data)
+            for key, session_data in data.items():
+                self.sessions[key] = BrowserSession.from_dict(session_data)
             
             logger.info(f"Loaded {len(self.sessions)} browser sessions")
         except Exception as e:
@@ -140,10 +172,11 @@ class BrowserSessionManager:
     def _save_sessions(self):
         """Save sessions to encrypted file."""
         try:
-            self.SESSIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
-            data = {platform: session.to_dict() for platform, session in self.sessions.items()}
-            encrypted = self.encryption.encrypt(json.dumps(data))
-            self.SESSIONS_FILE.write_bytes(encrypted)
+            with self._lock:
+                self.SESSIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
+                data = {key: session.to_dict() for key, session in self.sessions.items()}
+                encrypted = self.encryption.encrypt(json.dumps(data))
+                self.SESSIONS_FILE.write_bytes(encrypted)
             logger.info("Browser sessions saved")
         except Exception as e:
             logger.error(f"Failed to save sessions: {e}")
@@ -302,15 +335,61 @@ class BrowserSessionManager:
         self._save_browser_configs()
         logger.info(f"Set {browser_type} as browser for {platform}")
     
-    def has_session(self, platform: str) -> bool:
-        """Check if we have a saved session for platform."""
-        return platform in self.sessions and len(self.sessions[platform].cookies) > 0
+    def has_session(self, platform: str, account: Optional[str | int] = None) -> bool:
+        """Check if we have a saved session for an account (or the platform)."""
+        session = self.get_session(platform, account)
+        return session is not None and len(session.cookies) > 0
+    
+    def get_session(self, platform: str, account: Optional[str | int] = None) -> Optional[BrowserSession]:
+        """Get the saved session of an account (or the platform-wide one without an account)."""
+        with self._lock:
+            session = self.sessions.get(session_key(platform, account))
+            if session is None and account is not None:
+                session = self._adopt_shared_session(platform, account)
+            return session
+    
+    def list_sessions(self) -> List[BrowserSession]:
+        """Get every saved session."""
+        with self._lock:
+            return list(self.sessions.values())
+    
+    def _adopt_shared_session(self, platform: str, account: str | int) -> Optional[BrowserSession]:
+        """
+        Move the platform-wide session to the platform's only account.
+        
+        Whoever logged in before sessions were per account can't be told
+        apart once several accounts are configured, so then nobody gets it.
+        """
+        shared = self.sessions.get(session_key(platform))
+        if shared is None:
+            return None
+        accounts = self._configured_accounts(platform)
+        if accounts != [str(account)]:
+            logger.debug(f"Not using the {platform} session for account {account}: {len(accounts)} accounts configured")
+            return None
+        del self.sessions[shared.key]
+        shared.account = str(account)
+        self.sessions[shared.key] = shared
+        self._save_sessions()
+        logger.info(f"Saved {platform} session now belongs to account {account}")
+        return shared
+    
+    def _configured_accounts(self, platform: str) -> List[str]:
+        """IDs of the platform's active accounts (empty if they can't be read)."""
+        try:
+            return [str(a.id) for a in get_database().get_accounts_by_platform(platform.lower())]
+        except Exception as e:
+            logger.warning(f"Could not read the {platform} accounts: {e}")
+            return []
     
-    def get_session(self, platform: str) -> Optional[BrowserSession]:
-        """Get saved session for platform."""
-        return self.sessions.get(platform)
+    @asynccontextmanager
+    async def _playwright(self):
+        """Use the automation runtime's shared Playwright instead of starting a driver."""
+        yield await get_automation_runtime().playwright()
     
-    async def authenticate(self, platform: str, headless: bool = False) -> tuple[bool, str]:
+    async def authenticate(
+        self, platform: str, headless: bool = False, account: Optional[str | int] = None
+    ) -> tuple[bool, str]:
         """
         Authenticate with a platform by capturing browser session.
         
@@ -319,6 +398,7 @@ class BrowserSessionManager:
         Args:
             platform: Platform to authenticate (facebook, twitter, linkedin)
             headless: Whether to run browser headless
+            account: Account the session is saved for (None: platform-wide)
             
         Returns:
             (success: bool, message: str)
@@ -335,7 +415,7 @@ class BrowserSessionManager:
         logger.info(f"Starting authentication for {platform} using {browser_config.browser_type}")
         browser = None
         
-        async with async_playwright() as p:
+        async with self._playwright() as p:
             try:
                 # Launch browser
                 browser = await p.chromium.launch(
@@ -398,17 +478,20 @@ class BrowserSessionManager:
                             logger.debug(f"Could not get user name: {e}")
                         
                         # Save session
-                        all_cookies = [{k: v for k, v in c.items()} for c in cookies]
+                        state = await context.storage_state()
                         
                         session = BrowserSession(
                             platform=platform,
-                            cookies=all_cookies,
+                            account=None if account is None else str(account),
+                            cookies=state["cookies"],
+                            origins=state.get("origins", []),
                             user_agent=await page.evaluate("() => navigator.userAgent"),
                             user_name=user_name,
                         )
                         
-                        self.sessions[platform] = session
-                        self._save_sessions()
+                        with self._lock:
+                            self.sessions[session.key] = session
+                            self._save_sessions()
                         
                         await browser.close()
                         
@@ -429,42 +512,51 @@ class BrowserSessionManager:
                         pass
                 return False, f"Authentication failed: {str(e)}"
     
-    async def create_context_with_session(self, platform: str, p) -> tuple[Optional[any], Optional[str]]:
+    async def create_context_with_session(
+        self, platform: str, p=None, account: Optional[str | int] = None, headless: bool = False
+    ) -> tuple[Optional[any], Optional[str]]:
         """
         Create browser context with saved session cookies.
         
         Args:
             platform: Platform to create context for
-            p: Playwright instance
+            p: Playwright instance (defaults to the automation runtime's)
+            account: Account whose session to restore
+            headless: Launch without a window; only then are resources blocked
             
         Returns:
             (context, error_message)
         """
-        if not self.has_session(platform):
-            return None, f"No saved session for {platform}. Please authenticate first."
+        if not self.has_session(platform, account):
+            return None, f"No saved session for {session_key(platform, account)}. Please authenticate first."
         
-        session = self.sessions[platform]
+        session = self.get_session(platform, account)
         browser_config = self.browser_configs.get(platform)
         
         if not browser_config:
             return None, "No browser configured"
         
         try:
+            p = p or await get_automation_runtime().playwright()
             # Launch browser
             browser = await p.chromium.launch(
-                headless=False,
+                headless=headless,
                 executable_path=browser_config.executable_path,
                 args=["--disable-blink-features=AutomationControlled"],
             )
             
-            # Create context with saved cookies
+            # Create context with the saved cookies and localStorage
             context = await browser.new_context(
                 viewport={"width": 1280, "height": 800},
                 user_agent=session.user_agent,
+                storage_state=session.storage_state,
             )
             
-            # Add cookies
-            await context.add_cookies(session.cookies)
+            # Skip images, video and trackers the automation does not need;
+            # a visible browser is watched by the user, so it loads everything
+            policy = get_network_policy(platform)
+            if headless and policy and config.browser.block_resources:
+                await apply_network_policy(context, policy)
             
             # Update last used
             session.last_used = datetime.now()
@@ -476,32 +568,71 @@ class BrowserSessionManager:
             logger.error(f"Failed to create context: {e}")
             return None, f"Failed to restore session: {str(e)}"
     
+    def update_session_cookies(self, key: str, cookies: List[dict]) -> int:
+        """
+        Merge rotated cookies into a saved session and save it.
+        
+        Cookies replace the saved ones with the same name, domain and path;
+        new ones are added. A change of value or expiry counts as rotated.
+        
+        Args:
+            key: Session key (see ``session_key``)
+            cookies: Cookies in Playwright's format
+            
+        Returns:
+            Number of cookies that changed
+        """
+        # Read, merge and write under the lock, or concurrent refreshes lose cookies
+        with self._lock:
+            session = self.sessions.get(key)
+            if session is None:
+                return 0
+            saved = {(c.get("name"), c.get("domain"), c.get("path")): c for c in session.cookies}
+            changed = 0
+            for cookie in cookies:
+                ident = (cookie.get("name"), cookie.get("domain"), cookie.get("path"))
+                old = saved.get(ident)
+                if old is not None and old.get("value") == cookie.get("value") \
+                        and old.get("expires") == cookie.get("expires"):
+                    continue
+                saved[ident] = {**(old or {"sameSite": "Lax"}), **cookie}
+                changed += 1
+            if changed:
+                session.cookies = list(saved.values())
+                self._save_sessions()
+            return changed
+    
     def get_stored_accounts(self) -> List[dict]:
         """Get list of stored authenticated accounts."""
         accounts = []
-        for platform, session in self.sessions.items():
+        for session in self.list_sessions():
+            browser_config = self.browser_configs.get(session.platform)
             accounts.append({
-                "platform": platform,
+                "platform": session.platform,
+                "account": session.account,
                 "user": session.user_name or "Unknown",
-                "browser": self.browser_configs.get(platform, {}).browser_type or "Unknown",
+                "browser": browser_config.browser_type if browser_config else "Unknown",
                 "created": session.created_at.strftime("%Y-%m-%d %H:%M"),
                 "last_used": session.last_used.strftime("%Y-%m-%d %H:%M"),
             })
         return accounts
     
-    def logout(self, platform: str) -> bool:
-        """Logout from platform and clear session."""
-        if platform in self.sessions:
-            del self.sessions[platform]
+    def logout(self, platform: str, account: Optional[str | int] = None) -> bool:
+        """Logout from platform (or one account) and clear session."""
+        key = session_key(platform, account)
+        with self._lock:
+            if key not in self.sessions:
+                return False
+            del self.sessions[key]
             self._save_sessions()
-            logger.info(f"Logged out from {platform}")
-            return True
-        return False
+        logger.info(f"Logged out from {key}")
+        return True
     
     def clear_all_sessions(self):
         """Clear all saved sessions."""
-        self.sessions.clear()
-        self._save_sessions()
+        with self._lock:
+            self.sessions.clear()
+            self._save_sessions()
         logger.info("All sessions cleared")
 
 
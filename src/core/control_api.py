@@ -0,0 +1,523 @@
+"""
+Control API - Local HTTP/JSON interface for bulk scheduling.
+
+Lets other tools (e.g. a content pipeline) schedule thousands of posts
+without going through the GUI dialogs. Served on 127.0.0.1 by the app or
+the daemon when ``API_ENABLED=true``; requests must carry
+``Authorization: Bearer <API_TOKEN>`` when a token is configured. A token
+is required to listen on any other interface than loopback.
+
+Endpoints:
+    GET    /health             Liveness check
+    GET    /queue              Execution queue lanes, pending and running jobs
+    POST   /posts              Schedule a JSON batch (all or nothing)
+    POST   /posts/stream       Schedule NDJSON, one post per line, stored in
+                               batches of ``API_BATCH_SIZE`` as it is read
+    GET    /posts/<id>         Get a post
+    DELETE /posts/<id>         Cancel a pending post
+
+A post is ``{"account_id": 1, "content": "...", "scheduled_time":
+"2026-01-01T09:00:00", "media_paths": [], "priority": "bulk"}``; the
+platform is taken from the account.
+"""
+
+import hmac
+import ipaddress
+import json
+import logging
+import threading
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable, Iterator
+from urllib.parse import parse_qsl, urlsplit
+
+from src.config import config
+from src.core.execution_queue import Priority, get_execution_queue
+from src.data.database import get_database
+from src.data.models import ScheduledPost
+from src.utils.exceptions import ConfigurationError
+
+
+logger = logging.getLogger(__name__)
+
+
+# Stream responses report at most this many rejected lines
+MAX_REPORTED_ERRORS = 100
+
+
+class IngestError(ValueError):
+    """Raised when posts in a batch fail validation."""
+
+    def __init__(self, errors: list[dict]):
+        super().__init__(f"{len(errors)} invalid post(s)")
+        self.errors = errors
+
+
+class PostIngestor:
+    """Validates incoming posts and schedules them in batches."""
+
+    def __init__(self, scheduler=None, db=None, batch_size: int | None = None):
+        """
+        Initialize the ingestor.
+
+        Args:
+            scheduler: SchedulerManager (defaults to the shared instance)
+            db: Optional database
+            batch_size: Posts stored per transaction when streaming
+        """
+        self._scheduler = scheduler
+        self._db = db
+        self.batch_size = batch_size or config.api.batch_size
+        self._lock = threading.Lock()
+
+    @property
+    def scheduler(self):
+        if self._scheduler is None:
+            from src.core.scheduler import get_scheduler
+            self._scheduler = get_scheduler()
+        return self._scheduler
+
+    @property
+    def db(self):
+        return self._db or get_database()
+
+    def parse_post(
+        self,
+        raw: dict,
+        default_priority: Priority = Priority.BULK,
+        accounts: dict | None = None,
+    ) -> tuple[ScheduledPost, str, Priority]:
+        """
+        Validate one post.
+
+        Args:
+            raw: Decoded JSON object
+            default_priority: Lane when the post does not name one
+            accounts: Cache of accounts looked up so far
+
+        Returns:
+            (unsaved post, platform, priority)
+
+        Raises:
+            ValueError: If the post is invalid
+        """
+        if not isinstance(raw, dict):
+            raise ValueError("Post must be a JSON object")
+
+        account_id = raw.get("account_id")
+        if not isinstance(account_id, int) or isinstance(account_id, bool):
+            raise ValueError("account_id must be an integer")
+        accounts = {} if accounts is None else accounts
+        if account_id not in accounts:
+            accounts[account_id] = self.db.get_account(account_id)
+        account = accounts[account_id]
+        if account is None or not account.is_active:
+            raise ValueError(f"Account {account_id} not found or inactive")
+
+        content = raw.get("content", "")
+        media_paths = raw.get("media_paths", [])
+        if not isinstance(content, str):
+            raise ValueError("content must be a string")
+        if not isinstance(media_paths, list) or not all(isinstance(p, str) for p in media_paths):
+            raise ValueError("media_paths must be a list of strings")
+        if not content.strip() and not media_paths:
+            raise ValueError("Post needs content or media")
+
+        try:
+            scheduled_time = datetime.fromisoformat(raw["scheduled_time"])
+        except KeyError:
+            raise ValueError("scheduled_time is required") from None
+        except (TypeError, ValueError):
+            raise ValueError("scheduled_time must be an ISO 8601 date-time") from None
+        if scheduled_time.tzinfo is not None:
+            # Stored times are naive local time
+            scheduled_time = scheduled_time.astimezone().replace(tzinfo=None)
+
+        priority = default_priority
+        if raw.get("priority") is not None:
+            try:
+                priority = Priority[str(raw["priority"]).upper()]
+            except KeyError:
+                lanes = ", ".join(p.lane for p in Priority)
+                raise ValueError(f"priority must be one of: {lanes}") from None
+
+        post = ScheduledPost(
+            id=None,
+            account_id=account_id,
+            content=content,
+            scheduled_time=scheduled_time,
+            media_paths=media_paths,
+        )
+        return post, account.platform, priority
+
+    def schedule(self, items: list, default_priority: Priority = Priority.BULK) -> list[int]:
+        """
+        Validate and schedule a batch; nothing is stored if any post is invalid.
+
+        Args:
+            items: Decoded JSON posts
+            default_priority: Lane for posts that do not name one
+
+        Returns:
+            IDs of the new posts, in input order
+
+        Raises:
+            IngestError: If any post is invalid
+        """
+        accounts: dict = {}
+        parsed = []
+        errors = []
+        for index, raw in enumerate(items):
+            try:
+                parsed.append(self.parse_post(raw, default_priority, accounts))
+            except ValueError as e:
+                errors.append({"index": index, "error": str(e)})
+        if errors:
+            raise IngestError(errors)
+        return self._store(parsed)
+
+    def schedule_stream(
+        self, lines: Iterable[bytes], default_priority: Priority = Priority.BULK
+    ) -> dict:
+        """
+        Validate and schedule NDJSON lines, storing every ``batch_size`` posts.
+
+        Lines are consumed lazily, so a slow database or scheduler slows down
+        reading from the client instead of buffering the whole stream.
+        Invalid lines are reported and skipped.
+
+        Args:
+            lines: Raw NDJSON lines
+            default_priority: Lane for posts that do not name one
+
+        Returns:
+            Summary with accepted/rejected counts, post IDs and line errors
+        """
+        accounts: dict = {}
+        batch = []
+        post_ids: list[int] = []
+        errors: list[dict] = []
+        rejected = 0
+        batches = 0
+
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                batch.append(self.parse_post(json.loads(line), default_priority, accounts))
+            except ValueError as e:  # json.JSONDecodeError is a ValueError
+                rejected += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"line": number, "error": str(e)})
+                continue
+            if len(batch) >= self.batch_size:
+                post_ids.extend(self._store(batch))
+                batches += 1
+                batch = []
+        if batch:
+            post_ids.extend(self._store(batch))
+            batches += 1
+
+        logger.info(f"Ingested {len(post_ids)} post(s) in {batches} batch(es), rejected {rejected}")
+        return {
+            "accepted": len(post_ids),
+            "rejected": rejected,
+            "batches": batches,
+            "post_ids": post_ids,
+            "errors": errors,
+        }
+
+    def _store(self, parsed: list[tuple[ScheduledPost, str, Priority]]) -> list[int]:
+        """Save and schedule parsed posts, one scheduler batch per lane."""
+        ids_by_index: dict[int, int] = {}
+        by_priority: dict[Priority, list[int]] = {}
+        for index, (_, _, priority) in enumerate(parsed):
+            by_priority.setdefault(priority, []).append(index)
+
+        # Slot allocation reads the pending posts, so batches must not interleave
+        with self._lock:
+            for priority, indexes in by_priority.items():
+                post_ids = self.scheduler.add_posts(
+                    [parsed[i][0] for i in indexes],
+                    [parsed[i][1] for i in indexes],
+                    priority=priority,
+                    db=self.db,
+                )
+                ids_by_index.update(zip(indexes, post_ids))
+        return [ids_by_index[i] for i in range(len(parsed))]
+
+
+class ControlApiHandler(BaseHTTPRequestHandler):
+    """Routes control API requests to the ingestor and scheduler."""
+
+    server: "ControlApiServer"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _dispatch(self, method: str):
+        if not self._authorized():
+            self._drain_body()
+            self._send_json(HTTPStatus.UNAUTHORIZED, {"error": "Missing or invalid token"})
+            return
+
+        path = self.path.split("?", 1)[0].rstrip("/")
+        parts = path.strip("/").split("/")
+        try:
+            if method == "GET" and path == "/health":
+                self._send_json(HTTPStatus.OK, {"status": "ok"})
+            elif method == "GET" and path == "/queue":
+                self._get_queue()
+            elif method == "POST" and path == "/posts":
+                self._post_batch()
+            elif method == "POST" and path == "/posts/stream":
+                self._post_stream()
+            elif len(parts) == 2 and parts[0] == "posts" and parts[1].isdigit():
+                if method == "GET":
+                    self._get_post(int(parts[1]))
+                elif method == "DELETE":
+                    self._cancel_post(int(parts[1]))
+                else:
+                    self._send_json(HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Method not allowed"})
+            else:
+                self._drain_body()
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": f"No route for {method} {path}"})
+        except Exception as e:
+            logger.exception(f"Control API error on {method} {path}: {e}")
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)})
+
+    def _authorized(self) -> bool:
+        token = self.server.token
+        if not token:
+            return True
+        header = self.headers.get("Authorization", "")
+        return hmac.compare_digest(header, f"Bearer {token}")
+
+    def _get_queue(self):
+        scheduler = self.server.ingestor.scheduler
+        self._send_json(HTTPStatus.OK, {
+            "lanes": get_execution_queue().snapshot(),
+            "scheduled_jobs": len(scheduler.get_pending_jobs()),
+            "in_flight": scheduler.in_flight_jobs(),
+        })
+
+    def _post_batch(self):
+        try:
+            payload = json.loads(self._read_body() or b"null")
+        except ValueError:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "Body must be JSON"})
+            return
+
+        if isinstance(payload, dict):
+            items = payload.get("posts")
+            default = payload.get("priority")
+        else:
+            items, default = payload, None
+        if not isinstance(items, list):
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": "Expected a list of posts"})
+            return
+        if len(items) > config.api.max_batch:
+            self._send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {
+                "error": f"At most {config.api.max_batch} posts per request; use /posts/stream"
+            })
+            return
+
+        try:
+            priority = self._priority(default)
+            post_ids = self.server.ingestor.schedule(items, priority)
+        except IngestError as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e), "errors": e.errors})
+            return
+        except ValueError as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+        self._send_json(HTTPStatus.CREATED, {"accepted": len(post_ids), "post_ids": post_ids})
+
+    def _post_stream(self):
+        try:
+            priority = self._priority(self._query().get("priority"))
+        except ValueError as e:
+            self._drain_body()
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+        summary = self.server.ingestor.schedule_stream(self._iter_body_lines(), priority)
+        self._send_json(HTTPStatus.OK, summary)
+
+    def _get_post(self, post_id: int):
+        post = self.server.ingestor.db.get_scheduled_post(post_id)
+        if post is None:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Post {post_id} not found"})
+            return
+        self._send_json(HTTPStatus.OK, post.to_dict())
+
+    def _cancel_post(self, post_id: int):
+        ingestor = self.server.ingestor
+        post = ingestor.db.get_scheduled_post(post_id)
+        if post is None:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Post {post_id} not found"})
+            return
+        if not ingestor.db.cancel_pending_post(post_id):
+            self._send_json(HTTPStatus.CONFLICT, {
+                "error": f"Post {post_id} is {post.status.value} and can no longer be cancelled"
+            })
+            return
+        ingestor.scheduler.cancel_job(f"post_{post_id}")
+        self._send_json(HTTPStatus.OK, {"id": post_id, "status": "cancelled"})
+
+    @staticmethod
+    def _priority(name: str | None) -> Priority:
+        if name is None:
+            return Priority.BULK
+        try:
+            return Priority[str(name).upper()]
+        except KeyError:
+            raise ValueError(f"Unknown priority: {name}") from None
+
+    def _query(self) -> dict[str, str]:
+        return dict(parse_qsl(urlsplit(self.path).query))
+
+    def _read_body(self) -> bytes:
+        return b"".join(self._iter_body_chunks())
+
+    def _drain_body(self):
+        for _ in self._iter_body_chunks():
+            pass
+
+    def _iter_body_chunks(self, size: int = 65536) -> Iterator[bytes]:
+        """Read the request body (Content-Length or chunked encoding)."""
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            while True:
+                length = int(self.rfile.readline().split(b";", 1)[0].strip() or b"0", 16)
+                if length == 0:
+                    # Skip trailers up to the terminating blank line
+                    while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    return
+                yield self.rfile.read(length)
+                self.rfile.readline()  # CRLF after the chunk
+        remaining = int(self.headers.get("Content-Length") or 0)
+        while remaining > 0:
+            chunk = self.rfile.read(min(size, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
+
+    def _iter_body_lines(self) -> Iterator[bytes]:
+        buffer = b""
+        for chunk in self._iter_body_chunks():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            yield from lines
+        if buffer:
+            yield buffer
+
+    def _send_json(self, status: HTTPStatus, payload: dict):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _is_loopback(host: str) -> bool:
+    """Whether a host only accepts connections from this machine."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class ControlApiServer(ThreadingHTTPServer):
+    """Threaded HTTP server for the control API."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str | None = None,
+        port: int | None = None,
+        token: str | None = None,
+        ingestor: PostIngestor | None = None,
+    ):
+        """
+        Initialize and bind the server.
+
+        Args:
+            host: Interface to listen on (defaults to API_HOST)
+            port: Port to listen on; 0 picks a free one (defaults to API_PORT)
+            token: Bearer token required on every request (defaults to API_TOKEN)
+            ingestor: Post ingestor (defaults to one using the shared scheduler)
+
+        Raises:
+            ConfigurationError: The host is not loopback and no token is set
+        """
+        settings = config.api
+        host = host or settings.host
+        token = settings.token if token is None else token
+        if not token and not _is_loopback(host):
+            raise ConfigurationError("API_TOKEN", f"required to listen on {host}; set it or use API_HOST=127.0.0.1")
+        super().__init__((host, settings.port if port is None else port), ControlApiHandler)
+        self.token = token
+        self.ingestor = ingestor or PostIngestor()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve requests on a background thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self.serve_forever, name="control-api", daemon=True)
+        self._thread.start()
+        logger.info(f"Control API listening on {self.url}")
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+        logger.info("Control API stopped")
+
+
+def start_control_api(scheduler=None) -> ControlApiServer | None:
+    """
+    Start the control API if it is enabled in the config.
+
+    Args:
+        scheduler: SchedulerManager to schedule posts with
+
+    Returns:
+        The running server, or None if disabled or the port is unavailable
+    """
+    if not config.api.enabled:
+        return None
+    try:
+        server = ControlApiServer(ingestor=PostIngestor(scheduler=scheduler))
+    except OSError as e:
+        logger.error(f"Control API could not listen on {config.api.host}:{config.api.port}: {e}")
+        return None
+    except ConfigurationError as e:
+        logger.error(f"Control API not started: {e}")
+        return None
+    server.start()
+    return server
@@ -0,0 +1,226 @@
+"""
+Debug Artifacts - Bounded screenshots of Playwright posts for debugging.
+
+The Facebook flows used to write full-window PNGs (``fb_feed.png``,
+``fb_composer.png``...) into the working directory on every post, paying
+for PNG encoding each time and overwriting each other's files when posts
+ran concurrently. Now each post records into its own ArtifactRecorder:
+
+- ``BROWSER_SCREENSHOTS=off``: nothing is captured
+- ``on_failure`` (default): each step is captured as a compressed JPEG into
+  an in-memory ring buffer of the last ``BROWSER_SCREENSHOT_FRAMES``
+  frames, which is only written to disk if the post fails
+- ``every_step``: the same frames, written for every post
+
+Frames are written to ``data/screenshots/<job_id>/``. Once the job folders
+there exceed ``BROWSER_SCREENSHOTS_MAX_MB``, the oldest are deleted.
+
+Flows call ``capture(page, step)``; the recorder of the current post is
+found through a context variable, so concurrent posts on the automation
+loop never mix their frames.
+"""
+
+import asyncio
+import contextvars
+import logging
+import re
+import shutil
+import threading
+import uuid
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+
+from src.config import PROJECT_ROOT, config
+
+
+logger = logging.getLogger(__name__)
+
+
+class CaptureLevel(Enum):
+    """When screenshots are taken and kept."""
+    OFF = "off"
+    ON_FAILURE = "on_failure"
+    EVERY_STEP = "every_step"
+
+
+@dataclass
+class Frame:
+    """One captured screenshot."""
+    step: str
+    data: bytes
+    taken_at: datetime = field(default_factory=datetime.now)
+
+
+class ArtifactRecorder:
+    """Ring buffer of one post's screenshots."""
+
+    def __init__(self, job_id: str, level: CaptureLevel, frames: int, quality: int, root: Path):
+        self.job_id = job_id
+        self.level = level
+        self.quality = quality
+        self.root = root
+        self.frames: deque[Frame] = deque(maxlen=max(1, frames))
+        self.failure: str | None = None
+        self._count = 0
+
+    @property
+    def directory(self) -> Path:
+        return self.root / re.sub(r"[^\w.-]", "_", self.job_id)
+
+    async def capture(self, page, step: str):
+        """Take a JPEG of the visible viewport into the ring buffer."""
+        if self.level is CaptureLevel.OFF:
+            return
+        try:
+            data = await page.screenshot(type="jpeg", quality=self.quality)
+        except Exception as e:
+            logger.debug(f"Screenshot of step {step} failed: {e}")
+            return
+        self._count += 1
+        self.frames.append(Frame(step=f"{self._count:02d}_{step}", data=data))
+
+    def fail(self, reason: str):
+        """Mark the post as failed, so its frames are kept."""
+        self.failure = reason
+
+    @property
+    def should_write(self) -> bool:
+        if self.level is CaptureLevel.OFF or not self.frames:
+            return False
+        return self.level is CaptureLevel.EVERY_STEP or self.failure is not None
+
+    def write(self) -> Path | None:
+        """Write the buffered frames to ``data/screenshots/<job_id>/``."""
+        directory = self.directory
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            for frame in self.frames:
+                step = re.sub(r"[^\w.-]", "_", frame.step)
+                (directory / f"{frame.taken_at:%Y%m%d-%H%M%S}_{step}.jpg").write_bytes(frame.data)
+            if self.failure is not None:
+                with open(directory / "failure.txt", "a", encoding="utf-8") as f:
+                    f.write(f"{datetime.now().isoformat(timespec='seconds')} {self.failure}\n")
+        except OSError as e:
+            logger.warning(f"Failed to write debug screenshots for {self.job_id}: {e}")
+            return None
+        logger.info(f"Saved {len(self.frames)} debug screenshot(s) to {directory}")
+        self.frames.clear()
+        return directory
+
+
+_current_recorder: contextvars.ContextVar[ArtifactRecorder | None] = contextvars.ContextVar(
+    "current_recorder", default=None
+)
+
+
+async def capture(page, step: str):
+    """Capture ``page`` into the current post's recorder, if there is one."""
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        await recorder.capture(page, step)
+
+
+def fail_current(reason: str):
+    """Mark the current post as failed (keeps its screenshots)."""
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        recorder.fail(reason)
+
+
+class DebugArtifacts:
+    """Creates per-post recorders and bounds the screenshots kept on disk."""
+
+    SCREENSHOTS_DIR = PROJECT_ROOT / "data" / "screenshots"
+
+    def __init__(
+        self,
+        level: CaptureLevel | str | None = None,
+        frames: int | None = None,
+        quality: int | None = None,
+        max_mb: float | None = None,
+        root: Path | None = None,
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            level: Capture level (defaults to ``BROWSER_SCREENSHOTS``)
+            frames: Frames kept per post
+            quality: JPEG quality, 1-100
+            max_mb: Size above which the oldest job folders are deleted (0 disables)
+            root: Folder for the job folders
+        """
+        settings = config.browser
+        self.level = CaptureLevel(level or settings.screenshots)
+        self.frames = settings.screenshot_frames if frames is None else frames
+        self.quality = settings.screenshot_quality if quality is None else quality
+        self.max_mb = settings.screenshots_max_mb if max_mb is None else max_mb
+        self.root = Path(root) if root else self.SCREENSHOTS_DIR
+
+    @asynccontextmanager
+    async def recording(self, job_id: str | None = None):
+        """
+        Record the screenshots of one post.
+
+        Frames are written on exit if the post failed (an exception, or
+        ``fail`` was called) or the level is ``every_step``.
+
+        Args:
+            job_id: Folder name for the frames (generated if None)
+        """
+        job_id = job_id or f"facebook-{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+        recorder = ArtifactRecorder(job_id, self.level, self.frames, self.quality, self.root)
+        token = _current_recorder.set(recorder)
+        try:
+            yield recorder
+        except BaseException as e:
+            if not isinstance(e, asyncio.CancelledError):
+                recorder.fail(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_recorder.reset(token)
+            if recorder.should_write:
+                await asyncio.to_thread(self._persist, recorder)
+
+    def _persist(self, recorder: ArtifactRecorder):
+        if recorder.write() is not None:
+            self.enforce_retention()
+
+    def enforce_retention(self):
+        """Delete the oldest job folders until they fit in ``max_mb``."""
+        if not self.max_mb or not self.root.exists():
+            return
+        folders = []
+        for directory in self.root.iterdir():
+            if not directory.is_dir():
+                continue
+            files = [f for f in directory.rglob("*") if f.is_file()]
+            size = sum(f.stat().st_size for f in files)
+            newest = max((f.stat().st_mtime for f in files), default=directory.stat().st_mtime)
+            folders.append((newest, size, directory))
+        total = sum(size for _, size, _ in folders)
+        limit = self.max_mb * 1024 * 1024
+        for _, size, directory in sorted(folders):
+            if total <= limit:
+                break
+            shutil.rmtree(directory, ignore_errors=True)
+            total -= size
+            logger.info(f"Deleted old debug screenshots {directory.name}")
+
+
+# Singleton debug artifacts instance
+_debug_artifacts: DebugArtifacts | None = None
+_debug_artifacts_lock = threading.Lock()
+
+
+def get_debug_artifacts() -> DebugArtifacts:
+    """Get or create the debug artifacts service."""
+    global _debug_artifacts
+    with _debug_artifacts_lock:
+        if _debug_artifacts is None:
+            _debug_artifacts = DebugArtifacts()
+        return _debug_artifacts
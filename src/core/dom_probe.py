@@ -0,0 +1,163 @@
+"""
+DOM Probe - Find and score element candidates in one round trip per frame.
+
+Checking a candidate selector through locators costs a CDP round trip per
+question (``count``, ``is_visible``, ``is_editable``, ``is_enabled``, each
+``get_attribute``), and the element finder asks them for dozens of
+selectors and every iframe. ``probe_page`` instead sends all candidate
+selectors to each frame in a single ``evaluate`` call, with the frames
+probed concurrently. The page-side script scores every match on visibility,
+editability, role, placeholder and whether it sits in a dialog, and tags it
+with a ``data-aio-probe`` attribute so the Python side can build a locator
+for it. The result is one list, best candidate first.
+
+Only plain CSS selectors can be probed; Playwright-specific ones such as
+``:has-text()`` or ``text=`` are skipped by the page script.
+"""
+
+import asyncio
+import itertools
+import logging
+from dataclasses import dataclass
+from typing import Sequence
+
+from playwright.async_api import Error as PlaywrightError, Frame, Locator, Page
+
+
+logger = logging.getLogger(__name__)
+
+PROBE_ATTRIBUTE = "data-aio-probe"
+
+# Matches scored per selector; the rest are usually the same element's ancestors or copies
+MATCHES_PER_SELECTOR = 10
+
+_tokens = itertools.count(1)
+
+_PROBE_SCRIPT = """
+([selectors, token, limit, attr]) => {
+    document.querySelectorAll(`[${attr}]`).forEach((el) => el.removeAttribute(attr));
+    const seen = new Set();
+    const results = [];
+    selectors.forEach((selector, rank) => {
+        let nodes;
+        try {
+            nodes = document.querySelectorAll(selector);
+        } catch (e) {
+            return;  // Not plain CSS
+        }
+        let taken = 0;
+        for (const el of nodes) {
+            if (taken++ >= limit) break;
+            if (seen.has(el)) continue;
+            seen.add(el);
+            const rect = el.getBoundingClientRect();
+            const style = getComputedStyle(el);
+            const visible = rect.width > 0 && rect.height > 0
+                && style.visibility !== "hidden" && style.display !== "none"
+                && parseFloat(style.opacity || "1") > 0;
+            const tag = el.tagName.toLowerCase();
+            const disabled = el.disabled === true || el.getAttribute("aria-disabled") === "true";
+            const editable = !disabled && (el.isContentEditable
+                || ((tag === "textarea" || tag === "input") && !el.readOnly));
+            const role = el.getAttribute("role");
+            const placeholder = el.getAttribute("aria-placeholder") || el.getAttribute("placeholder");
+            const inDialog = el.closest("[role='dialog']") !== null;
+            const score = (visible ? 8 : 0) + (editable ? 4 : 0) + (role === "textbox" ? 2 : 0)
+                + (placeholder ? 1 : 0) + (inDialog ? 1 : 0);
+            const id = `${token}-${results.length}`;
+            el.setAttribute(attr, id);
+            results.push({
+                id, selector, rank, visible, editable, enabled: !disabled, role, placeholder,
+                tag, inDialog, score, textLength: (el.innerText || "").length,
+            });
+        }
+    });
+    return results;
+}
+"""
+
+
+@dataclass
+class ProbeMatch:
+    """One scored element found by the probe."""
+    frame: Frame
+    probe_id: str
+    selector: str          # First (best-ranked) selector that matched the element
+    rank: int              # Position of ``selector`` in the probed list
+    score: int
+    visible: bool
+    editable: bool
+    enabled: bool
+    role: str | None
+    placeholder: str | None
+    tag: str
+    in_dialog: bool
+    text_length: int
+    frame_index: int = 0   # 0 is the main frame
+
+    @property
+    def locator(self) -> Locator:
+        """Locator of exactly this element (valid until the next probe of its frame)."""
+        return self.frame.locator(f"[{PROBE_ATTRIBUTE}='{self.probe_id}']")
+
+
+async def probe_frame(
+    frame: Frame,
+    selectors: Sequence[str],
+    frame_index: int = 0,
+    limit: int = MATCHES_PER_SELECTOR,
+) -> list[ProbeMatch]:
+    """
+    Score every element matching ``selectors`` in one frame with a single ``evaluate``.
+
+    Returns:
+        Matches in page-script order; empty if the frame went away
+    """
+    token = f"p{next(_tokens)}"
+    try:
+        rows = await frame.evaluate(_PROBE_SCRIPT, [list(selectors), token, limit, PROBE_ATTRIBUTE])
+    except PlaywrightError as e:
+        logger.debug(f"Probe of frame {frame_index} failed: {e}")
+        return []
+    return [
+        ProbeMatch(
+            frame=frame,
+            probe_id=row["id"],
+            selector=row["selector"],
+            rank=row["rank"],
+            score=row["score"],
+            visible=row["visible"],
+            editable=row["editable"],
+            enabled=row["enabled"],
+            role=row["role"],
+            placeholder=row["placeholder"],
+            tag=row["tag"],
+            in_dialog=row["inDialog"],
+            text_length=row["textLength"],
+            frame_index=frame_index,
+        )
+        for row in rows
+    ]
+
+
+async def probe_page(page: Page, selectors: Sequence[str], frames: bool = True) -> list[ProbeMatch]:
+    """
+    Probe the main frame and (optionally) every iframe concurrently.
+
+    Args:
+        page: Page to probe
+        selectors: Candidate CSS selectors, most preferred first
+        frames: Also probe child frames
+
+    Returns:
+        All matches, best first: highest score, then selector rank, then frame
+    """
+    targets = [page.main_frame]
+    if frames:
+        targets += [frame for frame in page.frames if frame != page.main_frame]
+    results = await asyncio.gather(*(
+        probe_frame(frame, selectors, frame_index=index) for index, frame in enumerate(targets)
+    ))
+    matches = [match for frame_matches in results for match in frame_matches]
+    matches.sort(key=lambda m: (-m.score, m.rank, m.frame_index))
+    return matches
@@ -0,0 +1,269 @@
+"""
+Execution Queue - One priority queue for every posting path.
+
+Immediate "Post now" requests, scheduled jobs, retries and bulk imports all
+compete for the same browser and accounts. They are funnelled through a
+single queue with shared limits:
+
+- Lanes are served in priority order: interactive, scheduled, retry, bulk
+  (FIFO within a lane).
+- At most ``max_workers`` posts run at once; ``interactive_slots`` of those
+  are kept free for interactive posts, so "Post now" never waits behind the
+  backlog.
+- Posts with the same key (``platform:account``) never run concurrently.
+- Items may carry a deadline; an item not started in time fails with
+  ``QueueTimeoutError`` instead of waiting forever.
+
+The SchedulerEngine submits due jobs to the queue in their stored lane.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable
+
+from src.config import config
+
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Queue lanes, highest priority first."""
+    INTERACTIVE = 0
+    SCHEDULED = 1
+    RETRY = 2
+    BULK = 3
+
+    @property
+    def lane(self) -> str:
+        return self.name.lower()
+
+
+class QueueTimeoutError(TimeoutError):
+    """Raised when a queued item was not started before its deadline."""
+
+
+@dataclass
+class _QueueItem:
+    priority: Priority
+    seq: int
+    fn: Callable
+    args: tuple
+    kwargs: dict
+    future: Future
+    key: str | None = None
+    deadline: float | None = None  # time.monotonic() value
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def order(self) -> tuple[int, int]:
+        return (self.priority, self.seq)
+
+
+class ExecutionQueue:
+    """Priority queue with shared worker threads and per-key exclusion."""
+
+    def __init__(self, max_workers: int | None = None, interactive_slots: int | None = None):
+        """
+        Initialize the queue.
+
+        Args:
+            max_workers: Posts that may run at once, across all lanes
+            interactive_slots: Slots only interactive posts may use
+        """
+        settings = config.scheduler
+        self.max_workers = max(1, max_workers or settings.max_workers)
+        reserved = settings.interactive_slots if interactive_slots is None else interactive_slots
+        # Background lanes always keep at least one slot
+        self.background_limit = max(1, self.max_workers - reserved)
+
+        self._pending: list[_QueueItem] = []
+        self._running_keys: set[str] = set()
+        self._running: dict[Priority, int] = {p: 0 for p in Priority}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._shutdown = False
+        self._threads: list[threading.Thread] = []
+
+    def submit(
+        self,
+        fn: Callable,
+        *args: Any,
+        priority: Priority = Priority.SCHEDULED,
+        key: str | None = None,
+        timeout: float | None = None,
+        **kwargs: Any,
+    ) -> Future:
+        """
+        Queue a callable.
+
+        Args:
+            fn: Callable to run
+            *args: Positional arguments for fn
+            priority: Lane to queue in
+            key: Exclusion key; items with equal keys never run concurrently
+            timeout: Max seconds to wait for a slot (None waits indefinitely)
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Future for the call's result
+        """
+        future: Future = Future()
+        item = _QueueItem(
+            priority=Priority(priority),
+            seq=next(self._seq),
+            fn=fn,
+            args=args,
+            kwargs=kwargs,
+            future=future,
+            key=key,
+            deadline=time.monotonic() + timeout if timeout is not None else None,
+        )
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Execution queue is shut down")
+            self._pending.append(item)
+            self._ensure_threads()
+            self._cond.notify_all()
+        return future
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        """Get waiting and running counts per lane."""
+        with self._cond:
+            return {
+                p.lane: {
+                    "waiting": sum(1 for item in self._pending if item.priority == p),
+                    "running": self._running[p],
+                }
+                for p in Priority
+            }
+
+    def shutdown(self, wait: bool = False, cancel_pending: bool = True):
+        """
+        Stop the worker threads.
+
+        Args:
+            wait: Wait for running items to finish
+            cancel_pending: Cancel items that have not started
+        """
+        with self._cond:
+            self._shutdown = True
+            if cancel_pending:
+                for item in self._pending:
+                    item.future.cancel()
+                self._pending.clear()
+            self._cond.notify_all()
+            threads = list(self._threads)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def _ensure_threads(self):
+        """Start worker threads up to max_workers (lock held)."""
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < self.max_workers:
+            # Daemon threads: shutdown drains and checkpoints posts before exit
+            thread = threading.Thread(
+                target=self._worker,
+                name=f"execution-queue-{len(self._threads)}",
+                daemon=True,
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def _next_item(self) -> tuple[_QueueItem | None, float | None]:
+        """
+        Pick the best runnable item (lock held).
+
+        Returns:
+            (item or None, seconds until the next deadline or None)
+        """
+        now = time.monotonic()
+        background_running = sum(
+            count for p, count in self._running.items() if p != Priority.INTERACTIVE
+        )
+        best = None
+        next_deadline = None
+        for item in list(self._pending):
+            if item.deadline is not None and item.deadline <= now:
+                self._pending.remove(item)
+                if item.future.set_running_or_notify_cancel():
+                    waited = now - item.enqueued_at
+                    item.future.set_exception(
+                        QueueTimeoutError(f"No free slot within {waited:.0f}s ({item.priority.lane} lane)")
+                    )
+                continue
+            if item.deadline is not None:
+                remaining = item.deadline - now
+                next_deadline = remaining if next_deadline is None else min(next_deadline, remaining)
+            if item.key is not None and item.key in self._running_keys:
+                continue
+            if item.priority != Priority.INTERACTIVE and background_running >= self.background_limit:
+                continue
+            if best is None or item.order < best.order:
+                best = item
+        return best, next_deadline
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._shutdown and not self._pending:
+                        return
+                    item, wait_for = self._next_item()
+                    if item is not None:
+                        break
+                    self._cond.wait(timeout=wait_for)
+                self._pending.remove(item)
+                if not item.future.set_running_or_notify_cancel():
+                    continue
+                self._running[item.priority] += 1
+                if item.key is not None:
+                    self._running_keys.add(item.key)
+
+            try:
+                result = item.fn(*item.args, **item.kwargs)
+            except BaseException as e:
+                item.future.set_exception(e)
+            else:
+                item.future.set_result(result)
+            finally:
+                with self._cond:
+                    self._running[item.priority] -= 1
+                    if item.key is not None:
+                        self._running_keys.discard(item.key)
+                    self._cond.notify_all()
+
+
+def lane_priority(lane: str | None) -> Priority:
+    """Queue lane of a stored post (``ScheduledPost.lane``)."""
+    for priority in Priority:
+        if priority.lane == lane:
+            return priority
+    return Priority.SCHEDULED
+
+
+def post_key(platform: str | None, account_id: int | None) -> str | None:
+    """Exclusion key for posts that use the same account's browser session."""
+    if not platform:
+        return None
+    return f"{platform.lower()}:{account_id}"
+
+
+# Singleton execution queue instance
+_execution_queue: ExecutionQueue | None = None
+_execution_queue_lock = threading.Lock()
+
+
+def get_execution_queue() -> ExecutionQueue:
+    """Get or create the execution queue instance."""
+    global _execution_queue
+    with _execution_queue_lock:
+        if _execution_queue is None:
+            _execution_queue = ExecutionQueue()
+        return _execution_queue
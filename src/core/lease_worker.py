@@ -0,0 +1,280 @@
+"""
+Lease Worker - Claim due posts from the shared database.
+
+Several worker processes (on one host, or on hosts sharing the database)
+can execute posts from the same ``scheduled_posts`` table without posting
+anything twice:
+
+- A worker claims a post by atomically switching it to RUNNING with a
+  time-limited lease in its name.
+- While the post is being published, a heartbeat renews the lease.
+- If a worker crashes, its lease expires and another worker reclaims the
+  post; posts abandoned ``max_attempts`` times are marked failed.
+- Posts overdue by more than the misfire grace time are claimed and failed
+  as missed instead of being published late.
+
+Run a worker with ``python -m src.daemon --mode worker``.
+"""
+
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import Future, wait
+from functools import partial
+
+from src.config import config
+from src.core.execution_queue import lane_priority
+from src.core.posting_pipeline import PostContext, get_pipeline
+from src.core.result_recorder import get_result_recorder
+from src.core.scheduler_metrics import ExecutionRecorder
+from src.data.database import get_database
+from src.data.models import PostResult, PostStatusEnum, ScheduledPost
+
+
+logger = logging.getLogger(__name__)
+
+
+def lease_owner_id() -> str:
+    """Identifier of this process as a lease owner."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseKeeper:
+    """Renews the leases of posts held by this process on a heartbeat thread."""
+
+    def __init__(self, db=None, lease_seconds: int | None = None, heartbeat_interval: int | None = None):
+        self._db = db
+        self.lease_seconds = lease_seconds or config.scheduler.lease_seconds
+        self.heartbeat_interval = heartbeat_interval or config.scheduler.heartbeat_interval
+        self._held: dict[int, str] = {}  # post_id -> owner
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+
+    @property
+    def db(self):
+        return self._db or get_database()
+
+    @property
+    def held(self) -> set[int]:
+        with self._lock:
+            return set(self._held)
+
+    def hold(self, post_id: int, owner: str):
+        """Start renewing the lease of a claimed post."""
+        with self._lock:
+            self._held[post_id] = owner
+            if self._thread is None or not self._thread.is_alive():
+                self._stop_event.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="lease-heartbeat", daemon=True
+                )
+                self._thread.start()
+
+    def release(self, post_id: int):
+        """Stop renewing a lease."""
+        with self._lock:
+            self._held.pop(post_id, None)
+
+    def stop(self):
+        """Stop the heartbeat thread."""
+        self._stop_event.set()
+
+    def renew_all(self):
+        """Renew every held lease once."""
+        with self._lock:
+            held = list(self._held.items())
+        for post_id, owner in held:
+            try:
+                if not self.db.renew_lease(post_id, owner, self.lease_seconds):
+                    logger.warning(f"Lost lease on post {post_id}; another worker may run it")
+                    self.release(post_id)
+            except Exception as e:
+                logger.error(f"Failed to renew lease on post {post_id}: {e}")
+
+    def _run(self):
+        while not self._stop_event.wait(self.heartbeat_interval):
+            self.renew_all()
+
+
+# Singleton lease keeper instance
+_lease_keeper: LeaseKeeper | None = None
+
+
+def get_lease_keeper() -> LeaseKeeper:
+    """Get or create the lease keeper instance."""
+    global _lease_keeper
+    if _lease_keeper is None:
+        _lease_keeper = LeaseKeeper()
+    return _lease_keeper
+
+
+class LeaseWorker:
+    """Polls the database for due posts and executes the ones it claims."""
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        poll_interval: int | None = None,
+        owner: str | None = None,
+        db=None,
+    ):
+        """
+        Initialize the worker.
+
+        Args:
+            max_workers: Posts this worker holds at once (they run through
+                         the shared execution queue)
+            poll_interval: Seconds between polls for due posts
+            owner: Lease owner ID (defaults to host:pid)
+            db: Optional database
+        """
+        settings = config.scheduler
+        self.max_workers = max_workers or settings.max_workers
+        self.poll_interval = poll_interval or settings.poll_interval
+        self.lease_seconds = settings.lease_seconds
+        self.max_attempts = settings.max_attempts
+        self.owner = owner or lease_owner_id()
+        self._db = db
+        self.recorder = ExecutionRecorder(db=db)
+
+        self._active: set[int] = set()
+        self._futures: set[Future] = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def db(self):
+        return self._db or get_database()
+
+    def start(self):
+        """Start polling in a background thread."""
+        from src.core.scheduler_tasks import clear_shutdown
+
+        if self._thread is not None:
+            return
+        clear_shutdown()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="lease-poller", daemon=True)
+        self._thread.start()
+        logger.info(f"Lease worker {self.owner} started ({self.max_workers} slots)")
+
+    def stop(self, drain_timeout: float | None = None):
+        """
+        Stop claiming posts and drain running ones for a bounded time.
+
+        Claimed posts that have not started publishing are requeued; posts
+        still publishing after ``drain_timeout`` seconds finish in the
+        background.
+
+        Args:
+            drain_timeout: Seconds to wait (defaults to SCHEDULER_DRAIN_TIMEOUT)
+        """
+        from src.core.scheduler_tasks import request_shutdown
+
+        timeout = config.scheduler.drain_timeout if drain_timeout is None else drain_timeout
+        self._stop_event.set()
+        request_shutdown()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            futures = set(self._futures)
+        _, pending = wait(futures, timeout=timeout)
+        get_result_recorder().flush()
+        if pending:
+            logger.warning(
+                f"{len(pending)} post(s) still publishing after {timeout}s; "
+                "leaving them to finish in the background"
+            )
+        logger.info(f"Lease worker {self.owner} stopped")
+
+    def poll_once(self) -> int:
+        """
+        Claim as many due posts as there are free slots and submit them.
+
+        Returns:
+            Number of posts claimed
+        """
+        self._fail_missed_posts()
+        with self._lock:
+            free = self.max_workers - len(self._active)
+        posts = self.db.claim_due_posts(
+            self.owner,
+            self.lease_seconds,
+            free,
+            max_attempts=self.max_attempts,
+            grace_seconds=config.scheduler.misfire_grace_time,
+        )
+        keeper = get_lease_keeper()
+        for post in posts:
+            with self._lock:
+                self._active.add(post.id)
+            # Keep the lease alive while the post waits in the queue
+            keeper.hold(post.id, self.owner)
+            account = self.db.get_account(post.account_id)
+            platform = account.platform if account else ""
+            self.recorder.job_submitted(f"post_{post.id}")
+            ctx = PostContext(
+                platform=platform,
+                account_id=post.account_id,
+                content=post.content,
+                media_paths=post.media_paths,
+                post_id=post.id,
+                owner=self.owner,
+            )
+            future = get_pipeline().submit(ctx, lane_priority(post.lane))
+            with self._lock:
+                self._futures.add(future)
+            future.add_done_callback(partial(self._finished, post))
+        if posts:
+            logger.info(f"Claimed {len(posts)} due post(s)")
+        return len(posts)
+
+    def _fail_missed_posts(self):
+        """Fail posts that are too late to publish (the scheduler's missed jobs)."""
+        missed = self.db.claim_missed_posts(
+            self.owner, self.lease_seconds, config.scheduler.misfire_grace_time
+        )
+        recorder = get_result_recorder()
+        for post in missed:
+            account = self.db.get_account(post.account_id)
+            recorder.record(PostResult(
+                platform=account.platform if account else "unknown",
+                account_id=post.account_id,
+                status=PostStatusEnum.FAILED,
+                message="Missed its scheduled time (no worker was running)",
+                post_id=post.id,
+                owner=self.owner,
+                content=post.content,
+            ))
+        if missed:
+            logger.warning(f"Failed {len(missed)} post(s) that missed their scheduled time")
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.error(f"Lease worker poll failed: {e}")
+            self._stop_event.wait(self.poll_interval)
+
+    def _finished(self, post: ScheduledPost, future: Future):
+        """Record the timings of a finished post and free its slot."""
+        result = None
+        error = None
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.exception(f"Claimed post {post.id} failed: {e}")
+            error = e
+        finally:
+            get_lease_keeper().release(post.id)
+            with self._lock:
+                self._active.discard(post.id)
+                self._futures.discard(future)
+        self.recorder.job_finished(
+            f"post_{post.id}", post.scheduled_time, result=result, error=error, post_id=post.id
+        )
@@ -0,0 +1,212 @@
+"""
+Network Policy - Block resources a posting browser does not need.
+
+Opening the composer does not need the feed's photos, autoplay video,
+web fonts, analytics beacons or third-party trackers, but the browser
+downloads all of them on every post. A NetworkPolicy, applied to a
+browser context through Playwright routing, decides per request:
+
+- allow: URLs on the allowlist (UI sprites and the platform's own
+  scripts/styles the composer renders with), documents, and everything
+  first-party that is not a heavy resource type
+- block: images, media and fonts, and any third-party host
+- stub: beacons and known analytics endpoints, answered with an empty
+  response so page scripts waiting on them carry on
+
+Routing every request through the driver also turns off Chromium's HTTP
+cache for the context, which the blocked bytes more than make up for.
+
+NetworkStats counts the decisions and the bytes actually received, and
+records time-to-composer for the post being published.
+"""
+
+import asyncio
+import logging
+import re
+import time
+import weakref
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+from playwright.async_api import BrowserContext, Error as PlaywrightError, Request, Route
+
+
+logger = logging.getLogger(__name__)
+
+ALLOW = "allow"
+BLOCK = "block"
+STUB = "stub"
+
+# Empty answers for stubbed requests, by resource type
+_STUB_RESPONSES = {
+    "script": {"status": 200, "body": "", "content_type": "application/javascript"},
+    "stylesheet": {"status": 200, "body": "", "content_type": "text/css"},
+}
+_NO_CONTENT = {"status": 204, "body": ""}
+
+
+def _host_matches(host: str, suffixes: tuple[str, ...]) -> bool:
+    return any(host == suffix or host.endswith("." + suffix) for suffix in suffixes)
+
+
+@dataclass(frozen=True)
+class NetworkPolicy:
+    """Which requests a platform's posting browser lets through."""
+    first_party: tuple[str, ...]                  # Host suffixes of the platform itself
+    allow: tuple[str, ...] = ()                   # URL regexes always let through
+    stub_urls: tuple[str, ...] = ()               # URL regexes answered with an empty response
+    stub_hosts: tuple[str, ...] = ()              # Analytics/ads host suffixes, stubbed
+    block_types: frozenset[str] = frozenset({"image", "media", "font"})
+    stub_types: frozenset[str] = frozenset({"ping"})  # sendBeacon / <a ping>
+    block_third_party: bool = True
+
+    def decide(self, url: str, resource_type: str) -> str:
+        """Return ALLOW, BLOCK or STUB for a request."""
+        if any(re.search(pattern, url) for pattern in self.allow):
+            return ALLOW
+        host = (urlsplit(url).hostname or "").lower()
+        if (
+            resource_type in self.stub_types
+            or _host_matches(host, self.stub_hosts)
+            or any(re.search(pattern, url) for pattern in self.stub_urls)
+        ):
+            return STUB
+        if resource_type == "document":
+            return ALLOW  # Navigations and the composer's iframes
+        if self.block_third_party and not _host_matches(host, self.first_party):
+            return BLOCK
+        if resource_type in self.block_types:
+            return BLOCK
+        return ALLOW
+
+
+_ANALYTICS_HOSTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "scorecardresearch.com",
+)
+
+POLICIES: dict[str, NetworkPolicy] = {
+    "facebook": NetworkPolicy(
+        first_party=("facebook.com", "fbcdn.net", "facebook.net", "fbsbx.com"),
+        # rsrc.php serves the UI's scripts, styles and icon sprites
+        allow=(r"^https://static\.[a-z0-9.-]*fbcdn\.net/rsrc\.php/",),
+        # Client-side event logging
+        stub_urls=(r"^https://www\.facebook\.com/ajax/bz", r"^https://www\.facebook\.com/ajax/bnzai"),
+        stub_hosts=_ANALYTICS_HOSTS,
+    ),
+    "twitter": NetworkPolicy(
+        first_party=("twitter.com", "x.com", "twimg.com"),
+        allow=(r"^https://abs\.twimg\.com/responsive-web/",),
+        stub_hosts=_ANALYTICS_HOSTS,
+    ),
+    "linkedin": NetworkPolicy(
+        first_party=("linkedin.com", "licdn.com"),
+        allow=(r"^https://static\.licdn\.com/",),
+        stub_hosts=_ANALYTICS_HOSTS,
+    ),
+}
+
+
+def get_network_policy(platform: str) -> NetworkPolicy | None:
+    """Get the policy of a platform (None lets everything through)."""
+    return POLICIES.get(platform.split(":", 1)[0].lower())
+
+
+@dataclass
+class NetworkStats:
+    """Request decisions and transfer of one context since the current post began."""
+    allowed: int = 0
+    blocked: int = 0
+    stubbed: int = 0
+    bytes_received: int = 0
+    blocked_by_type: dict[str, int] = field(default_factory=dict)
+    started_at: float | None = None
+    time_to_composer_ms: float | None = None
+    _pending: set = field(default_factory=set, repr=False)
+
+    def begin(self):
+        """Start counting for a new post (call before navigating)."""
+        self.allowed = self.blocked = self.stubbed = self.bytes_received = 0
+        self.blocked_by_type = {}
+        self.started_at = time.monotonic()
+        self.time_to_composer_ms = None
+
+    def mark_composer(self):
+        """Record that the composer is open."""
+        if self.started_at is not None and self.time_to_composer_ms is None:
+            self.time_to_composer_ms = (time.monotonic() - self.started_at) * 1000
+
+    def summary(self) -> str:
+        """One-line description for the log."""
+        composer = "n/a" if self.time_to_composer_ms is None else f"{self.time_to_composer_ms:.0f}ms"
+        blocked = ", ".join(f"{kind} {count}" for kind, count in sorted(self.blocked_by_type.items()))
+        return (
+            f"Time to composer {composer}; {self.bytes_received / 1024:.0f} KB received; "
+            f"{self.allowed} allowed, {self.stubbed} stubbed, {self.blocked} blocked"
+            + (f" ({blocked})" if blocked else "")
+        )
+
+
+# Stats of every context a policy was applied to
+_context_stats: "weakref.WeakKeyDictionary[BrowserContext, NetworkStats]" = weakref.WeakKeyDictionary()
+
+
+def network_stats(context: BrowserContext) -> NetworkStats | None:
+    """Get the stats of a context, if a policy was applied to it."""
+    try:
+        return _context_stats.get(context)
+    except TypeError:  # Not weak-referenceable (test doubles)
+        return None
+
+
+async def apply_network_policy(context: BrowserContext, policy: NetworkPolicy) -> NetworkStats:
+    """
+    Route a context's requests through ``policy`` (once per context).
+
+    Returns:
+        The context's NetworkStats
+    """
+    stats = network_stats(context)
+    if stats is not None:
+        return stats
+    stats = NetworkStats()
+
+    async def handle(route: Route):
+        request = route.request
+        decision = policy.decide(request.url, request.resource_type)
+        try:
+            if decision == BLOCK:
+                kind = request.resource_type
+                stats.blocked += 1
+                stats.blocked_by_type[kind] = stats.blocked_by_type.get(kind, 0) + 1
+                await route.abort("blockedbyclient")
+            elif decision == STUB:
+                stats.stubbed += 1
+                await route.fulfill(**_STUB_RESPONSES.get(request.resource_type, _NO_CONTENT))
+            else:
+                stats.allowed += 1
+                await route.continue_()
+        except PlaywrightError as e:
+            logger.debug(f"Route of {request.url} not handled: {e}")
+
+    async def count_bytes(request: Request):
+        try:
+            sizes = await request.sizes()
+        except PlaywrightError:
+            return
+        stats.bytes_received += sizes.get("responseBodySize", 0) + sizes.get("responseHeadersSize", 0)
+
+    def on_finished(request: Request):
+        task = asyncio.ensure_future(count_bytes(request))
+        stats._pending.add(task)
+        task.add_done_callback(stats._pending.discard)
+
+    await context.route("**/*", handle)
+    context.on("requestfinished", on_finished)
+    try:
+        _context_stats[context] = stats
+    except TypeError:
+        pass
+    return stats
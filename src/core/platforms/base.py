@@ -72,6 +72,7 @@ class BasePlatform(ABC):
         """
         self.browser = browser_manager or get_browser_manager()
         self._logged_in = False
+        self._parked = False  # Already on the post page (pre-warmed)
     
     @property
     def driver(self) -> WebDriver:
@@ -129,6 +130,18 @@ class BasePlatform(ABC):
         """Navigate to the page where posts are created."""
         pass
     
+    def park_on_post_page(self):
+        """Open the post page ahead of time so the next post can start typing."""
+        self.navigate_to_post_page()
+        self._parked = True
+    
+    def open_post_page(self):
+        """Navigate to the post page unless the driver is already parked there."""
+        if self._parked:
+            self._parked = False
+            return
+        self.navigate_to_post_page()
+    
     def try_restore_session(self) -> bool:
         """
         Try to restore a previous session using saved cookies.
@@ -158,7 +158,7 @@ class FacebookPlatform(BasePlatform):
             )
         
         try:
-            self.navigate_to_post_page()
+            self.open_post_page()
             
             # Click on "What's on your mind" to open post dialog
             try:
@@ -171,7 +171,7 @@ class LinkedInPlatform(BasePlatform):
             )
         
         try:
-            self.navigate_to_post_page()
+            self.open_post_page()
             
             # Click "Start a post" button
             try:
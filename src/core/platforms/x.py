@@ -190,7 +190,7 @@ class XPlatform(BasePlatform):
             )
         
         try:
-            self.navigate_to_post_page()
+            self.open_post_page()
             
             # Find tweet compose box
             try:
@@ -313,7 +313,7 @@ class YouTubePlatform(BasePlatform):
         
         try:
             # Navigate to YouTube Studio
-            self.navigate_to_post_page()
+            self.open_post_page()
             
             # Click Create/Upload button
             create_btn = self.browser.wait_for_element(
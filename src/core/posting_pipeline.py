@@ -0,0 +1,630 @@
+"""
+Posting Pipeline - Stage-by-stage execution of scheduled posts.
+
+Publishing a post is split into five stages:
+
+1. prepare: claim the post, validate the platform, account and media, and
+   claim the account's other posts due within SCHEDULER_COALESCE_WINDOW
+2. session: open a browser and restore (or log into) the account's session,
+   or take the one the PreflightWorker parked for the post; for Facebook,
+   open the account's pooled context and park a logged-in feed page. If
+   the account's session expired, the posts go back to the retry lane
+   (SCHEDULER_SESSION_RETRY_DELAY) instead of waiting for someone to log in
+3. publish: create the post on the platform, then the coalesced ones in
+   the same session
+4. verify: check that a Facebook post went out, off the publish slot, and
+   release its page (coalesced posts and the Selenium drivers verify as
+   part of publishing, before the page moves on)
+5. record: close the browser, release the lease and hand the result to
+   the ResultRecorder, which stores results in batches
+
+``run_post_stages`` runs them back to back in the calling thread.
+``PostingPipeline`` runs each stage on its own worker pool with hand-offs
+between them, so while one post is publishing the next one is already
+validated and logged in. The publish stage goes through the shared
+ExecutionQueue, which keeps its priority lanes and per-account exclusion.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+from src.config import config
+from src.core.browser_automation import BrowserManager
+from src.core.execution_queue import (
+    ExecutionQueue, Priority, get_execution_queue, post_key,
+)
+from src.core.platforms import FacebookPlatform, XPlatform, LinkedInPlatform, YouTubePlatform
+from src.core.platforms.base import Credentials
+from src.core.result_recorder import get_result_recorder
+from src.core.social_poster import FacebookPost, get_poster
+from src.data.database import get_database
+from src.data.encryption import get_encryption
+from src.data.models import Account, PostResult, PostStatusEnum
+from src.utils.exceptions import SessionExpiredError
+from src.utils.helpers import contains_video_media, extract_video_paths
+
+
+logger = logging.getLogger(__name__)
+
+
+PLATFORM_CLASSES = {
+    "facebook": FacebookPlatform,
+    "x": XPlatform,
+    "linkedin": LinkedInPlatform,
+    "youtube": YouTubePlatform,
+}
+
+STAGES = ("prepare", "session", "publish", "verify", "record")
+
+
+# Set while the process is shutting down: claimed posts that have not started
+# publishing yet are handed back to the queue instead of being run.
+_shutdown_event = threading.Event()
+
+
+def request_shutdown():
+    """Stop starting new publishes (posts already publishing continue)."""
+    _shutdown_event.set()
+
+
+def clear_shutdown():
+    """Allow publishing again (called when a scheduler or worker starts)."""
+    _shutdown_event.clear()
+
+
+def shutdown_requested() -> bool:
+    """Check whether a shutdown is in progress."""
+    return _shutdown_event.is_set()
+
+
+@dataclass
+class PostContext:
+    """State of one post as it moves through the stages."""
+    platform: str
+    account_id: int
+    content: str
+    media_paths: list[str] = field(default_factory=list)
+    post_id: int | None = None
+    owner: str | None = None  # Lease owner once the post is claimed
+    account: Account | None = None
+    media: list[Path] = field(default_factory=list)
+    video_paths: list[str] = field(default_factory=list)
+    driver: Any = None
+    session: Any = None  # Facebook page parked by the session stage
+    submitted: bool = False  # Published, waiting for the verify stage
+    started_at: datetime | None = None
+    result: dict | None = None
+    stage_seconds: dict[str, float] = field(default_factory=dict)
+    # Posts of the same account published in this post's session
+    followers: list["PostContext"] = field(default_factory=list)
+
+    @property
+    def platform_key(self) -> str:
+        return (self.platform or "").lower()
+
+    @property
+    def done(self) -> bool:
+        """Whether an earlier stage already settled the outcome."""
+        return self.result is not None
+
+    @property
+    def job_id(self) -> str | None:
+        return f"post_{self.post_id}" if self.post_id is not None else None
+
+    def finish(self, status: str, message: str, post_url: str | None = None):
+        """Settle the outcome; later stages (except record) are skipped."""
+        self.result = {"status": status, "message": message, "post_url": post_url}
+
+
+def prepare_stage(ctx: PostContext):
+    """Claim the post and validate everything that does not need a browser."""
+    from src.core.lease_worker import get_lease_keeper, lease_owner_id
+
+    if ctx.started_at is None:
+        ctx.started_at = datetime.now()
+    logger.info(f"Executing scheduled post for {ctx.platform_key or ctx.platform}, account {ctx.account_id}")
+
+    if ctx.post_id is not None and ctx.owner is None:
+        owner = lease_owner_id()
+        if not get_database().claim_post(ctx.post_id, owner, config.scheduler.lease_seconds):
+            logger.info(f"Post {ctx.post_id} is not claimable (already taken or done), skipping")
+            ctx.finish("skipped", f"Post {ctx.post_id} was claimed by another worker or is no longer pending")
+            return
+        ctx.owner = owner
+    if ctx.owner is not None:
+        get_lease_keeper().hold(ctx.post_id, ctx.owner)
+
+    _validate(ctx)
+    _coalesce(ctx)
+
+
+def _validate(ctx: PostContext):
+    """Check the platform, account and media of a post."""
+    if ctx.platform_key == "facebook":
+        missing = [p for p in ctx.media_paths if not Path(p).exists()]
+        if missing:
+            ctx.finish("failed", f"Media file(s) not found: {', '.join(missing)}")
+            return
+        if contains_video_media(ctx.media_paths):
+            ctx.video_paths = extract_video_paths(ctx.media_paths)
+            if not ctx.video_paths:
+                ctx.finish("failed", "Reel scheduling requires at least one valid video file")
+        return
+
+    if ctx.platform_key not in PLATFORM_CLASSES:
+        ctx.finish("failed", f"Unknown platform: {ctx.platform}")
+        return
+
+    ctx.account = get_database().get_account(ctx.account_id)
+    if not ctx.account:
+        ctx.finish("failed", f"Account {ctx.account_id} not found")
+        return
+
+    ctx.media = [Path(p) for p in ctx.media_paths if Path(p).exists()]
+
+
+def _coalesce(ctx: PostContext):
+    """
+    Claim the account's other posts due within SCHEDULER_COALESCE_WINDOW.
+
+    They are published right after this post in the same browser session
+    instead of each paying for a browser launch and login, so up to the
+    window early. Their own jobs find them claimed and skip. The window
+    must exceed SCHEDULER_ACCOUNT_SPACING, which the slot allocator keeps
+    between one account's posts.
+    """
+    from src.core.lease_worker import get_lease_keeper
+
+    window = config.scheduler.coalesce_window
+    if window <= 0 or ctx.done or ctx.owner is None:
+        return
+
+    db = get_database()
+    until = datetime.now() + timedelta(seconds=window)
+    for post in db.get_pending_posts_due(until, account_id=ctx.account_id):
+        if post.id == ctx.post_id or not db.claim_post(post.id, ctx.owner, config.scheduler.lease_seconds):
+            continue
+        get_lease_keeper().hold(post.id, ctx.owner)
+        follower = PostContext(
+            platform=ctx.platform,
+            account_id=post.account_id,
+            content=post.content,
+            media_paths=post.media_paths,
+            post_id=post.id,
+            owner=ctx.owner,
+            started_at=datetime.now(),
+        )
+        _validate(follower)
+        ctx.followers.append(follower)
+    if ctx.followers:
+        logger.info(
+            f"Publishing {len(ctx.followers)} more post(s) of account {ctx.account_id} "
+            f"in the session of post {ctx.post_id}"
+        )
+
+
+def session_stage(ctx: PostContext):
+    """Open a browser for the post and restore or log into its session."""
+    if ctx.done:
+        return
+    if ctx.platform_key == "facebook":
+        try:
+            ctx.session = get_poster().open_facebook_session(account=ctx.account_id, headless=True)
+        except SessionExpiredError as e:
+            _defer_expired([ctx, *ctx.followers], e)
+        return
+
+    if ctx.post_id is not None:
+        from src.core.preflight import take_warm_driver
+
+        ctx.driver = take_warm_driver(ctx.post_id)
+        if ctx.driver is not None:
+            logger.info(f"Using the browser pre-warmed for post {ctx.post_id}")
+            return
+
+    # Each post gets its own browser so sessions can be prepared while
+    # another post is publishing
+    driver = PLATFORM_CLASSES[ctx.platform_key](BrowserManager())
+    ctx.driver = driver
+
+    session_restored = False
+    try:
+        session_restored = driver.try_restore_session()
+    except Exception as restore_err:
+        logger.warning("Failed to restore %s session: %s", ctx.platform_key, restore_err)
+
+    if session_restored:
+        return
+    if not ctx.account.encrypted_password:
+        ctx.finish("failed", "Account has no stored credentials. Please reconnect and save login info.")
+        return
+    credentials = Credentials(
+        username=ctx.account.username,
+        password=ctx.account.get_decrypted_password(get_encryption()),
+    )
+    if not driver.login(credentials):
+        ctx.finish("failed", "Failed to login to platform")
+
+
+def publish_stage(ctx: PostContext):
+    """Create the post, then its followers, checkpointing each as publishing first."""
+    group = [item for item in (ctx, *ctx.followers) if not item.done]
+    if ctx.done:
+        # The session could not be prepared, so the followers fail with it
+        for follower in group:
+            follower.finish(ctx.result["status"], ctx.result["message"])
+        return
+
+    if ctx.platform_key == "facebook":
+        _publish_facebook(group, ctx.session)
+        return
+
+    for item in group:
+        if not _checkpoint(item):
+            continue
+        try:
+            result = ctx.driver.create_post(item.content, item.media)
+        except Exception as e:
+            logger.exception(f"Error publishing post {item.post_id}: {e}")
+            item.finish("failed", str(e))
+            continue
+        item.finish(result.status.value, result.message, result.post_url)
+
+
+def _publish_facebook(group: list[PostContext], session: Any = None):
+    """Publish through the Playwright poster, one session for the whole group."""
+    try:
+        _publish_facebook_group(group, session)
+    except SessionExpiredError as e:
+        _defer_expired(group, e)
+
+
+def _publish_facebook_group(group: list[PostContext], session: Any):
+    poster = get_poster()
+    if len(group) == 1:
+        ctx = group[0]
+        if not _checkpoint(ctx):
+            return
+        # On a parked page, the verify stage checks the post after the publish slot is freed
+        verify = session is None
+        publish = poster.post_to_facebook_reel if ctx.video_paths else poster.post_to_facebook
+        success, message = publish(
+            ctx.content, ctx.video_paths or ctx.media_paths, headless=True, job_id=ctx.job_id,
+            account=ctx.account_id, allow_login=False, session=session, verify=verify,
+        )
+        if success and not verify:
+            ctx.submitted = True
+        else:
+            ctx.finish("success" if success else "failed", message)
+        return
+
+    posts = [
+        FacebookPost(
+            content=item.content,
+            media_paths=item.video_paths or item.media_paths,
+            is_reel=bool(item.video_paths),
+            job_id=item.job_id,
+        )
+        for item in group
+    ]
+    outcomes = poster.post_many_to_facebook(
+        posts,
+        before_each=lambda index: _checkpoint(group[index]),
+        headless=True,
+        account=group[0].account_id,
+        allow_login=False,
+        session=session,
+    )
+    for item, outcome in zip(group, outcomes):
+        if outcome is not None:
+            success, message = outcome
+            item.finish("success" if success else "failed", message)
+
+
+def _defer_expired(group: list[PostContext], error: SessionExpiredError):
+    """
+    Send posts whose session expired back to the retry lane.
+
+    Nothing was published (the session failed before the first post), so
+    stored posts run again after SCHEDULER_SESSION_RETRY_DELAY, until they
+    used up SCHEDULER_MAX_ATTEMPTS claims; other posts fail right away.
+    """
+    run_at = datetime.now() + timedelta(seconds=config.scheduler.session_retry_delay)
+    db = get_database()
+    for item in group:
+        if item.done:
+            continue
+        if item.owner is not None and db.defer_claimed_post(
+            item.post_id,
+            item.owner,
+            run_at,
+            f"Session expired ({error.message}); retrying at {run_at:%H:%M}",
+            max_attempts=config.scheduler.max_attempts,
+        ):
+            logger.warning(f"Session expired ({error.message}), post {item.post_id} retries at {run_at:%H:%M}")
+            item.finish("retry", f"Session expired, retrying at {run_at:%H:%M}; log in again before then")
+        else:
+            item.finish("failed", f"Session expired ({error.message}); log in again")
+
+
+def _checkpoint(ctx: PostContext) -> bool:
+    """
+    Mark a claimed post as publishing right before it is published.
+
+    Returns:
+        False if the post must not be published (shutdown or lost lease);
+        its outcome is settled then
+    """
+    if ctx.owner is None:
+        return True
+    db = get_database()
+    if shutdown_requested():
+        db.requeue_claimed_post(ctx.post_id, ctx.owner)
+        logger.info(f"Shutting down, requeued post {ctx.post_id}")
+        ctx.finish("requeued", "Requeued by shutdown before publishing")
+        return False
+    if not db.mark_publishing(ctx.post_id, ctx.owner):
+        ctx.finish("skipped", f"Lease on post {ctx.post_id} was lost before publishing")
+        return False
+    return True
+
+
+def verify_stage(ctx: PostContext):
+    """Check a post published on a parked page, then release the page."""
+    try:
+        if ctx.submitted and not ctx.done:
+            success, message = get_poster().verify_facebook_post(
+                ctx.session, ctx.content, is_reel=bool(ctx.video_paths), job_id=ctx.job_id
+            )
+            ctx.finish("success" if success else "failed", message)
+    finally:
+        _release_session(ctx)
+
+
+def _release_session(ctx: PostContext):
+    if ctx.session is None:
+        return
+    session, ctx.session = ctx.session, None
+    try:
+        get_poster().close_facebook_session(session)
+    except Exception as e:
+        logger.warning(f"Failed to release the session of post {ctx.post_id}: {e}")
+
+
+def record_stage(ctx: PostContext):
+    """Close the browser, release the leases and queue the outcomes for storage."""
+    _release_session(ctx)
+    if ctx.submitted and not ctx.done:
+        ctx.finish("success", "Published (verification did not run)")
+    if ctx.driver is not None:
+        try:
+            ctx.driver.browser.close()
+        except Exception as e:
+            logger.warning(f"Failed to close browser: {e}")
+        ctx.driver = None
+
+    _record_outcome(ctx)
+    for follower in ctx.followers:
+        if not follower.done:
+            follower.finish("failed", "Not published: the shared session stopped before this post")
+        _record_outcome(follower)
+
+
+def _record_outcome(ctx: PostContext):
+    """Release the post's lease and hand its result to the ResultRecorder."""
+    from src.core.lease_worker import get_lease_keeper
+
+    if ctx.owner is not None:
+        get_lease_keeper().release(ctx.post_id)
+
+    status = ctx.result.get("status")
+    # Requeued and retried posts were handed back already; skipped ones are not ours
+    if status in ("requeued", "retry", "skipped"):
+        return
+    get_result_recorder().record(PostResult(
+        platform=ctx.platform_key or "unknown",
+        account_id=ctx.account_id,
+        status=PostStatusEnum.SUCCESS if status == "success" else PostStatusEnum.FAILED,
+        message=ctx.result.get("message"),
+        post_url=ctx.result.get("post_url"),
+        post_id=ctx.post_id if ctx.owner is not None else None,
+        owner=ctx.owner,
+        content=ctx.content,
+    ))
+
+
+STAGE_FUNCTIONS: dict[str, Callable[[PostContext], None]] = {
+    "prepare": prepare_stage,
+    "session": session_stage,
+    "publish": publish_stage,
+    "verify": verify_stage,
+    "record": record_stage,
+}
+
+
+def run_stage(name: str, ctx: PostContext):
+    """Run one stage, timing it and turning exceptions into a failed result."""
+    start = time.monotonic()
+    try:
+        STAGE_FUNCTIONS[name](ctx)
+    except Exception as e:
+        logger.exception(f"Error executing scheduled post ({name} stage): {e}")
+        if not ctx.done:
+            ctx.finish("failed", str(e))
+    finally:
+        ctx.stage_seconds[name] = time.monotonic() - start
+
+
+def build_result(ctx: PostContext) -> dict:
+    """Result dict with platform, start/finish times and stage timings."""
+    result = dict(ctx.result or {"status": "failed", "message": "Post did not run", "post_url": None})
+    result["platform"] = ctx.platform_key or "unknown"
+    result["started_at"] = ctx.started_at
+    result["finished_at"] = datetime.now()
+    result["stage_seconds"] = dict(ctx.stage_seconds)
+    if ctx.post_id is not None:
+        result["post_id"] = ctx.post_id
+    # Posts handed back to the retry lane need a new job (see SchedulerManager)
+    retry_post_ids = [
+        item.post_id for item in (ctx, *ctx.followers)
+        if item.result and item.result.get("status") == "retry"
+    ]
+    if retry_post_ids:
+        result["retry_post_ids"] = retry_post_ids
+    return result
+
+
+def run_post_stages(ctx: PostContext) -> dict:
+    """
+    Run all stages for one post in the calling thread.
+
+    Args:
+        ctx: Post to publish
+
+    Returns:
+        Result dict with status, message, platform and start/finish times
+    """
+    for name in STAGES:
+        run_stage(name, ctx)
+    # Callers of the sequential path expect the outcome to be stored on return
+    get_result_recorder().flush()
+    return build_result(ctx)
+
+
+class PostingPipeline:
+    """Runs the stages of many posts concurrently, one worker pool per stage."""
+
+    def __init__(
+        self,
+        prepare_workers: int | None = None,
+        session_workers: int | None = None,
+        queue: ExecutionQueue | None = None,
+        verify_workers: int | None = None,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            prepare_workers: Threads validating and claiming posts
+            session_workers: Threads opening browsers and logging in
+            queue: Execution queue for the publish stage (defaults to the shared one)
+            verify_workers: Threads checking published posts
+        """
+        settings = config.scheduler
+        self._queue = queue
+        self._prepare = ThreadPoolExecutor(
+            max_workers=prepare_workers or settings.prepare_workers,
+            thread_name_prefix="pipeline-prepare",
+        )
+        session_workers = session_workers or settings.session_workers
+        self._session = ThreadPoolExecutor(
+            max_workers=session_workers,
+            thread_name_prefix="pipeline-session",
+        )
+        self._verify = ThreadPoolExecutor(
+            max_workers=verify_workers or settings.verify_workers,
+            thread_name_prefix="pipeline-verify",
+        )
+        self._record = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-record")
+        # Bounds open browsers: the ones publishing plus one prepared per session thread
+        self._ready = threading.BoundedSemaphore(self.queue.max_workers + session_workers)
+
+    @property
+    def queue(self) -> ExecutionQueue:
+        return self._queue or get_execution_queue()
+
+    def submit(self, ctx: PostContext, priority: Priority = Priority.SCHEDULED) -> Future:
+        """
+        Queue a post for publishing.
+
+        Args:
+            ctx: Post to publish
+            priority: Queue lane for the publish stage
+
+        Returns:
+            Future for the result dict (as returned by ``run_post_stages``)
+        """
+        outer: Future = Future()
+        outer.set_running_or_notify_cancel()
+        self._prepare.submit(self._run_prepare, ctx, priority, outer)
+        return outer
+
+    def shutdown(self, wait: bool = False):
+        """Stop the stage worker pools."""
+        for pool in (self._prepare, self._session, self._verify, self._record):
+            pool.shutdown(wait=wait)
+
+    def _run_prepare(self, ctx: PostContext, priority: Priority, outer: Future):
+        run_stage("prepare", ctx)
+        if ctx.done:
+            self._to_record(ctx, outer)
+        else:
+            self._session.submit(self._run_session, ctx, priority, outer)
+
+    def _run_session(self, ctx: PostContext, priority: Priority, outer: Future):
+        self._ready.acquire()
+        run_stage("session", ctx)
+        if ctx.done:
+            self._ready.release()
+            self._to_record(ctx, outer)
+            return
+
+        def published(f: Future):
+            if f.cancelled() or f.exception() is not None:
+                reason = "cancelled" if f.cancelled() else f.exception()
+                logger.error(f"Publish stage did not run for post {ctx.post_id}: {reason}")
+                if not ctx.done:
+                    ctx.finish("failed", f"Publish stage did not run: {reason}")
+            self._verify.submit(self._run_verify, ctx, outer)
+
+        try:
+            future = self.queue.submit(
+                run_stage,
+                "publish",
+                ctx,
+                priority=priority,
+                key=post_key(ctx.platform, ctx.account_id),
+            )
+        except Exception as e:
+            self._ready.release()
+            ctx.finish("failed", str(e))
+            self._to_record(ctx, outer)
+            return
+        future.add_done_callback(published)
+
+    def _run_verify(self, ctx: PostContext, outer: Future):
+        try:
+            run_stage("verify", ctx)
+        finally:
+            self._ready.release()
+            self._to_record(ctx, outer)
+
+    def _to_record(self, ctx: PostContext, outer: Future):
+        self._record.submit(self._run_record, ctx, outer)
+
+    def _run_record(self, ctx: PostContext, outer: Future):
+        try:
+            run_stage("record", ctx)
+            outer.set_result(build_result(ctx))
+        except Exception as e:
+            outer.set_exception(e)
+
+
+# Singleton pipeline instance
+_pipeline: PostingPipeline | None = None
+_pipeline_lock = threading.Lock()
+
+
+def get_pipeline() -> PostingPipeline:
+    """Get or create the posting pipeline instance."""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = PostingPipeline()
+        return _pipeline
@@ -0,0 +1,322 @@
+"""
+Preflight - Check scheduled posts and warm up browsers before they fire.
+
+Without it, problems with a post (a missing file, an expired session, too
+much text) only show up when the post fires, and every post waits for a
+cold browser start. The PreflightWorker looks at pending posts due within
+``SCHEDULER_PREFLIGHT_LEAD_MINUTES`` and, for each one:
+
+- checks that its media files exist (and that Reels have a video)
+- checks the content with ``validate_content_length``
+- checks that the account can log in (saved session or credentials); saved
+  Facebook sessions are checked over HTTP by the SessionProbe
+- for the Selenium platforms, opens a browser, restores the session and
+  parks it on the post page; the post's session stage picks it up, so at
+  fire time only typing and publishing are left
+
+Results are stored on the post and sent to listeners (such as the GUI)
+when they change. Posts that failed are checked again on every sweep
+until they pass, and posts that passed are revisited once a browser is
+free to park for them; editing a post clears its result.
+
+Facebook posts go through the Playwright poster, whose browsers stay warm
+in the BrowserPool, so they are checked but not parked here.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+from src.config import config
+from src.core.browser_automation import BrowserManager
+from src.core.browser_session_manager import get_session_manager
+from src.core.llm_client import Platform
+from src.core.posting_pipeline import PLATFORM_CLASSES, PostContext, session_stage
+from src.core.session_probe import get_session_probe
+from src.data.database import get_database
+from src.data.models import Account, ScheduledPost
+from src.utils.helpers import contains_video_media, extract_video_paths, validate_content_length
+
+
+logger = logging.getLogger(__name__)
+
+
+# Platform keys of accounts -> platforms known to validate_content_length
+CONTENT_PLATFORMS = {
+    "facebook": Platform.FACEBOOK,
+    "x": Platform.TWITTER,
+    "linkedin": Platform.LINKEDIN,
+    "youtube": Platform.YOUTUBE,
+}
+
+
+@dataclass
+class PreflightResult:
+    """Outcome of the pre-flight check of one post."""
+    post_id: int
+    platform: str
+    problems: list[str] = field(default_factory=list)
+    warmed: bool = False  # A browser is parked on the post page for it
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+    @property
+    def message(self) -> str | None:
+        """Problems as one line, or None if the check passed."""
+        return "; ".join(self.problems) or None
+
+
+PreflightListener = Callable[[list[PreflightResult]], None]
+
+
+class PreflightWorker:
+    """Periodically checks posts that are about to fire and pre-warms browsers."""
+
+    def __init__(
+        self,
+        db=None,
+        lead_minutes: int | None = None,
+        interval: int | None = None,
+        prewarm_browsers: int | None = None,
+    ):
+        """
+        Initialize the worker.
+
+        Args:
+            db: Optional database
+            lead_minutes: How long before its fire time a post is checked
+            interval: Seconds between sweeps
+            prewarm_browsers: Max browsers parked ahead of fire time
+        """
+        settings = config.scheduler
+        self._db = db
+        self.lead_minutes = settings.preflight_lead_minutes if lead_minutes is None else lead_minutes
+        self.interval = interval or settings.preflight_interval
+        self.prewarm_browsers = settings.prewarm_browsers if prewarm_browsers is None else prewarm_browsers
+
+        self._warm: dict[int, Any] = {}  # post_id -> parked platform driver
+        self._listeners: list[PreflightListener] = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def db(self):
+        return self._db or get_database()
+
+    @property
+    def warm_posts(self) -> set[int]:
+        """IDs of posts with a parked browser."""
+        with self._lock:
+            return set(self._warm)
+
+    def add_listener(self, listener: PreflightListener):
+        """Call ``listener`` (from the worker thread) with results that changed."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: PreflightListener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def start(self):
+        """Start sweeping in a background thread (no-op if disabled)."""
+        if self.lead_minutes <= 0 or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="preflight", daemon=True)
+        self._thread.start()
+        logger.info(f"Pre-flight checks running {self.lead_minutes} min ahead of fire time")
+
+    def stop(self):
+        """Stop sweeping and close every parked browser."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            warm, self._warm = list(self._warm.values()), {}
+        for driver in warm:
+            _close_driver(driver)
+
+    def take_warm_driver(self, post_id: int):
+        """
+        Hand over the browser parked for a post.
+
+        Returns:
+            A logged-in platform driver on the post page, or None
+        """
+        with self._lock:
+            return self._warm.pop(post_id, None)
+
+    def check_once(self) -> list[PreflightResult]:
+        """
+        Check every pending post due within the lead time.
+
+        Returns:
+            Results of the checked posts
+        """
+        self._close_stale_drivers()
+        until = datetime.now() + timedelta(minutes=self.lead_minutes)
+        posts = self.db.get_pending_posts_due(until)
+
+        results = []
+        changed = []
+        for post in posts:
+            if self._stop_event.is_set():
+                break
+            passed = post.preflight_at is not None and post.preflight_message is None
+            if passed and not self._has_spare_browser(post.id):
+                continue
+            try:
+                result = self.check_post(post)
+            except Exception as e:
+                logger.exception(f"Pre-flight check of post {post.id} failed: {e}")
+                result = PreflightResult(post_id=post.id, platform="", problems=[f"Pre-flight check failed: {e}"])
+            results.append(result)
+            if post.preflight_at is None or result.message != post.preflight_message:
+                changed.append(result)
+                if not result.ok:
+                    logger.warning(f"Pre-flight found problems with post {post.id}: {result.message}")
+
+        if results:
+            self.db.set_preflight_results([(r.post_id, r.message) for r in results])
+        if changed:
+            with self._lock:
+                listeners = list(self._listeners)
+            for listener in listeners:
+                try:
+                    listener(changed)
+                except Exception as e:
+                    logger.error(f"Pre-flight listener failed: {e}")
+        return results
+
+    def check_post(self, post: ScheduledPost) -> PreflightResult:
+        """Check one post, and park a browser for it if there is one to spare."""
+        account = self.db.get_account(post.account_id)
+        platform = account.platform.lower() if account else ""
+        result = PreflightResult(post_id=post.id, platform=platform)
+
+        if not account:
+            result.problems.append(f"Account {post.account_id} not found")
+            return result
+        if platform not in PLATFORM_CLASSES:
+            result.problems.append(f"Unknown platform: {account.platform}")
+            return result
+
+        missing = [Path(p).name for p in post.media_paths if not Path(p).exists()]
+        if missing:
+            result.problems.append(f"Missing media: {', '.join(missing)}")
+        if platform == "facebook" and contains_video_media(post.media_paths) \
+                and not extract_video_paths(post.media_paths):
+            result.problems.append("Reel scheduling requires at least one valid video file")
+
+        valid, error = validate_content_length(post.content, CONTENT_PLATFORMS[platform])
+        if not valid:
+            result.problems.append(error)
+
+        self._check_session(post, account, result)
+        return result
+
+    def _check_session(self, post: ScheduledPost, account: Account, result: PreflightResult):
+        """Check that the account can log in, warming a browser when possible."""
+        if result.platform == "facebook":
+            if not get_session_manager().has_session("facebook", account.id):
+                result.problems.append("No saved Facebook session for this account; log it in (Accounts > Log in) before the post fires")
+                return
+            health = get_session_probe().check("facebook", account.id)
+            if health.valid is False:
+                result.problems.append(f"Facebook session is no longer valid ({health.reason}); log in again")
+            return
+
+        if post.id in self.warm_posts:
+            result.warmed = True
+            return
+        # Don't hold a browser for a post that will fail anyway
+        if not self._has_spare_browser(post.id) or result.problems:
+            cookies = BrowserManager.COOKIES_DIR / f"{PLATFORM_CLASSES[result.platform].PLATFORM_NAME}_cookies.pkl"
+            if not cookies.exists() and not account.encrypted_password:
+                result.problems.append("No saved session or stored credentials; reconnect the account")
+            return
+
+        ctx = PostContext(
+            platform=result.platform,
+            account_id=account.id,
+            content=post.content,
+            account=account,
+        )
+        try:
+            session_stage(ctx)
+            if not ctx.done:
+                ctx.driver.park_on_post_page()
+        except Exception as e:
+            ctx.finish("failed", f"Browser warm-up failed: {e}")
+        if ctx.done:
+            result.problems.append(ctx.result["message"])
+            _close_driver(ctx.driver)
+            return
+
+        with self._lock:
+            self._warm[post.id] = ctx.driver
+        result.warmed = True
+        logger.info(f"Pre-warmed a {result.platform} browser for post {post.id}")
+
+    def _has_spare_browser(self, post_id: int) -> bool:
+        """Whether a browser could still be parked for this post."""
+        with self._lock:
+            return post_id not in self._warm and len(self._warm) < self.prewarm_browsers
+
+    def _close_stale_drivers(self):
+        """Close browsers whose post is no longer going to pick them up."""
+        grace = timedelta(seconds=config.scheduler.misfire_grace_time)
+        now = datetime.now()
+        for post_id in self.warm_posts:
+            post = self.db.get_scheduled_post(post_id)
+            if post is not None and post.status.value == "pending" and now - post.scheduled_time <= grace:
+                continue
+            driver = self.take_warm_driver(post_id)
+            if driver is not None:
+                logger.info(f"Closing pre-warmed browser of post {post_id} (no longer due)")
+                _close_driver(driver)
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.check_once()
+            except Exception as e:
+                logger.error(f"Pre-flight sweep failed: {e}")
+
+
+def _close_driver(driver):
+    if driver is None:
+        return
+    try:
+        driver.browser.close()
+    except Exception as e:
+        logger.warning(f"Failed to close browser: {e}")
+
+
+# Singleton pre-flight worker instance
+_preflight_worker: PreflightWorker | None = None
+_preflight_worker_lock = threading.Lock()
+
+
+def get_preflight_worker() -> PreflightWorker:
+    """Get or create the pre-flight worker instance."""
+    global _preflight_worker
+    with _preflight_worker_lock:
+        if _preflight_worker is None:
+            _preflight_worker = PreflightWorker()
+        return _preflight_worker
+
+
+def take_warm_driver(post_id: int):
+    """Take the browser pre-warmed for a post, if this process has one."""
+    worker = _preflight_worker
+    return worker.take_warm_driver(post_id) if worker is not None else None
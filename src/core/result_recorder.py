@@ -0,0 +1,217 @@
+"""
+Result Recorder - Batched persistence of post outcomes.
+
+Finished posts hand their outcome to the recorder instead of writing it
+themselves. A background thread stores everything that arrived within
+``SCHEDULER_RESULT_FLUSH_INTERVAL`` in one transaction (post status,
+result message, URL and the daily counters), then notifies listeners such
+as the GUI with just the stored results, so views can update the affected
+rows instead of reloading every table.
+
+If the database write fails, the batch stays queued and is retried with
+exponential backoff (up to ``RETRY_MAX_DELAY`` seconds apart); the failure
+is logged once, and again when the results are finally stored. After
+``SPLIT_AFTER_FAILURES`` failed writes in a row the batch is stored one
+result at a time, so a result the database keeps rejecting is dropped
+(and logged) instead of holding back the others. If no result can be
+stored the database itself is failing, and the batch stays queued.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable
+
+from src.config import config
+from src.data.database import get_database
+from src.data.models import PostResult
+
+
+logger = logging.getLogger(__name__)
+
+
+ResultListener = Callable[[list[PostResult]], None]
+
+# Backoff between attempts to store a batch the database rejected
+RETRY_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+
+# Failed writes in a row after which a batch is stored one result at a time
+SPLIT_AFTER_FAILURES = 3
+
+
+class ResultRecorder:
+    """Queues post results and stores them in batched transactions."""
+
+    def __init__(self, db=None, flush_interval: float | None = None, batch_size: int | None = None):
+        """
+        Initialize the recorder.
+
+        Args:
+            db: Optional database
+            flush_interval: Max seconds a result waits before being stored
+            batch_size: Queued results that trigger a write before the interval
+        """
+        settings = config.scheduler
+        self._db = db
+        self.flush_interval = settings.result_flush_interval if flush_interval is None else flush_interval
+        self.batch_size = batch_size or settings.result_batch_size
+
+        self._pending: list[PostResult] = []
+        self._listeners: list[ResultListener] = []
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        self._failures = 0        # Consecutive failed writes
+        self._retry_at = 0.0      # Monotonic time of the next write after a failure
+
+    @property
+    def db(self):
+        return self._db or get_database()
+
+    def add_listener(self, listener: ResultListener):
+        """Call ``listener`` (from the recorder thread) with each stored batch."""
+        with self._cond:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: ResultListener):
+        with self._cond:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def record(self, result: PostResult):
+        """Queue a result for the next batch."""
+        with self._cond:
+            self._pending.append(result)
+            self._ensure_thread()
+            self._cond.notify_all()
+
+    def flush(self) -> list[PostResult]:
+        """
+        Store all queued results now.
+
+        Returns:
+            The results that were applied
+        """
+        with self._flush_lock:
+            with self._cond:
+                batch, self._pending = self._pending, []
+                listeners = list(self._listeners)
+            if not batch:
+                return []
+
+            try:
+                applied = self.db.record_post_results(batch)
+            except Exception as e:
+                self._failures += 1
+                applied = None
+                if self._failures >= SPLIT_AFTER_FAILURES and len(batch) > 1:
+                    applied = self._store_one_by_one(batch)
+                if applied is None:
+                    delay = min(RETRY_DELAY * 2 ** (self._failures - 1), RETRY_MAX_DELAY)
+                    self._retry_at = time.monotonic() + delay
+                    if self._failures == 1:
+                        logger.error(f"Failed to store {len(batch)} post result(s), retrying with backoff: {e}")
+                    else:
+                        logger.debug(f"Storing post results failed again ({self._failures}), next try in {delay:.0f}s: {e}")
+                    with self._cond:
+                        self._pending[:0] = batch
+                    return []
+
+            if self._failures:
+                logger.info(f"Stored post results after {self._failures} failed attempt(s)")
+                self._failures = 0
+                self._retry_at = 0.0
+
+            lost = len(batch) - len(applied)
+            if lost:
+                logger.warning(f"{lost} post result(s) not stored: lease lost or post no longer pending")
+            logger.debug(f"Stored {len(applied)} post result(s)")
+
+        for listener in listeners:
+            try:
+                listener(applied)
+            except Exception as e:
+                logger.error(f"Post result listener failed: {e}")
+        return applied
+
+    def _store_one_by_one(self, batch: list[PostResult]) -> list[PostResult] | None:
+        """
+        Store a repeatedly rejected batch one result at a time.
+
+        Returns:
+            The applied results, with the rejected ones dropped, or None if
+            none could be stored
+        """
+        applied, rejected = [], []
+        for result in batch:
+            try:
+                applied.extend(self.db.record_post_results([result]))
+            except Exception as e:
+                rejected.append((result, e))
+        if len(rejected) == len(batch):
+            return None
+        for result, error in rejected:
+            logger.error(
+                f"Dropped result of post {result.post_id} ({result.status.value}) "
+                f"the database keeps rejecting: {error}"
+            )
+        return applied
+
+    def stop(self):
+        """Store what is queued and stop the background thread."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self.flush()
+        with self._cond:
+            self._thread = None
+            self._stopping = False
+
+    def _ensure_thread(self):
+        """Start the background thread (lock held)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="result-recorder", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                # Let a burst of results accumulate into one transaction
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._pending) < self.batch_size and not self._stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                # Back off while the database keeps rejecting writes
+                while not self._stopping:
+                    remaining = self._retry_at - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._stopping:
+                    return
+            self.flush()
+
+
+# Singleton result recorder instance
+_result_recorder: ResultRecorder | None = None
+_result_recorder_lock = threading.Lock()
+
+
+def get_result_recorder() -> ResultRecorder:
+    """Get or create the result recorder instance."""
+    global _result_recorder
+    with _result_recorder_lock:
+        if _result_recorder is None:
+            _result_recorder = ResultRecorder()
+        return _result_recorder
@@ -1,37 +1,83 @@
 """
-Scheduler - APScheduler-based task scheduling for posts.
+Scheduler - Timed execution of scheduled and recurring posts.
 
-Handles scheduling, persistence, and retry logic for automation tasks.
+The ``scheduled_posts`` and ``recurring_schedules`` tables are the only
+record of what is scheduled. On start the SchedulerManager loads pending
+posts and active series into the in-memory SchedulerEngine (see
+scheduler_engine), and keeps it in step as posts are added or cancelled.
 """
 
 import logging
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 from typing import Callable
-from pathlib import Path
 
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
-from apscheduler.executors.pool import ThreadPoolExecutor
-from apscheduler.triggers.date import DateTrigger
-from apscheduler.events import (
-    EVENT_JOB_EXECUTED,
+from apscheduler.triggers.cron import CronTrigger
+
+from src.config import config
+from src.core.execution_queue import Priority, get_execution_queue, lane_priority
+from src.core.preflight import get_preflight_worker
+from src.core.result_recorder import get_result_recorder
+from src.core.scheduler_engine import (
     EVENT_JOB_ERROR,
+    EVENT_JOB_EXECUTED,
     EVENT_JOB_MISSED,
-    JobExecutionEvent,
+    EVENT_JOB_SUBMITTED,
+    JobEvent,
+    ScheduledJob,
+    SchedulerEngine,
 )
-
-from src.config import config, PROJECT_ROOT
+from src.core.scheduler_metrics import ExecutionRecorder
+from src.core.session_keepalive import get_session_keepalive
+from src.core.session_probe import get_session_probe
+from src.data.models import PostResult, PostStatusEnum, RecurringSchedule, ScheduledPost
 
 
 logger = logging.getLogger(__name__)
 
 
+def post_id_from_job_id(job_id: str) -> int | None:
+    """Get the scheduled post ID from a ``post_<id>`` job ID, if it is one."""
+    prefix, _, suffix = job_id.partition("_")
+    if prefix == "post" and suffix.isdigit():
+        return int(suffix)
+    return None
+
+
+def series_job_id(series_id: int) -> str:
+    """Get the scheduler job ID used for a recurring series."""
+    return f"series_{series_id}"
+
+
+def next_occurrence(cron_expression: str, after: datetime | None = None) -> datetime | None:
+    """
+    Compute the next fire time of a cron expression.
+    
+    Args:
+        cron_expression: Standard 5-field crontab expression
+        after: Compute the first occurrence strictly after this time (defaults to now)
+        
+    Returns:
+        Next occurrence as a naive local datetime, or None if the expression never fires again
+    """
+    trigger = CronTrigger.from_crontab(cron_expression)
+    now = datetime.now(trigger.timezone)
+    if after is not None:
+        after = after.replace(tzinfo=trigger.timezone) if after.tzinfo is None else after
+        # CronTrigger returns times >= now, so nudge past the reference point
+        now = after + timedelta(seconds=1)
+    fire_time = trigger.get_next_fire_time(None, now)
+    if fire_time is None:
+        return None
+    return fire_time.astimezone(trigger.timezone).replace(tzinfo=None)
+
+
 class SchedulerManager:
     """
-    Manages scheduled automation tasks using APScheduler.
+    Manages scheduled automation tasks.
     
     Features:
-    - Persistent job storage (survives restarts)
+    - Jobs rebuilt from the posts database on start (survives restarts)
     - Automatic retry on failure
     - Event callbacks for job status updates
     """
@@ -50,55 +96,159 @@ class SchedulerManager:
         """
         self.on_job_executed = on_job_executed
         self.on_job_error = on_job_error
+        self.recorder = ExecutionRecorder()
         
-        # Ensure data directory exists
-        db_path = config.database.path
-        db_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Configure job stores and executors
-        jobstores = {
-            "default": SQLAlchemyJobStore(
-                url=f"sqlite:///{db_path.parent / 'scheduler.db'}"
-            )
-        }
-        
-        executors = {
-            "default": ThreadPoolExecutor(max_workers=3)
-        }
-        
-        job_defaults = {
-            "coalesce": True,  # Combine missed executions into one
-            "max_instances": 1,  # Only one instance per job
-            "misfire_grace_time": 60 * 5,  # 5 minutes grace period
-        }
+        # Every lane runs through the shared execution queue, so scheduled jobs,
+        # "Post now" and lease workers respect the same concurrency limits.
+        # Post jobs are split into stages so the next post is prepared while
+        # the current one publishes.
+        self.queue = get_execution_queue()
+        self.max_workers = self.queue.max_workers
+        self.misfire_grace_time = config.scheduler.misfire_grace_time
         
-        self.scheduler = BackgroundScheduler(
-            jobstores=jobstores,
-            executors=executors,
-            job_defaults=job_defaults,
-        )
+        self.engine = SchedulerEngine(self.queue, self.misfire_grace_time)
         
         # Add event listeners
-        self.scheduler.add_listener(
+        self.engine.add_listener(
             self._on_job_event,
             EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED
         )
+        self.engine.add_listener(self._on_job_submitted, EVENT_JOB_SUBMITTED)
         
         self._started = False
+        self._in_flight: dict[str, int] = {}
+        self._in_flight_changed = threading.Condition()
     
     def start(self):
-        """Start the scheduler."""
+        """Load pending posts and recurring series from the database and start firing them."""
+        from src.core.scheduler_tasks import clear_shutdown
+        
         if not self._started:
-            self.scheduler.start()
+            clear_shutdown()
+            try:
+                self.load_jobs()
+            except Exception as e:
+                logger.error(f"Failed to load scheduled jobs: {e}")
+            self.engine.start()
             self._started = True
+            get_preflight_worker().start()
+            get_session_probe().start()
+            get_session_keepalive().start()
             logger.info("Scheduler started")
     
-    def stop(self):
-        """Stop the scheduler gracefully."""
-        if self._started:
-            self.scheduler.shutdown(wait=True)
-            self._started = False
-            logger.info("Scheduler stopped")
+    def stop(self, drain_timeout: float | None = None):
+        """
+        Stop the scheduler, draining in-flight jobs for a bounded time.
+        
+        New jobs stop firing immediately. Posts that were claimed but have
+        not started publishing are requeued for the next start; posts that
+        are publishing get up to ``drain_timeout`` seconds to finish. Any
+        still running after that complete in the background and store their
+        own result.
+        
+        Args:
+            drain_timeout: Seconds to wait (defaults to SCHEDULER_DRAIN_TIMEOUT)
+        """
+        from src.core.scheduler_tasks import request_shutdown
+        
+        if not self._started:
+            return
+        
+        timeout = config.scheduler.drain_timeout if drain_timeout is None else drain_timeout
+        self.engine.pause()
+        request_shutdown()
+        get_preflight_worker().stop()
+        get_session_probe().stop()
+        get_session_keepalive().stop()
+        
+        drained = self.wait_for_in_flight(timeout)
+        if not drained:
+            logger.warning(
+                f"{len(self.in_flight_jobs())} job(s) still publishing after {timeout}s; "
+                "leaving them to finish in the background"
+            )
+        self.engine.shutdown()
+        get_result_recorder().flush()
+        self._started = False
+        logger.info("Scheduler stopped")
+    
+    def in_flight_jobs(self) -> list[str]:
+        """Get IDs of jobs handed to the executor that have not finished."""
+        with self._in_flight_changed:
+            return list(self._in_flight)
+    
+    def wait_for_in_flight(self, timeout: float) -> bool:
+        """
+        Wait until no job is running.
+        
+        Returns:
+            True if all jobs finished within the timeout
+        """
+        with self._in_flight_changed:
+            return self._in_flight_changed.wait_for(lambda: not self._in_flight, timeout)
+    
+    def load_jobs(self, db=None) -> int:
+        """
+        Build the engine's jobs from the database.
+        
+        Every pending post gets a job at its scheduled time, in the lane it
+        was added with; posts requeued by the last shutdown run right away.
+        Posts left running by a crashed process get a job when their lease
+        expires (abandoned ones that must not run again are failed first,
+        as by the lease workers). Every active recurring series gets a job
+        at its next occurrence.
+        
+        Args:
+            db: Optional database
+            
+        Returns:
+            Number of jobs loaded
+        """
+        from src.core.scheduler_tasks import execute_recurring_post
+        from src.data.database import get_database
+        
+        db = db or get_database()
+        now = datetime.now()
+        platforms = {account.id: account.platform for account in db.get_all_accounts(active_only=False)}
+        
+        db.settle_abandoned_posts(config.scheduler.max_attempts)
+        jobs = []
+        requeued = 0
+        for post in db.get_pending_posts() + db.get_running_posts():
+            run_at = post.scheduled_time
+            if post.checkpoint == "requeued":
+                run_at = max(run_at, now)
+                requeued += 1
+            elif post.status == PostStatusEnum.RUNNING:
+                # Reclaimed once the lease runs out; never reported as missed
+                run_at = max(run_at, post.lease_expires_at or now, now)
+            jobs.append(self._post_job(
+                f"post_{post.id}",
+                run_at,
+                platforms.get(post.account_id, "facebook"),
+                post.account_id,
+                post.content,
+                post.media_paths,
+                lane_priority(post.lane),
+            ))
+        
+        for series in db.get_active_recurring_schedules():
+            run_at = series.next_run_time or next_occurrence(series.cron_expression)
+            if run_at is None:
+                continue
+            jobs.append(ScheduledJob(
+                id=series_job_id(series.id),
+                func=execute_recurring_post,
+                run_time=run_at,
+                kwargs={"series_id": series.id},
+                cron_expression=series.cron_expression,
+            ))
+        
+        self.engine.add_jobs(jobs)
+        if requeued:
+            logger.info(f"Resuming {requeued} post(s) requeued at last shutdown")
+        logger.info(f"Loaded {len(jobs)} scheduled job(s)")
+        return len(jobs)
     
     def schedule_post(
         self,
@@ -108,6 +258,7 @@ class SchedulerManager:
         account_id: int,
         content: str,
         media_paths: list[str] | None = None,
+        priority: Priority = Priority.SCHEDULED,
     ) -> str:
         """
         Schedule a post for future execution.
@@ -119,28 +270,178 @@ class SchedulerManager:
             account_id: Account to post from
             content: Post content
             media_paths: Optional media file paths
+            priority: Execution queue lane
             
         Returns:
             Job ID
         """
+        self.engine.add_job(
+            self._post_job(job_id, run_at, platform, account_id, content, media_paths, priority)
+        )
+        
+        logger.info(f"Scheduled post {job_id} for {run_at}")
+        return job_id
+    
+    @staticmethod
+    def _post_job(
+        job_id: str,
+        run_at: datetime,
+        platform: str,
+        account_id: int,
+        content: str,
+        media_paths: list[str] | None,
+        priority: Priority,
+    ) -> ScheduledJob:
+        """Build the engine job of a post."""
         from src.core.scheduler_tasks import execute_scheduled_post
         
-        self.scheduler.add_job(
-            execute_scheduled_post,
-            trigger=DateTrigger(run_date=run_at),
+        kwargs = {
+            "platform": platform,
+            "account_id": account_id,
+            "content": content,
+            "media_paths": media_paths or [],
+        }
+        # Jobs of stored posts claim the post before running (see lease_worker)
+        post_id = post_id_from_job_id(job_id)
+        if post_id is not None:
+            kwargs["post_id"] = post_id
+        return ScheduledJob(
             id=job_id,
-            replace_existing=True,
-            kwargs={
-                "platform": platform,
-                "account_id": account_id,
-                "content": content,
-                "media_paths": media_paths or [],
-            },
+            func=execute_scheduled_post,
+            run_time=run_at,
+            kwargs=kwargs,
+            priority=priority,
+            pipeline=True,
         )
+    
+    def schedule_posts(
+        self, posts: list[dict], priority: Priority = Priority.SCHEDULED
+    ) -> list[str]:
+        """
+        Schedule many posts at once.
         
-        logger.info(f"Scheduled post {job_id} for {run_at}")
+        All jobs are added under one engine lock and the timer is woken up
+        once, instead of once per post.
+        
+        Args:
+            posts: Dicts with the same keys as ``schedule_post`` arguments
+                   (job_id, run_at, platform, account_id, content, media_paths,
+                   optionally priority)
+            priority: Default execution queue lane
+            
+        Returns:
+            List of job IDs, in input order
+        """
+        if not posts:
+            return []
+        
+        self.engine.add_jobs([
+            self._post_job(
+                post["job_id"],
+                post["run_at"],
+                post["platform"],
+                post["account_id"],
+                post["content"],
+                post.get("media_paths"),
+                post.get("priority", priority),
+            )
+            for post in posts
+        ])
+        
+        logger.info(f"Scheduled {len(posts)} posts in one batch")
+        return [post["job_id"] for post in posts]
+    
+    def add_posts(
+        self,
+        posts: list[ScheduledPost],
+        platforms: list[str],
+        priority: Priority = Priority.SCHEDULED,
+        db=None,
+    ) -> list[int]:
+        """
+        Save new posts and schedule their jobs in one batch.
+        
+        Launch times are spread by the slot allocator first, then the posts
+        are inserted in one transaction and their jobs added in one batch.
+        
+        Args:
+            posts: Unsaved posts (their scheduled_time may be moved)
+            platforms: Platform of each post, in the same order
+            priority: Execution queue lane
+            db: Optional database
+            
+        Returns:
+            IDs of the new posts, in input order
+        """
+        from src.core.slot_allocator import assign_slots
+        from src.data.database import get_database
+        
+        if not posts:
+            return []
+        db = db or get_database()
+        
+        assign_slots(db, posts)
+        for post in posts:
+            post.lane = priority.lane  # So the lane survives a restart
+        post_ids = db.add_scheduled_posts(posts)
+        self.schedule_posts([
+            {
+                "job_id": f"post_{post_id}",
+                "run_at": post.scheduled_time,
+                "platform": platform,
+                "account_id": post.account_id,
+                "content": post.content,
+                "media_paths": post.media_paths,
+            }
+            for post_id, post, platform in zip(post_ids, posts, platforms)
+        ], priority=priority)
+        return post_ids
+    
+    def schedule_recurring(self, series: RecurringSchedule) -> str:
+        """
+        Schedule a recurring post series.
+        
+        A single cron job is kept per series, so memory and startup cost do
+        not grow with the number of occurrences.
+        
+        Args:
+            series: Saved recurring schedule (must have an ID)
+            
+        Returns:
+            Job ID
+        """
+        from src.core.scheduler_tasks import execute_recurring_post
+        
+        if series.id is None:
+            raise ValueError("Recurring schedule must be saved before scheduling")
+        
+        job_id = series_job_id(series.id)
+        run_at = next_occurrence(series.cron_expression)
+        if run_at is None:
+            raise ValueError(f"Cron expression never fires: {series.cron_expression}")
+        self.engine.add_job(ScheduledJob(
+            id=job_id,
+            func=execute_recurring_post,
+            run_time=run_at,
+            kwargs={"series_id": series.id},
+            cron_expression=series.cron_expression,
+        ))
+        
+        logger.info(f"Scheduled recurring series {job_id} ({series.cron_expression})")
         return job_id
     
+    def cancel_recurring(self, series_id: int) -> bool:
+        """
+        Cancel a recurring post series.
+        
+        Args:
+            series_id: Series to cancel
+            
+        Returns:
+            True if the series job was found and cancelled
+        """
+        return self.cancel_job(series_job_id(series_id))
+    
     def cancel_job(self, job_id: str) -> bool:
         """
         Cancel a scheduled job.
@@ -151,28 +452,25 @@ class SchedulerManager:
         Returns:
             True if job was found and cancelled
         """
-        try:
-            self.scheduler.remove_job(job_id)
-            logger.info(f"Cancelled job {job_id}")
-            return True
-        except Exception:
+        if not self.engine.remove_job(job_id):
             return False
+        logger.info(f"Cancelled job {job_id}")
+        return True
     
     def get_pending_jobs(self) -> list[dict]:
         """
         Get all pending scheduled jobs.
         
         Returns:
-            List of job info dicts
+            List of job info dicts, soonest first
         """
-        jobs = self.scheduler.get_jobs()
         return [
             {
                 "id": job.id,
-                "next_run_time": job.next_run_time,
+                "next_run_time": job.run_time,
                 "kwargs": job.kwargs,
             }
-            for job in jobs
+            for job in self.engine.get_jobs()
         ]
     
     def reschedule_job(self, job_id: str, new_time: datetime) -> bool:
@@ -186,22 +484,64 @@ class SchedulerManager:
         Returns:
             True if rescheduled successfully
         """
-        try:
-            self.scheduler.reschedule_job(
-                job_id,
-                trigger=DateTrigger(run_date=new_time)
-            )
-            logger.info(f"Rescheduled job {job_id} to {new_time}")
-            return True
-        except Exception:
+        if not self.engine.reschedule_job(job_id, new_time):
             return False
+        logger.info(f"Rescheduled job {job_id} to {new_time}")
+        return True
     
-    def _on_job_event(self, event: JobExecutionEvent):
+    def simulate(self, posts: list, profiles: dict | None = None, seed: int | None = None):
+        """
+        Replay a schedule in virtual time using this scheduler's queue settings.
+        
+        Nothing is posted and no jobs are added; see ``scheduler_simulation``.
+        
+        Args:
+            posts: SimulatedPost items to replay
+            profiles: Optional per-platform latency/failure profiles
+            seed: Random seed for reproducible runs
+            
+        Returns:
+            SimulationReport
+        """
+        from src.core.scheduler_simulation import ScheduleSimulator
+        
+        simulator = ScheduleSimulator(
+            max_workers=self.max_workers,
+            misfire_grace_time=self.misfire_grace_time,
+            profiles=profiles,
+            seed=seed,
+            interactive_slots=self.max_workers - self.queue.background_limit,
+        )
+        return simulator.run(posts)
+    
+    def _on_job_submitted(self, event):
+        """Remember when a job left the store for the executor."""
+        self.recorder.job_submitted(event.job_id)
+        with self._in_flight_changed:
+            self._in_flight[event.job_id] = self._in_flight.get(event.job_id, 0) + 1
+    
+    def _on_job_event(self, event: JobEvent):
         """Handle job execution events."""
         job_id = event.job_id
+        if event.code != EVENT_JOB_MISSED:
+            with self._in_flight_changed:
+                remaining = self._in_flight.pop(job_id, 1) - 1
+                if remaining > 0:
+                    self._in_flight[job_id] = remaining
+                self._in_flight_changed.notify_all()
+        self.recorder.job_finished(
+            job_id,
+            event.scheduled_run_time,
+            result=event.retval,
+            error=event.exception,
+            post_id=post_id_from_job_id(job_id),
+            status="missed" if event.code == EVENT_JOB_MISSED else None,
+        )
         
         if event.code == EVENT_JOB_EXECUTED:
             logger.info(f"Job {job_id} executed successfully")
+            if isinstance(event.retval, dict) and event.retval.get("retry_post_ids"):
+                self._schedule_retries(event.retval["retry_post_ids"])
             if self.on_job_executed:
                 self.on_job_executed(job_id, event.retval)
                 
@@ -212,6 +552,48 @@ class SchedulerManager:
                 
         elif event.code == EVENT_JOB_MISSED:
             logger.warning(f"Job {job_id} was missed")
+            post_id = post_id_from_job_id(job_id)
+            if post_id is not None:
+                self._record_missed_post(post_id)
+    
+    def _schedule_retries(self, post_ids: list[int]):
+        """Give posts handed back to the retry lane a job at their new time."""
+        from src.data.database import get_database
+        
+        db = get_database()
+        for post_id in post_ids:
+            post = db.get_scheduled_post(post_id)
+            if post is None or post.status != PostStatusEnum.PENDING:
+                continue
+            account = db.get_account(post.account_id)
+            self.engine.add_job(self._post_job(
+                f"post_{post.id}",
+                post.scheduled_time,
+                account.platform if account else "facebook",
+                post.account_id,
+                post.content,
+                post.media_paths,
+                lane_priority(post.lane),
+            ))
+            logger.info(f"Post {post.id} will be retried at {post.scheduled_time}")
+    
+    def _record_missed_post(self, post_id: int):
+        """Fail a post whose job missed its run time (it would stay pending forever)."""
+        from src.data.database import get_database
+        
+        db = get_database()
+        post = db.get_scheduled_post(post_id)
+        if post is None:
+            return
+        account = db.get_account(post.account_id)
+        get_result_recorder().record(PostResult(
+            platform=account.platform if account else "unknown",
+            account_id=post.account_id,
+            status=PostStatusEnum.FAILED,
+            message="Missed its scheduled time (app or daemon was not running)",
+            post_id=post_id,
+            content=post.content,
+        ))
 
 
 # Singleton scheduler instance
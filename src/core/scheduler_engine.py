@@ -0,0 +1,303 @@
+"""
+Scheduler Engine - Heap-based timer that fires scheduled jobs.
+
+Replaces APScheduler's BackgroundScheduler and its SQLAlchemy job store.
+Nothing is pickled or stored twice: the ``scheduled_posts`` and
+``recurring_schedules`` tables are the source of truth, and the engine only
+keeps one small ScheduledJob per pending job plus a min-heap of due times.
+SchedulerManager builds the heap from those tables on start (one query
+each) and updates it incrementally as posts are added, edited and removed.
+
+Cancelled and rescheduled jobs leave their old heap entry behind. Entries
+are compared with the job's current run time when they reach the top and
+skipped if stale, so every change costs O(log n); the heap is rebuilt when
+stale entries outnumber live ones.
+
+Due post jobs are handed to the PostingPipeline, any other job to the
+shared ExecutionQueue. Listeners receive a JobEvent when a job is
+submitted, finishes, fails or misses its run time.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, Callable
+
+from src.config import config
+from src.core.execution_queue import ExecutionQueue, Priority, get_execution_queue, post_key
+
+
+logger = logging.getLogger(__name__)
+
+
+# Event codes (bit flags, so listeners can subscribe to several)
+EVENT_JOB_SUBMITTED = 1
+EVENT_JOB_EXECUTED = 2
+EVENT_JOB_ERROR = 4
+EVENT_JOB_MISSED = 8
+EVENT_ALL = EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED
+
+# Longest the timer sleeps at once, so wall-clock changes are picked up
+MAX_WAIT_SECONDS = 60.0
+
+
+@dataclass(slots=True, eq=False)
+class ScheduledJob:
+    """One pending job; ``run_time`` is a naive local datetime."""
+    id: str
+    func: Callable[..., Any]
+    run_time: datetime
+    kwargs: dict = field(default_factory=dict)
+    priority: Priority = Priority.SCHEDULED
+    cron_expression: str | None = None  # Recurring jobs are re-armed after each run
+    pipeline: bool = False              # Run through the PostingPipeline (post jobs)
+
+    def __post_init__(self):
+        if self.run_time.tzinfo is not None:
+            self.run_time = self.run_time.astimezone().replace(tzinfo=None)
+
+
+@dataclass(slots=True)
+class JobEvent:
+    """Something that happened to a job."""
+    code: int
+    job_id: str
+    scheduled_run_time: datetime | None = None
+    retval: Any = None
+    exception: BaseException | None = None
+
+
+JobListener = Callable[[JobEvent], None]
+
+
+class SchedulerEngine:
+    """Fires jobs at their run time from an in-memory min-heap."""
+
+    def __init__(
+        self,
+        queue: ExecutionQueue | None = None,
+        misfire_grace_time: int | None = None,
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            queue: Execution queue for jobs that are not posts
+            misfire_grace_time: Seconds a job may be late before it counts as missed
+        """
+        self._queue = queue
+        self.misfire_grace_time = (
+            config.scheduler.misfire_grace_time if misfire_grace_time is None else misfire_grace_time
+        )
+        self._jobs: dict[str, ScheduledJob] = {}
+        self._heap: list[tuple[datetime, int, str]] = []  # (run_time, seq, job_id)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._listeners: list[tuple[JobListener, int]] = []
+        self._thread: threading.Thread | None = None
+        self._running = False
+        self._paused = False
+
+    @property
+    def queue(self) -> ExecutionQueue:
+        return self._queue or get_execution_queue()
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def add_listener(self, listener: JobListener, mask: int = EVENT_ALL):
+        """Call ``listener`` for events whose code is in ``mask``."""
+        self._listeners.append((listener, mask))
+
+    # ==================== Jobs ====================
+
+    def add_job(self, job: ScheduledJob):
+        """Add a job, replacing any job with the same ID."""
+        self.add_jobs([job])
+
+    def add_jobs(self, jobs: list[ScheduledJob]):
+        """Add many jobs under one lock with a single wakeup."""
+        with self._cond:
+            for job in jobs:
+                self._jobs[job.id] = job
+                heapq.heappush(self._heap, (job.run_time, next(self._seq), job.id))
+            self._compact()
+            self._cond.notify_all()
+
+    def remove_job(self, job_id: str) -> bool:
+        """
+        Remove a pending job.
+
+        Returns:
+            True if the job existed
+        """
+        with self._cond:
+            return self._jobs.pop(job_id, None) is not None
+
+    def reschedule_job(self, job_id: str, run_time: datetime) -> bool:
+        """
+        Move a pending job to a new run time.
+
+        Returns:
+            True if the job existed
+        """
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            job.run_time = run_time
+            job.__post_init__()
+            heapq.heappush(self._heap, (job.run_time, next(self._seq), job_id))
+            self._compact()
+            self._cond.notify_all()
+            return True
+
+    def get_job(self, job_id: str) -> ScheduledJob | None:
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def get_jobs(self) -> list[ScheduledJob]:
+        """Get all pending jobs, soonest first."""
+        with self._cond:
+            jobs = list(self._jobs.values())
+        return sorted(jobs, key=lambda job: job.run_time)
+
+    # ==================== Lifecycle ====================
+
+    def start(self):
+        """Start firing jobs in a background thread."""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._paused = False
+        self._thread = threading.Thread(target=self._run, name="scheduler-engine", daemon=True)
+        self._thread.start()
+
+    def pause(self):
+        """Stop firing jobs until ``resume`` (jobs stay pending)."""
+        with self._cond:
+            self._paused = True
+
+    def resume(self):
+        with self._cond:
+            self._paused = False
+            self._cond.notify_all()
+
+    def shutdown(self):
+        """Stop the timer thread; pending jobs are kept for a later ``start``."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    # ==================== Timer ====================
+
+    def _run(self):
+        while True:
+            with self._cond:
+                due = self._wait_for_due_jobs()
+                if due is None:
+                    return
+            for job, run_time in due:
+                self._dispatch(job, run_time)
+
+    def _wait_for_due_jobs(self) -> list[tuple[ScheduledJob, datetime]] | None:
+        """Block until jobs are due (lock held); None once shut down."""
+        while self._running:
+            if self._paused:
+                self._cond.wait()
+                continue
+            due = self._pop_due(datetime.now())
+            if due:
+                return due
+            timeout = MAX_WAIT_SECONDS
+            if self._heap:
+                timeout = min(timeout, (self._heap[0][0] - datetime.now()).total_seconds())
+            self._cond.wait(max(timeout, 0.0))
+        return None
+
+    def _pop_due(self, now: datetime) -> list[tuple[ScheduledJob, datetime]]:
+        """Pop every job due by ``now``, re-arming recurring ones (lock held)."""
+        from src.core.scheduler import next_occurrence
+
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            run_time, _, job_id = heapq.heappop(self._heap)
+            job = self._jobs.get(job_id)
+            if job is None or job.run_time != run_time:
+                continue  # Cancelled or rescheduled since this entry was pushed
+            due.append((job, run_time))
+            next_run = None
+            if job.cron_expression:
+                # Missed occurrences are coalesced into this run
+                next_run = next_occurrence(job.cron_expression, max(run_time, now))
+            if next_run is None:
+                del self._jobs[job_id]
+            else:
+                job.run_time = next_run
+                heapq.heappush(self._heap, (next_run, next(self._seq), job_id))
+        return due
+
+    def _compact(self):
+        """Drop stale heap entries once they outnumber live ones (lock held)."""
+        if len(self._heap) > 2 * len(self._jobs) + 64:
+            self._heap = [
+                (job.run_time, next(self._seq), job.id) for job in self._jobs.values()
+            ]
+            heapq.heapify(self._heap)
+
+    # ==================== Execution ====================
+
+    def _dispatch(self, job: ScheduledJob, run_time: datetime):
+        """Hand a due job to the pipeline or the queue, unless it was missed."""
+        from src.core.posting_pipeline import PostContext, get_pipeline
+
+        lateness = datetime.now() - run_time
+        if self.misfire_grace_time is not None and lateness > timedelta(seconds=self.misfire_grace_time):
+            logger.warning(f'Run time of job "{job.id}" was missed by {lateness}')
+            self._emit(JobEvent(EVENT_JOB_MISSED, job.id, run_time))
+            return
+
+        self._emit(JobEvent(EVENT_JOB_SUBMITTED, job.id, run_time))
+        try:
+            if job.pipeline:
+                future = get_pipeline().submit(PostContext(**job.kwargs), job.priority)
+            else:
+                future = self.queue.submit(
+                    job.func,
+                    priority=job.priority,
+                    key=post_key(job.kwargs.get("platform"), job.kwargs.get("account_id")),
+                    **job.kwargs,
+                )
+        except Exception as e:
+            logger.exception(f'Job "{job.id}" could not be submitted: {e}')
+            self._emit(JobEvent(EVENT_JOB_ERROR, job.id, run_time, exception=e))
+            return
+        future.add_done_callback(partial(self._finished, job.id, run_time))
+
+    def _finished(self, job_id: str, run_time: datetime, future):
+        if future.cancelled():
+            error = RuntimeError("Job cancelled before it started")
+            self._emit(JobEvent(EVENT_JOB_ERROR, job_id, run_time, exception=error))
+            return
+        error = future.exception()
+        if error is not None:
+            self._emit(JobEvent(EVENT_JOB_ERROR, job_id, run_time, exception=error))
+        else:
+            self._emit(JobEvent(EVENT_JOB_EXECUTED, job_id, run_time, retval=future.result()))
+
+    def _emit(self, event: JobEvent):
+        for listener, mask in self._listeners:
+            if event.code & mask:
+                try:
+                    listener(event)
+                except Exception as e:
+                    logger.exception(f"Scheduler listener failed: {e}")
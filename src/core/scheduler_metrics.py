@@ -0,0 +1,234 @@
+"""
+Scheduler Metrics - Lateness and duration instrumentation for scheduled jobs.
+
+Every execution records its scheduled time, dequeue time (handed to the
+executor), start, finish and result in the ``job_executions`` table.
+Per-platform percentiles are computed from those records for the GUI and
+for CSV export.
+
+Usage:
+    python -m src.core.scheduler_metrics --days 7
+    python -m src.core.scheduler_metrics --export metrics.csv
+"""
+
+import argparse
+import csv
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from src.data.database import get_database
+from src.data.models import JobExecution
+from src.utils.helpers import percentile
+
+
+logger = logging.getLogger(__name__)
+
+
+# Outcomes that did not fail: the post was published, or left for another run
+NOT_FAILED = ("success", "skipped", "requeued", "retry")
+
+# Outcomes of runs that went through to the end; only these feed the percentiles,
+# since a skipped or requeued run returns early and would pull them down
+FINISHED = ("success", "failed")
+
+
+def _naive_local(value: datetime | None) -> datetime | None:
+    """Convert an aware datetime to naive local time (as stored elsewhere in the DB)."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+@dataclass
+class PlatformStats:
+    """Lateness and duration percentiles for one platform."""
+    platform: str
+    runs: int
+    failures: int
+    skipped: int
+    requeued: int
+    retries: int
+    lateness_p50: float | None
+    lateness_p95: float | None
+    lateness_p99: float | None
+    duration_p50: float | None
+    duration_p95: float | None
+    duration_p99: float | None
+
+
+class ExecutionRecorder:
+    """Collects scheduler events into JobExecution records."""
+
+    def __init__(self, db=None):
+        self._db = db
+        self._dequeued: dict[str, datetime] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def db(self):
+        return self._db or get_database()
+
+    def job_submitted(self, job_id: str):
+        """Record that the scheduler handed a job to the executor."""
+        with self._lock:
+            self._dequeued[job_id] = datetime.now()
+
+    def job_finished(
+        self,
+        job_id: str,
+        scheduled_time: datetime | None,
+        result: dict | None = None,
+        error: Exception | None = None,
+        post_id: int | None = None,
+        status: str | None = None,
+    ) -> JobExecution | None:
+        """
+        Persist the execution record of a finished (or missed) job.
+
+        Args:
+            job_id: Scheduler job ID
+            scheduled_time: When the job was due
+            result: Task return value (may carry platform, started_at, finished_at)
+            error: Exception raised by the task, if any
+            post_id: Related scheduled post
+            status: Override status (e.g. "missed")
+
+        Returns:
+            The stored record, or None if it could not be stored
+        """
+        with self._lock:
+            dequeued_at = self._dequeued.pop(job_id, None)
+
+        result = result if isinstance(result, dict) else {}
+        if status is None:
+            status = "failed" if error is not None else result.get("status", "unknown")
+        message = str(error) if error is not None else result.get("message")
+
+        execution = JobExecution(
+            id=None,
+            job_id=job_id,
+            post_id=post_id,
+            platform=result.get("platform") or "unknown",
+            scheduled_time=_naive_local(scheduled_time),
+            dequeued_at=dequeued_at,
+            started_at=result.get("started_at"),
+            finished_at=result.get("finished_at") or datetime.now(),
+            status=status,
+            message=message,
+        )
+        try:
+            execution.id = self.db.add_job_execution(execution)
+        except Exception as e:
+            logger.error(f"Failed to record execution of job {job_id}: {e}")
+            return None
+        return execution
+
+
+def compute_execution_stats(executions: list[JobExecution]) -> list[PlatformStats]:
+    """
+    Compute per-platform lateness/duration percentiles.
+
+    Percentiles cover only runs that finished (success or failed); skipped,
+    requeued and retried runs are reported as counts.
+    """
+    by_platform: dict[str, list[JobExecution]] = {}
+    for execution in executions:
+        by_platform.setdefault(execution.platform, []).append(execution)
+
+    stats = []
+    for platform, items in sorted(by_platform.items()):
+        finished = [e for e in items if e.status in FINISHED]
+        lateness = [e.lateness_seconds for e in finished if e.lateness_seconds is not None]
+        durations = [e.duration_seconds for e in finished if e.duration_seconds is not None]
+        stats.append(PlatformStats(
+            platform=platform,
+            runs=len(items),
+            failures=sum(1 for e in items if e.status not in NOT_FAILED),
+            skipped=sum(1 for e in items if e.status == "skipped"),
+            requeued=sum(1 for e in items if e.status == "requeued"),
+            retries=sum(1 for e in items if e.status == "retry"),
+            lateness_p50=percentile(lateness, 50),
+            lateness_p95=percentile(lateness, 95),
+            lateness_p99=percentile(lateness, 99),
+            duration_p50=percentile(durations, 50),
+            duration_p95=percentile(durations, 95),
+            duration_p99=percentile(durations, 99),
+        ))
+    return stats
+
+
+def get_execution_stats(since: datetime | None = None, db=None) -> list[PlatformStats]:
+    """Load executions from the database and compute per-platform stats."""
+    db = db or get_database()
+    return compute_execution_stats(db.get_job_executions(since))
+
+
+def export_execution_metrics(path: Path, since: datetime | None = None, db=None) -> int:
+    """
+    Export raw execution records (with derived lateness/duration) as CSV.
+
+    Args:
+        path: Destination CSV file
+        since: Only export executions finished after this time
+        db: Optional database
+
+    Returns:
+        Number of exported rows
+    """
+    db = db or get_database()
+    executions = db.get_job_executions(since)
+    fields = [
+        "job_id", "post_id", "platform", "scheduled_time", "dequeued_at",
+        "started_at", "finished_at", "status", "lateness_seconds",
+        "duration_seconds", "message",
+    ]
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        for execution in executions:
+            writer.writerow(execution.to_dict())
+
+    logger.info(f"Exported {len(executions)} job executions to {path}")
+    return len(executions)
+
+
+def format_stats_table(stats: list[PlatformStats]) -> str:
+    """Render stats as a plain-text table."""
+    def fmt(value: float | None) -> str:
+        return "-" if value is None else f"{value:.1f}"
+
+    lines = [
+        f"{'platform':<10} {'runs':>5} {'fail':>5} {'skip':>5} {'requ':>5} {'retry':>5} "
+        f"{'late p50':>9} {'p95':>7} {'p99':>7} {'dur p50':>8} {'p95':>7} {'p99':>7}"
+    ]
+    for s in stats:
+        lines.append(
+            f"{s.platform:<10} {s.runs:>5} {s.failures:>5} {s.skipped:>5} {s.requeued:>5} {s.retries:>5} "
+            f"{fmt(s.lateness_p50):>9} {fmt(s.lateness_p95):>7} {fmt(s.lateness_p99):>7} "
+            f"{fmt(s.duration_p50):>8} {fmt(s.duration_p95):>7} {fmt(s.duration_p99):>7}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None):
+    """Command line entry point: print stats and optionally export CSV."""
+    parser = argparse.ArgumentParser(description="Scheduler lateness and duration metrics")
+    parser.add_argument("--days", type=int, default=None, help="Only include the last N days")
+    parser.add_argument("--export", type=Path, default=None, help="Write raw executions to CSV")
+    args = parser.parse_args(argv)
+
+    since = datetime.now() - timedelta(days=args.days) if args.days else None
+    print(format_stats_table(get_execution_stats(since)))
+    if args.export:
+        count = export_execution_metrics(args.export, since)
+        print(f"Exported {count} executions to {args.export}")
+
+
+if __name__ == "__main__":
+    main()
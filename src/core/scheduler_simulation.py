@@ -0,0 +1,382 @@
+"""
+Scheduler Simulation - Virtual-time replay of a posting schedule.
+
+Models the shared ExecutionQueue (its background slots, lanes and
+per-account exclusion) against fake platform drivers with configurable
+latency and failure distributions, so executor sizing can be evaluated
+without launching a browser. A week of schedule replays in
+well under a second because time only advances from event to event.
+
+Usage:
+    python -m src.core.scheduler_simulation --accounts 40 --posts-per-day 10 --workers 3
+"""
+
+import argparse
+import heapq
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from src.core.execution_queue import Priority, post_key
+from src.utils.helpers import percentile
+
+
+@dataclass
+class PlatformProfile:
+    """Latency and failure distribution of a fake platform driver."""
+    latency_mean: float = 60.0     # seconds per post
+    latency_stddev: float = 20.0
+    min_latency: float = 5.0
+    failure_rate: float = 0.05
+
+
+# Rough figures for a browser-driven post, including Chromium launch
+DEFAULT_PROFILES = {
+    "facebook": PlatformProfile(latency_mean=60.0, latency_stddev=20.0, failure_rate=0.05),
+    "x": PlatformProfile(latency_mean=40.0, latency_stddev=15.0, failure_rate=0.05),
+    "linkedin": PlatformProfile(latency_mean=45.0, latency_stddev=15.0, failure_rate=0.05),
+    "youtube": PlatformProfile(latency_mean=180.0, latency_stddev=60.0, failure_rate=0.08),
+}
+
+
+@dataclass
+class SimulatedPost:
+    """A post to replay through the simulator."""
+    post_id: int
+    account_id: int
+    platform: str
+    run_at: datetime
+    lane: str = "scheduled"  # Queue lane (``ScheduledPost.lane``)
+
+
+@dataclass
+class SimulationReport:
+    """Outcome of a simulated schedule."""
+    total_posts: int
+    succeeded: int
+    failed: int
+    missed_slots: int
+    max_queue_depth: int
+    mean_queue_depth: float
+    lateness_p50: float | None
+    lateness_p95: float | None
+    lateness_p99: float | None
+    max_lateness: float | None
+    worker_utilization: float  # Of the background slots
+    max_workers: int
+    background_limit: int = 0
+    simulated_span: timedelta = field(default_factory=timedelta)
+
+    def summary(self) -> str:
+        """Human-readable report."""
+        def fmt(value: float | None) -> str:
+            return "n/a" if value is None else f"{value:.1f}s"
+
+        return "\n".join([
+            f"Posts:              {self.total_posts} over {self.simulated_span}",
+            f"Workers:            {self.max_workers}, {self.background_limit} for scheduled posts "
+            f"({self.worker_utilization:.0%} utilized)",
+            f"Succeeded / failed: {self.succeeded} / {self.failed}",
+            f"Missed slots:       {self.missed_slots}",
+            f"Queue depth:        max {self.max_queue_depth}, mean {self.mean_queue_depth:.2f}",
+            f"Lateness:           p50 {fmt(self.lateness_p50)}, p95 {fmt(self.lateness_p95)}, "
+            f"p99 {fmt(self.lateness_p99)}, max {fmt(self.max_lateness)}",
+        ])
+
+
+class VirtualClock:
+    """Clock that only moves when the simulation advances it."""
+
+    def __init__(self, start: datetime):
+        self.now = start
+
+    def advance_to(self, moment: datetime):
+        """Move the clock forward (never backwards)."""
+        if moment > self.now:
+            self.now = moment
+
+
+class FakePlatformDriver:
+    """Stand-in for a platform driver that only samples duration and outcome."""
+
+    def __init__(self, profile: PlatformProfile, rng: random.Random):
+        self.profile = profile
+        self.rng = rng
+
+    def post(self) -> tuple[float, bool]:
+        """
+        Simulate one post.
+
+        Returns:
+            (duration in seconds, success)
+        """
+        duration = max(
+            self.profile.min_latency,
+            self.rng.gauss(self.profile.latency_mean, self.profile.latency_stddev),
+        )
+        success = self.rng.random() >= self.profile.failure_rate
+        return duration, success
+
+
+class ScheduleSimulator:
+    """
+    Discrete-event model of the ExecutionQueue.
+
+    Posts are submitted at their run time and wait for one of the queue's
+    background slots (``max_workers`` minus ``interactive_slots``, at least
+    one), served like the queue does: lanes in priority order, FIFO within
+    a lane, never two posts of the same account at once. A post "misses
+    its slot" when it starts later than the misfire grace time.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 3,
+        misfire_grace_time: int = 300,
+        profiles: dict[str, PlatformProfile] | None = None,
+        seed: int | None = None,
+        interactive_slots: int = 0,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.background_limit = max(1, self.max_workers - interactive_slots)
+        self.misfire_grace_time = misfire_grace_time
+        self.profiles = {**DEFAULT_PROFILES, **(profiles or {})}
+        self.rng = random.Random(seed)
+
+    def _driver_for(self, platform: str) -> FakePlatformDriver:
+        profile = self.profiles.get(platform.lower(), PlatformProfile())
+        return FakePlatformDriver(profile, self.rng)
+
+    def run(self, posts: list[SimulatedPost]) -> SimulationReport:
+        """Replay the given posts and report executor behaviour."""
+        arrivals = sorted(posts, key=lambda p: p.run_at)
+        if not arrivals:
+            return SimulationReport(
+                total_posts=0, succeeded=0, failed=0, missed_slots=0,
+                max_queue_depth=0, mean_queue_depth=0.0,
+                lateness_p50=None, lateness_p95=None, lateness_p99=None,
+                max_lateness=None, worker_utilization=0.0,
+                max_workers=self.max_workers, background_limit=self.background_limit,
+            )
+
+        clock = VirtualClock(arrivals[0].run_at)
+        start_time = clock.now
+        drivers: dict[str, FakePlatformDriver] = {}
+
+        lanes = {p.lane: p for p in Priority}
+        waiting: list[tuple[Priority, int, SimulatedPost]] = []  # (lane, arrival order, post)
+        running: list[tuple[datetime, int, str]] = []  # min-heap of (finish time, order, account key)
+        running_keys: set[str] = set()
+        free_workers = self.background_limit
+
+        lateness: list[float] = []
+        succeeded = failed = missed = 0
+        busy_seconds = 0.0
+        max_depth = 0
+        depth_area = 0.0  # integral of queue depth over time
+        last_depth_change = clock.now
+        next_arrival = 0
+
+        def next_job() -> tuple[Priority, int, SimulatedPost] | None:
+            runnable = (
+                entry for entry in waiting
+                if post_key(entry[2].platform, entry[2].account_id) not in running_keys
+            )
+            return min(runnable, key=lambda entry: entry[:2], default=None)
+
+        def start_jobs():
+            nonlocal free_workers, busy_seconds, succeeded, failed, missed
+            while free_workers and waiting:
+                entry = next_job()
+                if entry is None:
+                    break  # Every waiting post's account is busy
+                waiting.remove(entry)
+                order, post = entry[1], entry[2]
+                key = post_key(post.platform, post.account_id)
+                late = (clock.now - post.run_at).total_seconds()
+                lateness.append(late)
+                if late > self.misfire_grace_time:
+                    missed += 1
+                driver = drivers.setdefault(post.platform, self._driver_for(post.platform))
+                duration, success = driver.post()
+                busy_seconds += duration
+                if success:
+                    succeeded += 1
+                else:
+                    failed += 1
+                heapq.heappush(running, (clock.now + timedelta(seconds=duration), order, key))
+                running_keys.add(key)
+                free_workers -= 1
+
+        while next_arrival < len(arrivals) or running:
+            next_finish = running[0][0] if running else None
+            arrival_time = arrivals[next_arrival].run_at if next_arrival < len(arrivals) else None
+
+            # Completions at the same instant free workers before new arrivals queue
+            if next_finish is not None and (arrival_time is None or next_finish <= arrival_time):
+                moment, _, finished_key = heapq.heappop(running)
+                event = "finish"
+            else:
+                moment = arrival_time
+                event = "arrival"
+
+            depth_area += len(waiting) * (moment - last_depth_change).total_seconds()
+            last_depth_change = moment
+            clock.advance_to(moment)
+
+            if event == "finish":
+                free_workers += 1
+                running_keys.discard(finished_key)
+            else:
+                post = arrivals[next_arrival]
+                waiting.append((lanes.get(post.lane, Priority.SCHEDULED), next_arrival, post))
+                next_arrival += 1
+
+            max_depth = max(max_depth, len(waiting))
+            start_jobs()
+
+        span = clock.now - start_time
+        span_seconds = span.total_seconds()
+        return SimulationReport(
+            total_posts=len(arrivals),
+            succeeded=succeeded,
+            failed=failed,
+            missed_slots=missed,
+            max_queue_depth=max_depth,
+            mean_queue_depth=depth_area / span_seconds if span_seconds else 0.0,
+            lateness_p50=percentile(lateness, 50),
+            lateness_p95=percentile(lateness, 95),
+            lateness_p99=percentile(lateness, 99),
+            max_lateness=max(lateness),
+            worker_utilization=(
+                busy_seconds / (self.background_limit * span_seconds) if span_seconds else 0.0
+            ),
+            max_workers=self.max_workers,
+            background_limit=self.background_limit,
+            simulated_span=span,
+        )
+
+
+def generate_schedule(
+    accounts: int = 40,
+    posts_per_day: int = 10,
+    days: int = 7,
+    start: datetime | None = None,
+    platform: str = "facebook",
+    round_minutes: int = 60,
+    seed: int | None = None,
+) -> list[SimulatedPost]:
+    """
+    Generate a synthetic schedule.
+
+    Posts are placed between 08:00 and 22:00 and rounded to ``round_minutes``,
+    mimicking users who pick round times such as 09:00.
+
+    Args:
+        accounts: Number of accounts
+        posts_per_day: Posts per account per day
+        days: Number of days
+        start: First day (defaults to tomorrow midnight)
+        platform: Platform for every post
+        round_minutes: Granularity of chosen times (1 = no rounding)
+        seed: Random seed
+
+    Returns:
+        List of SimulatedPost
+    """
+    rng = random.Random(seed)
+    start = start or (datetime.now() + timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    slots_per_day = (14 * 60) // max(round_minutes, 1)
+
+    posts = []
+    post_id = 1
+    for day in range(days):
+        day_start = start + timedelta(days=day, hours=8)
+        for account_id in range(1, accounts + 1):
+            for _ in range(posts_per_day):
+                slot = rng.randrange(slots_per_day)
+                posts.append(SimulatedPost(
+                    post_id=post_id,
+                    account_id=account_id,
+                    platform=platform,
+                    run_at=day_start + timedelta(minutes=slot * round_minutes),
+                ))
+                post_id += 1
+    return posts
+
+
+def posts_from_database(db=None) -> list[SimulatedPost]:
+    """Build a simulation input from the pending posts in the database."""
+    from src.data.database import get_database
+
+    db = db or get_database()
+    platforms: dict[int, str] = {}
+    posts = []
+    for post in db.get_pending_posts():
+        if post.account_id not in platforms:
+            account = db.get_account(post.account_id)
+            platforms[post.account_id] = account.platform if account else "facebook"
+        posts.append(SimulatedPost(
+            post_id=post.id,
+            account_id=post.account_id,
+            platform=platforms[post.account_id],
+            run_at=post.scheduled_time,
+            lane=post.lane,
+        ))
+    return posts
+
+
+def main(argv: list[str] | None = None):
+    """Command line entry point for capacity planning."""
+    from src.config import config
+
+    parser = argparse.ArgumentParser(description="Replay a posting schedule in virtual time")
+    parser.add_argument("--accounts", type=int, default=40)
+    parser.add_argument("--posts-per-day", type=int, default=10)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=config.scheduler.max_workers)
+    parser.add_argument("--interactive-slots", type=int, default=config.scheduler.interactive_slots,
+                        help="Slots kept free for Post now")
+    parser.add_argument("--grace", type=int, default=config.scheduler.misfire_grace_time)
+    parser.add_argument("--round-minutes", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=None, help="Mean seconds per post")
+    parser.add_argument("--failure-rate", type=float, default=None)
+    parser.add_argument("--from-db", action="store_true", help="Replay pending posts from the database")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.from_db:
+        posts = posts_from_database()
+    else:
+        posts = generate_schedule(
+            accounts=args.accounts,
+            posts_per_day=args.posts_per_day,
+            days=args.days,
+            round_minutes=args.round_minutes,
+            seed=args.seed,
+        )
+
+    profiles = {}
+    if args.latency is not None or args.failure_rate is not None:
+        base = DEFAULT_PROFILES["facebook"]
+        override = PlatformProfile(
+            latency_mean=args.latency if args.latency is not None else base.latency_mean,
+            latency_stddev=base.latency_stddev,
+            failure_rate=args.failure_rate if args.failure_rate is not None else base.failure_rate,
+        )
+        profiles = {platform: override for platform in DEFAULT_PROFILES}
+
+    simulator = ScheduleSimulator(
+        max_workers=args.workers,
+        misfire_grace_time=args.grace,
+        profiles=profiles,
+        seed=args.seed,
+        interactive_slots=args.interactive_slots,
+    )
+    print(simulator.run(posts).summary())
+
+
+if __name__ == "__main__":
+    main()
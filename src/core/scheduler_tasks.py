@@ -5,141 +5,148 @@ These functions are called by the scheduler when jobs execute.
 """
 
 import logging
-from pathlib import Path
+from datetime import datetime
 
-from src.core.platforms import FacebookPlatform, XPlatform, LinkedInPlatform, YouTubePlatform
-from src.core.platforms.base import Credentials, PostStatus
-from src.core.social_poster import get_poster
+# Shutdown helpers and PLATFORM_CLASSES are re-exported for existing callers
+from src.core.posting_pipeline import (
+    PLATFORM_CLASSES,
+    PostContext,
+    clear_shutdown,
+    request_shutdown,
+    run_post_stages,
+    shutdown_requested,
+)
 from src.data.database import get_database
-from src.data.models import Account, ScheduledPost, PostStatusEnum
-from src.data.encryption import get_encryption
-from src.utils.helpers import contains_video_media, extract_video_paths
 
 
 logger = logging.getLogger(__name__)
 
 
-PLATFORM_CLASSES = {
-    "facebook": FacebookPlatform,
-    "x": XPlatform,
-    "linkedin": LinkedInPlatform,
-    "youtube": YouTubePlatform,
-}
-
-
 def execute_scheduled_post(
     platform: str,
     account_id: int,
     content: str,
     media_paths: list[str],
+    post_id: int | None = None,
 ) -> dict:
     """
     Execute a scheduled post.
     
-    This function is called by the scheduler when a job fires.
+    This function is called by the scheduler when a job fires. When the
+    job belongs to a stored post, the post is claimed first so that it is
+    never published twice when several workers share the database.
+    
+    The stages (see posting_pipeline) run back to back in this thread; the
+    scheduler engine runs them on the PostingPipeline's worker pools instead.
     
     Args:
         platform: Target platform name
         account_id: Account ID to use
         content: Post content
         media_paths: List of media file paths
+        post_id: Stored post to claim and update (optional)
         
     Returns:
-        Result dict with status and message
+        Result dict with status, message, platform and start/finish times
+    """
+    return run_post_stages(PostContext(
+        platform=platform,
+        account_id=account_id,
+        content=content,
+        media_paths=media_paths or [],
+        post_id=post_id,
+    ))
+
+
+def execute_claimed_post(
+    post_id: int,
+    owner: str,
+    platform: str,
+    account_id: int,
+    content: str,
+    media_paths: list[str],
+) -> dict:
     """
-    platform_key = (platform or "").lower()
-    logger.info(f"Executing scheduled post for {platform_key or platform}, account {account_id}")
+    Run a post this worker has claimed through the posting pipeline.
     
-    try:
-        if platform_key == "facebook":
-            poster = get_poster()
-            if contains_video_media(media_paths):
-                video_paths = extract_video_paths(media_paths)
-                if not video_paths:
-                    return {
-                        "status": "failed",
-                        "message": "Reel scheduling requires at least one valid video file",
-                        "post_url": None,
-                    }
-                success, message = poster.post_to_facebook_reel(
-                    content,
-                    video_paths,
-                    headless=True,
-                )
-            else:
-                success, message = poster.post_to_facebook(
-                    content,
-                    media_paths,
-                    headless=True,
-                )
-            return {
-                "status": "success" if success else "failed",
-                "message": message,
-                "post_url": None,
-            }
-        
-        # Get the platform class
-        platform_class = PLATFORM_CLASSES.get(platform_key)
-        if not platform_class:
-            return {
-                "status": "failed",
-                "message": f"Unknown platform: {platform}"
-            }
-        
-        # Get account credentials from database
-        db = get_database()
-        account = db.get_account(account_id)
-        
-        if not account:
-            return {
-                "status": "failed",
-                "message": f"Account {account_id} not found"
-            }
-        
-        # Initialize platform driver
-        driver = platform_class()
-        session_restored = False
-        try:
-            session_restored = driver.try_restore_session()
-        except Exception as restore_err:
-            logger.warning("Failed to restore %s session: %s", platform_key, restore_err)
-        
-        if not session_restored:
-            if not account.encrypted_password:
-                return {
-                    "status": "failed",
-                    "message": "Account has no stored credentials. Please reconnect and save login info."
-                }
-            encryption = get_encryption()
-            credentials = Credentials(
-                username=account.username,
-                password=account.get_decrypted_password(encryption)
-            )
-            if not driver.login(credentials):
-                return {
-                    "status": "failed",
-                    "message": "Failed to login to platform"
-                }
-        
-        # Convert media paths to Path objects
-        media = [Path(p) for p in media_paths if Path(p).exists()]
-        
-        # Create the post
-        result = driver.create_post(content, media)
+    Only wraps ``run_post_stages`` with the lease owner set; the pipeline
+    stages keep the lease alive, checkpoint or requeue the post and store
+    its result.
+    
+    Args:
+        post_id: Claimed post
+        owner: Lease owner that holds the post
+        platform: Target platform name
+        account_id: Account ID to use
+        content: Post content
+        media_paths: List of media file paths
         
-        # Close browser
-        driver.browser.close()
+    Returns:
+        Result dict as returned by ``execute_scheduled_post``
+    """
+    return run_post_stages(PostContext(
+        platform=platform,
+        account_id=account_id,
+        content=content,
+        media_paths=media_paths or [],
+        post_id=post_id,
+        owner=owner,
+    ))
+
+
+def execute_recurring_post(series_id: int) -> dict:
+    """
+    Execute the next occurrence of a recurring post series.
+    
+    Picks the content for this occurrence (rotating evergreen queues),
+    posts it, then advances the series and stores its next fire time.
+    
+    Args:
+        series_id: Recurring schedule ID
         
-        # Return result
+    Returns:
+        Result dict with status and message
+    """
+    from src.core.scheduler import next_occurrence
+    
+    db = get_database()
+    series = db.get_recurring_schedule(series_id)
+    
+    if not series or not series.is_active:
         return {
-            "status": result.status.value,
-            "message": result.message,
-            "post_url": result.post_url,
+            "status": "failed",
+            "message": f"Recurring schedule {series_id} not found or inactive"
         }
-        
-    except Exception as e:
-        logger.exception(f"Error executing scheduled post: {e}")
+    
+    try:
+        item = series.current_item()
+    except ValueError as e:
         return {
             "status": "failed",
             "message": str(e)
         }
+    
+    logger.info(
+        f"Executing recurring series {series_id} "
+        f"(item {series.next_index + 1}/{len(series.content_items)})"
+    )
+    result = execute_scheduled_post(
+        platform=series.platform,
+        account_id=series.account_id,
+        content=item.get("content", ""),
+        media_paths=item.get("media_paths", []),
+    )
+    
+    # Only rotate evergreen content once it has actually been posted, so a
+    # failed item gets the next slot instead of being skipped.
+    now = datetime.now()
+    next_index = series.advanced_index() if result.get("status") == "success" else series.next_index
+    db.advance_recurring_schedule(
+        series_id,
+        next_index=next_index,
+        last_run_time=now,
+        next_run_time=next_occurrence(series.cron_expression, now),
+    )
+    
+    result["series_id"] = series_id
+    return result
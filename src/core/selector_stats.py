@@ -0,0 +1,291 @@
+"""
+Selector Stats - Learned ordering of fallback selectors.
+
+The Facebook flows find elements by trying lists of candidate selectors in
+a fixed order, so every post pays for the same failed probes before the
+selector that currently works. SelectorStats records, per platform and
+element, which selector matched and how long the probe took, persists that
+to ``data/selector_stats.json``, and ranks candidates for the next lookup:
+
+- candidates are ordered by smoothed hit rate, then by mean probe time,
+  then by their listed order (so unseen selectors keep the author's order)
+- counts decay exponentially (``BROWSER_SELECTOR_HALF_LIFE_DAYS``), so a
+  selector that stopped matching after a Facebook redesign loses its place
+
+Show hit rates with ``python -m src.core.selector_stats``.
+"""
+
+import argparse
+import json
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Sequence, TypeVar
+
+from src.config import PROJECT_ROOT, config
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class SelectorStat:
+    """Decayed probe counts of one selector."""
+    hits: float = 0.0
+    attempts: float = 0.0
+    hit_ms: float = 0.0        # summed probe time of the hits
+    updated_at: float = 0.0    # epoch seconds of the last decay
+    last_hit_at: float | None = None
+
+    @property
+    def hit_rate(self) -> float:
+        """Hit rate smoothed towards 0.5, so one probe does not decide the order."""
+        return (self.hits + 1) / (self.attempts + 2)
+
+    @property
+    def mean_hit_ms(self) -> float | None:
+        return self.hit_ms / self.hits if self.hits else None
+
+    def decay(self, now: float, half_life: float):
+        """Scale the counts down for the time since the last update."""
+        if self.updated_at and half_life > 0 and now > self.updated_at:
+            factor = 0.5 ** ((now - self.updated_at) / half_life)
+            self.hits *= factor
+            self.attempts *= factor
+            self.hit_ms *= factor
+        self.updated_at = now
+
+
+@dataclass
+class SelectorReport:
+    """Hit rate of one selector, for display."""
+    platform: str
+    element: str
+    selector: str
+    hits: float
+    attempts: float
+    hit_rate: float            # raw decayed rate, 0 if never probed
+    mean_hit_ms: float | None
+    last_hit_at: float | None
+
+
+class SelectorStats:
+    """Per-platform, per-element selector statistics with a JSON file behind them."""
+
+    STATS_FILE = PROJECT_ROOT / "data" / "selector_stats.json"
+
+    def __init__(self, path: Path | None = None, half_life_days: float | None = None):
+        """
+        Initialize the store.
+
+        Args:
+            path: JSON file (defaults to ``STATS_FILE``)
+            half_life_days: Days after which old probe counts weigh half
+        """
+        self.path = Path(path) if path else self.STATS_FILE
+        if half_life_days is None:
+            half_life_days = config.browser.selector_half_life_days
+        self.half_life = half_life_days * 86400
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict[str, dict[str, SelectorStat]]] = {}
+        self._load()
+
+    # ==================== Ranking ====================
+
+    def rank(self, platform: str, element: str, selectors: Sequence[str]) -> list[str]:
+        """Order candidate selectors with the most reliable (then fastest) first."""
+        now = time.time()
+        with self._lock:
+            known = self._stats.get(platform, {}).get(element, {})
+
+            def key(item: tuple[int, str]):
+                index, selector = item
+                stat = known.get(selector)
+                if stat is None:
+                    return (-0.5, float("inf"), index)
+                stat.decay(now, self.half_life)
+                mean = stat.mean_hit_ms
+                return (-stat.hit_rate, mean if mean is not None else float("inf"), index)
+
+            return [selector for _, selector in sorted(enumerate(selectors), key=key)]
+
+    def record(self, platform: str, element: str, selector: str, hit: bool, elapsed_ms: float = 0.0):
+        """Record one probe of ``selector`` (call ``save`` to persist)."""
+        now = time.time()
+        with self._lock:
+            stat = self._stats.setdefault(platform, {}).setdefault(element, {}).setdefault(
+                selector, SelectorStat(updated_at=now)
+            )
+            stat.decay(now, self.half_life)
+            stat.attempts += 1
+            if hit:
+                stat.hits += 1
+                stat.hit_ms += elapsed_ms
+                stat.last_hit_at = now
+
+    def record_lookup(
+        self,
+        platform: str,
+        element: str,
+        ranked: Sequence[str],
+        winner: str | None,
+        elapsed_ms: float = 0.0,
+    ):
+        """
+        Record a lookup that checked all of ``ranked`` at once and save.
+
+        Selectors ranked above the winner count as misses (all of them if
+        nothing matched), the winner as a hit taking ``elapsed_ms``.
+        """
+        for selector in ranked:
+            hit = selector == winner
+            self.record(platform, element, selector, hit, elapsed_ms if hit else 0.0)
+            if hit:
+                break
+        self.save()
+
+    async def first_match(
+        self,
+        platform: str,
+        element: str,
+        selectors: Sequence[str],
+        probe: Callable[[str], Awaitable[T | None]],
+    ) -> tuple[str, T] | None:
+        """
+        Try selectors in learned order until ``probe`` returns a result.
+
+        Every probe is recorded, and the stats are saved after the lookup.
+
+        Args:
+            platform: Platform name, e.g. "facebook"
+            element: What is being looked for, e.g. "text_input"
+            selectors: Candidates in their default order
+            probe: Async callable returning a result (a hit) or None (a miss);
+                   exceptions count as misses
+
+        Returns:
+            (selector, result) of the first hit, or None
+        """
+        match = None
+        try:
+            for selector in self.rank(platform, element, selectors):
+                started = time.monotonic()
+                try:
+                    result = await probe(selector)
+                except Exception as e:
+                    logger.debug(f"Selector {selector} failed: {e}")
+                    result = None
+                elapsed_ms = (time.monotonic() - started) * 1000
+                self.record(platform, element, selector, result is not None, elapsed_ms)
+                if result is not None:
+                    match = (selector, result)
+                    break
+        finally:
+            self.save()
+        return match
+
+    # ==================== Reporting ====================
+
+    def report(self, platform: str | None = None) -> list[SelectorReport]:
+        """Hit rates of every recorded selector, best first within each element."""
+        now = time.time()
+        rows = []
+        with self._lock:
+            for platform_name, elements in sorted(self._stats.items()):
+                if platform is not None and platform_name != platform:
+                    continue
+                for element, selectors in sorted(elements.items()):
+                    for selector, stat in selectors.items():
+                        stat.decay(now, self.half_life)
+                        rows.append(SelectorReport(
+                            platform=platform_name,
+                            element=element,
+                            selector=selector,
+                            hits=stat.hits,
+                            attempts=stat.attempts,
+                            hit_rate=stat.hits / stat.attempts if stat.attempts else 0.0,
+                            mean_hit_ms=stat.mean_hit_ms,
+                            last_hit_at=stat.last_hit_at,
+                        ))
+        rows.sort(key=lambda r: (r.platform, r.element, -r.hit_rate, -r.hits))
+        return rows
+
+    def summary(self, platform: str | None = None) -> str:
+        """Human-readable hit-rate table."""
+        lines = []
+        current = None
+        for row in self.report(platform):
+            if (row.platform, row.element) != current:
+                current = (row.platform, row.element)
+                lines.append(f"{row.platform} / {row.element}")
+            speed = "n/a" if row.mean_hit_ms is None else f"{row.mean_hit_ms:.0f}ms"
+            lines.append(
+                f"  {row.hit_rate:6.1%}  {row.hits:6.1f}/{row.attempts:<6.1f} {speed:>7}  {row.selector}"
+            )
+        return "\n".join(lines) if lines else "No selector statistics recorded yet"
+
+    # ==================== Persistence ====================
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text())
+            self._stats = {
+                platform: {
+                    element: {selector: SelectorStat(**stat) for selector, stat in selectors.items()}
+                    for element, selectors in elements.items()
+                }
+                for platform, elements in data.items()
+            }
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable selector stats {self.path}: {e}")
+            self._stats = {}
+
+    def save(self):
+        """Write the stats to disk (atomically)."""
+        with self._lock:
+            data = {
+                platform: {
+                    element: {selector: asdict(stat) for selector, stat in selectors.items()}
+                    for element, selectors in elements.items()
+                }
+                for platform, elements in self._stats.items()
+            }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, indent=1))
+            tmp.replace(self.path)
+        except OSError as e:
+            logger.warning(f"Failed to save selector stats: {e}")
+
+
+# Singleton selector stats instance
+_selector_stats: SelectorStats | None = None
+_selector_stats_lock = threading.Lock()
+
+
+def get_selector_stats() -> SelectorStats:
+    """Get or create the selector stats store."""
+    global _selector_stats
+    with _selector_stats_lock:
+        if _selector_stats is None:
+            _selector_stats = SelectorStats()
+        return _selector_stats
+
+
+def main(argv: list[str] | None = None):
+    """Print selector hit rates."""
+    parser = argparse.ArgumentParser(description="Show learned selector hit rates")
+    parser.add_argument("--platform", default=None)
+    args = parser.parse_args(argv)
+    print(get_selector_stats().summary(args.platform))
+
+
+if __name__ == "__main__":
+    main()
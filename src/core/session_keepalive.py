@@ -0,0 +1,167 @@
+"""
+Session Keep-Alive - Refresh saved sessions before they expire.
+
+Saved browser sessions only got fresh cookies when a post opened a browser
+with them, so an account that posts rarely could find its session expired
+at fire time, and posting then waited for a manual login. SessionKeepAlive
+visits every saved session over HTTP (the same cookie replay as
+SessionProbe) every ``BROWSER_SESSION_KEEPALIVE_INTERVAL`` seconds:
+
+- cookies the platform rotates in the response are written back to the
+  saved session, which keeps sliding expiries moving forward
+- the verdict is stored in the probe cache, so posting and pre-flight see it
+- a warning is logged once the session cookie expires within
+  ``BROWSER_SESSION_EXPIRY_WARNING_HOURS``, and when it has expired
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+
+from src.config import config
+from src.core.browser_session_manager import BrowserSession, BrowserSessionManager, get_session_manager
+from src.core.session_probe import (
+    STARTUP_DELAY,
+    SessionHealth,
+    SessionProbe,
+    get_session_probe,
+    session_cookie_expiry,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class KeepAliveResult:
+    """Outcome of refreshing one session."""
+    health: SessionHealth
+    rotated: int = 0               # Cookies written back
+    expiring: bool = False         # Session cookie expires within the warning window
+
+
+class SessionKeepAlive:
+    """Periodically refreshes the cookies of every saved session."""
+
+    def __init__(
+        self,
+        manager: BrowserSessionManager | None = None,
+        probe: SessionProbe | None = None,
+        interval: int | None = None,
+        warn_hours: float | None = None,
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            manager: Session manager (defaults to the shared one)
+            probe: Probe making the requests and caching verdicts (defaults to the shared one)
+            interval: Seconds between refreshes (0 disables them)
+            warn_hours: Warn when a session cookie expires within this many hours
+        """
+        settings = config.browser
+        self._manager = manager
+        self._probe = probe
+        self.interval = settings.session_keepalive_interval if interval is None else interval
+        self.warn_hours = settings.session_expiry_warning_hours if warn_hours is None else warn_hours
+
+        self._results: dict[str, KeepAliveResult] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def manager(self) -> BrowserSessionManager:
+        return self._manager or get_session_manager()
+
+    @property
+    def probe(self) -> SessionProbe:
+        return self._probe or get_session_probe()
+
+    # ==================== Refresh ====================
+
+    def refresh(self, session: BrowserSession) -> KeepAliveResult:
+        """Visit one session, save its rotated cookies and check its expiry."""
+        health, cookies = self.probe.fetch(session)
+        rotated = 0
+        if health.valid and cookies:
+            rotated = self.manager.update_session_cookies(session.key, cookies)
+            if rotated:
+                # The rotated cookies may carry a later expiry
+                current = self.manager.get_session(session.platform, session.account) or session
+                health.expires_at = session_cookie_expiry(current)[1]
+        if health.valid is not None:
+            self.probe.record(health.key, health.valid, health.reason, expires_at=health.expires_at)
+
+        hours = health.expires_in_hours
+        expiring = health.valid is not False and hours is not None and hours < self.warn_hours
+        if health.valid is False:
+            logger.warning(f"Saved session {session.key} has expired ({health.reason}); log in again")
+        elif expiring:
+            logger.warning(f"Saved session {session.key} expires in {hours:.1f} h; log in again before then")
+        elif rotated:
+            logger.info(f"Refreshed {rotated} cookie(s) of session {session.key}")
+
+        result = KeepAliveResult(health=health, rotated=rotated, expiring=expiring)
+        with self._lock:
+            self._results[session.key] = result
+        return result
+
+    def refresh_all(self) -> list[KeepAliveResult]:
+        """Refresh every saved session."""
+        results = []
+        for session in self.manager.list_sessions():
+            if self._stop_event.is_set():
+                break
+            try:
+                results.append(self.refresh(session))
+            except Exception as e:
+                logger.error(f"Keep-alive of session {session.key} failed: {e}")
+        return results
+
+    def expiring(self) -> list[KeepAliveResult]:
+        """Latest results of sessions that expired or expire within the warning window."""
+        with self._lock:
+            return [r for r in self._results.values() if r.expiring or r.health.valid is False]
+
+    def snapshot(self) -> dict[str, KeepAliveResult]:
+        """Latest result per session key."""
+        with self._lock:
+            return dict(self._results)
+
+    # ==================== Background refreshes ====================
+
+    def start(self):
+        """Start refreshing sessions in a background thread (no-op if disabled)."""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="session-keepalive", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background refreshes."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        delay = STARTUP_DELAY
+        while not self._stop_event.wait(delay):
+            self.refresh_all()
+            delay = self.interval
+
+
+# Singleton session keep-alive instance
+_session_keepalive: SessionKeepAlive | None = None
+_session_keepalive_lock = threading.Lock()
+
+
+def get_session_keepalive() -> SessionKeepAlive:
+    """Get or create the session keep-alive service."""
+    global _session_keepalive
+    with _session_keepalive_lock:
+        if _session_keepalive is None:
+            _session_keepalive = SessionKeepAlive()
+        return _session_keepalive
@@ -0,0 +1,307 @@
+"""
+Session Probe - Check saved browser sessions over HTTP, without a browser.
+
+Finding out whether a saved Facebook session still works used to mean
+launching Chromium, loading the homepage and looking for the ``c_user``
+cookie. SessionProbe instead replays a session's cookie jar against a
+page that redirects to the login form when logged out, over one pooled
+HTTP client, reading only the response headers:
+
+- the session cookie missing or past its expiry: invalid, no request made
+- a redirect to a login or checkpoint URL, or the session cookie being
+  cleared by ``Set-Cookie``: invalid
+- any other redirect or a 200: valid
+- network errors and other statuses: unknown (not cached)
+
+Verdicts are cached for ``BROWSER_SESSION_CHECK_TTL`` seconds, and a
+background thread re-checks every stored session every
+``BROWSER_SESSION_CHECK_INTERVAL`` seconds, so the GUI, pre-flight and the
+poster can read session health from the cache.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from http.cookiejar import Cookie, DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
+
+from src.config import config
+from src.core.browser_session_manager import BrowserSession, BrowserSessionManager, get_session_manager
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds after start before the first sweep, so it does not compete with startup
+STARTUP_DELAY = 5.0
+
+
+@dataclass(frozen=True)
+class ProbeTarget:
+    """Page that shows a logged-out visitor the way to the login form."""
+    url: str
+    login_markers: tuple[str, ...]  # Substrings of the redirect target when logged out
+
+
+PROBE_TARGETS: dict[str, ProbeTarget] = {
+    "facebook": ProbeTarget("https://www.facebook.com/settings", ("/login", "/checkpoint")),
+    "linkedin": ProbeTarget("https://www.linkedin.com/feed/", ("/login", "/authwall", "/checkpoint")),
+}
+
+
+@dataclass
+class SessionHealth:
+    """Verdict of one session check."""
+    key: str
+    valid: bool | None             # None: could not tell
+    reason: str
+    checked_at: float = field(default_factory=time.time)
+    expires_at: float | None = None  # Expiry of the session cookie (epoch seconds)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.checked_at
+
+    @property
+    def expires_in_hours(self) -> float | None:
+        if self.expires_at is None:
+            return None
+        return (self.expires_at - time.time()) / 3600
+
+
+def cookie_jar(cookies: list[dict]) -> RequestsCookieJar:
+    """Turn Playwright cookies into a requests cookie jar."""
+    jar = RequestsCookieJar()
+    for cookie in cookies:
+        expires = cookie.get("expires")
+        jar.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain", ""),
+            path=cookie.get("path", "/"),
+            secure=cookie.get("secure", False),
+            expires=int(expires) if expires and expires > 0 else None,
+        )
+    return jar
+
+
+def playwright_cookie(cookie: Cookie) -> dict:
+    """Turn a cookie set by a response into Playwright's format (without sameSite)."""
+    return {
+        "name": cookie.name,
+        "value": cookie.value or "",
+        "domain": cookie.domain,
+        "path": cookie.path,
+        "expires": float(cookie.expires) if cookie.expires else -1,
+        "httpOnly": cookie.has_nonstandard_attr("HttpOnly") or cookie.has_nonstandard_attr("httponly"),
+        "secure": cookie.secure,
+    }
+
+
+def session_cookie_expiry(session: BrowserSession) -> tuple[bool, float | None]:
+    """
+    Find the platform's session cookie in a saved session.
+
+    Returns:
+        (present and unexpired, its expiry or None for a browser-session cookie)
+    """
+    name = BrowserSessionManager.PLATFORM_URLS.get(session.platform, {}).get("session_cookie")
+    for cookie in session.cookies:
+        if cookie.get("name") == name:
+            expires = cookie.get("expires")
+            if expires and expires > 0:
+                return expires > time.time(), float(expires)
+            return True, None
+    return name is None, None
+
+
+class SessionProbe:
+    """Cached, browserless validity checks of the saved browser sessions."""
+
+    def __init__(
+        self,
+        manager: BrowserSessionManager | None = None,
+        ttl: int | None = None,
+        interval: int | None = None,
+        timeout: float = 10.0,
+    ):
+        """
+        Initialize the probe.
+
+        Args:
+            manager: Session manager (defaults to the shared one)
+            ttl: Seconds a verdict is reused
+            interval: Seconds between background sweeps (0 disables them)
+            timeout: HTTP timeout in seconds
+        """
+        settings = config.browser
+        self._manager = manager
+        self.ttl = settings.session_check_ttl if ttl is None else ttl
+        self.interval = settings.session_check_interval if interval is None else interval
+        self.timeout = timeout
+
+        self._cache: dict[str, SessionHealth] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self.http = requests.Session()
+        self.http.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+        # Cookies are passed per request; never keep one account's Set-Cookie for the next
+        self.http.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    @property
+    def manager(self) -> BrowserSessionManager:
+        return self._manager or get_session_manager()
+
+    # ==================== Checks ====================
+
+    def cached(self, platform: str, account: str | int | None = None) -> SessionHealth | None:
+        """Get the last verdict on the session an account would use, if still fresh."""
+        session = self.manager.get_session(platform, account)
+        if session is None:
+            return None
+        with self._lock:
+            health = self._cache.get(session.key)
+        if health is None or health.age > self.ttl:
+            return None
+        if health.checked_at < session.created_at.timestamp():
+            return None  # The session was captured again since
+        return health
+
+    def check(self, platform: str, account: str | int | None = None, force: bool = False) -> SessionHealth:
+        """
+        Check the session an account would use (cached for ``ttl`` seconds).
+
+        Args:
+            platform: Platform name
+            account: Account whose session to check (falls back like ``get_session``)
+            force: Ignore a cached verdict
+        """
+        session = self.manager.get_session(platform, account)
+        if session is None:
+            return SessionHealth(platform, False, "no saved session")
+        if not force:
+            health = self.cached(platform, account)
+            if health is not None:
+                return health
+        health = self.probe(session)
+        if health.valid is not None:
+            with self._lock:
+                self._cache[health.key] = health
+        return health
+
+    def probe(self, session: BrowserSession) -> SessionHealth:
+        """Check one session now (not cached)."""
+        return self.fetch(session)[0]
+
+    def fetch(self, session: BrowserSession) -> tuple[SessionHealth, list[dict]]:
+        """
+        Check one session now and collect the cookies the platform set.
+
+        Returns:
+            (verdict, cookies set by the response in Playwright's format)
+        """
+        present, expires_at = session_cookie_expiry(session)
+        if not present:
+            return SessionHealth(session.key, False, "session cookie missing or expired", expires_at=expires_at), []
+        target = PROBE_TARGETS.get(session.platform)
+        if target is None:
+            return SessionHealth(session.key, None, "no probe endpoint", expires_at=expires_at), []
+
+        name = BrowserSessionManager.PLATFORM_URLS[session.platform]["session_cookie"]
+        try:
+            with self.http.get(
+                target.url,
+                cookies=cookie_jar(session.cookies),
+                headers={"User-Agent": session.user_agent} if session.user_agent else None,
+                allow_redirects=False,
+                timeout=self.timeout,
+                stream=True,  # Only the headers are needed
+            ) as response:
+                status = response.status_code
+                location = response.headers.get("Location", "")
+                set_cookie = response.headers.get("Set-Cookie", "")
+                cookies = [playwright_cookie(cookie) for cookie in response.cookies]
+        except requests.RequestException as e:
+            return SessionHealth(session.key, None, f"probe failed: {e}", expires_at=expires_at), []
+
+        if f"{name}=deleted" in set_cookie:
+            valid, reason = False, "session cookie cleared"
+        elif status in (301, 302, 303, 307, 308):
+            if any(marker in location for marker in target.login_markers):
+                valid, reason = False, "redirected to login"
+            else:
+                valid, reason = True, f"HTTP {status}"
+        elif status == 200:
+            valid, reason = True, "HTTP 200"
+        elif status == 401:
+            valid, reason = False, "HTTP 401"
+        else:
+            valid, reason = None, f"HTTP {status}"
+        logger.debug(f"Session {session.key}: {reason}")
+        return SessionHealth(session.key, valid, reason, expires_at=expires_at), cookies
+
+    def record(self, key: str, valid: bool, reason: str, expires_at: float | None = None):
+        """Store a verdict reached elsewhere (e.g. by a browser that loaded the page)."""
+        with self._lock:
+            self._cache[key] = SessionHealth(key, valid, reason, expires_at=expires_at)
+
+    def check_all(self) -> list[SessionHealth]:
+        """Check every stored session whose verdict is stale."""
+        results = []
+        for session in self.manager.list_sessions():
+            if self._stop_event.is_set():
+                break
+            try:
+                results.append(self.check(session.platform, session.account))
+            except Exception as e:
+                logger.error(f"Check of session {session.key} failed: {e}")
+        return results
+
+    def snapshot(self) -> dict[str, SessionHealth]:
+        """Latest verdict per session key."""
+        with self._lock:
+            return dict(self._cache)
+
+    # ==================== Background sweeps ====================
+
+    def start(self):
+        """Start checking sessions in a background thread (no-op if disabled)."""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="session-probe", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background checks."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        delay = STARTUP_DELAY
+        while not self._stop_event.wait(delay):
+            for health in self.check_all():
+                if health.valid is False:
+                    logger.warning(f"Saved session {health.key} is no longer valid: {health.reason}")
+            delay = self.interval
+
+
+# Singleton session probe instance
+_session_probe: SessionProbe | None = None
+_session_probe_lock = threading.Lock()
+
+
+def get_session_probe() -> SessionProbe:
+    """Get or create the session probe."""
+    global _session_probe
+    with _session_probe_lock:
+        if _session_probe is None:
+            _session_probe = SessionProbe()
+        return _session_probe
@@ -0,0 +1,160 @@
+"""
+Slot Allocator - Spread scheduled posts to avoid browser-launch stampedes.
+
+Users tend to pick round times (09:00), so many jobs fire at once and each
+one launches Chromium. At schedule time the allocator shifts colliding posts
+forward so that:
+- posts of the same account are at least ``account_spacing`` apart
+- any two launches are at least ``launch_interval`` apart
+A post is never moved earlier and never by more than ``max_jitter``.
+"""
+
+import bisect
+import logging
+from datetime import datetime, timedelta
+
+from src.config import config
+from src.data.models import ScheduledPost
+
+
+logger = logging.getLogger(__name__)
+
+
+class SlotAllocator:
+    """Assigns launch slots that respect per-account and global spacing."""
+
+    def __init__(
+        self,
+        account_spacing: int | None = None,
+        launch_interval: int | None = None,
+        max_jitter: int | None = None,
+    ):
+        """
+        Initialize the allocator.
+
+        Args:
+            account_spacing: Min seconds between two posts of one account
+            launch_interval: Min seconds between any two posts
+            max_jitter: Max seconds a post may be shifted from its requested time
+        """
+        settings = config.scheduler
+        self.account_spacing = timedelta(seconds=(
+            settings.account_spacing if account_spacing is None else account_spacing
+        ))
+        self.launch_interval = timedelta(seconds=(
+            settings.launch_interval if launch_interval is None else launch_interval
+        ))
+        self.max_jitter = timedelta(seconds=(
+            settings.max_jitter if max_jitter is None else max_jitter
+        ))
+
+        # Sorted occupied launch times, globally and per account
+        self._all: list[datetime] = []
+        self._by_account: dict[int, list[datetime]] = {}
+
+    def load(self, occupied: list[tuple[int, datetime]]):
+        """
+        Replace the known occupied slots.
+
+        Args:
+            occupied: (account_id, launch time) pairs of already scheduled posts
+        """
+        self._all = sorted(time for _, time in occupied)
+        self._by_account = {}
+        for account_id, time in occupied:
+            bisect.insort(self._by_account.setdefault(account_id, []), time)
+
+    def reserve(self, account_id: int, time: datetime):
+        """Mark a slot as occupied."""
+        bisect.insort(self._all, time)
+        bisect.insort(self._by_account.setdefault(account_id, []), time)
+
+    def allocate(self, account_id: int, requested: datetime) -> datetime:
+        """
+        Find the earliest acceptable slot at or after the requested time.
+
+        The slot is reserved. If no slot satisfies every constraint within
+        ``max_jitter``, the post is shifted by the full jitter bound.
+
+        Args:
+            account_id: Account the post belongs to
+            requested: Time the user asked for
+
+        Returns:
+            Adjusted launch time
+        """
+        limit = requested + self.max_jitter
+        candidate = requested
+
+        while True:
+            blocker = self._conflict_end(self._all, candidate, self.launch_interval)
+            account_blocker = self._conflict_end(
+                self._by_account.get(account_id, []), candidate, self.account_spacing
+            )
+            pushed = max(filter(None, (blocker, account_blocker)), default=None)
+            if pushed is None:
+                break
+            if pushed > limit:
+                logger.warning(
+                    f"No free slot within {self.max_jitter} of {requested} "
+                    f"for account {account_id}; using the jitter bound"
+                )
+                candidate = limit
+                break
+            candidate = pushed
+
+        if candidate != requested:
+            logger.info(f"Shifted post for account {account_id} from {requested} to {candidate}")
+        self.reserve(account_id, candidate)
+        return candidate
+
+    @staticmethod
+    def _conflict_end(
+        slots: list[datetime], candidate: datetime, gap: timedelta
+    ) -> datetime | None:
+        """
+        Get the earliest time a candidate could move to past conflicting slots.
+
+        Returns None if no slot lies within ``gap`` of the candidate.
+        """
+        if not gap:
+            return None
+        lo = bisect.bisect_right(slots, candidate - gap)
+        hi = bisect.bisect_left(slots, candidate + gap)
+        if lo >= hi:
+            return None
+        # Slots are sorted, so clearing the last conflicting one clears them all
+        return slots[hi - 1] + gap
+
+
+def occupied_slots(db, exclude_post_ids: set[int] | None = None) -> list[tuple[int, datetime]]:
+    """Get (account_id, time) pairs of all pending posts."""
+    exclude_post_ids = exclude_post_ids or set()
+    return [
+        (post.account_id, post.scheduled_time)
+        for post in db.get_pending_posts()
+        if post.id not in exclude_post_ids
+    ]
+
+
+def assign_slots(db, posts: list[ScheduledPost], allocator: SlotAllocator | None = None):
+    """
+    Spread posts against each other and the already scheduled posts.
+
+    Each post's ``scheduled_time`` becomes the allocated slot; when it had to
+    move, the original time is kept in ``requested_time`` for display.
+
+    Args:
+        db: Database to read occupied slots from
+        posts: Posts to place (edited posts are excluded from occupancy by ID)
+        allocator: Optional pre-configured allocator
+    """
+    allocator = allocator or SlotAllocator()
+    allocator.load(occupied_slots(db, {p.id for p in posts if p.id is not None}))
+
+    # Place earliest requests first so shifts cascade forward in order
+    for post in sorted(posts, key=lambda p: p.requested_time or p.scheduled_time):
+        requested = post.requested_time or post.scheduled_time
+        slot = allocator.allocate(post.account_id, requested)
+        post.scheduled_time = slot
+        post.requested_time = requested if slot != requested else None
@@ -6,143 +6,135 @@ with elements reliably, even when Facebook changes their DOM structure.
 
 import asyncio
 import logging
+import re
+import time
+from concurrent.futures import Future
 from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
-from playwright.async_api import async_playwright, Page, Locator
+from typing import Callable, Optional
+from playwright.async_api import Page, Locator
 
 from src.config import config
 from src.data.database import get_database
+from src.utils.exceptions import SessionExpiredError
 from src.utils.logger import get_logger
 
-from src.core.browser_session_manager import get_session_manager, BrowserSessionManager
+from src.core.automation_runtime import get_automation_runtime
+from src.core.browser_pool import LaunchSpec, get_browser_pool
+from src.core.browser_session_manager import get_session_manager, session_key, BrowserSessionManager
+from src.core.debug_artifacts import capture, get_debug_artifacts
+from src.core.dom_probe import probe_page
+from src.core.network_policy import apply_network_policy, get_network_policy, network_stats
+from src.core.selector_stats import get_selector_stats
+from src.core.session_probe import get_session_probe
+from src.core.waits import (
+    remaining_ms, wait_for_dom_quiet, wait_for_enabled, wait_for_state, wait_for_visible, wait_until,
+)
 
 logger = get_logger(__name__)
 
+FACEBOOK_BROWSER_ARGS = (
+    "--disable-blink-features=AutomationControlled",
+    "--no-first-run",
+    "--start-maximized",
+    "--window-size=1920,1080",
+    "--force-device-scale-factor=1",
+)
+
+# Ceilings (ms) of the condition-driven waits in the Facebook flows
+PAGE_READY_TIMEOUT = 15000     # feed or login form rendered after navigation
+COMPOSER_TIMEOUT = 10000       # composer dialog / Reel upload surface open
+SETTLE_TIMEOUT = 3000          # DOM stops changing after a click or upload
+TEXT_TIMEOUT = 1000            # typed text shows up in the editor
+MEDIA_READY_TIMEOUT = 30000    # attached photos/videos previewed
+POST_BUTTON_TIMEOUT = 30000    # Post button enabled (media may still be processing)
+PUBLISH_TIMEOUT = 15000        # composer dialog closed after clicking Post
+REEL_MEDIA_TIMEOUT = 60000     # Reel video preview rendered
+REEL_SHARE_TIMEOUT = 40000     # Reel Share button enabled
+REEL_PUBLISHED_TIMEOUT = 10000  # Reel success message shown
+
+# Rendered once the post-login feed or the login form is on screen
+FEED_READY_SELECTORS = (
+    "div[role='feed']",
+    "div[role='main']",
+    "input[name='email']",
+    "form[action*='login']",
+)
+
+# Editor inside the composer dialog, rendered once the dialog has opened
+COMPOSER_EDITOR_SELECTORS = (
+    "div[role='dialog'] [role='textbox']",
+    "div[role='dialog'] [contenteditable='true']",
+)
+
+REEL_FILE_INPUT_SELECTOR = "input[type='file'][accept*='video']"
+POST_BUTTON_SELECTOR = "div[aria-label='Post'][role='button']"
+NEXT_BUTTON_SELECTOR = "div[aria-label='Next'][role='button']"
+
 
 class IntelligentElementFinder:
     """Intelligent element finder with multiple detection strategies."""
     
-    @staticmethod
-    async def find_text_input_intelligent(page: Page) -> Optional[Locator]:
+    # Comprehensive selector list - ordered by specificity (using role/aria, not classes)
+    TEXT_INPUT_SELECTORS = [
+        # Most specific - role-based selectors (most reliable)
+        "div[role='textbox'][contenteditable='true']",
+        "div[contenteditable='true'][role='textbox']",
+        "[role='textbox']",
+        # Contenteditable with data attributes
+        "div[contenteditable='true'][data-lexical-editor='true']",
+        "div[data-lexical-editor='true'][contenteditable='true']",
+        "div[data-contents='true'][contenteditable='true']",
+        # Standard contenteditable patterns
+        "div[contenteditable='true'][spellcheck='false']",
+        # Placeholder based (aria)
+        "div[aria-placeholder*='mind']",
+        "div[aria-placeholder*='your']",
+        "div[aria-placeholder*='post']",
+        "div[aria-placeholder*='text']",
+        # Data attributes
+        "[data-lexical-editor='true']",
+        "[data-contents='true']",
+        "[data-testid*='composer']",
+        "[data-testid*='textbox']",
+        # Generic fallbacks
+        "div[contenteditable='true']",
+        "[contenteditable='true']",
+    ]
+    
+    @classmethod
+    async def find_text_input_intelligent(cls, page: Page) -> Optional[Locator]:
         """Intelligently find Facebook's text input/composer with extensive fallbacks."""
         logger.info("🔍 Searching for text input...")
         
-        # Wait a moment for any animations/dialogs to settle
-        await page.wait_for_timeout(1500)
+        # Let any animations/dialogs settle
+        await wait_for_dom_quiet(page, timeout=1500)
         
-        # Check for iframes first - Facebook sometimes puts composer in iframe
-        logger.info("Checking for iframes...")
-        frames = page.frames
-        logger.info(f"Found {len(frames)} frame(s)")
+        # One probe per frame scores every candidate; iframes are included because
+        # Facebook sometimes puts the composer in one
+        stats = get_selector_stats()
+        selectors = stats.rank("facebook", "text_input", cls.TEXT_INPUT_SELECTORS)
+        started = time.monotonic()
+        matches = await probe_page(page, selectors)
+        elapsed_ms = (time.monotonic() - started) * 1000
+        logger.info(f"Probed {len(selectors)} selectors in {len(page.frames)} frame(s): "
+                    f"{len(matches)} candidate(s) in {elapsed_ms:.0f}ms")
         
-        for i, frame in enumerate(frames):
-            if frame != page.main_frame:
-                try:
-                    # Try to find text input in iframe
-                    iframe_input = frame.locator("[contenteditable='true'], [role='textbox']").first
-                    count = await iframe_input.count()
-                    if count > 0:
-                        is_visible = await iframe_input.is_visible()
-                        is_editable = await iframe_input.is_editable()
-                        logger.info(f"✓ Found text input in iframe {i}: visible={is_visible}, editable={is_editable}")
-                        if is_visible and is_editable:
-                            return iframe_input
-                except Exception as e:
-                    logger.debug(f"Frame {i} check failed: {e}")
+        for match in matches[:5]:
+            logger.debug(f"  {match.selector} (frame {match.frame_index}): score={match.score}, "
+                         f"visible={match.visible}, editable={match.editable}, role={match.role}, "
+                         f"placeholder={match.placeholder}")
         
-        # Comprehensive selector list - ordered by specificity (using role/aria, not classes)
-        selectors = [
-            # Most specific - role-based selectors (most reliable)
-            "div[role='textbox'][contenteditable='true']",
-            "div[contenteditable='true'][role='textbox']",
-            "[role='textbox']",
-            # Contenteditable with data attributes
-            "div[contenteditable='true'][data-lexical-editor='true']",
-            "div[data-lexical-editor='true'][contenteditable='true']",
-            "div[data-contents='true'][contenteditable='true']",
-            # Standard contenteditable patterns
-            "div[contenteditable='true'][spellcheck='false']",
-            # Placeholder based (aria)
-            "div[aria-placeholder*='mind']",
-            "div[aria-placeholder*='your']",
-            "div[aria-placeholder*='post']",
-            "div[aria-placeholder*='text']",
-            # Data attributes
-            "[data-lexical-editor='true']",
-            "[data-contents='true']",
-            "[data-testid*='composer']",
-            "[data-testid*='textbox']",
-            # Generic fallbacks
-            "div[contenteditable='true']",
-            "[contenteditable='true']",
-        ]
-        
-        logger.info(f"Trying {len(selectors)} selectors...")
-        
-        for selector in selectors:
-            try:
-                locator = page.locator(selector).first
-                count = await locator.count()
-                if count > 0:
-                    # Log detailed state for debugging
-                    is_visible = await locator.is_visible()
-                    is_editable = await locator.is_editable()
-                    is_enabled = await locator.is_enabled()
-                    
-                    logger.info(f"  Selector {selector}: count={count}, visible={is_visible}, editable={is_editable}, enabled={is_enabled}")
-                    
-                    if is_visible and is_editable:
-                        # Try to verify it's actually a text input
-                        try:
-                            contenteditable = await locator.get_attribute("contenteditable")
-                            role = await locator.get_attribute("role")
-                            placeholder = await locator.get_attribute("aria-placeholder")
-                            
-                            if contenteditable == "true" or role == "textbox":
-                                logger.info(f"✓ Confirmed text input: {selector} (contenteditable={contenteditable}, role={role}, placeholder={placeholder})")
-                                return locator
-                        except Exception:
-                            # If we can't check attributes but it's visible and editable, use it
-                            logger.info(f"✓ Using visible editable element: {selector}")
-                            return locator
-            except Exception as e:
-                logger.debug(f"Selector {selector} failed: {e}")
-                continue
+        best = next((m for m in matches if m.visible and m.editable), None)
+        stats.record_lookup("facebook", "text_input", selectors, best.selector if best else None, elapsed_ms)
+        if best is None:
+            logger.error("❌ Could not find any interactable text input element")
+            return None
         
-        # Deep fallback: scan all page elements for contenteditable that's visible and editable
-        logger.info("🔍 Deep scan: looking for any interactable contenteditable element...")
-        try:
-            # Get all contenteditable elements
-            all_editables = page.locator("[contenteditable='true']")
-            count = await all_editables.count()
-            logger.info(f"Found {count} contenteditable elements total")
-            
-            # Check each one for visibility and editability
-            for i in range(min(count, 10)):
-                try:
-                    locator = all_editables.nth(i)
-                    is_visible = await locator.is_visible()
-                    is_editable = await locator.is_editable()
-                    
-                    if is_visible and is_editable:
-                        # Get some info about it
-                        text = await locator.inner_text()
-                        role = await locator.get_attribute("role")
-                        logger.info(f"  Element {i}: visible={is_visible}, editable={is_editable}, role={role}, text='{text[:50]}...'")
-                        # Return the first visible, editable one that's likely a composer
-                        if i == 0 or len(text) < 500:  # First one or not too much text
-                            logger.info(f"✓ Using contenteditable element {i}")
-                            return locator
-                except Exception as e:
-                    logger.debug(f"Element {i} check failed: {e}")
-                    continue
-                    
-        except Exception as e:
-            logger.error(f"Deep scan failed: {e}")
-        
-        logger.error("❌ Could not find any interactable text input element")
-        return None
+        logger.info(f"✓ Confirmed text input: {best.selector} (frame {best.frame_index}, "
+                    f"role={best.role}, placeholder={best.placeholder})")
+        return best.locator
     
     @staticmethod
     async def find_button_by_text(page: Page, text: str) -> Optional[Locator]:
@@ -167,6 +159,24 @@ class IntelligentElementFinder:
         return None
 
 
+@dataclass
+class FacebookPost:
+    """One post of a multi-post Facebook session."""
+    content: str
+    media_paths: list[str] = field(default_factory=list)
+    is_reel: bool = False  # media_paths are the Reel's videos
+    job_id: str | None = None  # Names the folder of its debug screenshots
+
+
+@dataclass(eq=False)
+class ParkedSession:
+    """A logged-in Facebook page kept open between pipeline stages."""
+    key: str
+    page: Page
+    release: asyncio.Event
+    task: asyncio.Task
+
+
 class BrowserDOMPoster:
     """AI-powered social media poster using intelligent DOM manipulation."""
     
@@ -175,68 +185,319 @@ class BrowserDOMPoster:
         self.session_manager = get_session_manager()
     
     @asynccontextmanager
-    async def _facebook_session(self, headless: bool = True):
-        """Provide an authenticated Facebook page inside a managed browser."""
+    async def _facebook_session(
+        self,
+        headless: bool = True,
+        account: str | int | None = None,
+        allow_login: bool = True,
+        _retried: bool = False,
+    ):
+        """
+        Provide an authenticated Facebook page from the warm browser pool.
+        
+        Each account gets its own pooled context (cookies and localStorage),
+        so posts of different accounts run side by side in shared browsers.
+        Cookies the platform rotated while the page was in use are saved
+        back to the session afterwards.
+        
+        Args:
+            headless: Run the browser headless
+            account: Account whose session to use
+            allow_login: Open a visible login window when the session is
+                         missing or expired; if False, raise SessionExpiredError
+                         instead (scheduled posts must not wait for a person)
+        """
         platform = "facebook"
-        if not self.session_manager.has_session(platform):
-            success, message = await self.session_manager.authenticate(platform, headless=False)
+        if not self.session_manager.has_session(platform, account):
+            if not allow_login:
+                raise SessionExpiredError(session_key(platform, account), "no saved session for this account")
+            success, message = await self.session_manager.authenticate(platform, headless=False, account=account)
             if not success:
                 raise RuntimeError(f"Authentication required: {message}")
             logger.info(f"Authentication successful: {message}")
-        playwright = await async_playwright().start()
-        browser = None
+        browser_config = self.session_manager.browser_configs.get(platform)
+        if not browser_config:
+            raise RuntimeError("No browser configured")
+        session = self.session_manager.get_session(platform, account)
+        key = session.key
+        spec = LaunchSpec(
+            executable_path=browser_config.executable_path,
+            headless=headless,
+            args=FACEBOOK_BROWSER_ARGS,
+        )
+        
+        pool = get_browser_pool()
+        probe = get_session_probe()
+        health = probe.cached(platform, account)
+        if health is not None and health.valid is False:
+            # Known to be logged out; don't load the feed to find that out again
+            logger.warning(f"Session {key} failed its last check ({health.reason})")
+            await pool.discard(key)
+        else:
+            async with pool.context(
+                key, spec, viewport=None, user_agent=session.user_agent, storage_state=session.storage_state,
+            ) as context:
+                policy = get_network_policy(platform)
+                if headless and policy and config.browser.block_resources:
+                    await apply_network_policy(context, policy)
+                page = await context.new_page()
+                page.set_default_timeout(30000)
+                await self._open_feed(page)
+                cookies = await context.cookies()
+                logged_in = any(c.get("name") == "c_user" for c in cookies)
+                probe.record(key, logged_in, "feed loaded" if logged_in else "logged out in the browser")
+                if logged_in:
+                    logger.info(f"✓ Logged in with saved session {key}")
+                    yield page
+                    await self._save_rotated_cookies(key, context)
+                    return
+                await pool.discard(key)
+            health = probe.cached(platform, account)
+        
+        if _retried:
+            raise RuntimeError("Still logged out after re-authentication")
+        if not allow_login:
+            raise SessionExpiredError(key, health.reason if health else "logged out")
+        logger.warning(f"Session {key} expired, retrying authentication")
+        success, message = await self.session_manager.authenticate(platform, headless=False, account=account)
+        if not success:
+            raise RuntimeError(f"Session expired and re-authentication failed: {message}")
+        async with self._facebook_session(headless=headless, account=account, _retried=True) as retry_page:
+            yield retry_page
+    
+    async def _save_rotated_cookies(self, key: str, context):
+        """Write cookies rotated during the post back to the saved session."""
         try:
-            browser_config = self.session_manager.browser_configs.get(platform)
-            if not browser_config:
-                raise RuntimeError("No browser configured")
-            session = self.session_manager.get_session(platform)
-            browser = await playwright.chromium.launch(
-                headless=headless,
-                executable_path=browser_config.executable_path,
-                args=[
-                    "--disable-blink-features=AutomationControlled",
-                    "--no-first-run",
-                    "--start-maximized",
-                    "--window-size=1920,1080",
-                    "--force-device-scale-factor=1",
-                ]
-            )
-            context = await browser.new_context(
-                viewport=None,
-                user_agent=session.user_agent if session else None,
-            )
-            if session and session.cookies:
-                await context.add_cookies(session.cookies)
-            page = await context.new_page()
-            page.set_default_timeout(30000)
-            await page.goto("https://www.facebook.com/", wait_until="domcontentloaded")
-            await page.wait_for_timeout(3000)
             cookies = await context.cookies()
-            if not any(c.get("name") == "c_user" for c in cookies):
-                logger.warning("Session expired, retrying authentication")
-                await browser.close()
-                await playwright.stop()
-                success, message = await self.session_manager.authenticate(platform, headless=False)
-                if not success:
-                    raise RuntimeError(f"Session expired and re-authentication failed: {message}")
-                async with self._facebook_session(headless=headless) as retry_page:
-                    yield retry_page
-                return
-            logger.info("✓ Logged in with saved session")
+            changed = await asyncio.to_thread(self.session_manager.update_session_cookies, key, cookies)
+        except Exception as e:
+            logger.warning(f"Failed to save the cookies of session {key}: {e}")
+            return
+        if changed:
+            logger.info(f"Saved {changed} rotated cookie(s) of session {key}")
+    
+    @asynccontextmanager
+    async def _session_page(
+        self, session: ParkedSession | None, headless: bool, account: str | int | None, allow_login: bool
+    ):
+        """The page of a parked session, or of a session opened for this post."""
+        if session is not None:
+            yield session.page
+            return
+        async with self._facebook_session(headless=headless, account=account, allow_login=allow_login) as page:
+            yield page
+    
+    async def _park_session(self, account: str | int | None, headless: bool) -> ParkedSession:
+        """Open a session in a task that holds it until released."""
+        ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        release = asyncio.Event()
+        
+        async def hold():
             try:
-                yield page
-            finally:
-                await browser.close()
-        finally:
-            await playwright.stop()
+                async with self._facebook_session(headless=headless, account=account, allow_login=False) as page:
+                    ready.set_result(page)
+                    await release.wait()
+            except asyncio.CancelledError:
+                if not ready.done():
+                    ready.cancel()
+                raise
+            except Exception as e:
+                if ready.done():
+                    raise
+                ready.set_exception(e)
+        
+        task = asyncio.create_task(hold())
+        try:
+            page = await ready
+        except BaseException:
+            task.cancel()
+            raise
+        return ParkedSession(key=session_key("facebook", account), page=page, release=release, task=task)
+    
+    async def _unpark_session(self, session: ParkedSession):
+        session.release.set()
+        try:
+            await session.task
+        except Exception as e:
+            logger.warning(f"Closing session {session.key} failed: {e}")
+    
+    async def _async_verify_post(
+        self, session: ParkedSession, content: str, is_reel: bool, job_id: str | None
+    ) -> tuple[bool, str]:
+        async with get_debug_artifacts().recording(job_id) as artifacts:
+            page = session.page
+            if is_reel:
+                verified = await self._verify_reel_post(page, content)
+            else:
+                verified = await self._verify_post(page, content)
+            self._log_network(page)
+            if verified:
+                return True, "Reel posted successfully!" if is_reel else "Posted successfully!"
+            message = (
+                "Reel may not have been published (verification failed)" if is_reel
+                else "Post verification failed - post may not have been published"
+            )
+            await capture(page, "verify_failed")
+            artifacts.fail(message)
+            return False, message
+    
+    async def _open_feed(self, page: Page):
+        """Navigate to the feed and wait until it (or the login form) has rendered."""
+        stats = network_stats(page.context)
+        if stats is not None:
+            stats.begin()
+        await page.goto("https://www.facebook.com/", wait_until="domcontentloaded")
+        if not await wait_for_visible(page, FEED_READY_SELECTORS, PAGE_READY_TIMEOUT):
+            logger.warning("Facebook page did not render within the wait ceiling")
+    
+    @staticmethod
+    def _mark_composer(page: Page):
+        """Record time-to-composer when a network policy is measuring the page."""
+        stats = network_stats(page.context)
+        if stats is not None:
+            stats.mark_composer()
+    
+    @staticmethod
+    def _log_network(page: Page):
+        stats = network_stats(page.context)
+        if stats is not None:
+            logger.info(f"Network: {stats.summary()}")
     
-    def post_to_facebook(self, content: str, media_paths: list[str] = None, headless: bool = True) -> tuple[bool, str]:
+    def submit_to_facebook(
+        self,
+        content: str,
+        media_paths: list[str] | None = None,
+        headless: bool = True,
+        job_id: str | None = None,
+        account: str | int | None = None,
+        allow_login: bool = True,
+        session: ParkedSession | None = None,
+        verify: bool = True,
+    ) -> "Future[tuple[bool, str]]":
+        """
+        Start a Facebook post on the automation runtime; cancel the future to abort it.
+        
+        ``session`` publishes on a page parked by ``open_facebook_session``
+        instead of opening one; ``verify=False`` returns once the post was
+        submitted, leaving ``verify_facebook_post`` to check it.
+        """
+        return get_automation_runtime().submit(self._async_post_to_facebook(
+            content, media_paths or [], headless, job_id, account, allow_login, session=session, verify=verify,
+        ))
+    
+    def submit_to_facebook_reel(
+        self,
+        content: str,
+        media_paths: list[str],
+        headless: bool = True,
+        job_id: str | None = None,
+        account: str | int | None = None,
+        allow_login: bool = True,
+        session: ParkedSession | None = None,
+        verify: bool = True,
+    ) -> "Future[tuple[bool, str]]":
+        """Start a Facebook Reel on the automation runtime (see ``submit_to_facebook``)."""
+        return get_automation_runtime().submit(self._async_post_to_facebook_reel(
+            content, media_paths or [], headless, job_id, account, allow_login, session=session, verify=verify,
+        ))
+    
+    def submit_many_to_facebook(
+        self,
+        posts: list[FacebookPost],
+        before_each: Callable[[int], bool] | None = None,
+        headless: bool = True,
+        account: str | int | None = None,
+        allow_login: bool = True,
+        session: ParkedSession | None = None,
+    ) -> "Future[list[tuple[bool, str] | None]]":
+        """
+        Start publishing several posts back to back in one logged-in browser session.
+        
+        Args:
+            posts: Posts to publish, in order
+            before_each: Called (in a worker thread) with a post's index right
+                         before it is published; returning False skips that post
+            headless: Run the browser headless
+            account: Account whose session publishes the posts
+            allow_login: Open a login window if the session expired; if False
+                         the future raises SessionExpiredError instead
+            session: Publish on this parked page instead of opening a session
+            
+        Returns:
+            Future with (success, message) per post, or None for skipped posts
+        """
+        return get_automation_runtime().submit(self._async_post_many_to_facebook(
+            posts, before_each, headless, account, allow_login, session=session,
+        ))
+    
+    def post_to_facebook(
+        self,
+        content: str,
+        media_paths: list[str] = None,
+        headless: bool = True,
+        job_id: str | None = None,
+        account: str | int | None = None,
+        allow_login: bool = True,
+        session: ParkedSession | None = None,
+        verify: bool = True,
+    ) -> tuple[bool, str]:
         """Public method to post to Facebook (called by worker thread)."""
-        return asyncio.run(self._async_post_to_facebook(content, media_paths or [], headless))
+        return self.submit_to_facebook(
+            content, media_paths, headless, job_id, account, allow_login, session=session, verify=verify,
+        ).result()
     
-    def post_to_facebook_reel(self, content: str, media_paths: list[str], headless: bool = True) -> tuple[bool, str]:
+    def post_to_facebook_reel(
+        self,
+        content: str,
+        media_paths: list[str],
+        headless: bool = True,
+        job_id: str | None = None,
+        account: str | int | None = None,
+        allow_login: bool = True,
+        session: ParkedSession | None = None,
+        verify: bool = True,
+    ) -> tuple[bool, str]:
         """Post a Facebook Reel (videos only)."""
-        return asyncio.run(self._async_post_to_facebook_reel(content, media_paths or [], headless))
+        return self.submit_to_facebook_reel(
+            content, media_paths, headless, job_id, account, allow_login, session=session, verify=verify,
+        ).result()
+    
+    def post_many_to_facebook(
+        self,
+        posts: list[FacebookPost],
+        before_each: Callable[[int], bool] | None = None,
+        headless: bool = True,
+        account: str | int | None = None,
+        allow_login: bool = True,
+        session: ParkedSession | None = None,
+    ) -> list[tuple[bool, str] | None]:
+        """Publish several posts in one session and wait (see ``submit_many_to_facebook``)."""
+        return self.submit_many_to_facebook(
+            posts, before_each, headless, account, allow_login, session=session,
+        ).result()
+    
+    def open_facebook_session(self, account: str | int | None = None, headless: bool = True) -> ParkedSession:
+        """
+        Log into an account's saved session and keep its feed page open.
+        
+        Lets the pipeline prepare the next post's session while the current
+        one publishes. Never opens a login window; release the session with
+        ``close_facebook_session``.
+        
+        Raises:
+            SessionExpiredError: The account has no valid saved session
+        """
+        return get_automation_runtime().run(self._park_session(account, headless))
+    
+    def close_facebook_session(self, session: ParkedSession):
+        """Release a parked session: save its rotated cookies and return its context to the pool."""
+        get_automation_runtime().run(self._unpark_session(session))
+    
+    def verify_facebook_post(
+        self, session: ParkedSession, content: str, is_reel: bool = False, job_id: str | None = None
+    ) -> tuple[bool, str]:
+        """Check that a post submitted with ``verify=False`` on a parked page went out."""
+        return get_automation_runtime().run(self._async_verify_post(session, content, is_reel, job_id))
     
     def post(self, platform: str, content: str, media_paths: list[str]) -> tuple[bool, str]:
         """Post content to social media platform."""
@@ -245,284 +506,245 @@ class BrowserDOMPoster:
         return False, f"{platform} posting not implemented"
     
     async def _async_post_to_facebook(
-        self, content: str, media_paths: list[str], headless: bool = True
+        self,
+        content: str,
+        media_paths: list[str],
+        headless: bool = True,
+        job_id: str | None = None,
+        account: str | int | None = None,
+        allow_login: bool = True,
+        session: ParkedSession | None = None,
+        verify: bool = True,
     ) -> tuple[bool, str]:
         """Post to Facebook using saved browser session."""
         logger.info("Starting Facebook post...")
-        platform = "facebook"
+        async with get_debug_artifacts().recording(job_id) as artifacts:
+            try:
+                async with self._session_page(session, headless, account, allow_login) as page:
+                    result = await self._post_on_page(page, content, media_paths, verify=verify)
+            except SessionExpiredError:
+                raise
+            except Exception as e:
+                logger.error(f"Error: {e}")
+                result = (False, f"Error: {e}")
+            if not result[0]:
+                artifacts.fail(result[1])
+            return result
+    
+    async def _async_post_many_to_facebook(
+        self,
+        posts: list[FacebookPost],
+        before_each: Callable[[int], bool] | None,
+        headless: bool,
+        account: str | int | None = None,
+        allow_login: bool = True,
+        session: ParkedSession | None = None,
+    ) -> list[tuple[bool, str] | None]:
+        """Publish posts in one session; a failed post does not stop the rest."""
+        logger.info(f"Starting Facebook session for {len(posts)} post(s)...")
+        results: list[tuple[bool, str] | None] = []
+        try:
+            async with self._session_page(session, headless, account, allow_login) as page:
+                for index, post in enumerate(posts):
+                    # Checkpoints touch the database; keep them off the shared loop
+                    if before_each is not None and not await asyncio.to_thread(before_each, index):
+                        results.append(None)
+                        continue
+                    if index > 0:
+                        await self._open_feed(page)
+                    async with get_debug_artifacts().recording(post.job_id) as artifacts:
+                        try:
+                            if post.is_reel:
+                                result = await self._reel_on_page(page, post.content, post.media_paths)
+                            else:
+                                result = await self._post_on_page(page, post.content, post.media_paths)
+                        except Exception as e:
+                            logger.error(f"Error: {e}")
+                            result = (False, f"Error: {e}")
+                        if not result[0]:
+                            artifacts.fail(result[1])
+                    results.append(result)
+        except SessionExpiredError:
+            # Only raised before the first post, so none of them ran
+            raise
+        except Exception as e:
+            logger.error(f"Facebook session failed: {e}")
+            # Posts the session never reached fail with the session error
+            results.extend((False, f"Error: {e}") for _ in posts[len(results):])
+        return results
+    
+    async def _post_on_page(
+        self, page: Page, content: str, media_paths: list[str], verify: bool = True
+    ) -> tuple[bool, str]:
+        """Create a feed post from a logged-in page showing the Facebook feed."""
+        await capture(page, "feed")
+
+        # Open composer - try multiple approaches
+        logger.info("Looking for composer trigger...")
+        composer_clicked = False
         
-        # Check if we have a saved session
-        if not self.session_manager.has_session(platform):
-            logger.info("No saved session found. Need to authenticate first.")
-            success, message = await self.session_manager.authenticate(platform, headless=False)
-            if not success:
-                return False, f"Authentication required: {message}"
-            logger.info(f"Authentication successful: {message}")
+        # Try "What's on your mind" button
+        composer_selectors = [
+            "div[role='button']:has-text('mind')",
+            "div[role='button']:has-text('post')",
+            "[aria-label*='Create a post']",
+            "[aria-label*='composer']",
+            "div[role='button'][class*='composer']",
+            "div[role='button'][class*='create']",
+        ]
         
-        # Now post using the saved session
-        browser = None
+        async def click_trigger(selector: str) -> Optional[Locator]:
+            locator = page.locator(selector).first
+            if await locator.count() == 0 or not await locator.is_visible():
+                return None
+            logger.info(f"Found composer trigger: {selector}")
+            await locator.click()
+            return locator
         
-        async with async_playwright() as p:
-            try:
-                # Get browser config
-                browser_config = self.session_manager.browser_configs.get(platform)
-                if not browser_config:
-                    return False, "No browser configured"
-                
-                session = self.session_manager.get_session(platform)
-                
-                # Launch browser with maximized window
-                browser = await p.chromium.launch(
-                    headless=headless,
-                    executable_path=browser_config.executable_path,
-                    args=[
-                        "--disable-blink-features=AutomationControlled",
-                        "--no-first-run",
-                        "--start-maximized",
-                        "--window-size=1920,1080",
-                        "--force-device-scale-factor=1",
-                    ]
-                )
-                
-                # Create context with no viewport constraint (full window)
-                context = await browser.new_context(
-                    viewport=None,  # Use full window size
-                    user_agent=session.user_agent if session else None,
-                )
-                
-                # Add saved cookies
-                if session and session.cookies:
-                    await context.add_cookies(session.cookies)
-                    logger.info(f"Loaded {len(session.cookies)} cookies from saved session")
-                
-                page = await context.new_page()
-                page.set_default_timeout(30000)
-                
-                # Navigate to Facebook
-                logger.info("Navigating to Facebook...")
-                await page.goto("https://www.facebook.com/", wait_until="domcontentloaded")
-                await page.wait_for_timeout(3000)
-                
-                # Check if still logged in
-                cookies = await context.cookies()
-                has_session = any(
-                    c.get("name") == "c_user" for c in cookies
-                )
-                
-                if not has_session:
-                    logger.warning("Session expired, need to re-authenticate")
-                    await browser.close()
-                    
-                    # Try to re-authenticate
-                    success, message = await self.session_manager.authenticate(platform, headless=False)
-                    if not success:
-                        return False, f"Session expired and re-authentication failed: {message}"
-                    
-                    # Retry posting
-                    return await self._async_post_to_facebook(content, media_paths, headless)
-                
-                logger.info("✓ Logged in with saved session")
-                
-                # Take screenshot of feed
-                try:
-                    await page.screenshot(path="fb_feed.png")
-                    logger.info("Screenshot saved: fb_feed.png")
-                except Exception as e:
-                    logger.warning(f"Screenshot failed: {e}")
-
-                # Open composer - try multiple approaches
-                logger.info("Looking for composer trigger...")
-                composer_clicked = False
-                
-                # Try "What's on your mind" button
-                composer_selectors = [
-                    "div[role='button']:has-text('mind')",
-                    "div[role='button']:has-text('post')",
-                    "[aria-label*='Create a post']",
-                    "[aria-label*='composer']",
-                    "div[role='button'][class*='composer']",
-                    "div[role='button'][class*='create']",
-                ]
-                
-                for selector in composer_selectors:
-                    try:
-                        locator = page.locator(selector).first
-                        if await locator.count() > 0 and await locator.is_visible():
-                            logger.info(f"Found composer trigger: {selector}")
-                            await locator.click()
-                            await page.wait_for_timeout(3000)
-                            composer_clicked = True
-                            break
-                    except Exception as e:
-                        logger.debug(f"Selector {selector} failed: {e}")
-                        continue
-                
-                if not composer_clicked:
-                    logger.warning("Could not find composer trigger, looking for text input directly...")
+        if await get_selector_stats().first_match(
+            "facebook", "composer_trigger", composer_selectors, click_trigger
+        ):
+            if await wait_for_visible(page, COMPOSER_EDITOR_SELECTORS, COMPOSER_TIMEOUT):
+                self._mark_composer(page)
+            else:
+                logger.warning("Composer dialog did not open within the wait ceiling")
+            composer_clicked = True
+        
+        if not composer_clicked:
+            logger.warning("Could not find composer trigger, looking for text input directly...")
 
-                # Take screenshot after attempting to open composer
-                try:
-                    await page.screenshot(path="fb_composer.png")
-                    logger.info("Screenshot saved: fb_composer.png")
-                except Exception as e:
-                    logger.warning(f"Screenshot failed: {e}")
+        await capture(page, "composer")
 
-                # Find text input
-                text_input = await self.element_finder.find_text_input_intelligent(page)
-                if not text_input:
-                    await browser.close()
-                    return False, "Could not find text input"
+        # Find text input
+        text_input = await self.element_finder.find_text_input_intelligent(page)
+        if not text_input:
+            return False, "Could not find text input"
 
-                # Enter text
-                logger.info("Entering text...")
-                text_entered = await self._enter_text(page, text_input, content)
-                if not text_entered:
-                    await browser.close()
-                    return False, "Failed to enter text"
+        # Enter text
+        logger.info("Entering text...")
+        text_entered = await self._enter_text(page, text_input, content)
+        if not text_entered:
+            return False, "Failed to enter text"
 
-                # Upload media
-                if media_paths:
-                    logger.info(f"Uploading {len(media_paths)} media files...")
-                    media_success = await self._upload_media(page, media_paths)
-                    
-                    if not media_success:
-                        logger.error("Media upload failed - cannot proceed with post")
-                        await browser.close()
-                        return False, "Media upload failed - please check your media files and try again"
-                    
-                    logger.info("✓ Media upload completed")
-                    # Extra wait for Facebook to process
-                    await page.wait_for_timeout(3000)
+        # Upload media
+        if media_paths:
+            logger.info(f"Uploading {len(media_paths)} media files...")
+            media_success = await self._upload_media(page, media_paths)
+            
+            if not media_success:
+                logger.error("Media upload failed - cannot proceed with post")
+                return False, "Media upload failed - please check your media files and try again"
+            
+            logger.info("✓ Media upload completed")
+            # Let the previews finish rendering; the Post button wait covers processing
+            await wait_for_dom_quiet(page, timeout=SETTLE_TIMEOUT)
 
-                # DEBUG: Screenshot before looking for buttons
-                try:
-                    await page.screenshot(path="fb_before_buttons.png")
-                    logger.info("Screenshot saved: fb_before_buttons.png")
-                except:
-                    pass
+        await capture(page, "before_buttons")
 
-                # Find and click Post - with smart waiting
-                logger.info("Looking for Post/Next button...")
-                post_btn = None
-                
-                # Wait up to 30 seconds for buttons to appear and be enabled
-                for attempt in range(30):
-                    # Try Post button - must be visible AND not disabled
-                    post_locator = page.locator("div[aria-label='Post'][role='button']").first
-                    if await post_locator.count() > 0:
-                        is_visible = await post_locator.is_visible()
-                        if is_visible:
-                            # Check if disabled
-                            try:
-                                aria_disabled = await post_locator.get_attribute("aria-disabled")
-                                if aria_disabled and aria_disabled.lower() == "true":
-                                    logger.debug(f"Post button disabled, waiting... ({attempt + 1}/30)")
-                                else:
-                                    post_btn = post_locator
-                                    logger.info("✓ Found enabled Post button")
-                                    break
-                            except:
-                                post_btn = post_locator
-                                logger.info("✓ Found Post button")
-                                break
-                    
-                    # Try Next button - must be visible AND not disabled
-                    next_locator = page.locator("div[aria-label='Next'][role='button']").first
-                    if await next_locator.count() > 0:
-                        is_visible = await next_locator.is_visible()
-                        if is_visible:
-                            try:
-                                aria_disabled = await next_locator.get_attribute("aria-disabled")
-                                if aria_disabled and aria_disabled.lower() == "true":
-                                    logger.debug(f"Next button disabled, waiting... ({attempt + 1}/30)")
-                                else:
-                                    logger.info("Found Next button, clicking...")
-                                    await next_locator.click()
-                                    await page.wait_for_timeout(3000)
-                                    # Now look for Post button again
-                                    continue  # Go to next iteration to find Post
-                            except:
-                                logger.info("Found Next button, clicking...")
-                                await next_locator.click()
-                                await page.wait_for_timeout(3000)
-                                continue
-                    
-                    if attempt % 5 == 0:
-                        logger.info(f"Waiting for buttons to appear... {attempt + 1}/30")
-                    await page.wait_for_timeout(1000)
-                
-                if not post_btn:
-                    logger.error("Could not find Post button after extended wait")
-                    try:
-                        await page.screenshot(path="fb_no_post_button.png")
-                        logger.info("Debug screenshot: fb_no_post_button.png")
-                    except:
-                        pass
-                    await browser.close()
-                    return False, "Could not find Post button - media may still be processing"
+        # Find and click Post - Next leads to an audience step on some accounts
+        logger.info("Looking for Post/Next button...")
+        post_btn = None
+        deadline = time.monotonic() + POST_BUTTON_TIMEOUT / 1000
+        
+        while post_btn is None and remaining_ms(deadline) > 0:
+            # Buttons stay aria-disabled while media is processing
+            button = await wait_for_enabled(
+                page, [POST_BUTTON_SELECTOR, NEXT_BUTTON_SELECTOR], remaining_ms(deadline)
+            )
+            if button is None:
+                break
+            try:
+                label = await button.get_attribute("aria-label")
+            except Exception:
+                label = "Post"
+            if label == "Next":
+                logger.info("Found Next button, clicking...")
+                await button.click()
+                await wait_for_dom_quiet(page, timeout=SETTLE_TIMEOUT)
+                continue
+            post_btn = button
+            logger.info("✓ Found enabled Post button")
+        
+        if not post_btn:
+            logger.error("Could not find Post button after extended wait")
+            await capture(page, "no_post_button")
+            return False, "Could not find Post button - media may still be processing"
 
-                logger.info("Clicking Post...")
-                await post_btn.click()
-                
-                # Wait longer for post to actually publish
-                logger.info("Waiting for post to publish...")
-                await page.wait_for_timeout(5000)
-                
-                # Verify with screenshot
-                try:
-                    await page.screenshot(path="fb_after_post.png")
-                    logger.info("Screenshot saved: fb_after_post.png")
-                except Exception as e:
-                    logger.warning(f"Screenshot failed: {e}")
+        logger.info("Clicking Post...")
+        await post_btn.click()
+        
+        # The composer (and its Post button) closes once Facebook has accepted the post
+        logger.info("Waiting for post to publish...")
+        if not await wait_for_state(page, POST_BUTTON_SELECTOR, "hidden", PUBLISH_TIMEOUT):
+            logger.warning("Composer dialog still open after the publish wait ceiling")
+        
+        await capture(page, "after_post")
+        if not verify:
+            return True, "Submitted, awaiting verification"
 
-                # Verify
-                success = await self._verify_post(page, content)
-                
-                # Close browser
-                logger.info("Closing browser...")
-                await browser.close()
-                
-                if success:
-                    return True, "Posted successfully!"
-                return False, "Post verification failed - post may not have been published"
-                
-            except Exception as e:
-                logger.error(f"Error: {e}")
-                try:
-                    if 'browser' in locals() and browser:
-                        await browser.close()
-                except:
-                    pass
-                return False, f"Error: {e}"
+        # Verify
+        success = await self._verify_post(page, content)
+        self._log_network(page)
+        
+        if success:
+            return True, "Posted successfully!"
+        return False, "Post verification failed - post may not have been published"
     
     async def _async_post_to_facebook_reel(
-        self, content: str, media_paths: list[str], headless: bool = True
+        self,
+        content: str,
+        media_paths: list[str],
+        headless: bool = True,
+        job_id: str | None = None,
+        account: str | int | None = None,
+        allow_login: bool = True,
+        session: ParkedSession | None = None,
+        verify: bool = True,
     ) -> tuple[bool, str]:
         """Post videos as a Facebook Reel following the dedicated workflow."""
         logger.info("Starting Facebook Reel workflow...")
         if not media_paths:
             return False, "Reels require at least one video file"
-        try:
-            async with self._facebook_session(headless=headless) as page:
-                composer_ready = await self._open_reel_composer(page)
-                if not composer_ready:
-                    return False, "Could not open Facebook Reel composer"
-                upload_success = await self._upload_reel_media(page, media_paths)
-                if not upload_success:
-                    return False, "Failed to upload Reel video"
-                caption_success = await self._enter_reel_caption(page, content)
-                if not caption_success:
-                    return False, "Failed to enter Reel caption"
-                publish_success = await self._publish_reel(page)
-                if not publish_success:
-                    return False, "Could not find Share button for Reels"
-                verification_success = await self._verify_reel_post(page, content)
-                if not verification_success:
-                    return False, "Reel may not have been published (verification failed)"
-                return True, "Reel posted successfully!"
-        except Exception as exc:
-            logger.exception("Facebook Reel posting error: %s", exc)
-            return False, f"Error posting Reel: {exc}"
+        async with get_debug_artifacts().recording(job_id) as artifacts:
+            try:
+                async with self._session_page(session, headless, account, allow_login) as page:
+                    result = await self._reel_on_page(page, content, media_paths, verify=verify)
+            except SessionExpiredError:
+                raise
+            except Exception as exc:
+                logger.exception("Facebook Reel posting error: %s", exc)
+                result = (False, f"Error posting Reel: {exc}")
+            if not result[0]:
+                artifacts.fail(result[1])
+            return result
+    
+    async def _reel_on_page(
+        self, page: Page, content: str, media_paths: list[str], verify: bool = True
+    ) -> tuple[bool, str]:
+        """Publish a Reel from a logged-in page."""
+        composer_ready = await self._open_reel_composer(page)
+        await capture(page, "reel_composer")
+        if not composer_ready:
+            return False, "Could not open Facebook Reel composer"
+        self._mark_composer(page)
+        upload_success = await self._upload_reel_media(page, media_paths)
+        await capture(page, "reel_upload")
+        if not upload_success:
+            return False, "Failed to upload Reel video"
+        caption_success = await self._enter_reel_caption(page, content)
+        if not caption_success:
+            return False, "Failed to enter Reel caption"
+        publish_success = await self._publish_reel(page)
+        await capture(page, "reel_publish")
+        if not publish_success:
+            return False, "Could not find Share button for Reels"
+        if not verify:
+            return True, "Submitted, awaiting verification"
+        verification_success = await self._verify_reel_post(page, content)
+        self._log_network(page)
+        if not verification_success:
+            return False, "Reel may not have been published (verification failed)"
+        return True, "Reel posted successfully!"
     
     async def _open_reel_composer(self, page: Page) -> bool:
         """Navigate to the Reel composer and ensure the upload surface is ready."""
@@ -531,16 +753,18 @@ class BrowserDOMPoster:
             "https://www.facebook.com/reels/create/",
             "https://www.facebook.com/creatorstudio/?tab=reels",
         ]
-        for url in target_urls:
-            try:
-                await page.goto(url, wait_until="domcontentloaded")
-                await page.wait_for_timeout(3000)
-                file_input = page.locator("input[type='file'][accept*='video']").first
-                if await file_input.count() > 0:
-                    logger.info("✓ Reel composer ready via direct URL")
-                    return True
-            except Exception as exc:
-                logger.debug("Composer URL %s failed: %s", url, exc)
+        stats = get_selector_stats()
+        
+        async def open_url(url: str) -> Optional[bool]:
+            await page.goto(url, wait_until="domcontentloaded")
+            # The upload input is hidden, so wait for it to be attached
+            if await wait_for_state(page, REEL_FILE_INPUT_SELECTOR, "attached", COMPOSER_TIMEOUT):
+                return True
+            return None
+        
+        if await stats.first_match("facebook", "reel_composer_url", target_urls, open_url):
+            logger.info("✓ Reel composer ready via direct URL")
+            return True
         logger.info("Direct navigation failed, trying UI navigation")
         create_selectors = [
             "div[role='button']:has-text('Create')",
@@ -548,30 +772,31 @@ class BrowserDOMPoster:
             "div[role='button']:has-text('Reel')",
             "[aria-label*='Reel'][role='button']",
         ]
-        for selector in create_selectors:
-            try:
-                trigger = page.locator(selector).first
-                if await trigger.count() == 0 or not await trigger.is_visible():
-                    continue
-                logger.info("Clicking %s to open Reel options", selector)
-                await trigger.click()
-                await page.wait_for_timeout(2000)
-                reel_option_selectors = [
-                    "div[role='menuitem']:has-text('Reel')",
-                    "div[role='button']:has-text('Reel')",
-                    "div[role='menuitem']:has-text('Create reel')",
-                ]
-                for option_selector in reel_option_selectors:
-                    option = page.locator(option_selector).first
-                    if await option.count() > 0 and await option.is_visible():
-                        await option.click()
-                        await page.wait_for_timeout(4000)
-                        file_input = page.locator("input[type='file'][accept*='video']").first
-                        if await file_input.count() > 0:
-                            logger.info("✓ Reel composer opened via UI navigation")
-                            return True
-            except Exception as exc:
-                logger.debug("Create selector %s failed: %s", selector, exc)
+        reel_option_selectors = [
+            "div[role='menuitem']:has-text('Reel')",
+            "div[role='button']:has-text('Reel')",
+            "div[role='menuitem']:has-text('Create reel')",
+        ]
+        
+        async def open_via(selector: str) -> Optional[bool]:
+            trigger = page.locator(selector).first
+            if await trigger.count() == 0 or not await trigger.is_visible():
+                return None
+            logger.info("Clicking %s to open Reel options", selector)
+            await trigger.click()
+            option = await wait_for_visible(
+                page, stats.rank("facebook", "reel_option", reel_option_selectors), SETTLE_TIMEOUT
+            )
+            if option is None:
+                return None
+            await option.click()
+            if await wait_for_state(page, REEL_FILE_INPUT_SELECTOR, "attached", COMPOSER_TIMEOUT):
+                return True
+            return None
+        
+        if await stats.first_match("facebook", "reel_create", create_selectors, open_via):
+            logger.info("✓ Reel composer opened via UI navigation")
+            return True
         logger.error("Failed to open Reel composer")
         return False
     
@@ -588,18 +813,18 @@ class BrowserDOMPoster:
             "input[type='file'][aria-label*='video']",
             "input[type='file']",
         ]
-        file_input = None
-        for selector in uploader_selectors:
+        
+        async def find_uploader(selector: str) -> Optional[Locator]:
             candidate = page.locator(selector).first
-            try:
-                if await candidate.count() > 0:
-                    file_input = candidate
-                    break
-            except Exception:
-                continue
-        if not file_input:
+            return candidate if await candidate.count() > 0 else None
+        
+        match = await get_selector_stats().first_match(
+            "facebook", "reel_uploader", uploader_selectors, find_uploader
+        )
+        if match is None:
             logger.error("Could not locate Reel video file input")
             return False
+        file_input = match[1]
         try:
             await file_input.set_input_files(valid_paths)
             logger.info("✓ Videos queued, waiting for processing...")
@@ -617,24 +842,10 @@ class BrowserDOMPoster:
             "div[role='img']",
             "img[src*='fbcdn']",
         ]
-        for attempt in range(60):
-            for selector in preview_selectors:
-                locator = page.locator(selector).first
-                try:
-                    if await locator.count() > 0 and await locator.is_visible():
-                        logger.info("✓ Reel media preview detected (%s)", selector)
-                        return True
-                except Exception:
-                    continue
-            status_texts = ["Uploading", "Processing", "Finishing up"]
-            for text in status_texts:
-                try:
-                    if await page.locator(f"text={text}").count() > 0:
-                        logger.info("Reel media %s... (%d/60)", text.lower(), attempt + 1)
-                        break
-                except Exception:
-                    continue
-            await page.wait_for_timeout(1000)
+        preview = await wait_for_visible(page, preview_selectors, REEL_MEDIA_TIMEOUT)
+        if preview is not None:
+            logger.info("✓ Reel media preview detected")
+            return True
         logger.error("Reel media never indicated as ready")
         return False
     
@@ -650,15 +861,19 @@ class BrowserDOMPoster:
             "div[contenteditable='true'][data-lexical-editor='true']",
             "div[contenteditable='true'][aria-placeholder*='caption']",
         ]
-        for selector in caption_selectors:
-            try:
-                locator = page.locator(selector).first
-                if await locator.count() > 0 and await locator.is_visible():
-                    logger.info("Entering Reel caption using %s", selector)
-                    return await self._enter_text(page, locator, content)
-            except Exception as exc:
-                logger.debug("Caption selector %s failed: %s", selector, exc)
-                continue
+        
+        async def find_caption(selector: str) -> Optional[Locator]:
+            locator = page.locator(selector).first
+            if await locator.count() > 0 and await locator.is_visible():
+                return locator
+            return None
+        
+        match = await get_selector_stats().first_match(
+            "facebook", "reel_caption", caption_selectors, find_caption
+        )
+        if match is not None:
+            logger.info("Entering Reel caption using %s", match[0])
+            return await self._enter_text(page, match[1], content)
         logger.info("Falling back to intelligent text input finder for caption")
         text_input = await self.element_finder.find_text_input_intelligent(page)
         if text_input:
@@ -676,25 +891,15 @@ class BrowserDOMPoster:
             "button:has-text('Share now')",
             "div[aria-label='Share'][role='button']",
         ]
-        for attempt in range(40):
-            for selector in share_selectors:
-                try:
-                    locator = page.locator(selector).first
-                    if await locator.count() == 0 or not await locator.is_visible():
-                        continue
-                    aria_disabled = await locator.get_attribute("aria-disabled")
-                    if aria_disabled and aria_disabled.lower() == "true":
-                        logger.debug("Share button disabled, waiting...")
-                        continue
-                    logger.info("Clicking Reel share button: %s", selector)
-                    await locator.click()
-                    await page.wait_for_timeout(4000)
-                    return True
-                except Exception as exc:
-                    logger.debug("Share selector %s failed: %s", selector, exc)
-            if attempt % 5 == 0:
-                logger.info("Waiting for Share button... (%d/40)", attempt + 1)
-            await page.wait_for_timeout(1000)
+        # Share stays aria-disabled until the video has been processed
+        share = await wait_for_enabled(page, share_selectors, REEL_SHARE_TIMEOUT)
+        if share is not None:
+            try:
+                logger.info("Clicking Reel share button")
+                await share.click()
+                return True
+            except Exception as exc:
+                logger.debug("Share click failed: %s", exc)
         logger.error("Failed to locate enabled Share button")
         return False
     
@@ -706,13 +911,9 @@ class BrowserDOMPoster:
             "text=Your reel has been shared",
             "text=Check it out in your profile",
         ]
-        for indicator in success_indicators:
-            try:
-                if await page.locator(indicator).count() > 0:
-                    logger.info("✓ Reel success indicator found: %s", indicator)
-                    return True
-            except Exception:
-                continue
+        if await wait_for_visible(page, success_indicators, REEL_PUBLISHED_TIMEOUT) is not None:
+            logger.info("✓ Reel success indicator found")
+            return True
         logger.info("Reel success indicators not found, falling back to generic verification")
         return await self._verify_post(page, expected_content)
     
@@ -736,12 +937,11 @@ class BrowserDOMPoster:
         try:
             logger.info("Strategy 1: Focus + pressSequentially...")
             await text_input.click()
-            await page.wait_for_timeout(500)  # Stabilization wait
+            await self._wait_for_focus(text_input)
             await text_input.press_sequentially(content, delay=10)
-            await page.wait_for_timeout(500)
             
             # Verify text was entered
-            entered_text = await text_input.inner_text()
+            entered_text = await self._wait_for_text(text_input, content)
             if content[:20] in entered_text or len(entered_text) >= len(content) * 0.8:
                 logger.info("✓ Text entered successfully with pressSequentially")
                 return True
@@ -754,14 +954,13 @@ class BrowserDOMPoster:
         try:
             logger.info("Strategy 2: Clear and re-type...")
             await text_input.click()
-            await page.wait_for_timeout(300)
+            await self._wait_for_focus(text_input)
             await text_input.press("Control+a")
             await text_input.press("Delete")
-            await page.wait_for_timeout(200)
+            await wait_until(self._text_is(text_input, lambda text: not text.strip()), TEXT_TIMEOUT)
             await text_input.press_sequentially(content, delay=10)
-            await page.wait_for_timeout(500)
             
-            entered_text = await text_input.inner_text()
+            entered_text = await self._wait_for_text(text_input, content)
             if content[:20] in entered_text:
                 logger.info("✓ Text entered successfully with clear+type")
                 return True
@@ -772,11 +971,10 @@ class BrowserDOMPoster:
         try:
             logger.info("Strategy 3: Explicit focus + keyboard.type...")
             await text_input.focus()
-            await page.wait_for_timeout(300)
+            await self._wait_for_focus(text_input)
             await page.keyboard.type(content, delay=20)
-            await page.wait_for_timeout(500)
             
-            entered_text = await text_input.inner_text()
+            entered_text = await self._wait_for_text(text_input, content)
             if content[:20] in entered_text:
                 logger.info("✓ Text entered successfully with keyboard.type")
                 return True
@@ -787,9 +985,8 @@ class BrowserDOMPoster:
         try:
             logger.info("Strategy 4: JavaScript injection...")
             await self._javascript_type(page, text_input, content)
-            await page.wait_for_timeout(500)
             
-            entered_text = await text_input.inner_text()
+            entered_text = await self._wait_for_text(text_input, content)
             if content[:20] in entered_text or len(entered_text) > 0:
                 logger.info("✓ Text entered successfully with JavaScript")
                 return True
@@ -799,12 +996,33 @@ class BrowserDOMPoster:
         logger.error("All text entry strategies failed")
         return False
     
+    @staticmethod
+    def _text_is(text_input: Locator, predicate: Callable[[str], bool]):
+        """Build a wait condition on the editor's current text."""
+        async def condition() -> bool:
+            return predicate(await text_input.inner_text())
+        return condition
+    
+    async def _wait_for_text(self, text_input: Locator, content: str) -> str:
+        """Wait until the start of ``content`` shows up in the editor; returns the editor text."""
+        await wait_until(self._text_is(text_input, lambda text: content[:20] in text), TEXT_TIMEOUT)
+        return await text_input.inner_text()
+    
+    @staticmethod
+    async def _wait_for_focus(text_input: Locator):
+        """Wait until the editor (or an element inside it) has keyboard focus."""
+        async def focused() -> bool:
+            return await text_input.evaluate(
+                "el => el === document.activeElement || el.contains(document.activeElement)"
+            )
+        await wait_until(focused, TEXT_TIMEOUT, interval=50)
+    
     async def _force_type(self, page: Page, text_input: Locator, content: str):
         """Force click and type with explicit focus."""
         await text_input.click(force=True)
-        await page.wait_for_timeout(500)
+        await self._wait_for_focus(text_input)
         await text_input.press_sequentially(content, delay=15)
-        await page.wait_for_timeout(300)
+        await self._wait_for_text(text_input, content)
     
     async def _javascript_type(self, page: Page, text_input: Locator, content: str):
         """Use JavaScript to set text."""
@@ -821,12 +1039,7 @@ class BrowserDOMPoster:
     async def _upload_media(self, page: Page, media_paths: list[str]) -> bool:
         """Upload media files directly without opening OS file picker."""
         try:
-            # Debug screenshot before upload
-            try:
-                await page.screenshot(path="fb_before_upload.png")
-                logger.info("Debug screenshot: fb_before_upload.png")
-            except:
-                pass
+            await capture(page, "before_upload")
             
             # Verify files exist first
             valid_paths = []
@@ -897,7 +1110,6 @@ class BrowserDOMPoster:
                             return true;
                         }
                     """)
-                    await page.wait_for_timeout(500)
                     file_input = dialog.locator("#__playwright_file_input").first
                     if await file_input.count() > 0:
                         logger.info("✓ Created synthetic file input in dialog")
@@ -952,7 +1164,8 @@ class BrowserDOMPoster:
                         }
                     """)
                     
-                    await page.wait_for_timeout(3000)  # Give Facebook time to process
+                    # Give Facebook time to react to the new files
+                    await wait_for_dom_quiet(page, timeout=SETTLE_TIMEOUT)
                 except Exception as e:
                     logger.error(f"Failed to set file {path}: {e}")
             
@@ -962,73 +1175,43 @@ class BrowserDOMPoster:
             
             logger.info(f"✓ Set {uploaded_count} files, waiting for them to appear...")
             
-            # Debug screenshot after upload
-            try:
-                await page.screenshot(path="fb_after_upload.png")
-                logger.info("Debug screenshot: fb_after_upload.png")
-            except:
-                pass
+            await capture(page, "after_upload")
             
             # Verify media appears in composer - LENIENT MODE
             # If we successfully set files, give Facebook time to process even if detection fails
             logger.info("Waiting for media to appear in composer...")
             media_found = False
             
-            for attempt in range(30):  # Wait up to 30 seconds
-                # Check for media thumbnails/preview within dialog - EXPANDED selectors
-                media_indicators = [
-                    "img[src*='scontent']",  # Facebook CDN images
-                    "img[src*='fbcdn']",
-                    "img[src*='facebook']",
-                    "video",
-                    "[data-testid*='media']",
-                    "[data-testid*='photo']",
-                    "[data-testid*='video']",
-                    "[data-testid*='attachment']",
-                    "img[alt*='photo']",
-                    "div[role='img']",
-                    ".x1ll5l",  # Facebook image container class pattern
-                    "[class*='attachment']",
-                ]
-                
-                found = False
-                for indicator in media_indicators:
-                    try:
-                        locator = dialog.locator(indicator).first
-                        count = await locator.count()
-                        if count > 0:
-                            visible = await locator.is_visible()
-                            if visible:
-                                logger.info(f"✓ Media detected: {indicator}")
-                                found = True
-                                media_found = True
-                                break
-                    except:
-                        continue
-                
-                # Check for processing indicators
-                try:
-                    processing = await dialog.locator("text=Processing").count()
-                    uploading = await dialog.locator("text=Uploading").count()
-                    loading = await dialog.locator("text=Loading").count()
-                except:
-                    processing = 0
-                    uploading = 0
-                    loading = 0
-                
-                if found and processing == 0 and uploading == 0 and loading == 0:
-                    logger.info(f"✓ Media successfully attached after {attempt + 1} seconds")
-                    return True
-                
-                # Early success: if processing/uploading text appears, media is being handled
-                if uploading > 0 or processing > 0:
-                    logger.info(f"Media is being processed (uploading/processing detected)")
-                    media_found = True
-                
-                if attempt % 5 == 0:
-                    logger.info(f"Waiting for media... {attempt + 1}/30 (processing: {processing}, uploading: {uploading})")
-                
-                await page.wait_for_timeout(1000)
+            # Check for media thumbnails/preview within dialog - EXPANDED selectors
+            media_indicators = [
+                "img[src*='scontent']",  # Facebook CDN images
+                "img[src*='fbcdn']",
+                "img[src*='facebook']",
+                "video",
+                "[data-testid*='media']",
+                "[data-testid*='photo']",
+                "[data-testid*='video']",
+                "[data-testid*='attachment']",
+                "img[alt*='photo']",
+                "div[role='img']",
+                ".x1ll5l",  # Facebook image container class pattern
+                "[class*='attachment']",
+            ]
+            previews = dialog.locator(", ".join(media_indicators)).filter(visible=True)
+            busy = dialog.get_by_text(re.compile("Processing|Uploading|Loading"))
+            
+            async def media_attached() -> bool:
+                nonlocal media_found
+                found = await previews.count() > 0
+                processing = await busy.count() > 0
+                # Processing/uploading text means media is being handled
+                media_found = media_found or found or processing
+                return found and not processing
+            
+            started = time.monotonic()
+            if await wait_until(media_attached, MEDIA_READY_TIMEOUT, interval=250):
+                logger.info(f"✓ Media successfully attached after {time.monotonic() - started:.1f} seconds")
+                return True
             
             # LENIENT MODE: If we successfully set files but detection took too long, 
             # still consider it a success if files were uploaded
@@ -1041,12 +1224,7 @@ class BrowserDOMPoster:
                 logger.warning("✓ Media files were set but visual detection failed - proceeding anyway (lenient mode)")
                 return True
             
-            # Debug screenshot at failure
-            try:
-                await page.screenshot(path="fb_upload_failed.png")
-                logger.info("Debug screenshot: fb_upload_failed.png")
-            except:
-                pass
+            await capture(page, "upload_failed")
                 
             logger.error("Media upload failed - no files were set")
             return False
@@ -1058,8 +1236,8 @@ class BrowserDOMPoster:
     async def _verify_post(self, page: Page, expected_content: str = "") -> bool:
         """Verify post was actually published successfully."""
         try:
-            # Wait a moment for any navigation/state changes
-            await page.wait_for_timeout(2000)
+            # Let any navigation/state changes settle
+            await wait_for_dom_quiet(page, timeout=2000)
             
             # Check 1: Look for success toast/notification
             success_indicators = [
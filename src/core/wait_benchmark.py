@@ -0,0 +1,187 @@
+"""
+Wait Benchmark - Per-post waiting time of the Facebook flows, before and after.
+
+The Facebook flows used to sleep for fixed durations (3 s after every
+navigation and click, 5 s after Post) and poll for buttons once a second.
+They now wait on locator state, DOM quiet and text conditions, each with a
+ceiling (see ``waits``). This benchmark compares the two in two ways:
+
+- model: replays the steps of a post against page readiness times drawn
+  from configurable distributions, costing each step the old way (sleep,
+  then poll at 1 s) and the new way (ready time plus detection latency,
+  capped at the ceiling). Also counts steps where the old fixed sleep ended
+  before the page was ready, which is when the old flow misfired.
+- database: end-to-end durations of Facebook jobs recorded in
+  ``job_executions`` before and after a cut-over time.
+
+Usage:
+    python -m src.core.wait_benchmark --posts 500 --flow feed --media
+    python -m src.core.wait_benchmark --from-db --split 2026-10-18T12:00
+"""
+
+import argparse
+import math
+import random
+from dataclasses import dataclass
+from datetime import datetime
+
+from src.utils.helpers import percentile
+
+
+# Latency of a Playwright locator wait noticing a condition (rAF + round trip)
+LOCATOR_DETECTION_MS = 40.0
+
+
+@dataclass
+class WaitStep:
+    """One wait of a posting flow, with its old and new waiting strategy."""
+    name: str
+    ready_mean_ms: float           # when the page is actually ready for the next action
+    ready_stddev_ms: float
+    legacy_sleep_ms: float = 0.0   # fixed sleep before the old code looked
+    legacy_poll_ms: float = 0.0    # old polling interval after the sleep (0: looked once)
+    legacy_after_ms: float = 0.0   # fixed sleep after the condition was met
+    ceiling_ms: float = 30000.0    # ceiling of the condition-driven wait
+    settle_ms: float = 0.0         # DOM-quiet window the new code adds
+    poll_ms: float = 0.0           # new polling interval (0: locator wait)
+    work_ms: float = 0.0           # clicks/typing, the same before and after
+
+    def legacy_cost(self, ready: float) -> float:
+        """Milliseconds the old code spent on this step."""
+        waited = self.legacy_sleep_ms
+        if self.legacy_poll_ms and ready > waited:
+            polls = math.ceil((ready - waited) / self.legacy_poll_ms)
+            waited = min(waited + polls * self.legacy_poll_ms, self.ceiling_ms)
+        return self.work_ms + waited + self.legacy_after_ms
+
+    def legacy_premature(self, ready: float) -> bool:
+        """Whether the old code moved on before the page was ready."""
+        return not self.legacy_poll_ms and ready > self.legacy_sleep_ms
+
+    def condition_cost(self, ready: float) -> float:
+        """Milliseconds the condition-driven wait spends on this step."""
+        detection = self.poll_ms / 2 if self.poll_ms else LOCATOR_DETECTION_MS
+        return self.work_ms + min(ready + detection, self.ceiling_ms) + self.settle_ms
+
+
+# Readiness figures are rough observations of a logged-in desktop session
+FEED_STEPS = [
+    WaitStep("feed load", 1500, 600, legacy_sleep_ms=3000, ceiling_ms=15000),
+    WaitStep("composer open", 900, 400, legacy_sleep_ms=4500, ceiling_ms=10000, settle_ms=400),
+    WaitStep("typing", 120, 60, legacy_sleep_ms=1000, ceiling_ms=1000, poll_ms=100, work_ms=2000),
+    WaitStep("post button", 600, 400, legacy_poll_ms=1000, ceiling_ms=30000),
+    WaitStep("publish", 2500, 1000, legacy_sleep_ms=7000, ceiling_ms=15000, settle_ms=400),
+]
+MEDIA_STEPS = [
+    WaitStep("media attach", 4000, 2000, legacy_sleep_ms=3000, legacy_poll_ms=1000,
+             legacy_after_ms=3000, ceiling_ms=30000, settle_ms=800, poll_ms=250),
+]
+REEL_STEPS = [
+    WaitStep("feed load", 1500, 600, legacy_sleep_ms=3000, ceiling_ms=15000),
+    WaitStep("reel composer", 1800, 700, legacy_sleep_ms=3000, ceiling_ms=10000),
+    WaitStep("video processing", 8000, 4000, legacy_poll_ms=1000, ceiling_ms=60000),
+    WaitStep("caption", 120, 60, legacy_sleep_ms=1000, ceiling_ms=1000, poll_ms=100, work_ms=2000),
+    WaitStep("share button", 2000, 1500, legacy_poll_ms=1000, ceiling_ms=40000),
+    WaitStep("publish", 3000, 1200, legacy_sleep_ms=6000, ceiling_ms=10000),
+]
+
+
+def flow_steps(flow: str, media: bool = False) -> list[WaitStep]:
+    """Steps of the "feed" or "reel" flow."""
+    if flow == "reel":
+        return list(REEL_STEPS)
+    steps = list(FEED_STEPS)
+    if media:
+        steps[3:3] = MEDIA_STEPS  # Media is attached before the Post button wait
+    return steps
+
+
+@dataclass
+class WaitBenchmarkReport:
+    """Per-post time of the old and new waiting strategy."""
+    posts: int
+    legacy: list[float]      # seconds per post
+    condition: list[float]
+    premature_steps: int     # old fixed sleeps that ended before the page was ready
+    label: str = "model"
+
+    def summary(self) -> str:
+        """Human-readable report."""
+        def row(name: str, values: list[float]) -> str:
+            if not values:
+                return f"{name:<10} n/a"
+            mean = sum(values) / len(values)
+            return (f"{name:<10} mean {mean:.1f}s, p50 {percentile(values, 50):.1f}s, "
+                    f"p95 {percentile(values, 95):.1f}s ({len(values)} posts)")
+
+        lines = [
+            f"Per-post time ({self.label}, {self.posts} posts)",
+            row("before:", self.legacy),
+            row("after:", self.condition),
+        ]
+        if self.legacy and self.condition:
+            saved = sum(self.legacy) / len(self.legacy) - sum(self.condition) / len(self.condition)
+            lines.append(f"Saved:     {saved:.1f}s per post")
+        if self.label == "model":
+            lines.append(f"Old sleeps that ended before the page was ready: {self.premature_steps}")
+        return "\n".join(lines)
+
+
+def run_model(
+    steps: list[WaitStep],
+    posts: int = 500,
+    seed: int | None = None,
+) -> WaitBenchmarkReport:
+    """Cost ``posts`` simulated posts with the old and the new waits."""
+    rng = random.Random(seed)
+    legacy, condition = [], []
+    premature = 0
+    for _ in range(posts):
+        old = new = 0.0
+        for step in steps:
+            ready = max(0.0, rng.gauss(step.ready_mean_ms, step.ready_stddev_ms))
+            old += step.legacy_cost(ready)
+            new += step.condition_cost(ready)
+            premature += step.legacy_premature(ready)
+        legacy.append(old / 1000)
+        condition.append(new / 1000)
+    return WaitBenchmarkReport(posts, legacy, condition, premature)
+
+
+def durations_from_database(split: datetime, db=None) -> WaitBenchmarkReport:
+    """Compare recorded Facebook post durations before and after ``split``."""
+    from src.data.database import get_database
+
+    db = db or get_database()
+    before, after = [], []
+    for execution in db.get_job_executions():
+        duration = execution.duration_seconds
+        if execution.platform != "facebook" or execution.status != "success" or duration is None:
+            continue
+        (before if execution.started_at < split else after).append(duration)
+    return WaitBenchmarkReport(len(before) + len(after), before, after, 0, label="recorded")
+
+
+def main(argv: list[str] | None = None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Compare fixed sleeps with condition-driven waits")
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--flow", choices=("feed", "reel"), default="feed")
+    parser.add_argument("--media", action="store_true", help="Feed posts attach photos/videos")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--from-db", action="store_true", help="Use recorded job durations")
+    parser.add_argument("--split", type=datetime.fromisoformat, default=None,
+                        help="Cut-over time for --from-db (ISO format)")
+    args = parser.parse_args(argv)
+
+    if args.from_db:
+        if args.split is None:
+            parser.error("--from-db requires --split")
+        report = durations_from_database(args.split)
+    else:
+        report = run_model(flow_steps(args.flow, args.media), posts=args.posts, seed=args.seed)
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
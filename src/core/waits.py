@@ -0,0 +1,184 @@
+"""
+Waits - Condition-driven waits for the Playwright posting flows.
+
+Fixed ``wait_for_timeout`` sleeps cost their full duration on every post
+even when the page is ready sooner, and fail outright when it is slower.
+These helpers return as soon as their condition holds:
+
+- locator state: an element becomes visible, or visible and enabled
+- network idle: no requests in flight for 500 ms
+- DOM quiet: no DOM mutations for a short window (animations, React renders)
+- any other async predicate, polled at a short interval
+
+Every wait takes a ceiling in milliseconds and reports whether its
+condition was met instead of raising, so callers keep their own fallbacks.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Sequence
+
+from playwright.async_api import Error as PlaywrightError, Locator, Page
+
+
+logger = logging.getLogger(__name__)
+
+# Default window without DOM mutations that counts as "settled"
+DOM_QUIET_MS = 400
+
+# Interval for predicates that cannot be expressed as locator state
+POLL_INTERVAL_MS = 100
+
+_DOM_QUIET_SCRIPT = """
+([quietMs, timeoutMs]) => new Promise((resolve) => {
+    let quietTimer = null;
+    let ceilingTimer = null;
+    const observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => done(true), quietMs);
+    });
+    const done = (settled) => {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(ceilingTimer);
+        resolve(settled);
+    };
+    observer.observe(document, {
+        subtree: true, childList: true, attributes: true, characterData: true,
+    });
+    quietTimer = setTimeout(() => done(true), quietMs);
+    ceilingTimer = setTimeout(() => done(false), timeoutMs);
+})
+"""
+
+
+def _ceiling(timeout: float) -> float:
+    """Playwright treats a timeout of 0 as "wait forever"; keep ceilings positive."""
+    return max(float(timeout), 1.0)
+
+
+def enabled(selector: str) -> str:
+    """Narrow a CSS selector to elements that are not ``aria-disabled``."""
+    return f"{selector}:not([aria-disabled='true'])"
+
+
+async def wait_for_visible(page: Page, selectors: Sequence[str], timeout: float) -> Locator | None:
+    """
+    Wait until any of several selectors matches a visible element.
+
+    Args:
+        page: Page to search
+        selectors: Candidate selectors, most preferred first
+        timeout: Ceiling in milliseconds
+
+    Returns:
+        Locator of the first visible match (by selector order), or None
+    """
+    if not selectors:
+        return None
+    combined = page.locator(selectors[0])
+    for selector in selectors[1:]:
+        combined = combined.or_(page.locator(selector))
+    try:
+        await combined.first.wait_for(state="visible", timeout=_ceiling(timeout))
+    except PlaywrightError:
+        return None
+    for selector in selectors:
+        locator = page.locator(selector).first
+        try:
+            if await locator.is_visible():
+                return locator
+        except PlaywrightError:
+            continue
+    # The match went away again between the wait and the lookup
+    return combined.first
+
+
+async def wait_for_enabled(page: Page, selectors: Sequence[str], timeout: float) -> Locator | None:
+    """Wait until any of several CSS selectors matches a visible, enabled element."""
+    return await wait_for_visible(page, [enabled(selector) for selector in selectors], timeout)
+
+
+async def wait_for_state(page: Page, selector: str, state: str, timeout: float) -> bool:
+    """
+    Wait until the first match of ``selector`` reaches a locator state.
+
+    Args:
+        page: Page to search
+        selector: Element selector
+        state: "attached", "detached", "visible" or "hidden"
+        timeout: Ceiling in milliseconds
+
+    Returns:
+        True if the state was reached before the ceiling
+    """
+    try:
+        await page.locator(selector).first.wait_for(state=state, timeout=_ceiling(timeout))
+        return True
+    except PlaywrightError:
+        return False
+
+
+async def wait_for_network_idle(page: Page, timeout: float) -> bool:
+    """Wait until the page has had no network requests for 500 ms."""
+    try:
+        await page.wait_for_load_state("networkidle", timeout=_ceiling(timeout))
+        return True
+    except PlaywrightError:
+        return False
+
+
+async def wait_for_dom_quiet(page: Page, quiet: float = DOM_QUIET_MS, timeout: float = 5000) -> bool:
+    """
+    Wait until the DOM stops changing.
+
+    Args:
+        page: Page to observe
+        quiet: Milliseconds without mutations that count as settled
+        timeout: Ceiling in milliseconds
+
+    Returns:
+        True if the DOM settled, False at the ceiling or if the page navigated
+    """
+    try:
+        return bool(await page.evaluate(_DOM_QUIET_SCRIPT, [quiet, _ceiling(timeout)]))
+    except PlaywrightError as e:
+        logger.debug(f"DOM quiet wait interrupted: {e}")
+        return False
+
+
+async def wait_until(
+    condition: Callable[[], Awaitable[bool]],
+    timeout: float,
+    interval: float = POLL_INTERVAL_MS,
+) -> bool:
+    """
+    Poll an async predicate until it returns True.
+
+    Playwright errors raised by the predicate count as False.
+
+    Args:
+        condition: Predicate to poll
+        timeout: Ceiling in milliseconds
+        interval: Milliseconds between polls
+
+    Returns:
+        True if the condition held before the ceiling
+    """
+    deadline = time.monotonic() + timeout / 1000
+    while True:
+        try:
+            if await condition():
+                return True
+        except PlaywrightError as e:
+            logger.debug(f"Wait condition failed: {e}")
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        await asyncio.sleep(min(interval / 1000, remaining))
+
+
+def remaining_ms(deadline: float) -> float:
+    """Milliseconds left until a ``time.monotonic()`` deadline (never negative)."""
+    return max(0.0, (deadline - time.monotonic()) * 1000)
@@ -0,0 +1,163 @@
+"""
+AIOperator - Headless Daemon
+
+Runs the scheduler and its executors without any GUI, e.g. on a Linux
+server without a display. The desktop app can still be used to manage
+accounts and posts against the same database.
+
+Usage:
+    python -m src.daemon [--mode scheduler|worker|both] [--api] [--log-level INFO]
+
+``scheduler`` fires the scheduled posts and recurring series from the
+built-in scheduler engine (see scheduler_engine).
+``worker`` only claims due posts from the database with a lease, so any
+number of worker processes can share the posting load (see lease_worker).
+``--api`` serves the local control API for bulk scheduling (see control_api).
+
+Stops cleanly on SIGTERM or SIGINT, waiting for running jobs to finish.
+"""
+
+import argparse
+import signal
+import sys
+import threading
+
+from src.config import config
+from src.utils.logger import setup_logging, get_logger
+
+
+logger = get_logger(__name__)
+
+
+class SchedulerDaemon:
+    """Keeps the scheduler running until asked to stop."""
+
+    def __init__(
+        self,
+        scheduler=None,
+        lease_worker=None,
+        run_scheduler: bool = True,
+        serve_api: bool = False,
+    ):
+        """
+        Initialize the daemon.
+
+        Args:
+            scheduler: SchedulerManager to run (defaults to the shared instance)
+            lease_worker: Optional LeaseWorker to run alongside
+            run_scheduler: Whether to run the scheduler at all
+            serve_api: Whether to serve the control API
+        """
+        self._scheduler = scheduler
+        self.lease_worker = lease_worker
+        self.run_scheduler = run_scheduler
+        self.serve_api = serve_api
+        self.api_server = None
+        self._stop_event = threading.Event()
+
+    @property
+    def scheduler(self):
+        if self._scheduler is None:
+            from src.core.scheduler import get_scheduler
+            self._scheduler = get_scheduler()
+        return self._scheduler
+
+    def install_signal_handlers(self):
+        """Stop on SIGTERM/SIGINT (and SIGHUP where available)."""
+        signals = [signal.SIGTERM, signal.SIGINT]
+        if hasattr(signal, "SIGHUP"):
+            signals.append(signal.SIGHUP)
+        for signum in signals:
+            signal.signal(signum, self.request_stop)
+
+    def request_stop(self, signum=None, frame=None):
+        """Ask the daemon to shut down (safe to call from a signal handler)."""
+        if signum is not None:
+            logger.info(f"Received signal {signal.Signals(signum).name}, shutting down")
+        self._stop_event.set()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop_event.is_set()
+
+    def run(self) -> int:
+        """
+        Start the scheduler and block until a stop is requested.
+
+        Returns:
+            Process exit code
+        """
+        try:
+            if self.run_scheduler:
+                self.scheduler.start()
+            if self.lease_worker is not None:
+                self.lease_worker.start()
+            if self.serve_api:
+                from src.core.control_api import ControlApiServer, PostIngestor
+                self.api_server = ControlApiServer(ingestor=PostIngestor(scheduler=self.scheduler))
+                self.api_server.start()
+        except Exception as e:
+            logger.exception(f"Failed to start daemon: {e}")
+            return 1
+
+        if self.run_scheduler:
+            pending = self.scheduler.get_pending_jobs()
+            logger.info(f"Daemon running with {len(pending)} pending job(s)")
+        else:
+            logger.info("Daemon running as lease worker only")
+
+        # Wake up periodically so signals are handled promptly on every platform
+        while not self._stop_event.wait(timeout=1.0):
+            pass
+
+        if self.api_server is not None:
+            self.api_server.stop()
+        if self.lease_worker is not None:
+            self.lease_worker.stop()
+        if self.run_scheduler:
+            self.scheduler.stop()
+        from src.core.automation_runtime import shutdown_automation_runtime
+        shutdown_automation_runtime()
+        logger.info("Daemon stopped")
+        return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Daemon entry point."""
+    parser = argparse.ArgumentParser(description="Run the AIOperator scheduler without a GUI")
+    parser.add_argument(
+        "--mode",
+        choices=["scheduler", "worker", "both"],
+        default="scheduler",
+        help="Run the scheduler, a lease worker, or both",
+    )
+    parser.add_argument(
+        "--api",
+        action="store_true",
+        help="Serve the local control API (also enabled by API_ENABLED=true)",
+    )
+    parser.add_argument("--log-level", default=None, help="DEBUG, INFO, WARNING or ERROR")
+    args = parser.parse_args(argv)
+
+    setup_logging(level=args.log_level.upper() if args.log_level else None)
+    logger.info("Starting AIOperator daemon...")
+
+    for error in config.validate():
+        logger.warning(f"Config warning: {error}")
+
+    lease_worker = None
+    if args.mode in ("worker", "both"):
+        from src.core.lease_worker import LeaseWorker
+        lease_worker = LeaseWorker()
+
+    daemon = SchedulerDaemon(
+        lease_worker=lease_worker,
+        run_scheduler=args.mode != "worker",
+        serve_api=args.api or config.api.enabled,
+    )
+    daemon.install_signal_handlers()
+    return daemon.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
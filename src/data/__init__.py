@@ -1,7 +1,7 @@
 """Data layer - Database and models."""
 
 from src.data.database import Database, get_database
-from src.data.models import Account, ScheduledPost, LogEntry
+from src.data.models import Account, ScheduledPost, LogEntry, RecurringSchedule
 from src.data.encryption import CredentialEncryption
 
 __all__ = [
@@ -10,5 +10,6 @@ __all__ = [
     "Account",
     "ScheduledPost", 
     "LogEntry",
+    "RecurringSchedule",
     "CredentialEncryption",
 ]
@@ -4,22 +4,42 @@ Database - SQLite database operations.
 Handles CRUD operations for accounts, posts, and logs.
 """
 
+import functools
 import json
 import sqlite3
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
 
 from src.config import config, PROJECT_ROOT
-from src.data.models import Account, ScheduledPost, LogEntry, PostStatusEnum
+from src.data.models import (
+    Account, ScheduledPost, LogEntry, PostStatusEnum,
+    RecurringSchedule, RecurrenceKind, JobExecution, PostResult, DailyPostCount,
+)
 from src.data.encryption import get_encryption
 
 
+def _serialized(method):
+    """Run a method while holding the connection lock (see ``Database._lock``)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class Database:
     """
     SQLite database manager.
     
     Handles all database operations for accounts, scheduled posts, and logs.
+    
+    One connection is shared by every thread (the result recorder, lease
+    heartbeats, pipeline stages, API requests...). A commit or rollback
+    applies to whatever that connection has pending, so each method runs
+    under a re-entrant lock; otherwise another thread's commit could split a
+    batch in flight, or its rollback discard it.
     """
     
     def __init__(self, db_path: Path | None = None):
@@ -33,6 +53,7 @@ class Database:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
         self._connection: sqlite3.Connection | None = None
+        self._lock = threading.RLock()
         self._init_database()
     
     @property
@@ -41,9 +62,12 @@ class Database:
         if self._connection is None:
             self._connection = sqlite3.connect(
                 self.db_path,
-                check_same_thread=False
+                check_same_thread=False,
+                timeout=config.database.busy_timeout,
             )
             self._connection.row_factory = sqlite3.Row
+            if config.database.wal:
+                self._connection.execute("PRAGMA journal_mode=WAL")
         return self._connection
     
     def _init_database(self):
@@ -80,6 +104,56 @@ class Database:
             )
         """)
         
+        # Recurring schedules table (one row per series, not per occurrence)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS recurring_schedules (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                account_id INTEGER NOT NULL,
+                platform TEXT NOT NULL,
+                cron_expression TEXT NOT NULL,
+                kind TEXT DEFAULT 'cron',
+                content_items TEXT NOT NULL,
+                next_index INTEGER DEFAULT 0,
+                is_active INTEGER DEFAULT 1,
+                next_run_time TEXT,
+                last_run_time TEXT,
+                created_at TEXT NOT NULL,
+                FOREIGN KEY (account_id) REFERENCES accounts(id)
+            )
+        """)
+        
+        # Job execution timings (scheduler instrumentation)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS job_executions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                post_id INTEGER,
+                platform TEXT NOT NULL,
+                scheduled_time TEXT,
+                dequeued_at TEXT,
+                started_at TEXT,
+                finished_at TEXT NOT NULL,
+                status TEXT NOT NULL,
+                message TEXT
+            )
+        """)
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_job_executions_finished "
+            "ON job_executions(finished_at)"
+        )
+        
+        # Published/failed posts per account and day
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS daily_post_counts (
+                day TEXT NOT NULL,
+                platform TEXT NOT NULL,
+                account_id INTEGER NOT NULL,
+                succeeded INTEGER DEFAULT 0,
+                failed INTEGER DEFAULT 0,
+                PRIMARY KEY (day, platform, account_id)
+            )
+        """)
+        
         # Logs table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS logs (
@@ -92,9 +166,36 @@ class Database:
         """)
         
         self.connection.commit()
+        self._migrate_schema()
+    
+    def _migrate_schema(self):
+        """Add columns introduced after a table was first created."""
+        self._ensure_columns("scheduled_posts", {
+            "requested_time": "TEXT",
+            "lease_owner": "TEXT",
+            "lease_expires_at": "TEXT",
+            "attempts": "INTEGER DEFAULT 0",
+            "checkpoint": "TEXT",
+            "preflight_at": "TEXT",
+            "preflight_message": "TEXT",
+            "lane": "TEXT DEFAULT 'scheduled'",
+        })
+    
+    def _ensure_columns(self, table: str, columns: dict[str, str]):
+        """Add any missing columns to an existing table."""
+        cursor = self.connection.cursor()
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row["name"] for row in cursor.fetchall()}
+        
+        for name, definition in columns.items():
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+        
+        self.connection.commit()
     
     # ==================== Account Operations ====================
     
+    @_serialized
     def add_account(self, account: Account) -> int:
         """
         Add a new account.
@@ -122,6 +223,7 @@ class Database:
         self.connection.commit()
         return cursor.lastrowid
     
+    @_serialized
     def get_account(self, account_id: int) -> Account | None:
         """Get account by ID."""
         cursor = self.connection.cursor()
@@ -132,6 +234,7 @@ class Database:
             return self._row_to_account(row)
         return None
     
+    @_serialized
     def get_accounts_by_platform(self, platform: str) -> list[Account]:
         """Get all accounts for a platform."""
         cursor = self.connection.cursor()
@@ -141,6 +244,7 @@ class Database:
         )
         return [self._row_to_account(row) for row in cursor.fetchall()]
     
+    @_serialized
     def get_all_accounts(self, active_only: bool = True) -> list[Account]:
         """Get all accounts."""
         cursor = self.connection.cursor()
@@ -150,6 +254,7 @@ class Database:
             cursor.execute("SELECT * FROM accounts")
         return [self._row_to_account(row) for row in cursor.fetchall()]
     
+    @_serialized
     def update_account(self, account: Account) -> bool:
         """Update an existing account."""
         if account.id is None:
@@ -173,6 +278,7 @@ class Database:
         self.connection.commit()
         return cursor.rowcount > 0
     
+    @_serialized
     def delete_account(self, account_id: int) -> bool:
         """Delete an account (soft delete by setting inactive)."""
         cursor = self.connection.cursor()
@@ -196,27 +302,67 @@ class Database:
     
     # ==================== Scheduled Post Operations ====================
     
+    @_serialized
     def add_scheduled_post(self, post: ScheduledPost) -> int:
         """Add a new scheduled post."""
         cursor = self.connection.cursor()
         cursor.execute(
             """
             INSERT INTO scheduled_posts 
-            (account_id, content, scheduled_time, status, media_paths, created_at)
-            VALUES (?, ?, ?, ?, ?, ?)
+            (account_id, content, scheduled_time, status, media_paths, created_at,
+             requested_time, lane)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (
-                post.account_id,
-                post.content,
-                post.scheduled_time.isoformat(),
-                post.status.value,
-                json.dumps(post.media_paths),
-                post.created_at.isoformat(),
-            )
+            self._post_insert_params(post)
         )
         self.connection.commit()
         return cursor.lastrowid
     
+    def _post_insert_params(self, post: ScheduledPost) -> tuple:
+        """Get INSERT parameters for a scheduled post."""
+        return (
+            post.account_id,
+            post.content,
+            post.scheduled_time.isoformat(),
+            post.status.value,
+            json.dumps(post.media_paths),
+            post.created_at.isoformat(),
+            post.requested_time.isoformat() if post.requested_time else None,
+            post.lane,
+        )
+    
+    @_serialized
+    def add_scheduled_posts(self, posts: list[ScheduledPost]) -> list[int]:
+        """
+        Add many scheduled posts in a single transaction.
+        
+        Args:
+            posts: Posts to add
+            
+        Returns:
+            IDs of the new posts, in input order
+        """
+        cursor = self.connection.cursor()
+        post_ids = []
+        try:
+            for post in posts:
+                cursor.execute(
+                    """
+                    INSERT INTO scheduled_posts 
+                    (account_id, content, scheduled_time, status, media_paths, created_at,
+                     requested_time, lane)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    self._post_insert_params(post)
+                )
+                post_ids.append(cursor.lastrowid)
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        return post_ids
+    
+    @_serialized
     def get_scheduled_post(self, post_id: int) -> ScheduledPost | None:
         """Get scheduled post by ID."""
         cursor = self.connection.cursor()
@@ -227,6 +373,7 @@ class Database:
             return self._row_to_post(row)
         return None
     
+    @_serialized
     def get_pending_posts(self) -> list[ScheduledPost]:
         """Get all pending posts."""
         cursor = self.connection.cursor()
@@ -235,6 +382,7 @@ class Database:
         )
         return [self._row_to_post(row) for row in cursor.fetchall()]
     
+    @_serialized
     def get_posts_by_account(self, account_id: int) -> list[ScheduledPost]:
         """Get all posts for an account."""
         cursor = self.connection.cursor()
@@ -244,6 +392,7 @@ class Database:
         )
         return [self._row_to_post(row) for row in cursor.fetchall()]
     
+    @_serialized
     def update_post_status(
         self, 
         post_id: int, 
@@ -269,6 +418,7 @@ class Database:
         )
         self.connection.commit()
     
+    @_serialized
     def update_scheduled_post(self, post: ScheduledPost) -> bool:
         """Update a scheduled post content and time."""
         if post.id is None:
@@ -278,19 +428,22 @@ class Database:
         cursor.execute(
             """
             UPDATE scheduled_posts 
-            SET content = ?, scheduled_time = ?, media_paths = ?
+            SET content = ?, scheduled_time = ?, media_paths = ?, requested_time = ?,
+                preflight_at = NULL, preflight_message = NULL
             WHERE id = ?
             """,
             (
                 post.content,
                 post.scheduled_time.isoformat(),
                 json.dumps(post.media_paths) if post.media_paths else "[]",
+                post.requested_time.isoformat() if post.requested_time else None,
                 post.id,
             )
         )
         self.connection.commit()
         return cursor.rowcount > 0
     
+    @_serialized
     def delete_scheduled_post(self, post_id: int) -> bool:
         """Delete a scheduled post."""
         cursor = self.connection.cursor()
@@ -298,6 +451,26 @@ class Database:
         self.connection.commit()
         return cursor.rowcount > 0
     
+    @_serialized
+    def cancel_pending_post(self, post_id: int) -> bool:
+        """
+        Cancel a post that has not been claimed yet.
+        
+        Returns:
+            True if the post was pending and is now cancelled
+        """
+        cursor = self.connection.cursor()
+        cursor.execute(
+            """
+            UPDATE scheduled_posts
+            SET status = ?, executed_at = ?
+            WHERE id = ? AND status = 'pending'
+            """,
+            (PostStatusEnum.CANCELLED.value, datetime.now().isoformat(), post_id)
+        )
+        self.connection.commit()
+        return cursor.rowcount == 1
+    
     def _row_to_post(self, row: sqlite3.Row) -> ScheduledPost:
         """Convert database row to ScheduledPost."""
         return ScheduledPost(
@@ -312,10 +485,695 @@ class Database:
             created_at=datetime.fromisoformat(row["created_at"]),
             executed_at=datetime.fromisoformat(row["executed_at"]) 
                         if row["executed_at"] else None,
+            requested_time=datetime.fromisoformat(row["requested_time"]) 
+                           if row["requested_time"] else None,
+            lease_owner=row["lease_owner"],
+            lease_expires_at=datetime.fromisoformat(row["lease_expires_at"]) 
+                             if row["lease_expires_at"] else None,
+            attempts=row["attempts"] or 0,
+            checkpoint=row["checkpoint"],
+            preflight_at=datetime.fromisoformat(row["preflight_at"]) 
+                         if row["preflight_at"] else None,
+            preflight_message=row["preflight_message"],
+            lane=row["lane"] or "scheduled",
+        )
+    
+    # ==================== Due Post Queries ====================
+    
+    @_serialized
+    def get_pending_posts_due(
+        self, until: datetime, account_id: int | None = None
+    ) -> list[ScheduledPost]:
+        """
+        Get pending posts scheduled no later than ``until``.
+        
+        Args:
+            until: Latest scheduled time to include
+            account_id: Only include posts of this account
+            
+        Returns:
+            Posts ordered by scheduled time
+        """
+        query = "SELECT * FROM scheduled_posts WHERE status = 'pending' AND scheduled_time <= ?"
+        params: list = [until.isoformat()]
+        if account_id is not None:
+            query += " AND account_id = ?"
+            params.append(account_id)
+        cursor = self.connection.cursor()
+        cursor.execute(query + " ORDER BY scheduled_time", params)
+        return [self._row_to_post(row) for row in cursor.fetchall()]
+    
+    @_serialized
+    def set_preflight_results(self, results: list[tuple[int, str | None]]):
+        """
+        Store pre-flight outcomes in one transaction.
+        
+        Args:
+            results: (post_id, problem message or None if the check passed)
+        """
+        if not results:
+            return
+        checked_at = datetime.now().isoformat()
+        cursor = self.connection.cursor()
+        try:
+            cursor.executemany(
+                """
+                UPDATE scheduled_posts
+                SET preflight_at = ?, preflight_message = ?
+                WHERE id = ? AND status = 'pending'
+                """,
+                [(checked_at, message, post_id) for post_id, message in results]
+            )
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+    
+    # ==================== Lease Operations ====================
+    #
+    # Workers (possibly in several processes) claim posts with a conditional
+    # UPDATE, which SQLite applies atomically, so a post is only ever owned by
+    # one worker. Owners renew the lease by heartbeat; an expired lease means
+    # the owner died and the post may be claimed again - unless it died while
+    # publishing (checkpoint 'publishing'), as the post may already be live.
+    
+    _CLAIMABLE = """
+        (status = 'pending'
+         OR (status = 'running' AND lease_expires_at IS NOT NULL AND lease_expires_at < ?
+             AND COALESCE(checkpoint, '') != 'publishing'))
+    """
+    
+    @_serialized
+    def claim_post(self, post_id: int, owner: str, lease_seconds: int) -> bool:
+        """
+        Claim a single post for execution.
+        
+        Args:
+            post_id: Post to claim
+            owner: Unique worker identifier
+            lease_seconds: Lease length
+            
+        Returns:
+            True if this owner now holds the post (status RUNNING)
+        """
+        now = datetime.now()
+        cursor = self.connection.cursor()
+        cursor.execute(
+            f"""
+            UPDATE scheduled_posts
+            SET status = 'running', lease_owner = ?, lease_expires_at = ?,
+                attempts = COALESCE(attempts, 0) + 1, checkpoint = NULL
+            WHERE id = ? AND {self._CLAIMABLE}
+            """,
+            (
+                owner,
+                (now + timedelta(seconds=lease_seconds)).isoformat(),
+                post_id,
+                now.isoformat(),
+            )
+        )
+        self.connection.commit()
+        return cursor.rowcount == 1
+    
+    @_serialized
+    def claim_due_posts(
+        self,
+        owner: str,
+        lease_seconds: int,
+        limit: int,
+        max_attempts: int | None = None,
+        grace_seconds: int | None = None,
+    ) -> list[ScheduledPost]:
+        """
+        Claim up to ``limit`` due posts, oldest first.
+        
+        Due posts are pending posts whose time has come and running posts
+        whose lease expired. Abandoned posts that must not run again are
+        failed first (see ``settle_abandoned_posts``); posts overdue by more
+        than ``grace_seconds`` are left to ``claim_missed_posts``.
+        
+        Args:
+            owner: Unique worker identifier
+            lease_seconds: Lease length
+            limit: Maximum number of posts to claim
+            max_attempts: Claim limit per post (None for no limit)
+            grace_seconds: Skip posts overdue by more than this (requeued
+                           posts are always due); None for no limit
+            
+        Returns:
+            Claimed posts
+        """
+        self.settle_abandoned_posts(max_attempts)
+        now = datetime.now().isoformat()
+        cursor = self.connection.cursor()
+        
+        if limit <= 0:
+            return []
+        oldest = (
+            (datetime.now() - timedelta(seconds=grace_seconds)).isoformat()
+            if grace_seconds is not None else ""
+        )
+        cursor.execute(
+            f"""
+            SELECT id FROM scheduled_posts
+            WHERE scheduled_time <= ? AND {self._CLAIMABLE}
+              AND (scheduled_time >= ? OR checkpoint = 'requeued')
+            ORDER BY scheduled_time
+            LIMIT ?
+            """,
+            (now, now, oldest, limit)
+        )
+        candidates = [row["id"] for row in cursor.fetchall()]
+        
+        # Another worker may win any candidate between the SELECT and the UPDATE
+        claimed = [
+            post_id for post_id in candidates
+            if self.claim_post(post_id, owner, lease_seconds)
+        ]
+        return [post for post in map(self.get_scheduled_post, claimed) if post]
+    
+    @_serialized
+    def settle_abandoned_posts(self, max_attempts: int | None = None) -> int:
+        """
+        Fail running posts with an expired lease that must not be claimed again.
+        
+        A post abandoned in the middle of publishing may already be online,
+        and one abandoned ``max_attempts`` times keeps crashing its workers.
+        
+        Args:
+            max_attempts: Claim limit per post (None for no limit)
+            
+        Returns:
+            Number of posts failed
+        """
+        now = datetime.now().isoformat()
+        cursor = self.connection.cursor()
+        
+        cursor.execute(
+            """
+            UPDATE scheduled_posts
+            SET status = 'failed', lease_owner = NULL, lease_expires_at = NULL,
+                result_message = 'Interrupted while publishing; check the platform before re-posting',
+                executed_at = ?
+            WHERE status = 'running' AND lease_expires_at < ? AND checkpoint = 'publishing'
+            """,
+            (now, now)
+        )
+        failed = cursor.rowcount
+        self.connection.commit()
+        
+        if max_attempts is not None:
+            cursor.execute(
+                """
+                UPDATE scheduled_posts
+                SET status = 'failed', lease_owner = NULL, lease_expires_at = NULL,
+                    result_message = 'Abandoned by workers too many times', executed_at = ?
+                WHERE status = 'running' AND lease_expires_at < ? AND attempts >= ?
+                """,
+                (now, now, max_attempts)
+            )
+            failed += cursor.rowcount
+            self.connection.commit()
+        return failed
+    
+    @_serialized
+    def claim_missed_posts(
+        self, owner: str, lease_seconds: int, grace_seconds: int, limit: int = 100
+    ) -> list[ScheduledPost]:
+        """
+        Claim due posts overdue by more than ``grace_seconds``, so they can be failed as missed.
+        
+        Posts requeued by a shutdown are never missed; ``claim_due_posts``
+        takes them whenever they come up.
+        
+        Args:
+            owner: Unique worker identifier
+            lease_seconds: Lease length
+            grace_seconds: How late a post may still be published
+            limit: Maximum number of posts to claim
+            
+        Returns:
+            Claimed posts
+        """
+        now = datetime.now()
+        cursor = self.connection.cursor()
+        cursor.execute(
+            f"""
+            SELECT id FROM scheduled_posts
+            WHERE scheduled_time < ? AND {self._CLAIMABLE}
+              AND COALESCE(checkpoint, '') != 'requeued'
+            ORDER BY scheduled_time
+            LIMIT ?
+            """,
+            ((now - timedelta(seconds=grace_seconds)).isoformat(), now.isoformat(), limit)
+        )
+        claimed = [
+            row["id"] for row in cursor.fetchall()
+            if self.claim_post(row["id"], owner, lease_seconds)
+        ]
+        return [post for post in map(self.get_scheduled_post, claimed) if post]
+    
+    @_serialized
+    def get_running_posts(self) -> list[ScheduledPost]:
+        """Get posts claimed by a worker that may still be picked up again (not publishing)."""
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "SELECT * FROM scheduled_posts WHERE status = 'running' "
+            "AND COALESCE(checkpoint, '') != 'publishing' ORDER BY scheduled_time"
+        )
+        return [self._row_to_post(row) for row in cursor.fetchall()]
+    
+    @_serialized
+    def renew_lease(self, post_id: int, owner: str, lease_seconds: int) -> bool:
+        """
+        Extend a lease held by ``owner``.
+        
+        Returns:
+            False if the lease was lost (expired and claimed by another worker)
+        """
+        cursor = self.connection.cursor()
+        cursor.execute(
+            """
+            UPDATE scheduled_posts SET lease_expires_at = ?
+            WHERE id = ? AND lease_owner = ? AND status = 'running'
+            """,
+            (
+                (datetime.now() + timedelta(seconds=lease_seconds)).isoformat(),
+                post_id,
+                owner,
+            )
+        )
+        self.connection.commit()
+        return cursor.rowcount == 1
+    
+    @_serialized
+    def mark_publishing(self, post_id: int, owner: str) -> bool:
+        """
+        Checkpoint that a claimed post is entering the irreversible publish step.
+        
+        Returns:
+            False if ``owner`` no longer holds the post
+        """
+        cursor = self.connection.cursor()
+        cursor.execute(
+            """
+            UPDATE scheduled_posts SET checkpoint = 'publishing'
+            WHERE id = ? AND lease_owner = ? AND status = 'running'
+            """,
+            (post_id, owner)
+        )
+        self.connection.commit()
+        return cursor.rowcount == 1
+    
+    @_serialized
+    def requeue_claimed_post(self, post_id: int, owner: str) -> bool:
+        """
+        Hand a claimed but unpublished post back to the queue (e.g. on shutdown).
+        
+        The post becomes pending again with checkpoint 'requeued', and the
+        claim does not count as an attempt.
+        
+        Returns:
+            False if ``owner`` no longer holds the post
+        """
+        cursor = self.connection.cursor()
+        cursor.execute(
+            """
+            UPDATE scheduled_posts
+            SET status = 'pending', lease_owner = NULL, lease_expires_at = NULL,
+                checkpoint = 'requeued', attempts = MAX(COALESCE(attempts, 1) - 1, 0)
+            WHERE id = ? AND lease_owner = ? AND COALESCE(checkpoint, '') != 'publishing'
+            """,
+            (post_id, owner)
+        )
+        self.connection.commit()
+        return cursor.rowcount == 1
+    
+    @_serialized
+    def defer_claimed_post(
+        self,
+        post_id: int,
+        owner: str,
+        run_at: datetime,
+        message: str,
+        max_attempts: int | None = None,
+    ) -> bool:
+        """
+        Hand a claimed post back to the retry lane, to run again at ``run_at``.
+        
+        Used when the post could not be published for a reason that may
+        clear up by itself (e.g. an expired session). The claim counts as an
+        attempt; the original time is kept in ``requested_time``.
+        
+        Args:
+            post_id: Post to defer
+            owner: Worker holding the post
+            run_at: New scheduled time
+            message: Reason, stored as the result message
+            max_attempts: Refuse once the post was claimed this many times
+            
+        Returns:
+            False if ``owner`` no longer holds the post or it ran out of attempts
+        """
+        query = """
+            UPDATE scheduled_posts
+            SET status = 'pending', lease_owner = NULL, lease_expires_at = NULL,
+                checkpoint = NULL, lane = 'retry', result_message = ?,
+                requested_time = COALESCE(requested_time, scheduled_time),
+                scheduled_time = ?
+            WHERE id = ? AND lease_owner = ?
+            """
+        params = [message, run_at.isoformat(), post_id, owner]
+        if max_attempts is not None:
+            query += " AND COALESCE(attempts, 0) < ?"
+            params.append(max_attempts)
+        cursor = self.connection.cursor()
+        cursor.execute(query, params)
+        self.connection.commit()
+        return cursor.rowcount == 1
+    
+    @_serialized
+    def finish_claimed_post(
+        self,
+        post_id: int,
+        owner: str,
+        status: PostStatusEnum,
+        result_message: str | None = None,
+        post_url: str | None = None,
+    ) -> bool:
+        """
+        Store the result of a claimed post and release its lease.
+        
+        Returns:
+            False if ``owner`` no longer held the post
+        """
+        cursor = self.connection.cursor()
+        cursor.execute(
+            """
+            UPDATE scheduled_posts
+            SET status = ?, result_message = ?, post_url = ?, executed_at = ?,
+                lease_owner = NULL, lease_expires_at = NULL, checkpoint = NULL
+            WHERE id = ? AND lease_owner = ?
+            """,
+            (
+                status.value,
+                result_message,
+                post_url,
+                datetime.now().isoformat(),
+                post_id,
+                owner,
+            )
+        )
+        self.connection.commit()
+        return cursor.rowcount == 1
+    
+    # ==================== Result Operations ====================
+    
+    @_serialized
+    def record_post_results(self, results: list[PostResult]) -> list[PostResult]:
+        """
+        Store many post outcomes and daily counters in one transaction.
+        
+        A result with a lease owner only updates the post while that owner
+        still holds it (and releases the lease); a result without one only
+        updates a post that is still pending.
+        
+        Args:
+            results: Outcomes to store
+            
+        Returns:
+            The results that were applied
+        """
+        cursor = self.connection.cursor()
+        applied = []
+        try:
+            for result in results:
+                if result.post_id is not None:
+                    condition = "lease_owner = ?" if result.owner else "status = 'pending'"
+                    params = [
+                        result.status.value,
+                        result.message,
+                        result.post_url,
+                        result.executed_at.isoformat(),
+                        result.post_id,
+                    ]
+                    if result.owner:
+                        params.append(result.owner)
+                    cursor.execute(
+                        f"""
+                        UPDATE scheduled_posts
+                        SET status = ?, result_message = ?, post_url = ?, executed_at = ?,
+                            lease_owner = NULL, lease_expires_at = NULL, checkpoint = NULL
+                        WHERE id = ? AND {condition}
+                        """,
+                        params
+                    )
+                    if cursor.rowcount != 1:
+                        continue
+                
+                if result.account_id is not None:
+                    succeeded = 1 if result.status == PostStatusEnum.SUCCESS else 0
+                    cursor.execute(
+                        """
+                        INSERT INTO daily_post_counts (day, platform, account_id, succeeded, failed)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT (day, platform, account_id) DO UPDATE SET
+                            succeeded = succeeded + excluded.succeeded,
+                            failed = failed + excluded.failed
+                        """,
+                        (
+                            result.executed_at.date().isoformat(),
+                            result.platform,
+                            result.account_id,
+                            succeeded,
+                            1 - succeeded,
+                        )
+                    )
+                applied.append(result)
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        return applied
+    
+    @_serialized
+    def get_daily_post_counts(self, day: str | None = None) -> list[DailyPostCount]:
+        """
+        Get per-account post counts.
+        
+        Args:
+            day: Only this day (YYYY-MM-DD); all days if None
+        """
+        cursor = self.connection.cursor()
+        if day:
+            cursor.execute(
+                "SELECT * FROM daily_post_counts WHERE day = ? ORDER BY platform, account_id",
+                (day,)
+            )
+        else:
+            cursor.execute("SELECT * FROM daily_post_counts ORDER BY day, platform, account_id")
+        return [
+            DailyPostCount(
+                day=row["day"],
+                platform=row["platform"],
+                account_id=row["account_id"],
+                succeeded=row["succeeded"],
+                failed=row["failed"],
+            )
+            for row in cursor.fetchall()
+        ]
+    
+    # ==================== Recurring Schedule Operations ====================
+    
+    @_serialized
+    def add_recurring_schedule(self, series: RecurringSchedule) -> int:
+        """Add a new recurring schedule."""
+        cursor = self.connection.cursor()
+        cursor.execute(
+            """
+            INSERT INTO recurring_schedules
+            (account_id, platform, cron_expression, kind, content_items,
+             next_index, is_active, next_run_time, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                series.account_id,
+                series.platform,
+                series.cron_expression,
+                series.kind.value,
+                json.dumps(series.content_items),
+                series.next_index,
+                1 if series.is_active else 0,
+                series.next_run_time.isoformat() if series.next_run_time else None,
+                series.created_at.isoformat(),
+            )
+        )
+        self.connection.commit()
+        return cursor.lastrowid
+    
+    @_serialized
+    def get_recurring_schedule(self, series_id: int) -> RecurringSchedule | None:
+        """Get recurring schedule by ID."""
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT * FROM recurring_schedules WHERE id = ?", (series_id,))
+        row = cursor.fetchone()
+        
+        if row:
+            return self._row_to_recurring(row)
+        return None
+    
+    @_serialized
+    def get_active_recurring_schedules(self) -> list[RecurringSchedule]:
+        """Get all active recurring schedules, soonest first."""
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "SELECT * FROM recurring_schedules WHERE is_active = 1 ORDER BY next_run_time"
+        )
+        return [self._row_to_recurring(row) for row in cursor.fetchall()]
+    
+    @_serialized
+    def update_recurring_schedule(self, series: RecurringSchedule) -> bool:
+        """Update a recurring schedule definition."""
+        if series.id is None:
+            return False
+        
+        cursor = self.connection.cursor()
+        cursor.execute(
+            """
+            UPDATE recurring_schedules
+            SET cron_expression = ?, kind = ?, content_items = ?, next_index = ?,
+                is_active = ?, next_run_time = ?
+            WHERE id = ?
+            """,
+            (
+                series.cron_expression,
+                series.kind.value,
+                json.dumps(series.content_items),
+                series.next_index,
+                1 if series.is_active else 0,
+                series.next_run_time.isoformat() if series.next_run_time else None,
+                series.id,
+            )
+        )
+        self.connection.commit()
+        return cursor.rowcount > 0
+    
+    @_serialized
+    def advance_recurring_schedule(
+        self,
+        series_id: int,
+        next_index: int,
+        last_run_time: datetime,
+        next_run_time: datetime | None,
+    ):
+        """Record that a series fired and store its next occurrence."""
+        cursor = self.connection.cursor()
+        cursor.execute(
+            """
+            UPDATE recurring_schedules
+            SET next_index = ?, last_run_time = ?, next_run_time = ?
+            WHERE id = ?
+            """,
+            (
+                next_index,
+                last_run_time.isoformat(),
+                next_run_time.isoformat() if next_run_time else None,
+                series_id,
+            )
+        )
+        self.connection.commit()
+    
+    @_serialized
+    def delete_recurring_schedule(self, series_id: int) -> bool:
+        """Delete a recurring schedule."""
+        cursor = self.connection.cursor()
+        cursor.execute("DELETE FROM recurring_schedules WHERE id = ?", (series_id,))
+        self.connection.commit()
+        return cursor.rowcount > 0
+    
+    def _row_to_recurring(self, row: sqlite3.Row) -> RecurringSchedule:
+        """Convert database row to RecurringSchedule."""
+        return RecurringSchedule(
+            id=row["id"],
+            account_id=row["account_id"],
+            platform=row["platform"],
+            cron_expression=row["cron_expression"],
+            kind=RecurrenceKind(row["kind"] or "cron"),
+            content_items=json.loads(row["content_items"] or "[]"),
+            next_index=row["next_index"] or 0,
+            is_active=bool(row["is_active"]),
+            next_run_time=datetime.fromisoformat(row["next_run_time"]) 
+                          if row["next_run_time"] else None,
+            last_run_time=datetime.fromisoformat(row["last_run_time"]) 
+                          if row["last_run_time"] else None,
+            created_at=datetime.fromisoformat(row["created_at"]),
+        )
+    
+    # ==================== Job Execution Operations ====================
+    
+    @_serialized
+    def add_job_execution(self, execution: JobExecution) -> int:
+        """Record the timings of one job execution."""
+        def iso(value: datetime | None) -> str | None:
+            return value.isoformat() if value else None
+        
+        cursor = self.connection.cursor()
+        cursor.execute(
+            """
+            INSERT INTO job_executions
+            (job_id, post_id, platform, scheduled_time, dequeued_at, started_at,
+             finished_at, status, message)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                execution.job_id,
+                execution.post_id,
+                execution.platform,
+                iso(execution.scheduled_time),
+                iso(execution.dequeued_at),
+                iso(execution.started_at),
+                execution.finished_at.isoformat(),
+                execution.status,
+                execution.message,
+            )
+        )
+        self.connection.commit()
+        return cursor.lastrowid
+    
+    @_serialized
+    def get_job_executions(self, since: datetime | None = None) -> list[JobExecution]:
+        """Get job executions finished after ``since`` (all if None), oldest first."""
+        cursor = self.connection.cursor()
+        if since:
+            cursor.execute(
+                "SELECT * FROM job_executions WHERE finished_at >= ? ORDER BY finished_at",
+                (since.isoformat(),)
+            )
+        else:
+            cursor.execute("SELECT * FROM job_executions ORDER BY finished_at")
+        return [self._row_to_execution(row) for row in cursor.fetchall()]
+    
+    def _row_to_execution(self, row: sqlite3.Row) -> JobExecution:
+        """Convert database row to JobExecution."""
+        def parse(value: str | None) -> datetime | None:
+            return datetime.fromisoformat(value) if value else None
+        
+        return JobExecution(
+            id=row["id"],
+            job_id=row["job_id"],
+            post_id=row["post_id"],
+            platform=row["platform"],
+            scheduled_time=parse(row["scheduled_time"]),
+            dequeued_at=parse(row["dequeued_at"]),
+            started_at=parse(row["started_at"]),
+            finished_at=datetime.fromisoformat(row["finished_at"]),
+            status=row["status"],
+            message=row["message"],
         )
     
     # ==================== Log Operations ====================
     
+    @_serialized
     def add_log(self, entry: LogEntry) -> int:
         """Add a log entry."""
         cursor = self.connection.cursor()
@@ -334,6 +1192,7 @@ class Database:
         self.connection.commit()
         return cursor.lastrowid
     
+    @_serialized
     def get_recent_logs(self, limit: int = 100) -> list[LogEntry]:
         """Get recent log entries."""
         cursor = self.connection.cursor()
@@ -343,6 +1202,7 @@ class Database:
         )
         return [self._row_to_log(row) for row in cursor.fetchall()]
     
+    @_serialized
     def clear_old_logs(self, days: int = 30):
         """Delete logs older than specified days."""
         from datetime import timedelta
@@ -362,6 +1222,7 @@ class Database:
             extra_data=json.loads(row["extra_data"] or "{}"),
         )
     
+    @_serialized
     def close(self):
         """Close database connection."""
         if self._connection:
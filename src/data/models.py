@@ -21,6 +21,12 @@ class PostStatusEnum(Enum):
     CANCELLED = "cancelled"
 
 
+class RecurrenceKind(Enum):
+    """How a recurring schedule picks the content for each occurrence."""
+    CRON = "cron"            # Same content every occurrence
+    EVERGREEN = "evergreen"  # Rotate through a queue of content items
+
+
 @dataclass
 class Account:
     """Social media account."""
@@ -88,6 +94,26 @@ class ScheduledPost:
     post_url: str | None = None
     created_at: datetime = field(default_factory=datetime.now)
     executed_at: datetime | None = None
+    requested_time: datetime | None = None  # Set when the slot allocator shifted the post
+    lease_owner: str | None = None          # Worker currently executing the post
+    lease_expires_at: datetime | None = None
+    attempts: int = 0                       # Number of times the post was claimed
+    checkpoint: str | None = None           # "publishing" or "requeued" (see Database leases)
+    preflight_at: datetime | None = None    # When the pre-flight check last ran
+    preflight_message: str | None = None    # Problems found by it (None if it passed)
+    lane: str = "scheduled"                 # Execution queue lane (see execution_queue.Priority)
+    
+    @property
+    def preflight_failed(self) -> bool:
+        """Whether the last pre-flight check found a problem."""
+        return self.preflight_at is not None and self.preflight_message is not None
+    
+    @property
+    def slot_shift_seconds(self) -> int:
+        """Seconds the post was shifted from its requested time."""
+        if self.requested_time is None:
+            return 0
+        return int((self.scheduled_time - self.requested_time).total_seconds())
     
     def to_dict(self) -> dict:
         """Convert to dictionary for storage."""
@@ -96,12 +122,20 @@ class ScheduledPost:
             "account_id": self.account_id,
             "content": self.content,
             "scheduled_time": self.scheduled_time.isoformat(),
+            "requested_time": self.requested_time.isoformat() if self.requested_time else None,
             "status": self.status.value,
             "media_paths": self.media_paths,
             "result_message": self.result_message,
             "post_url": self.post_url,
             "created_at": self.created_at.isoformat(),
             "executed_at": self.executed_at.isoformat() if self.executed_at else None,
+            "lease_owner": self.lease_owner,
+            "lease_expires_at": self.lease_expires_at.isoformat() if self.lease_expires_at else None,
+            "attempts": self.attempts,
+            "checkpoint": self.checkpoint,
+            "preflight_at": self.preflight_at.isoformat() if self.preflight_at else None,
+            "preflight_message": self.preflight_message,
+            "lane": self.lane,
         }
     
     @classmethod
@@ -120,9 +154,166 @@ class ScheduledPost:
                        if "created_at" in data else datetime.now(),
             executed_at=datetime.fromisoformat(data["executed_at"]) 
                         if data.get("executed_at") else None,
+            requested_time=datetime.fromisoformat(data["requested_time"]) 
+                           if data.get("requested_time") else None,
+            lease_owner=data.get("lease_owner"),
+            lease_expires_at=datetime.fromisoformat(data["lease_expires_at"]) 
+                             if data.get("lease_expires_at") else None,
+            attempts=data.get("attempts", 0),
+            checkpoint=data.get("checkpoint"),
+            preflight_at=datetime.fromisoformat(data["preflight_at"]) 
+                         if data.get("preflight_at") else None,
+            preflight_message=data.get("preflight_message"),
+            lane=data.get("lane", "scheduled"),
         )
 
 
+@dataclass
+class RecurringSchedule:
+    """
+    A recurring post series.
+    
+    Only the next occurrence is stored; it is recomputed from the cron
+    expression each time the series fires.
+    """
+    
+    id: int | None
+    account_id: int
+    platform: str
+    cron_expression: str
+    kind: RecurrenceKind = RecurrenceKind.CRON
+    content_items: list[dict] = field(default_factory=list)
+    next_index: int = 0
+    is_active: bool = True
+    next_run_time: datetime | None = None
+    last_run_time: datetime | None = None
+    created_at: datetime = field(default_factory=datetime.now)
+    
+    def current_item(self) -> dict:
+        """Get the content item for the next occurrence."""
+        if not self.content_items:
+            raise ValueError("Recurring schedule has no content items")
+        if self.kind == RecurrenceKind.EVERGREEN:
+            return self.content_items[self.next_index % len(self.content_items)]
+        return self.content_items[0]
+    
+    def advanced_index(self) -> int:
+        """Get the rotation index to use after the current item was posted."""
+        if self.kind == RecurrenceKind.EVERGREEN and self.content_items:
+            return (self.next_index + 1) % len(self.content_items)
+        return self.next_index
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary for storage."""
+        return {
+            "id": self.id,
+            "account_id": self.account_id,
+            "platform": self.platform,
+            "cron_expression": self.cron_expression,
+            "kind": self.kind.value,
+            "content_items": self.content_items,
+            "next_index": self.next_index,
+            "is_active": self.is_active,
+            "next_run_time": self.next_run_time.isoformat() if self.next_run_time else None,
+            "last_run_time": self.last_run_time.isoformat() if self.last_run_time else None,
+            "created_at": self.created_at.isoformat(),
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "RecurringSchedule":
+        """Create from dictionary."""
+        return cls(
+            id=data.get("id"),
+            account_id=data["account_id"],
+            platform=data["platform"],
+            cron_expression=data["cron_expression"],
+            kind=RecurrenceKind(data.get("kind", "cron")),
+            content_items=data.get("content_items", []),
+            next_index=data.get("next_index", 0),
+            is_active=data.get("is_active", True),
+            next_run_time=datetime.fromisoformat(data["next_run_time"]) 
+                          if data.get("next_run_time") else None,
+            last_run_time=datetime.fromisoformat(data["last_run_time"]) 
+                          if data.get("last_run_time") else None,
+            created_at=datetime.fromisoformat(data["created_at"]) 
+                       if "created_at" in data else datetime.now(),
+        )
+
+
+@dataclass
+class JobExecution:
+    """Timing record of one scheduler job execution."""
+    
+    id: int | None
+    job_id: str
+    platform: str
+    scheduled_time: datetime | None
+    finished_at: datetime
+    status: str
+    post_id: int | None = None
+    dequeued_at: datetime | None = None
+    started_at: datetime | None = None
+    message: str | None = None
+    
+    @property
+    def lateness_seconds(self) -> float | None:
+        """Seconds between the scheduled time and the actual start."""
+        start = self.started_at or self.dequeued_at
+        if self.scheduled_time is None or start is None:
+            return None
+        return (start - self.scheduled_time).total_seconds()
+    
+    @property
+    def duration_seconds(self) -> float | None:
+        """Seconds the job spent running."""
+        if self.started_at is None:
+            return None
+        return (self.finished_at - self.started_at).total_seconds()
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary for storage."""
+        return {
+            "id": self.id,
+            "job_id": self.job_id,
+            "post_id": self.post_id,
+            "platform": self.platform,
+            "scheduled_time": self.scheduled_time.isoformat() if self.scheduled_time else None,
+            "dequeued_at": self.dequeued_at.isoformat() if self.dequeued_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat(),
+            "status": self.status,
+            "message": self.message,
+            "lateness_seconds": self.lateness_seconds,
+            "duration_seconds": self.duration_seconds,
+        }
+
+
+@dataclass
+class PostResult:
+    """Final outcome of a published (or abandoned) post, awaiting storage."""
+    
+    platform: str
+    account_id: int | None
+    status: PostStatusEnum
+    message: str | None = None
+    post_url: str | None = None
+    post_id: int | None = None
+    owner: str | None = None  # Lease owner; None only updates still-pending posts
+    content: str = ""
+    executed_at: datetime = field(default_factory=datetime.now)
+
+
+@dataclass
+class DailyPostCount:
+    """Published and failed posts of one account on one day."""
+    
+    day: str  # YYYY-MM-DD, local time
+    platform: str
+    account_id: int
+    succeeded: int = 0
+    failed: int = 0
+
+
 @dataclass
 class LogEntry:
     """Application log entry."""
@@ -0,0 +1,34 @@
+"""
+GUI Log Handler - Relay log records to Qt widgets.
+
+Kept out of ``src.utils.logger`` so that headless entry points can set up
+logging without importing PyQt5.
+"""
+
+import logging
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class QtLogEmitter(QObject):
+    """Qt object that relays log records via signal across threads."""
+
+    log_message = pyqtSignal(str, str)  # level, formatted message
+
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
+
+
+class GUILogHandler(logging.Handler):
+    """Custom log handler that forwards records through Qt signals."""
+
+    def __init__(self, emitter: QtLogEmitter):
+        super().__init__()
+        self.emitter = emitter
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            msg = self.format(record)
+            self.emitter.log_message.emit(record.levelname, msg)
+        except Exception:
+            self.handleError(record)
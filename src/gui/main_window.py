@@ -8,9 +8,9 @@ from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QStackedWidget, QSplitter, QStatusBar, QMenuBar,
     QMenu, QAction, QMessageBox, QLabel, QPushButton,
-    QFrame
+    QFrame, QApplication
 )
-from PyQt5.QtCore import Qt, QTimer, pyqtSlot
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal, pyqtSlot
 from PyQt5.QtGui import QIcon, QFont
 
 from src.gui.widgets.account_manager import AccountManagerWidget
@@ -19,14 +19,22 @@ from src.gui.widgets.scheduler_widget import SchedulerWidget
 from src.gui.widgets.log_viewer import LogViewerWidget
 from src.gui.widgets.settings_dialog import SettingsDialog
 from src.gui.widgets.simple_connect_dialog import SimpleConnectDialog
-from src.gui.widgets.post_history import PostHistoryWidget, get_post_history
+from src.gui.widgets.scheduler_metrics_dialog import SchedulerMetricsDialog
+from src.gui.widgets.post_history import PostHistoryWidget, PostRecord, get_post_history
 from src.gui.widgets.toast_notifications import (
     toast_success, toast_error, toast_warning, toast_info
 )
 from src.gui.threads.post_thread import FacebookPostWorker
 from src.gui.styles.dark_theme import get_dark_stylesheet
-from src.utils.logger import get_logger, GUILogHandler, QtLogEmitter
+from src.utils.logger import get_logger
+from src.gui.log_handler import GUILogHandler, QtLogEmitter
+from src.config import config
+from src.core.automation_runtime import shutdown_automation_runtime
 from src.core.scheduler import get_scheduler
+from src.core.control_api import start_control_api
+from src.core.preflight import get_preflight_worker
+from src.core.result_recorder import get_result_recorder
+from src.core.slot_allocator import assign_slots
 from src.data.database import get_database
 from src.utils.helpers import contains_video_media
 
@@ -36,11 +44,17 @@ logger = get_logger(__name__)
 class MainWindow(QMainWindow):
     """Main application window."""
     
+    # Batches of stored PostResults, re-emitted on the GUI thread
+    post_results_stored = pyqtSignal(list)
+    # Pre-flight results that changed, re-emitted on the GUI thread
+    preflight_checked = pyqtSignal(list)
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("AIOperator - Social Media Automation")
         self.setMinimumSize(1200, 800)
         self.db = get_database()
+        self.post_workers: set[FacebookPostWorker] = set()
         
         # Apply dark theme
         self.setStyleSheet(get_dark_stylesheet() + """
@@ -63,6 +77,19 @@ class MainWindow(QMainWindow):
         self.scheduler = get_scheduler()
         self.scheduler.start()
         
+        # Local control API for bulk scheduling (API_ENABLED)
+        self.api_server = start_control_api(self.scheduler)
+        
+        # Show scheduled post results as soon as they are stored
+        self.post_results_stored.connect(self._on_post_results_stored)
+        self._results_listener = self.post_results_stored.emit
+        get_result_recorder().add_listener(self._results_listener)
+        
+        # Flag posts that will fail before they fire
+        self.preflight_checked.connect(self._on_preflight_checked)
+        self._preflight_listener = self.preflight_checked.emit
+        get_preflight_worker().add_listener(self._preflight_listener)
+        
         logger.info("AIOperator started successfully")
     
     def _init_menu_bar(self):
@@ -97,6 +124,10 @@ class MainWindow(QMainWindow):
         refresh_action.triggered.connect(self._refresh_data)
         view_menu.addAction(refresh_action)
         
+        metrics_action = QAction("Scheduler &Metrics...", self)
+        metrics_action.triggered.connect(self._show_scheduler_metrics)
+        view_menu.addAction(metrics_action)
+        
         # Help menu
         help_menu = menubar.addMenu("&Help")
         
@@ -230,22 +261,29 @@ class MainWindow(QMainWindow):
         # Use real poster for Facebook
         if platform.lower() == "facebook":
             is_reel = contains_video_media(media_paths)
-            # Create and start background worker
-            self.post_worker = FacebookPostWorker(
+            # Same account (and session) as the scheduled jobs, so they never overlap
+            db_account = self.account_widget.get_db_account(account.platform, account.display_name)
+            
+            # Create and start background worker (kept until it finishes)
+            worker = FacebookPostWorker(
                 content=content,
                 media_paths=media_paths,
                 headless=True,
-                post_type="reel" if is_reel else "feed"
+                post_type="reel" if is_reel else "feed",
+                account_id=db_account.id if db_account else None,
             )
+            # Drop references to finished threads only once they have stopped
+            self.post_workers = {w for w in self.post_workers if w.isRunning()}
+            self.post_workers.add(worker)
             
             # Connect signals
-            self.post_worker.status_update.connect(lambda msg: self.status_label.setText(msg))
-            self.post_worker.finished.connect(lambda success, msg: self._on_post_finished(platform, content, success, msg))
+            worker.status_update.connect(lambda msg: self.status_label.setText(msg))
+            worker.finished.connect(lambda success, msg: self._on_post_finished(platform, content, success, msg))
             
             # Disable post button to prevent double-click
             self.content_editor.post_btn.setEnabled(False)
             
-            self.post_worker.start()
+            worker.start()
         else:
             # For other platforms, just record in history for now
             self.post_history.add_post(platform, content, "success")
@@ -342,14 +380,15 @@ class MainWindow(QMainWindow):
                 media_paths=media_paths or [],
             )
             
-            # Save to database
+            # Spread colliding launch times, then save to database
+            assign_slots(self.db, [post])
             post_id = self.db.add_scheduled_post(post)
             
             # Schedule the job
             job_id = f"post_{post_id}"
             scheduler.schedule_post(
                 job_id=job_id,
-                run_at=scheduled_time,
+                run_at=post.scheduled_time,
                 platform=platform_name,
                 account_id=db_account.id,
                 content=content,
@@ -360,9 +399,9 @@ class MainWindow(QMainWindow):
             self.scheduler_widget.refresh()
             
             self.status_label.setText("Post scheduled")
-            toast_success("Scheduled", f"Post scheduled for {scheduled_time.strftime('%Y-%m-%d %H:%M')}")
+            toast_success("Scheduled", f"Post scheduled for {post.scheduled_time.strftime('%Y-%m-%d %H:%M:%S')}")
             
-            logger.info(f"Successfully scheduled post {post_id} for {scheduled_time}")
+            logger.info(f"Successfully scheduled post {post_id} for {post.scheduled_time}")
             
         except Exception as e:
             self.status_label.setText("Scheduling failed")
@@ -380,6 +419,11 @@ class MainWindow(QMainWindow):
         dialog.account_connected.connect(self.account_widget.refresh)
         dialog.exec_()
     
+    def _show_scheduler_metrics(self):
+        """Show scheduler lateness/duration metrics."""
+        dialog = SchedulerMetricsDialog(self)
+        dialog.exec_()
+    
     def _show_about(self):
         """Show about dialog."""
         QMessageBox.about(
@@ -399,8 +443,49 @@ class MainWindow(QMainWindow):
         self.status_label.setText("Refreshed")
         logger.info("Data refreshed")
     
+    @pyqtSlot(list)
+    def _on_post_results_stored(self, results: list):
+        """Update history and the schedule table for newly finished posts."""
+        self.post_history.add_posts([
+            PostRecord(
+                platform=r.platform,
+                content=r.content,
+                posted_at=r.executed_at,
+                status="success" if r.status.value == "success" else "failed",
+            )
+            for r in results
+        ])
+        self.scheduler_widget.remove_posts({r.post_id for r in results if r.post_id is not None})
+        
+        failed = sum(1 for r in results if r.status.value != "success")
+        self.status_label.setText(
+            f"{len(results) - failed} scheduled post(s) published, {failed} failed"
+        )
+    
+    @pyqtSlot(list)
+    def _on_preflight_checked(self, results: list):
+        """Flag scheduled posts whose pre-flight check found problems."""
+        self.scheduler_widget.update_preflight(results)
+        
+        failing = [r for r in results if not r.ok]
+        if failing:
+            self.status_label.setText(f"Pre-flight: {len(failing)} scheduled post(s) need attention")
+            toast_warning(
+                "Pre-flight Check",
+                failing[0].message if len(failing) == 1
+                else f"{len(failing)} posts due soon will fail; see the schedule list",
+            )
+    
     def closeEvent(self, event):
         """Handle window close."""
-        self.scheduler.stop()
+        # Bounded drain: unstarted posts are requeued for the next launch
+        self.status_label.setText("Finishing in-flight posts...")
+        QApplication.processEvents()
+        if self.api_server is not None:
+            self.api_server.stop()
+        get_result_recorder().remove_listener(self._results_listener)
+        get_preflight_worker().remove_listener(self._preflight_listener)
+        self.scheduler.stop(drain_timeout=config.scheduler.drain_timeout)
+        shutdown_automation_runtime()
         logger.info("AIOperator shutting down")
         event.accept()
@@ -0,0 +1,35 @@
+"""
+Worker thread for capturing an account's browser session.
+"""
+
+import logging
+from PyQt5.QtCore import QThread, pyqtSignal
+from src.core.automation_runtime import get_automation_runtime
+from src.core.browser_session_manager import get_session_manager
+
+logger = logging.getLogger(__name__)
+
+class SessionLoginWorker(QThread):
+    """
+    Worker thread for logging one account in.
+
+    Opens a visible browser on the platform's login page and saves the
+    session under the account, so its scheduled posts use that identity.
+    """
+
+    finished = pyqtSignal(bool, str)  # (success, message)
+
+    def __init__(self, platform: str, account_id: int | None):
+        super().__init__()
+        self.platform = platform
+        self.account_id = account_id
+
+    def run(self):
+        try:
+            success, message = get_automation_runtime().run(
+                get_session_manager().authenticate(self.platform, headless=False, account=self.account_id)
+            )
+        except Exception as e:
+            logger.exception(f"Login of {self.platform} account {self.account_id} failed: {e}")
+            success, message = False, f"Login failed: {e}"
+        self.finished.emit(success, message)
@@ -3,54 +3,106 @@ Worker threads for social media posting to prevent GUI hanging.
 """
 
 import logging
+from concurrent.futures import CancelledError, Future
 from PyQt5.QtCore import QThread, pyqtSignal
+from src.config import config
+from src.core.execution_queue import Priority, QueueTimeoutError, get_execution_queue, post_key
 from src.core.social_poster import get_poster
 from src.utils.helpers import extract_video_paths
 
 logger = logging.getLogger(__name__)
 
 class FacebookPostWorker(QThread):
-    """Worker thread for Facebook posting."""
+    """
+    Worker thread for Facebook posting.
+    
+    The post itself runs in the shared execution queue's interactive lane, so
+    it jumps ahead of scheduled work but still respects the global and
+    per-account concurrency limits. The browser work runs on the shared
+    automation runtime; ``cancel`` aborts it.
+    """
     
     finished = pyqtSignal(bool, str)  # (success, message)
     status_update = pyqtSignal(str)   # Status message for UI
     
-    def __init__(self, content, media_paths=None, headless=True, post_type: str = "feed"):
+    def __init__(
+        self,
+        content,
+        media_paths=None,
+        headless=True,
+        post_type: str = "feed",
+        account_id: int | None = None,
+    ):
         super().__init__()
         self.content = content
         self.media_paths = media_paths or []
         self.headless = headless
         self.post_type = post_type
+        self.account_id = account_id
+        self._automation: Future | None = None
+        self._cancelled = False
+    
+    def cancel(self):
+        """Abort the post if it has not finished."""
+        self._cancelled = True
+        if self._automation is not None:
+            self._automation.cancel()
         
     def run(self):
-        """Execute posting in background thread."""
+        """Queue the post as interactive and wait for its result."""
         try:
-            self.status_update.emit("Starting browser...")
-            logger.info("Worker thread starting social poster...")
-            poster = get_poster()
-
-            if self.post_type == "reel":
-                video_paths = extract_video_paths(self.media_paths)
-                if not video_paths:
-                    msg = "Reels require at least one video file"
-                    logger.error(msg)
-                    self.finished.emit(False, msg)
-                    return
-                success, message = poster.post_to_facebook_reel(
-                    content=self.content,
-                    media_paths=video_paths,
-                    headless=self.headless
-                )
-            else:
-                # Standard feed post
-                success, message = poster.post_to_facebook(
-                    content=self.content,
-                    media_paths=self.media_paths,
-                    headless=self.headless
-                )
-            
+            self.status_update.emit("Queued...")
+            future = get_execution_queue().submit(
+                self._publish,
+                priority=Priority.INTERACTIVE,
+                key=post_key("facebook", self.account_id),
+                timeout=config.scheduler.interactive_max_wait,
+            )
+            success, message = future.result()
             logger.info(f"Worker thread finished with success={success}")
             self.finished.emit(success, message)
+        except QueueTimeoutError as e:
+            logger.error(f"Post was not started in time: {e}")
+            self.finished.emit(False, f"Posting is busy, try again later ({e})")
+        except CancelledError:
+            logger.info("Post cancelled")
+            self.finished.emit(False, "Post cancelled")
         except Exception as e:
             logger.exception(f"CRITICAL Worker error: {e}")
             self.finished.emit(False, f"Internal Error: {str(e)}")
+    
+    def _publish(self) -> tuple[bool, str]:
+        """Publish the post (runs in an execution queue thread)."""
+        if self._cancelled:
+            raise CancelledError()
+        self.status_update.emit("Starting browser...")
+        logger.info("Worker thread starting social poster...")
+        poster = get_poster()
+
+        if self.post_type == "reel":
+            video_paths = extract_video_paths(self.media_paths)
+            if not video_paths:
+                msg = "Reels require at least one video file"
+                logger.error(msg)
+                return False, msg
+            return self._wait(poster.submit_to_facebook_reel(
+                content=self.content,
+                media_paths=video_paths,
+                headless=self.headless,
+                account=self.account_id,
+            ))
+
+        # Standard feed post
+        return self._wait(poster.submit_to_facebook(
+            content=self.content,
+            media_paths=self.media_paths,
+            headless=self.headless,
+            account=self.account_id,
+        ))
+    
+    def _wait(self, future: Future) -> tuple[bool, str]:
+        """Wait for the automation runtime to finish the post."""
+        self._automation = future
+        if self._cancelled:
+            future.cancel()
+        return future.result()
@@ -8,9 +8,13 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem,
     QPushButton, QLabel, QMessageBox
 )
-from PyQt5.QtCore import pyqtSignal, Qt
+from PyQt5.QtCore import pyqtSignal, Qt, QTimer
 
+from src.config import config
 from src.core.browser_connect import get_browser_connect, SocialPlatform, PLATFORM_CONFIG
+from src.core.session_probe import get_session_probe
+from src.data.database import get_database
+from src.gui.threads.login_thread import SessionLoginWorker
 from src.gui.widgets.simple_connect_dialog import SimpleConnectDialog
 from src.gui.widgets.toast_notifications import toast_success, toast_error
 from src.gui.widgets.platform_icons import get_platform_icon
@@ -28,8 +32,14 @@ class AccountManagerWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.connector = get_browser_connect()
+        self.login_worker: SessionLoginWorker | None = None
         self._init_ui()
         self.refresh()
+        
+        # Session checks run in the background; show their latest verdicts
+        self._health_timer = QTimer(self)
+        self._health_timer.timeout.connect(self._show_session_health)
+        self._health_timer.start(30000)
     
     def _init_ui(self):
         """Initialize the UI."""
@@ -72,6 +82,13 @@ class AccountManagerWidget(QWidget):
         self.add_button.clicked.connect(self._show_connect_dialog)
         button_layout.addWidget(self.add_button)
         
+        self.login_button = QPushButton("🔑 Log in")
+        self.login_button.setMinimumHeight(36)
+        self.login_button.setToolTip("Log the selected account in and save its browser session")
+        self.login_button.clicked.connect(self._log_in_account)
+        self.login_button.setEnabled(False)
+        button_layout.addWidget(self.login_button)
+        
         self.remove_button = QPushButton("Remove")
         self.remove_button.setMinimumHeight(36)
         self.remove_button.clicked.connect(self._remove_account)
@@ -99,14 +116,40 @@ class AccountManagerWidget(QWidget):
                 item.setData(Qt.UserRole + 1, idx)
                 self.account_list.addItem(item)
             
+            self._show_session_health()
+            
             # Auto-select first account if nothing is selected
             if self.account_list.count() > 0:
                 self.account_list.setCurrentRow(0)
                 self.remove_button.setEnabled(True)
+                self.login_button.setEnabled(True)
         
         # If still no selection (e.g. empty list), disable remove button
         if not self.account_list.currentItem() or self.account_list.currentItem().text() == "No accounts connected":
             self.remove_button.setEnabled(False)
+            self.login_button.setEnabled(False)
+    
+    def _show_session_health(self):
+        """Mark accounts whose saved browser session failed its last check or expires soon."""
+        probe = get_session_probe()
+        for row in range(self.account_list.count()):
+            item = self.account_list.item(row)
+            platform = item.data(Qt.UserRole)
+            if not platform:
+                continue
+            name = item.text().split("  ⚠", 1)[0]
+            db_account = self.get_db_account(platform, name)
+            health = probe.cached(platform.value, db_account.id if db_account else None)
+            if health is not None and health.valid is False:
+                item.setText(f"{name}  ⚠ session expired")
+                item.setToolTip(f"Saved session is no longer valid ({health.reason}); log in again")
+            elif health is not None and health.expires_in_hours is not None \
+                    and health.expires_in_hours < config.browser.session_expiry_warning_hours:
+                item.setText(f"{name}  ⚠ session expires soon")
+                item.setToolTip(f"Saved session expires in {health.expires_in_hours:.0f} h; log in again before then")
+            else:
+                item.setText(name)
+                item.setToolTip("")
     
     def _on_item_clicked(self, item: QListWidgetItem):
         """Handle account item click."""
@@ -115,6 +158,7 @@ class AccountManagerWidget(QWidget):
             idx = item.data(Qt.UserRole + 1)
             self.account_selected.emit(idx if idx else 0)
             self.remove_button.setEnabled(True)
+            self.login_button.setEnabled(True)
     
     def get_selected_account(self):
         """Get the currently selected account."""
@@ -128,6 +172,42 @@ class AccountManagerWidget(QWidget):
                         return acc
         return None
     
+    def get_db_account(self, platform: SocialPlatform, display_name: str):
+        """
+        Get the database account a connected account schedules with.
+        
+        Matched by name; if none matches, the platform's only account.
+        """
+        accounts = get_database().get_accounts_by_platform(platform.value)
+        for acc in accounts:
+            if acc.username.lower() == display_name.lower():
+                return acc
+        return accounts[0] if len(accounts) == 1 else None
+    
+    def _log_in_account(self):
+        """Log the selected account in and save its browser session."""
+        account = self.get_selected_account()
+        if not account or (self.login_worker is not None and self.login_worker.isRunning()):
+            return
+        db_account = self.get_db_account(account.platform, account.display_name)
+        if db_account is None:
+            toast_error("Log In Failed", f"No scheduling account found for {account.display_name}")
+            return
+        
+        self.login_button.setEnabled(False)
+        self.login_worker = SessionLoginWorker(account.platform.value, db_account.id)
+        self.login_worker.finished.connect(self._on_login_finished)
+        self.login_worker.start()
+    
+    def _on_login_finished(self, success: bool, message: str):
+        """Handle the end of a login."""
+        self.login_button.setEnabled(True)
+        if success:
+            toast_success("Logged In", message)
+            self._show_session_health()
+        else:
+            toast_error("Log In Failed", message)
+    
     def _show_connect_dialog(self):
         """Show dialog to connect new account."""
         dialog = SimpleConnectDialog(self)
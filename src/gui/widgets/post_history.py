@@ -104,6 +104,15 @@ class PostHistoryManager:
         self._save()
         return record
     
+    def add_posts(self, records: list[PostRecord]):
+        """Add several records (newest last) with a single save."""
+        if not records:
+            return
+        
+        self.records[:0] = sorted(records, key=lambda r: r.posted_at, reverse=True)
+        self.records = self.records[:self.MAX_RECORDS]
+        self._save()
+    
     def get_recent(self, limit: int = 20) -> list[PostRecord]:
         """Get recent posts."""
         return self.records[:limit]
@@ -256,3 +265,8 @@ class PostHistoryWidget(QWidget):
         """Add a new post and refresh."""
         self.history.add_post(platform, content, status)
         self.refresh()
+    
+    def add_posts(self, records: list[PostRecord]):
+        """Add several posts and refresh once."""
+        self.history.add_posts(records)
+        self.refresh()
@@ -0,0 +1,123 @@
+"""
+Scheduler Metrics Dialog - Per-platform lateness and duration percentiles.
+"""
+
+from datetime import datetime, timedelta
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog, QMessageBox
+)
+from PyQt5.QtCore import Qt
+
+from src.config import PROJECT_ROOT
+from src.core.scheduler_metrics import get_execution_stats, export_execution_metrics
+from src.utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+PERIODS = [
+    ("Last 24 hours", timedelta(days=1)),
+    ("Last 7 days", timedelta(days=7)),
+    ("Last 30 days", timedelta(days=30)),
+    ("All time", None),
+]
+
+COLUMNS = [
+    "Platform", "Runs", "Failed", "Skipped", "Requeued", "Retry",
+    "Late p50", "Late p95", "Late p99",
+    "Duration p50", "Duration p95", "Duration p99",
+]
+
+
+class SchedulerMetricsDialog(QDialog):
+    """Shows how late and how long scheduled jobs run, per platform."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Scheduler Metrics")
+        self.setMinimumSize(720, 320)
+        self._init_ui()
+        self.refresh()
+
+    def _init_ui(self):
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Period:"))
+        self.period_combo = QComboBox()
+        for label, _ in PERIODS:
+            self.period_combo.addItem(label)
+        self.period_combo.setCurrentIndex(1)
+        self.period_combo.currentIndexChanged.connect(self.refresh)
+        controls.addWidget(self.period_combo)
+        controls.addStretch()
+
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self.refresh)
+        controls.addWidget(refresh_btn)
+
+        export_btn = QPushButton("Export CSV...")
+        export_btn.clicked.connect(self._export_csv)
+        controls.addWidget(export_btn)
+        layout.addLayout(controls)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        layout.addWidget(self.table)
+
+        hint = QLabel("Times in seconds. Lateness is start time minus scheduled time; "
+                       "percentiles cover posts that succeeded or failed.")
+        hint.setStyleSheet("color: #888;")
+        layout.addWidget(hint)
+
+    def _since(self) -> datetime | None:
+        """Start of the selected period."""
+        _, span = PERIODS[self.period_combo.currentIndex()]
+        return datetime.now() - span if span else None
+
+    def refresh(self):
+        """Reload stats for the selected period."""
+        try:
+            stats = get_execution_stats(self._since())
+        except Exception as e:
+            logger.error(f"Failed to load scheduler metrics: {e}")
+            stats = []
+
+        self.table.setRowCount(len(stats))
+        for row, s in enumerate(stats):
+            values = [
+                s.platform, s.runs, s.failures, s.skipped, s.requeued, s.retries,
+                s.lateness_p50, s.lateness_p95, s.lateness_p99,
+                s.duration_p50, s.duration_p95, s.duration_p99,
+            ]
+            for col, value in enumerate(values):
+                if isinstance(value, float):
+                    text = f"{value:.1f}"
+                elif value is None:
+                    text = "-"
+                else:
+                    text = str(value)
+                item = QTableWidgetItem(text)
+                if col > 0:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, col, item)
+
+    def _export_csv(self):
+        """Export raw execution records to a CSV file."""
+        default = PROJECT_ROOT / "data" / "scheduler_metrics.csv"
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Scheduler Metrics", str(default), "CSV Files (*.csv)"
+        )
+        if not path:
+            return
+        try:
+            count = export_execution_metrics(path, self._since())
+            QMessageBox.information(self, "Export Complete", f"Exported {count} executions.")
+        except Exception as e:
+            QMessageBox.critical(self, "Export Failed", str(e))
@@ -40,7 +40,9 @@ def _bind_calendar_button(button: QPushButton, datetime_edit: QDateTimeEdit):
 
 from src.data.database import get_database
 from src.data.models import ScheduledPost, PostStatusEnum
+from src.core.execution_queue import Priority, lane_priority
 from src.core.scheduler import get_scheduler
+from src.core.slot_allocator import assign_slots
 from src.core.llm_client import LLMClient, Platform
 from src.core.browser_connect import get_browser_connect
 from src.gui.widgets.platform_icons import get_platform_icon
@@ -835,55 +837,56 @@ class SchedulerWidget(QWidget):
         else:
             return
         
+        items = []
         for file_path in files:
             # Auto-schedule for 1 hour from now
             scheduled_time = datetime.now() + timedelta(hours=1)
             
             # Create data dict for auto-scheduling
-            data = {
+            items.append({
                 "file_path": str(file_path),
                 "platform": acc.platform,
                 "account_id": acc.id,
                 "title": file_path.stem.replace('_', ' ').replace('-', ' '),
                 "description": f"Auto-scheduled: {file_path.name}",
                 "scheduled_time": scheduled_time,
-            }
-            
-            self._create_scheduled_post(data)
+            })
+        
+        # Save and register all files in one batch, behind regular scheduled posts
+        self._create_scheduled_posts(items, priority=Priority.BULK)
         
         logger.info(f"Auto-scheduled {len(files)} file(s)")
         QMessageBox.information(self, "Files Added", f"{len(files)} file(s) scheduled for 1 hour from now.")
     
     def _create_scheduled_post(self, data: dict):
         """Create a new scheduled post."""
-        db = get_database()
-        
-        content = data.get("title", "")
-        if data.get("description"):
-            content = f"{content}\n\n{data['description']}" if content else data["description"]
-        
-        post = ScheduledPost(
-            id=None,
-            account_id=data["account_id"],
-            content=content,
-            scheduled_time=data["scheduled_time"],
-            media_paths=[data["file_path"]] if data.get("file_path") else [],
-        )
+        self._create_scheduled_posts([data])
+    
+    def _create_scheduled_posts(self, items: list[dict], priority: Priority = Priority.SCHEDULED):
+        """Create scheduled posts in one database and scheduler batch."""
+        if not items:
+            return
         
-        post_id = db.add_scheduled_post(post)
-        
-        # Register with scheduler
-        scheduler = get_scheduler()
-        scheduler.schedule_post(
-            job_id=f"post_{post_id}",
-            run_at=data["scheduled_time"],
-            platform=data["platform"],
-            account_id=data["account_id"],
-            content=content,
-            media_paths=post.media_paths,
-        )
+        db = get_database()
         
-        logger.info(f"Scheduled post for {data['scheduled_time']}")
+        posts = []
+        for data in items:
+            content = data.get("title", "")
+            if data.get("description"):
+                content = f"{content}\n\n{data['description']}" if content else data["description"]
+            
+            posts.append(ScheduledPost(
+                id=None,
+                account_id=data["account_id"],
+                content=content,
+                scheduled_time=data["scheduled_time"],
+                media_paths=[data["file_path"]] if data.get("file_path") else [],
+            ))
+        
+        # Spread launch times, save and register with the scheduler in one batch
+        get_scheduler().add_posts(posts, [data["platform"] for data in items], priority=priority, db=db)
+        
+        logger.info(f"Scheduled {len(posts)} post(s)")
         self.refresh()
     
     def refresh(self):
@@ -921,9 +924,15 @@ class SchedulerWidget(QWidget):
             content_item.setToolTip(post.content)  # Full content on hover
             self.schedule_table.setItem(row, 1, content_item)
             
-            # Scheduled time - formatted nicely
+            # Scheduled time - formatted nicely (adjusted slot if it was spread)
             time_str = post.scheduled_time.strftime("%b %d, %Y  %I:%M %p")
             time_item = QTableWidgetItem(time_str)
+            if post.slot_shift_seconds:
+                time_item.setText(f"{time_str}  ↷")
+                time_item.setToolTip(
+                    f"Requested {post.requested_time.strftime('%b %d, %Y  %I:%M:%S %p')}, "
+                    f"shifted +{post.slot_shift_seconds}s to avoid launch collisions"
+                )
             self.schedule_table.setItem(row, 2, time_item)
             
             # Status with colored indicator
@@ -935,6 +944,8 @@ class SchedulerWidget(QWidget):
                 status_item.setForeground(Qt.green)
             elif status_text.lower() == "failed":
                 status_item.setForeground(Qt.red)
+            if post.preflight_at is not None:
+                self._show_preflight(status_item, post.preflight_message)
             self.schedule_table.setItem(row, 3, status_item)
             
             # Media count
@@ -998,6 +1009,36 @@ class SchedulerWidget(QWidget):
             # Store post ID for actions
             self.schedule_table.item(row, 0).setData(Qt.UserRole, post.id)
     
+    def remove_posts(self, post_ids: set[int]):
+        """Drop rows of posts that are no longer pending, without a full reload."""
+        for row in reversed(range(self.schedule_table.rowCount())):
+            item = self.schedule_table.item(row, 0)
+            if item is not None and item.data(Qt.UserRole) in post_ids:
+                self.schedule_table.removeRow(row)
+        
+        if self.schedule_table.rowCount() == 0:
+            self.watermark_label.show()
+    
+    def update_preflight(self, results: list):
+        """Flag the rows of posts whose pre-flight outcome changed."""
+        messages = {r.post_id: r.message for r in results}
+        for row in range(self.schedule_table.rowCount()):
+            item = self.schedule_table.item(row, 0)
+            status_item = self.schedule_table.item(row, 3)
+            if item is not None and status_item is not None and item.data(Qt.UserRole) in messages:
+                self._show_preflight(status_item, messages[item.data(Qt.UserRole)])
+    
+    def _show_preflight(self, status_item: QTableWidgetItem, message: str | None):
+        """Show a pending post's pre-flight outcome in its status cell."""
+        if message:
+            status_item.setText("  Pending ⚠")
+            status_item.setForeground(Qt.red)
+            status_item.setToolTip(f"Pre-flight check failed: {message}")
+        else:
+            status_item.setText("  Ready")
+            status_item.setForeground(Qt.green)
+            status_item.setToolTip("Pre-flight check passed")
+    
     def _remove_selected(self):
         """Remove selected scheduled posts and delete their files."""
         rows = set(item.row() for item in self.schedule_table.selectedItems())
@@ -1100,8 +1141,10 @@ class SchedulerWidget(QWidget):
             # Update the post in database
             post.content = updated_data["content"]
             post.scheduled_time = updated_data["scheduled_time"]
+            post.requested_time = None
             
-            # Update database
+            # Spread against other scheduled posts, then update database
+            assign_slots(db, [post])
             db.update_scheduled_post(post)
             
             # Reschedule the job
@@ -1113,11 +1156,12 @@ class SchedulerWidget(QWidget):
             
             scheduler.schedule_post(
                 job_id=f"post_{post_id}",
-                run_at=updated_data["scheduled_time"],
+                run_at=post.scheduled_time,
                 platform=platform_name,
                 account_id=post.account_id,
                 content=updated_data["content"],
                 media_paths=post.media_paths or [],
+                priority=lane_priority(post.lane),
             )
             
             from src.gui.widgets.toast_notifications import toast_success
@@ -85,12 +85,12 @@ class AuthenticationError(AIOperatorError):
         message: str = "Authentication failed",
         **kwargs
     ):
+        kwargs.setdefault("recovery_hint", "Check credentials and try logging in again")
         super().__init__(
             message=f"{platform}: {message}",
             category=ErrorCategory.AUTHENTICATION,
             severity=ErrorSeverity.HIGH,
             details={"platform": platform},
-            recovery_hint="Check credentials and try logging in again",
             **kwargs
         )
 
@@ -98,11 +98,11 @@ class AuthenticationError(AIOperatorError):
 class SessionExpiredError(AuthenticationError):
     """Session has expired and needs re-authentication."""
     
-    def __init__(self, platform: str, **kwargs):
+    def __init__(self, platform: str, message: str = "Session expired", **kwargs):
+        kwargs.setdefault("recovery_hint", "Please log in again to refresh your session")
         super().__init__(
             platform=platform,
-            message="Session expired",
-            recovery_hint="Please log in again to refresh your session",
+            message=message,
             **kwargs
         )
 
@@ -146,6 +146,27 @@ def extract_video_paths(media_paths: Iterable[str | Path]) -> list[str]:
     return video_files
 
 
+def percentile(values: Iterable[float], pct: float) -> float | None:
+    """
+    Compute a percentile using linear interpolation.
+    
+    Args:
+        values: Sample values
+        pct: Percentile between 0 and 100
+        
+    Returns:
+        Percentile value, or None if there are no samples
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    
+    rank = (len(ordered) - 1) * (pct / 100)
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
 def truncate_text(text: str, max_length: int, suffix: str = "...") -> str:
     """
     Truncate text to a maximum length.
@@ -9,8 +9,6 @@ import sys
 from pathlib import Path
 from logging.handlers import RotatingFileHandler
 
-from PyQt5.QtCore import QObject, pyqtSignal
-
 from src.config import config
 
 
@@ -79,26 +77,3 @@ def get_logger(name: str) -> logging.Logger:
     """
     return logging.getLogger(name)
 
-
-class QtLogEmitter(QObject):
-    """Qt object that relays log records via signal across threads."""
-
-    log_message = pyqtSignal(str, str)  # level, formatted message
-
-    def __init__(self, parent: QObject | None = None):
-        super().__init__(parent)
-
-
-class GUILogHandler(logging.Handler):
-    """Custom log handler that forwards records through Qt signals."""
-
-    def __init__(self, emitter: QtLogEmitter):
-        super().__init__()
-        self.emitter = emitter
-
-    def emit(self, record: logging.LogRecord):
-        try:
-            msg = self.format(record)
-            self.emitter.log_message.emit(record.levelname, msg)
-        except Exception:
-            self.handleError(record)
@@ -165,3 +165,956 @@ class TestFailureScenarios:
         error = RateLimitError("facebook", retry_after=60)
         assert error.details["retry_after"] == 60
         assert "60" in error.recovery_hint
+
+
+class _FakeContext:
+    """Playwright BrowserContext stand-in."""
+    
+    def __init__(self, options=None):
+        self.options = options or {}
+        self.pages = []
+        self.closed = False
+    
+    async def cookies(self):
+        return self.options.get("storage_state", {}).get("cookies", [])
+    
+    async def new_page(self):
+        page = MagicMock()
+        
+        async def close():
+            self.pages.remove(page)
+        
+        page.close = close
+        self.pages.append(page)
+        return page
+    
+    async def close(self):
+        self.closed = True
+
+
+class _FakeBrowser:
+    """Playwright Browser stand-in."""
+    
+    def __init__(self):
+        self.contexts = []
+        self.closed = False
+    
+    def is_connected(self):
+        return not self.closed
+    
+    async def new_context(self, **options):
+        context = _FakeContext(options)
+        self.contexts.append(context)
+        return context
+    
+    async def close(self):
+        self.closed = True
+
+
+class _FakePlaywright:
+    """Playwright stand-in that counts browser launches."""
+    
+    def __init__(self):
+        self.browsers = []
+        self.chromium = self
+    
+    async def launch(self, **options):
+        browser = _FakeBrowser()
+        self.browsers.append(browser)
+        return browser
+    
+    async def stop(self):
+        pass
+
+
+class TestBrowserPool:
+    """Test the warm Playwright browser pool."""
+    
+    @pytest.fixture
+    def pool(self):
+        """Create a pool backed by a fake Playwright driver."""
+        from src.core.browser_pool import BrowserPool
+        
+        pool = BrowserPool(max_browsers=1, max_uses=3, max_memory_mb=0, idle_timeout=0)
+        pool._playwright = _FakePlaywright()
+        yield pool
+        pool.shutdown()
+    
+    @staticmethod
+    async def _open_page(pool, key):
+        from src.core.browser_pool import LaunchSpec
+        
+        async with pool.context(key, LaunchSpec()) as context:
+            await context.new_page()
+            return context
+    
+    def test_consecutive_posts_reuse_browser_and_context(self, pool):
+        """Test that one account's posts share a warm browser and context."""
+        first = pool.run(self._open_page(pool, "facebook"))
+        second = pool.run(self._open_page(pool, "facebook"))
+        other = pool.run(self._open_page(pool, "facebook:2"))
+        
+        assert len(pool._playwright.browsers) == 1
+        assert first is second
+        assert other is not first
+        assert first.pages == []  # Pages are closed on release
+    
+    def test_browser_is_recycled_after_max_uses(self, pool):
+        """Test that a worn-out browser is closed and replaced."""
+        contexts = [pool.run(self._open_page(pool, "facebook")) for _ in range(4)]
+        
+        browsers = pool._playwright.browsers
+        assert len(browsers) == 2
+        assert browsers[0].closed and not browsers[1].closed
+        assert contexts[3] is not contexts[0]
+    
+    def test_browser_is_recycled_above_memory_limit(self, pool, monkeypatch):
+        """Test that a browser using too much memory is replaced."""
+        from src.core import browser_pool
+        
+        async def memory(browser):
+            return 2000.0
+        
+        monkeypatch.setattr(browser_pool, "browser_memory_mb", memory)
+        pool.max_uses = 0
+        pool.max_memory_mb = 1500
+        pool.run(self._open_page(pool, "facebook"))
+        pool.run(self._open_page(pool, "facebook"))
+        
+        assert len(pool._playwright.browsers) == 2
+        assert pool._playwright.browsers[0].closed
+    
+    def test_idle_contexts_and_browsers_are_closed(self, pool):
+        """Test that the idle sweep closes unused contexts and browsers."""
+        context = pool.run(self._open_page(pool, "facebook"))
+        
+        pool.run(pool.reap_idle())
+        
+        assert context.closed
+        assert pool._playwright.browsers[0].closed
+        assert pool._browsers == []
+
+
+class TestAutomationRuntime:
+    """Test the shared asyncio loop for Playwright work."""
+    
+    @pytest.fixture
+    def runtime(self):
+        """Create a runtime and stop it afterwards."""
+        from src.core.automation_runtime import AutomationRuntime
+        
+        runtime = AutomationRuntime()
+        yield runtime
+        runtime.shutdown()
+    
+    def test_posts_run_concurrently_on_one_loop(self, runtime):
+        """Test that submitted coroutines share one loop and overlap."""
+        import asyncio
+        
+        loops = []
+        
+        async def post(name, arrived, other):
+            loops.append(asyncio.get_running_loop())
+            arrived.set()
+            await asyncio.wait_for(other.wait(), 5)  # Only finishes if both run at once
+            return name
+        
+        async def events():
+            return asyncio.Event(), asyncio.Event()
+        
+        first, second = runtime.run(events())
+        futures = [runtime.submit(post("a", first, second)), runtime.submit(post("b", second, first))]
+        
+        assert [f.result(5) for f in futures] == ["a", "b"]
+        assert loops[0] is loops[1]
+    
+    def test_cancelling_the_handle_cancels_the_coroutine(self, runtime):
+        """Test that a sync caller can abort a running coroutine."""
+        import asyncio
+        import threading
+        from concurrent.futures import CancelledError
+        
+        started = threading.Event()
+        cleaned_up = threading.Event()
+        
+        async def long_post():
+            started.set()
+            try:
+                await asyncio.sleep(60)
+            finally:
+                cleaned_up.set()
+        
+        future = runtime.submit(long_post())
+        assert started.wait(5)
+        future.cancel()
+        
+        with pytest.raises(CancelledError):
+            future.result(5)
+        assert cleaned_up.wait(5)
+    
+    def test_run_from_the_loop_is_rejected(self, runtime):
+        """Test that blocking on the runtime from its own loop fails fast."""
+        async def nested():
+            async def noop():
+                return 1
+            runtime.run(noop())
+        
+        with pytest.raises(RuntimeError):
+            runtime.run(nested(), timeout=5)
+    
+    def test_shutdown_cancels_work_and_runs_hooks(self, runtime):
+        """Test that shutdown stops running posts before the hooks close browsers."""
+        import asyncio
+        import threading
+        
+        started = threading.Event()
+        order = []
+        
+        async def long_post():
+            started.set()
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                order.append("cancelled")
+                raise
+        
+        async def hook():
+            order.append("hook")
+        
+        runtime.add_shutdown_hook(hook)
+        future = runtime.submit(long_post())
+        assert started.wait(5)
+        runtime.shutdown()
+        
+        assert future.cancelled()
+        assert order == ["cancelled", "hook"]
+        assert not runtime.running
+
+
+class _FakeLocator:
+    """Playwright Locator stand-in matching any of its selectors."""
+    
+    def __init__(self, page, selectors):
+        self.page = page
+        self.selectors = selectors
+        self.first = self
+    
+    def or_(self, other):
+        return _FakeLocator(self.page, self.selectors + other.selectors)
+    
+    async def is_visible(self):
+        return any(selector in self.page.visible for selector in self.selectors)
+    
+    async def wait_for(self, state="visible", timeout=30000):
+        import asyncio
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout / 1000
+        while not await self.is_visible():
+            if loop.time() >= deadline:
+                raise PlaywrightTimeoutError(f"Timeout {timeout}ms exceeded")
+            await asyncio.sleep(0.01)
+
+
+class _FakePage:
+    """Playwright Page stand-in whose elements appear when made visible."""
+    
+    def __init__(self):
+        self.visible = set()
+    
+    def locator(self, selector):
+        return _FakeLocator(self, [selector])
+
+
+class TestWaits:
+    """Test the condition-driven waits of the posting flows."""
+    
+    def test_wait_returns_once_element_appears(self):
+        """Test that a wait ends when the condition holds, not at its ceiling."""
+        import asyncio
+        import time
+        from src.core.waits import wait_for_visible
+        
+        page = _FakePage()
+        
+        async def scenario():
+            asyncio.get_running_loop().call_later(0.05, page.visible.add, "div[role='feed']")
+            return await wait_for_visible(page, ["div[role='main']", "div[role='feed']"], 10000)
+        
+        started = time.monotonic()
+        locator = asyncio.run(scenario())
+        
+        assert time.monotonic() - started < 2
+        assert locator.selectors == ["div[role='feed']"]
+    
+    def test_wait_gives_up_at_ceiling(self):
+        """Test that a wait reports failure at its ceiling instead of raising."""
+        import asyncio
+        from src.core.waits import wait_for_enabled, wait_for_state
+        
+        page = _FakePage()
+        page.visible.add("div[aria-label='Post'][role='button']")  # Still aria-disabled
+        
+        assert asyncio.run(wait_for_enabled(page, ["div[aria-label='Post'][role='button']"], 50)) is None
+        assert asyncio.run(wait_for_state(page, "div[role='dialog']", "visible", 50)) is False
+    
+    def test_enabled_excludes_aria_disabled(self):
+        """Test that enabled() narrows a selector to enabled elements."""
+        from src.core.waits import enabled
+        
+        assert enabled("div[aria-label='Post']") == "div[aria-label='Post']:not([aria-disabled='true'])"
+    
+    def test_wait_until_polls_predicate(self):
+        """Test that wait_until treats Playwright errors as not-yet and honours the ceiling."""
+        import asyncio
+        from playwright.async_api import Error as PlaywrightError
+        from src.core.waits import wait_until
+        
+        calls = []
+        
+        async def flaky():
+            calls.append(1)
+            if len(calls) == 1:
+                raise PlaywrightError("Element is not attached to the DOM")
+            return len(calls) >= 3
+        
+        async def never():
+            return False
+        
+        assert asyncio.run(wait_until(flaky, 5000, interval=10)) is True
+        assert len(calls) == 3
+        assert asyncio.run(wait_until(never, 50, interval=10)) is False
+    
+    def test_benchmark_costs_fixed_sleeps_and_polling(self):
+        """Test the before/after cost model of the wait benchmark."""
+        from src.core.wait_benchmark import WaitStep, flow_steps, run_model
+        
+        step = WaitStep("post button", 600, 0, legacy_sleep_ms=500, legacy_poll_ms=1000)
+        assert step.legacy_cost(2100) == 500 + 2000
+        assert step.condition_cost(2100) == 2100 + 40
+        assert WaitStep("feed", 0, 0, legacy_sleep_ms=3000).legacy_premature(4000)
+        
+        report = run_model(flow_steps("feed", media=True), posts=50, seed=1)
+        
+        assert len(report.legacy) == len(report.condition) == 50
+        assert sum(report.condition) < sum(report.legacy)
+        assert "Saved" in report.summary()
+
+
+class TestSelectorStats:
+    """Test the learned ordering of fallback selectors."""
+    
+    @pytest.fixture
+    def stats(self, tmp_path):
+        """Create a selector stats store in a temp file."""
+        from src.core.selector_stats import SelectorStats
+        
+        return SelectorStats(tmp_path / "selector_stats.json", half_life_days=14)
+    
+    def test_winning_selector_is_tried_first_next_time(self, stats):
+        """Test that a lookup records misses and the hit, and later lookups start with the hit."""
+        import asyncio
+        
+        selectors = ["[role='textbox']", "div[contenteditable='true']", "[contenteditable='true']"]
+        probed = []
+        
+        async def probe(selector):
+            probed.append(selector)
+            return "editor" if selector == "[contenteditable='true']" else None
+        
+        first = asyncio.run(stats.first_match("facebook", "text_input", selectors, probe))
+        probed.clear()
+        second = asyncio.run(stats.first_match("facebook", "text_input", selectors, probe))
+        
+        assert first == second == ("[contenteditable='true']", "editor")
+        assert probed == ["[contenteditable='true']"]
+        assert stats.rank("facebook", "text_input", selectors)[1:] == selectors[:2]  # Unseen/failed keep order
+        assert stats.rank("facebook", "reel_caption", selectors) == selectors
+    
+    def test_stale_winner_decays(self, stats):
+        """Test that old hits fade so a selector that stopped matching loses its place."""
+        import time
+        
+        for _ in range(3):
+            stats.record("facebook", "composer_trigger", "old", hit=True)
+        stats.record("facebook", "composer_trigger", "new", hit=True)
+        assert stats.rank("facebook", "composer_trigger", ["new", "old"]) == ["old", "new"]
+        
+        # Two months later "old" keeps failing while "new" keeps matching
+        for stat in stats._stats["facebook"]["composer_trigger"].values():
+            stat.updated_at = time.time() - 60 * 86400
+        stats.record("facebook", "composer_trigger", "old", hit=False)
+        stats.record("facebook", "composer_trigger", "new", hit=True)
+        
+        assert stats.rank("facebook", "composer_trigger", ["old", "new"]) == ["new", "old"]
+    
+    def test_stats_persist_and_report_hit_rates(self, stats):
+        """Test that stats survive a restart and are reported per element."""
+        from src.core.selector_stats import SelectorStats
+        
+        stats.record("facebook", "reel_uploader", "input[type='file']", hit=True, elapsed_ms=12)
+        stats.record("facebook", "reel_uploader", "input[accept*='video']", hit=False, elapsed_ms=3)
+        stats.save()
+        
+        reloaded = SelectorStats(stats.path, half_life_days=14)
+        rows = reloaded.report("facebook")
+        
+        assert [(r.selector, round(r.hit_rate, 2)) for r in rows] == [
+            ("input[type='file']", 1.0), ("input[accept*='video']", 0.0),
+        ]
+        assert round(rows[0].mean_hit_ms) == 12
+        assert "facebook / reel_uploader" in reloaded.summary()
+
+
+class _ProbeFrame:
+    """Playwright Frame stand-in answering the probe script with canned rows."""
+    
+    def __init__(self, rows=None, error=None):
+        self.rows = rows or []
+        self.error = error
+        self.calls = 0
+    
+    async def evaluate(self, script, args):
+        from playwright.async_api import Error as PlaywrightError
+        
+        self.calls += 1
+        if self.error:
+            raise PlaywrightError(self.error)
+        selectors, token = args[0], args[1]
+        return [
+            dict(row, id=f"{token}-{i}", rank=selectors.index(row["selector"]))
+            for i, row in enumerate(self.rows)
+        ]
+    
+    def locator(self, selector):
+        return ("locator", self, selector)
+
+
+def _probe_row(selector, visible=True, editable=True, score=12, role=None):
+    return {
+        "selector": selector, "visible": visible, "editable": editable, "enabled": True,
+        "role": role, "placeholder": None, "tag": "div", "inDialog": False,
+        "score": score, "textLength": 0,
+    }
+
+
+class TestDomProbe:
+    """Test the single-round-trip element discovery probe."""
+    
+    def test_probe_ranks_matches_across_frames(self):
+        """Test that each frame is evaluated once and matches come back best first."""
+        import asyncio
+        from src.core.dom_probe import probe_page
+        
+        main = _ProbeFrame([_probe_row("[contenteditable='true']", visible=False, score=4)])
+        iframe = _ProbeFrame([_probe_row("[role='textbox']", score=14, role="textbox")])
+        gone = _ProbeFrame(error="Frame was detached")
+        page = MagicMock(main_frame=main, frames=[main, iframe, gone])
+        
+        matches = asyncio.run(probe_page(page, ["[role='textbox']", "[contenteditable='true']"]))
+        
+        assert [m.selector for m in matches] == ["[role='textbox']", "[contenteditable='true']"]
+        assert matches[0].frame is iframe and matches[0].frame_index == 1
+        assert main.calls == iframe.calls == gone.calls == 1
+        assert matches[0].locator == ("locator", iframe, f"[data-aio-probe='{matches[0].probe_id}']")
+    
+    def test_text_input_finder_uses_one_probe(self, tmp_path, monkeypatch):
+        """Test that the finder picks the best visible editable match and records it."""
+        import asyncio
+        from src.core import social_poster
+        from src.core.selector_stats import SelectorStats
+        
+        stats = SelectorStats(tmp_path / "selector_stats.json", half_life_days=14)
+        monkeypatch.setattr(social_poster, "get_selector_stats", lambda: stats)
+        
+        main = _ProbeFrame([
+            _probe_row("[role='textbox']", visible=False, score=6),
+            _probe_row("div[contenteditable='true']", score=13),
+        ])
+        page = MagicMock(main_frame=main, frames=[main])
+        
+        async def quiet(*args, **kwargs):
+            return True
+        
+        page.evaluate = quiet
+        locator = asyncio.run(social_poster.IntelligentElementFinder.find_text_input_intelligent(page))
+        
+        assert locator[1] is main and locator[2].startswith("[data-aio-probe=")
+        assert main.calls == 1
+        rows = {r.selector: r for r in stats.report("facebook")}
+        assert rows["div[contenteditable='true']"].hit_rate == 1.0
+        assert rows["[role='textbox']"].hit_rate == 0.0
+
+
+class _FakeRoute:
+    """Playwright Route stand-in recording how it was handled."""
+    
+    def __init__(self, url, resource_type):
+        self.request = MagicMock(url=url, resource_type=resource_type)
+        self.handled = None
+    
+    async def abort(self, error_code=None):
+        self.handled = "abort"
+    
+    async def fulfill(self, **response):
+        self.handled = ("fulfill", response["status"])
+    
+    async def continue_(self):
+        self.handled = "continue"
+
+
+class TestNetworkPolicy:
+    """Test request interception for posting browsers."""
+    
+    def test_facebook_policy_decisions(self):
+        """Test that heavy and third-party resources are blocked and beacons stubbed."""
+        from src.core.network_policy import ALLOW, BLOCK, STUB, get_network_policy
+        
+        policy = get_network_policy("facebook:2")
+        
+        assert policy.decide("https://www.facebook.com/", "document") == ALLOW
+        assert policy.decide("https://static.xx.fbcdn.net/rsrc.php/v3/y4/r/sprite.png", "image") == ALLOW
+        assert policy.decide("https://static.xx.fbcdn.net/rsrc.php/v3/app.js", "script") == ALLOW
+        assert policy.decide("https://www.facebook.com/api/graphql/", "xhr") == ALLOW
+        assert policy.decide("https://scontent.xx.fbcdn.net/v/photo.jpg", "image") == BLOCK
+        assert policy.decide("https://video.xx.fbcdn.net/v/clip.mp4", "media") == BLOCK
+        assert policy.decide("https://fonts.example.com/font.woff2", "font") == BLOCK
+        assert policy.decide("https://cdn.thirdparty.io/widget.js", "script") == BLOCK
+        assert policy.decide("https://www.google-analytics.com/collect", "script") == STUB
+        assert policy.decide("https://www.facebook.com/ajax/bz", "xhr") == STUB
+        assert policy.decide("https://www.facebook.com/tr", "ping") == STUB
+        assert get_network_policy("mastodon") is None
+    
+    def test_policy_routes_context_and_counts(self):
+        """Test that the route handler applies decisions and the stats count them."""
+        import asyncio
+        from src.core.network_policy import apply_network_policy, get_network_policy
+        
+        context = MagicMock()
+        handlers = {}
+        
+        async def route(pattern, handler):
+            handlers[pattern] = handler
+        
+        context.route = route
+        
+        async def scenario():
+            stats = await apply_network_policy(context, get_network_policy("facebook"))
+            again = await apply_network_policy(context, get_network_policy("facebook"))
+            stats.begin()
+            routes = [
+                _FakeRoute("https://www.facebook.com/", "document"),
+                _FakeRoute("https://scontent.xx.fbcdn.net/v/photo.jpg", "image"),
+                _FakeRoute("https://www.google-analytics.com/analytics.js", "script"),
+            ]
+            for fake in routes:
+                await handlers["**/*"](fake)
+            stats.mark_composer()
+            return stats, again, routes
+        
+        stats, again, routes = asyncio.run(scenario())
+        
+        assert again is stats
+        assert [r.handled for r in routes] == ["continue", "abort", ("fulfill", 200)]
+        assert (stats.allowed, stats.blocked, stats.stubbed) == (1, 1, 1)
+        assert stats.blocked_by_type == {"image": 1}
+        assert stats.time_to_composer_ms is not None
+        assert "1 blocked (image 1)" in stats.summary()
+
+
+class _ShotPage:
+    """Page whose screenshots are numbered JPEG stand-ins."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    async def screenshot(self, **kwargs):
+        self.calls.append(kwargs)
+        return b"jpeg%d" % len(self.calls)
+
+
+class TestDebugArtifacts:
+    """Test ring-buffered debug screenshots."""
+    
+    def test_frames_written_only_on_failure(self, tmp_path):
+        """Test that a successful post writes nothing and a failed one its last frames."""
+        import asyncio
+        from src.core.debug_artifacts import DebugArtifacts, capture
+        
+        artifacts = DebugArtifacts("on_failure", frames=2, quality=40, max_mb=0, root=tmp_path)
+        page = _ShotPage()
+        
+        async def post(job_id, fail):
+            async with artifacts.recording(job_id) as recorder:
+                for step in ("feed", "composer", "after_post"):
+                    await capture(page, step)
+                if fail:
+                    recorder.fail("Post verification failed")
+        
+        asyncio.run(post("post_1", fail=False))
+        asyncio.run(post("post_2", fail=True))
+        asyncio.run(capture(page, "outside"))  # No recording: ignored
+        
+        assert not (tmp_path / "post_1").exists()
+        names = sorted(p.name for p in (tmp_path / "post_2").iterdir())
+        assert names[-1] == "failure.txt"
+        assert [n.split("_", 1)[1] for n in names[:-1]] == ["02_composer.jpg", "03_after_post.jpg"]
+        assert page.calls[0] == {"type": "jpeg", "quality": 40}
+        assert len(page.calls) == 6
+    
+    def test_exception_and_retention(self, tmp_path):
+        """Test that exceptions keep frames and old job folders are pruned."""
+        import asyncio
+        import os
+        from src.core.debug_artifacts import DebugArtifacts, capture
+        
+        artifacts = DebugArtifacts("on_failure", frames=4, quality=50, max_mb=0, root=tmp_path)
+        page = _ShotPage()
+        
+        async def crash():
+            async with artifacts.recording("post_9"):
+                await capture(page, "feed")
+                raise RuntimeError("boom")
+        
+        with pytest.raises(RuntimeError):
+            asyncio.run(crash())
+        assert "RuntimeError: boom" in (tmp_path / "post_9" / "failure.txt").read_text()
+        
+        for index, name in enumerate(("old", "new")):
+            folder = tmp_path / name
+            folder.mkdir()
+            (folder / "frame.jpg").write_bytes(b"x" * 600_000)
+            os.utime(folder / "frame.jpg", (1000 + index, 1000 + index))
+        artifacts.max_mb = 1
+        artifacts.enforce_retention()
+        
+        assert not (tmp_path / "old").exists()
+        assert (tmp_path / "new").exists() and (tmp_path / "post_9").exists()
+        
+        off = DebugArtifacts("off", root=tmp_path / "off")
+        
+        async def failed_without_frames():
+            async with off.recording("post_10") as recorder:
+                await capture(page, "feed")
+                recorder.fail("nope")
+        
+        asyncio.run(failed_without_frames())
+        assert not (tmp_path / "off").exists()
+
+
+class _PlainEncryption:
+    """Encryption stand-in that stores sessions as plain JSON."""
+    
+    def encrypt(self, text):
+        return text.encode()
+    
+    def decrypt(self, data):
+        return data.decode()
+
+
+class TestAccountSessions:
+    """Test per-account browser sessions and their validity checks."""
+    
+    @pytest.fixture
+    def manager(self, tmp_path, monkeypatch):
+        """Create a session manager storing its files in a temporary folder."""
+        from src.core import browser_session_manager
+        from src.core.browser_session_manager import BrowserConfig, BrowserSessionManager
+        
+        monkeypatch.setattr(browser_session_manager, "get_encryption", _PlainEncryption)
+        monkeypatch.setattr(BrowserSessionManager, "SESSIONS_FILE", tmp_path / "sessions.enc")
+        monkeypatch.setattr(BrowserSessionManager, "BROWSER_CONFIG_FILE", tmp_path / "browsers.json")
+        manager = BrowserSessionManager()
+        manager.browser_configs["facebook"] = BrowserConfig("facebook", "chrome", "/usr/bin/chromium")
+        return manager
+    
+    @staticmethod
+    def _session(account, user):
+        from src.core.browser_session_manager import BrowserSession
+        
+        return BrowserSession(
+            platform="facebook",
+            account=account,
+            cookies=[{"name": "c_user", "value": user}],
+            origins=[{"origin": "https://www.facebook.com", "localStorage": []}],
+            user_agent="test-agent",
+            user_name=user,
+        )
+    
+    def test_sessions_are_keyed_by_account(self, manager, monkeypatch):
+        """Test that accounts keep separate sessions and never share the platform-wide one."""
+        from src.core.browser_session_manager import BrowserSessionManager
+        
+        monkeypatch.setattr(BrowserSessionManager, "_configured_accounts", lambda self, platform: ["7", "8"])
+        for session in (self._session(None, "legacy"), self._session("7", "seven")):
+            manager.sessions[session.key] = session
+        manager._save_sessions()
+        
+        reloaded = BrowserSessionManager()
+        
+        assert set(reloaded.sessions) == {"facebook", "facebook:7"}
+        assert reloaded.get_session("facebook", 7).user_name == "seven"
+        assert reloaded.get_session("facebook", 7).storage_state["origins"][0]["origin"] == "https://www.facebook.com"
+        # With two accounts, the old session could belong to either
+        assert reloaded.get_session("facebook", 8) is None
+        assert not reloaded.has_session("facebook", 8)
+        assert reloaded.logout("facebook", 7)
+        assert reloaded.get_session("facebook", 7) is None
+    
+    def test_restored_context_blocks_resources_only_headless(self, manager, monkeypatch):
+        """Test that a visible browser restored from a session loads every resource."""
+        import asyncio
+        from src.core import browser_session_manager
+        
+        launches, routed = [], []
+        
+        class FakeBrowser:
+            async def new_context(self, **kwargs):
+                return object()
+        
+        class FakeChromium:
+            async def launch(self, headless, **kwargs):
+                launches.append(headless)
+                return FakeBrowser()
+        
+        class FakePlaywright:
+            chromium = FakeChromium()
+        
+        async def fake_apply(context, policy):
+            routed.append(context)
+        
+        monkeypatch.setattr(browser_session_manager, "apply_network_policy", fake_apply)
+        monkeypatch.setattr(browser_session_manager.config.browser, "block_resources", True)
+        manager.sessions["facebook:1"] = self._session("1", "one")
+        
+        _, error = asyncio.run(manager.create_context_with_session("facebook", FakePlaywright(), 1))
+        assert error is None
+        assert routed == []
+        
+        asyncio.run(manager.create_context_with_session("facebook", FakePlaywright(), 1, headless=True))
+        assert launches == [False, True]
+        assert len(routed) == 1
+    
+    def test_concurrent_cookie_updates_are_not_lost(self, manager):
+        """Test that sessions refreshed from several threads at once keep every rotated cookie."""
+        import sys
+        import threading
+        
+        manager.sessions["facebook:1"] = self._session("1", "one")
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # Switch threads inside the merge
+        
+        def rotate(thread):
+            for batch in range(5):
+                manager.update_session_cookies("facebook:1", [
+                    {"name": f"t{thread}-{batch}-{i}", "value": "v", "domain": ".facebook.com", "path": "/"}
+                    for i in range(200)
+                ])
+        
+        threads = [threading.Thread(target=rotate, args=(i,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        sys.setswitchinterval(interval)
+        
+        assert len(manager.get_session("facebook", 1).cookies) == 1 + 6 * 5 * 200
+    
+    def test_only_account_adopts_platform_wide_session(self, manager, monkeypatch):
+        """Test that a single account takes over the session saved before sessions were per account."""
+        from src.core.browser_session_manager import BrowserSessionManager
+        
+        monkeypatch.setattr(BrowserSessionManager, "_configured_accounts", lambda self, platform: ["8"])
+        manager.sessions["facebook"] = self._session(None, "legacy")
+        
+        assert manager.get_session("facebook", 9) is None
+        assert manager.get_session("facebook", 8).user_name == "legacy"
+        assert set(BrowserSessionManager().sessions) == {"facebook:8"}
+        
+        # A second account doesn't take the first one's session away
+        monkeypatch.setattr(BrowserSessionManager, "_configured_accounts", lambda self, platform: ["8", "9"])
+        assert manager.get_session("facebook", 8).user_name == "legacy"
+    
+    def test_accounts_post_concurrently_in_own_contexts(self, manager, monkeypatch):
+        """Test that two accounts get their own contexts in one shared browser at the same time."""
+        import asyncio
+        from src.core import social_poster
+        from src.core.browser_pool import BrowserPool
+        from src.core.session_probe import SessionProbe
+        
+        for session in (self._session("1", "one"), self._session("2", "two")):
+            manager.sessions[session.key] = session
+        pool = BrowserPool(max_browsers=1, max_uses=0, max_memory_mb=0, idle_timeout=0)
+        playwright = pool._playwright = _FakePlaywright()
+        
+        async def open_feed(self, page):
+            pass
+        
+        probe = SessionProbe(manager, ttl=60, interval=0)
+        monkeypatch.setattr(social_poster, "get_browser_pool", lambda: pool)
+        monkeypatch.setattr(social_poster, "get_session_probe", lambda: probe)
+        monkeypatch.setattr(social_poster.BrowserDOMPoster, "_open_feed", open_feed)
+        poster = social_poster.BrowserDOMPoster.__new__(social_poster.BrowserDOMPoster)
+        poster.session_manager = manager
+        
+        async def scenario():
+            both_open = asyncio.Barrier(2)  # Times out if the sessions ran one after the other
+            
+            async def post(account):
+                async with poster._facebook_session(headless=False, account=account):
+                    await asyncio.wait_for(both_open.wait(), 5)
+            
+            await asyncio.gather(post(1), post(2))
+        
+        try:
+            pool.run(scenario())
+        finally:
+            pool.shutdown()
+        
+        assert len(playwright.browsers) == 1
+        contexts = playwright.browsers[0].contexts
+        users = sorted(c.options["storage_state"]["cookies"][0]["value"] for c in contexts)
+        assert users == ["one", "two"]
+        assert probe.cached("facebook", 1).valid is True
+    
+    def test_probe_judges_sessions_over_http(self, manager):
+        """Test that the HTTP probe reads redirects and caches definite verdicts."""
+        import time
+        from src.core.session_probe import SessionProbe
+        
+        responses = {
+            "one": (302, {"Location": "https://www.facebook.com/profile.php?id=1"}),
+            "two": (302, {"Location": "https://www.facebook.com/login/?next=%2Fsettings"}),
+            "three": (500, {}),
+        }
+        requested = []
+        
+        class Response:
+            def __init__(self, status, headers):
+                self.status_code = status
+                self.headers = headers
+                self.cookies = []
+            
+            def __enter__(self):
+                return self
+            
+            def __exit__(self, *exc):
+                return False
+        
+        def get(url, cookies=None, **kwargs):
+            user = cookies.get("c_user")
+            requested.append(user)
+            assert kwargs["allow_redirects"] is False
+            return Response(*responses[user])
+        
+        for account, user in (("1", "one"), ("2", "two"), ("3", "three")):
+            manager.sessions[f"facebook:{account}"] = self._session(account, user)
+        stale = self._session("4", "four")
+        stale.cookies[0]["expires"] = time.time() - 60
+        manager.sessions[stale.key] = stale
+        probe = SessionProbe(manager, ttl=60, interval=0)
+        probe.http.get = get
+        
+        assert probe.check("facebook", 1).valid is True
+        assert probe.check("facebook", 2).reason == "redirected to login"
+        assert probe.check("facebook", 3).valid is None
+        assert probe.check("facebook", 4).valid is False
+        assert "four" not in requested  # Expired cookie: no request needed
+        
+        probe.check_all()
+        assert requested.count("one") == 1 and requested.count("three") == 2
+        assert probe.cached("facebook", 2).valid is False
+        
+        manager.sessions["facebook:2"] = self._session("2", "two")  # Logged in again
+        assert probe.cached("facebook", 2) is None
+    
+    def test_keepalive_saves_rotated_cookies_and_warns(self, manager, caplog):
+        """Test that the keep-alive writes rotated cookies back and warns before expiry."""
+        import logging
+        import time
+        from requests.cookies import RequestsCookieJar, create_cookie
+        from src.core.browser_session_manager import BrowserSessionManager
+        from src.core.session_keepalive import SessionKeepAlive
+        from src.core.session_probe import SessionProbe
+        
+        rotated = time.time() + 30 * 86400
+        
+        class Response:
+            def __init__(self, user):
+                self.status_code = 200
+                self.headers = {}
+                self.cookies = RequestsCookieJar()
+                if user == "one":
+                    self.cookies.set_cookie(create_cookie(
+                        "xs", "fresh", domain=".facebook.com", path="/", expires=int(rotated),
+                        rest={"HttpOnly": None},
+                    ))
+            
+            def __enter__(self):
+                return self
+            
+            def __exit__(self, *exc):
+                return False
+        
+        for account, user, hours in (("1", "one", 240), ("2", "two", 10)):
+            session = self._session(account, user)
+            session.cookies[0].update(domain=".facebook.com", path="/", expires=time.time() + hours * 3600)
+            session.cookies.append({
+                "name": "xs", "value": "old", "domain": ".facebook.com", "path": "/",
+                "expires": time.time() + 3600, "sameSite": "None",
+            })
+            manager.sessions[session.key] = session
+        probe = SessionProbe(manager, ttl=60, interval=0)
+        probe.http.get = lambda url, cookies=None, **kwargs: Response(cookies.get("c_user"))
+        keepalive = SessionKeepAlive(manager, probe, interval=0, warn_hours=48)
+        
+        with caplog.at_level(logging.WARNING):
+            results = {r.health.key: r for r in keepalive.refresh_all()}
+        
+        assert results["facebook:1"].rotated == 1 and not results["facebook:1"].expiring
+        assert results["facebook:2"].expiring
+        assert [r.health.key for r in keepalive.expiring()] == ["facebook:2"]
+        assert "facebook:2 expires in" in caplog.text
+        assert probe.cached("facebook", 1).valid is True
+        xs = next(c for c in BrowserSessionManager().get_session("facebook", 1).cookies if c["name"] == "xs")
+        assert (xs["value"], xs["expires"], xs["sameSite"], xs["httpOnly"]) == ("fresh", int(rotated), "None", True)
+        assert keepalive.refresh(manager.get_session("facebook", 1)).rotated == 0
+    
+    def test_expired_session_fails_fast_without_login(self, manager, monkeypatch):
+        """Test that a scheduled post raises SessionExpiredError instead of opening a login window."""
+        from src.core import social_poster
+        from src.core.browser_pool import BrowserPool
+        from src.core.session_probe import SessionProbe
+        from src.utils.exceptions import SessionExpiredError
+        
+        manager.sessions["facebook:1"] = self._session("1", "one")
+        pool = BrowserPool(max_browsers=1, max_uses=0, max_memory_mb=0, idle_timeout=0)
+        pool._playwright = _FakePlaywright()
+        probe = SessionProbe(manager, ttl=60, interval=0)
+        probe.record("facebook:1", False, "redirected to login")
+        logins = []
+        
+        async def authenticate(platform, headless=False, account=None):
+            logins.append(account)
+            return False, "no"
+        
+        manager.authenticate = authenticate
+        monkeypatch.setattr(social_poster, "get_browser_pool", lambda: pool)
+        monkeypatch.setattr(social_poster, "get_session_probe", lambda: probe)
+        poster = social_poster.BrowserDOMPoster.__new__(social_poster.BrowserDOMPoster)
+        poster.session_manager = manager
+        
+        async def post(account):
+            async with poster._facebook_session(account=account, allow_login=False):
+                pass
+        
+        try:
+            with pytest.raises(SessionExpiredError, match="redirected to login"):
+                pool.run(post(1))
+            with pytest.raises(SessionExpiredError, match="no saved session"):
+                pool.run(post(2))
+        finally:
+            pool.shutdown()
+        assert logins == []
+
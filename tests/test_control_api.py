@@ -0,0 +1,163 @@
+"""
+Test Control API - Local HTTP bulk scheduling tests.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+
+class _FakeScheduler:
+    """Scheduler stand-in that stores posts without adding jobs."""
+    
+    def __init__(self):
+        self.batches = []
+        self.cancelled = []
+    
+    def add_posts(self, posts, platforms, priority, db):
+        self.batches.append((len(posts), priority))
+        return db.add_scheduled_posts(posts)
+    
+    def get_pending_jobs(self):
+        return []
+    
+    def in_flight_jobs(self):
+        return []
+    
+    def cancel_job(self, job_id):
+        self.cancelled.append(job_id)
+        return True
+
+
+@pytest.fixture
+def api():
+    """Serve the control API on a free port against a temporary database."""
+    from src.core.control_api import ControlApiServer, PostIngestor
+    from src.data.database import Database
+    from src.data.models import Account
+    
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
+        db_path = Path(f.name)
+    db = Database(db_path)
+    account_id = db.add_account(Account(id=None, platform="facebook", username="api"))
+    
+    scheduler = _FakeScheduler()
+    server = ControlApiServer(
+        host="127.0.0.1",
+        port=0,
+        token="secret",
+        ingestor=PostIngestor(scheduler=scheduler, db=db, batch_size=2),
+    )
+    server.start()
+    yield server, db, scheduler, account_id
+    
+    server.stop()
+    db.close()
+    db_path.unlink(missing_ok=True)
+
+
+def _request(server, method, path, body=None, token="secret", headers=None):
+    """Send a request and return (status, decoded JSON)."""
+    import http.client
+    
+    host, port = server.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    headers = dict(headers or {})
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    if isinstance(body, (dict, list)):
+        body = json.dumps(body)
+        headers["Content-Type"] = "application/json"
+    # Generators are sent with chunked transfer encoding
+    chunked = body is not None and not isinstance(body, (str, bytes))
+    conn.request(method, path, body=body, headers=headers, encode_chunked=chunked)
+    response = conn.getresponse()
+    payload = json.loads(response.read() or b"null")
+    conn.close()
+    return response.status, payload
+
+
+class TestControlApi:
+    """Test the control API endpoints."""
+    
+    def test_requires_token(self, api):
+        """Test that requests without the bearer token are rejected."""
+        server, *_ = api
+        
+        assert _request(server, "GET", "/health", token=None)[0] == 401
+        assert _request(server, "GET", "/health", token="wrong")[0] == 401
+        assert _request(server, "GET", "/health") == (200, {"status": "ok"})
+    
+    def test_public_host_requires_token(self):
+        """Test that the server refuses to listen beyond loopback without a token."""
+        from src.core.control_api import ControlApiServer
+        from src.utils.exceptions import ConfigurationError
+        
+        with pytest.raises(ConfigurationError, match="API_TOKEN"):
+            ControlApiServer(host="0.0.0.0", port=0, token="", ingestor=object())
+        
+        server = ControlApiServer(host="0.0.0.0", port=0, token="secret", ingestor=object())
+        server.server_close()
+        server = ControlApiServer(host="127.0.0.1", port=0, token="", ingestor=object())
+        server.server_close()
+    
+    def test_batch_is_all_or_nothing(self, api):
+        """Test that a batch with an invalid post stores nothing."""
+        server, db, scheduler, account_id = api
+        good = {"account_id": account_id, "content": "hello", "scheduled_time": "2030-01-01T09:00:00"}
+        
+        status, payload = _request(server, "POST", "/posts", {"posts": [good, {"account_id": 999}]})
+        assert status == 400
+        assert payload["errors"][0]["index"] == 1
+        assert db.get_pending_posts() == []
+        
+        status, payload = _request(server, "POST", "/posts", {"posts": [good, good], "priority": "scheduled"})
+        assert status == 201
+        assert payload["accepted"] == 2
+        assert [p.id for p in db.get_pending_posts()] == payload["post_ids"]
+        assert scheduler.batches[-1][1].lane == "scheduled"
+    
+    def test_stream_stores_in_batches(self, api):
+        """Test chunked NDJSON ingestion with per-line errors."""
+        server, db, scheduler, account_id = api
+        
+        def lines():
+            for i in range(5):
+                post = {"account_id": account_id, "content": f"post {i}",
+                        "scheduled_time": f"2030-01-0{i + 1}T09:00:00"}
+                yield (json.dumps(post) + "\n").encode()
+            yield b"not json\n"
+        
+        status, payload = _request(
+            server, "POST", "/posts/stream", lines(),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        
+        assert status == 200
+        assert payload["accepted"] == 5
+        assert payload["rejected"] == 1
+        assert payload["errors"][0]["line"] == 6
+        assert payload["batches"] == 3
+        assert [n for n, _ in scheduler.batches] == [2, 2, 1]
+        assert all(priority.lane == "bulk" for _, priority in scheduler.batches)
+        assert len(db.get_pending_posts()) == 5
+    
+    def test_queue_and_cancel(self, api):
+        """Test queue state and cancelling a pending post."""
+        server, db, scheduler, account_id = api
+        _, created = _request(server, "POST", "/posts", [
+            {"account_id": account_id, "content": "x", "scheduled_time": "2030-01-01T09:00:00"}
+        ])
+        post_id = created["post_ids"][0]
+        
+        status, queue = _request(server, "GET", "/queue")
+        assert status == 200
+        assert set(queue["lanes"]) == {"interactive", "scheduled", "retry", "bulk"}
+        
+        assert _request(server, "DELETE", f"/posts/{post_id}")[0] == 200
+        assert scheduler.cancelled == [f"post_{post_id}"]
+        assert _request(server, "GET", f"/posts/{post_id}")[1]["status"] == "cancelled"
+        assert _request(server, "DELETE", f"/posts/{post_id}")[0] == 409
+        assert _request(server, "DELETE", "/posts/999999")[0] == 404
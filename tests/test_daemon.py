@@ -0,0 +1,60 @@
+"""
+Test Daemon - Headless scheduler entry point tests.
+"""
+
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+class TestDaemon:
+    """Test the headless daemon."""
+    
+    def test_daemon_does_not_import_qt(self):
+        """Test that the daemon and scheduler stack load without PyQt5."""
+        code = (
+            "import sys\n"
+            "import src.daemon, src.core.scheduler, src.core.scheduler_tasks\n"
+            "assert not [m for m in sys.modules if m.startswith('PyQt5')], 'PyQt5 imported'\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        assert result.returncode == 0, result.stderr
+    
+    def test_run_until_stopped(self):
+        """Test that the daemon starts the scheduler and stops it on request."""
+        from src.daemon import SchedulerDaemon
+        
+        class FakeScheduler:
+            started = stopped = False
+            
+            def start(self):
+                self.started = True
+            
+            def stop(self):
+                self.stopped = True
+            
+            def get_pending_jobs(self):
+                return []
+        
+        scheduler = FakeScheduler()
+        daemon = SchedulerDaemon(scheduler=scheduler)
+        result = {}
+        thread = threading.Thread(target=lambda: result.update(code=daemon.run()))
+        thread.start()
+        
+        daemon.request_stop()
+        thread.join(timeout=5)
+        
+        assert not thread.is_alive()
+        assert result["code"] == 0
+        assert scheduler.started and scheduler.stopped
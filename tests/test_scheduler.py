@@ -0,0 +1,1473 @@
+"""
+Test Scheduler - Scheduling, recurrence and job management tests.
+"""
+
+import pytest
+from pathlib import Path
+from datetime import datetime, timedelta
+import tempfile
+
+
+@pytest.fixture
+def temp_db():
+    """Create a temporary database."""
+    with tempfile.NamedTemporaryFile(suffix=".db", delete=False) as f:
+        db_path = Path(f.name)
+    
+    from src.data.database import Database
+    db = Database(db_path)
+    yield db
+    
+    db.close()
+    db_path.unlink(missing_ok=True)
+
+
+class TestRecurringSchedules:
+    """Test recurring (cron and evergreen) schedules."""
+    
+    def test_next_occurrence_is_after_reference(self):
+        """Test that the next cron occurrence is computed lazily from a reference time."""
+        from src.core.scheduler import next_occurrence
+        
+        reference = datetime(2024, 1, 1, 9, 0)  # Monday 09:00
+        fire_time = next_occurrence("0 9 * * mon", reference)
+        
+        assert fire_time == datetime(2024, 1, 8, 9, 0)
+    
+    def test_evergreen_rotation(self):
+        """Test that evergreen series rotate through their content queue."""
+        from src.data.models import RecurringSchedule, RecurrenceKind
+        
+        series = RecurringSchedule(
+            id=1,
+            account_id=1,
+            platform="facebook",
+            cron_expression="0 9 * * *",
+            kind=RecurrenceKind.EVERGREEN,
+            content_items=[{"content": "a"}, {"content": "b"}],
+            next_index=1,
+        )
+        
+        assert series.current_item()["content"] == "b"
+        assert series.advanced_index() == 0
+    
+    def test_cron_series_repeats_same_content(self):
+        """Test that plain cron series always post their single item."""
+        from src.data.models import RecurringSchedule
+        
+        series = RecurringSchedule(
+            id=1,
+            account_id=1,
+            platform="facebook",
+            cron_expression="0 9 * * *",
+            content_items=[{"content": "weekly"}],
+        )
+        
+        assert series.current_item()["content"] == "weekly"
+        assert series.advanced_index() == 0
+    
+    def test_recurring_schedule_roundtrip(self, temp_db):
+        """Test storing a series and advancing it stores one row per series."""
+        from src.data.models import Account, RecurringSchedule, RecurrenceKind
+        
+        account_id = temp_db.add_account(
+            Account(id=None, platform="facebook", username="series")
+        )
+        series_id = temp_db.add_recurring_schedule(RecurringSchedule(
+            id=None,
+            account_id=account_id,
+            platform="facebook",
+            cron_expression="0 9 * * *",
+            kind=RecurrenceKind.EVERGREEN,
+            content_items=[{"content": "a"}, {"content": "b"}],
+        ))
+        
+        next_run = datetime(2024, 1, 2, 9, 0)
+        temp_db.advance_recurring_schedule(
+            series_id, next_index=1, last_run_time=datetime(2024, 1, 1, 9, 0),
+            next_run_time=next_run,
+        )
+        
+        series = temp_db.get_recurring_schedule(series_id)
+        assert series.kind == RecurrenceKind.EVERGREEN
+        assert series.next_index == 1
+        assert series.next_run_time == next_run
+        assert len(temp_db.get_active_recurring_schedules()) == 1
+
+
+class TestBatchScheduling:
+    """Test bulk scheduling through schedule_posts."""
+    
+    @pytest.fixture
+    def scheduler(self, temp_db, monkeypatch):
+        """Create a running scheduler backed by a temporary database."""
+        from src.core.scheduler import SchedulerManager
+        from src.data import database
+        
+        monkeypatch.setattr(database, "get_database", lambda: temp_db)
+        manager = SchedulerManager()
+        manager.start()
+        yield manager
+        manager.stop()
+    
+    def test_add_scheduled_posts_batch(self, temp_db):
+        """Test that batch inserts return one ID per post, in order."""
+        from src.data.models import Account, ScheduledPost
+        
+        account_id = temp_db.add_account(Account(id=None, platform="facebook", username="bulk"))
+        posts = [
+            ScheduledPost(id=None, account_id=account_id, content=f"post {i}",
+                          scheduled_time=datetime(2030, 1, 1, 9, i))
+            for i in range(5)
+        ]
+        
+        post_ids = temp_db.add_scheduled_posts(posts)
+        
+        assert len(post_ids) == 5
+        assert temp_db.get_scheduled_post(post_ids[3]).content == "post 3"
+    
+    def test_batch_insert_is_not_split_by_other_threads(self, temp_db, monkeypatch):
+        """Test that commits from other threads cannot commit half of a failing batch."""
+        import threading
+        import time
+        from src.data.models import Account, ScheduledPost
+        
+        account_id = temp_db.add_account(Account(id=None, platform="facebook", username="bulk"))
+        other_id = temp_db.add_scheduled_post(ScheduledPost(
+            id=None, account_id=account_id, content="other", scheduled_time=datetime(2030, 1, 1),
+        ))
+        insert_params = temp_db._post_insert_params
+        inserting = threading.Event()
+        
+        def slow_params(post):
+            if post.content == "bad":
+                inserting.set()
+                time.sleep(0.3)  # The other thread commits meanwhile (without the lock)
+                raise ValueError("bad post")
+            return insert_params(post)
+        
+        monkeypatch.setattr(temp_db, "_post_insert_params", slow_params)
+        
+        def heartbeat():
+            inserting.wait(5)
+            temp_db.renew_lease(other_id, "worker-a", 60)
+        
+        thread = threading.Thread(target=heartbeat)
+        thread.start()
+        posts = [
+            ScheduledPost(id=None, account_id=account_id, content=content, scheduled_time=datetime(2030, 1, 1))
+            for content in ("good", "bad")
+        ]
+        with pytest.raises(ValueError):
+            temp_db.add_scheduled_posts(posts)
+        thread.join()
+        
+        assert [p.content for p in temp_db.get_pending_posts()] == ["other"]
+    
+    def test_schedule_posts_bulk_is_fast(self, scheduler):
+        """Test that 1,000 posts are stored in one fast batch."""
+        import time
+        from datetime import timedelta
+        import src.core.scheduler_tasks  # noqa: F401 - keep import cost out of the timing
+        
+        run_at = datetime.now() + timedelta(days=1)
+        posts = [
+            {
+                "job_id": f"post_{i}",
+                "run_at": run_at + timedelta(minutes=i),
+                "platform": "facebook",
+                "account_id": 1,
+                "content": f"bulk {i}",
+            }
+            for i in range(1000)
+        ]
+        
+        start = time.perf_counter()
+        job_ids = scheduler.schedule_posts(posts)
+        elapsed = time.perf_counter() - start
+        
+        assert len(job_ids) == 1000
+        assert len(scheduler.get_pending_jobs()) == 1000
+        assert elapsed < 1.0
+    
+    def test_schedule_posts_replaces_existing(self, scheduler):
+        """Test that re-scheduling a batch replaces jobs with the same ID."""
+        from datetime import timedelta
+        
+        post = {
+            "job_id": "post_1",
+            "run_at": datetime.now() + timedelta(days=1),
+            "platform": "facebook",
+            "account_id": 1,
+            "content": "first",
+        }
+        scheduler.schedule_posts([post])
+        scheduler.schedule_posts([dict(post, content="second")])
+        
+        jobs = scheduler.get_pending_jobs()
+        assert len(jobs) == 1
+        assert jobs[0]["kwargs"]["content"] == "second"
+    
+    def test_add_posts_saves_and_schedules(self, scheduler, temp_db):
+        """Test that new posts are stored and get a claiming job each."""
+        from src.data.models import Account, ScheduledPost
+        
+        account_id = temp_db.add_account(Account(id=None, platform="x", username="batch"))
+        run_at = datetime.now() + timedelta(days=1)
+        posts = [
+            ScheduledPost(id=None, account_id=account_id, content=f"post {i}", scheduled_time=run_at)
+            for i in range(3)
+        ]
+        
+        post_ids = scheduler.add_posts(posts, ["x"] * 3, db=temp_db)
+        
+        jobs = {job["id"]: job for job in scheduler.get_pending_jobs()}
+        assert [p.id for p in temp_db.get_pending_posts()] == post_ids
+        assert jobs[f"post_{post_ids[1]}"]["kwargs"]["post_id"] == post_ids[1]
+        # Same account at the same time: the slot allocator spreads them out
+        assert len({p.scheduled_time for p in temp_db.get_pending_posts()}) == 3
+
+
+class TestSchedulerEngine:
+    """Test the heap-based scheduler engine."""
+    
+    def test_jobs_fire_in_run_time_order(self):
+        """Test that due jobs are submitted soonest first, whatever the insert order."""
+        from src.core.execution_queue import ExecutionQueue
+        from src.core.scheduler_engine import EVENT_JOB_EXECUTED, ScheduledJob, SchedulerEngine
+        
+        queue = ExecutionQueue(max_workers=1, interactive_slots=0)
+        engine = SchedulerEngine(queue, misfire_grace_time=60)
+        fired = []
+        done = []
+        engine.add_listener(done.append, EVENT_JOB_EXECUTED)
+        
+        now = datetime.now()
+        engine.add_jobs([
+            ScheduledJob(id=name, func=lambda name: fired.append(name), run_time=now - timedelta(seconds=offset),
+                         kwargs={"name": name})
+            for name, offset in [("second", 2), ("third", 1), ("first", 3)]
+        ])
+        engine.start()
+        try:
+            import time
+            deadline = time.monotonic() + 5
+            while len(done) < 3 and time.monotonic() < deadline:
+                time.sleep(0.02)
+        finally:
+            engine.shutdown()
+            queue.shutdown()
+        
+        assert fired == ["first", "second", "third"]
+        assert engine.get_jobs() == []
+    
+    def test_reschedule_and_cancel(self):
+        """Test that moved and cancelled jobs leave no live heap entry behind."""
+        from src.core.execution_queue import ExecutionQueue
+        from src.core.scheduler_engine import EVENT_ALL, ScheduledJob, SchedulerEngine
+        
+        queue = ExecutionQueue(max_workers=1, interactive_slots=0)
+        engine = SchedulerEngine(queue, misfire_grace_time=60)
+        fired = []
+        events = []
+        engine.add_listener(events.append, EVENT_ALL)
+        
+        later = datetime.now() + timedelta(days=1)
+        engine.add_jobs([
+            ScheduledJob(id=name, func=lambda name: fired.append(name), run_time=later, kwargs={"name": name})
+            for name in ("moved", "cancelled", "waiting")
+        ])
+        assert engine.reschedule_job("moved", datetime.now())
+        assert engine.remove_job("cancelled")
+        assert not engine.remove_job("cancelled")
+        
+        engine.start()
+        try:
+            import time
+            deadline = time.monotonic() + 5
+            while len(events) < 2 and time.monotonic() < deadline:
+                time.sleep(0.02)
+        finally:
+            engine.shutdown()
+            queue.shutdown()
+        
+        assert fired == ["moved"]
+        assert [job.id for job in engine.get_jobs()] == ["waiting"]
+    
+    def test_missed_job_is_reported(self):
+        """Test that a job later than the misfire grace time is not run."""
+        from src.core.scheduler_engine import EVENT_JOB_MISSED, ScheduledJob, SchedulerEngine
+        
+        engine = SchedulerEngine(misfire_grace_time=1)
+        fired = []
+        missed = []
+        engine.add_listener(missed.append, EVENT_JOB_MISSED)
+        engine.add_job(ScheduledJob(
+            id="old", func=lambda name: fired.append(name), run_time=datetime.now() - timedelta(minutes=5),
+            kwargs={"name": "old"},
+        ))
+        
+        engine.start()
+        try:
+            import time
+            deadline = time.monotonic() + 5
+            while not missed and time.monotonic() < deadline:
+                time.sleep(0.02)
+        finally:
+            engine.shutdown()
+        
+        assert [event.job_id for event in missed] == ["old"]
+        assert fired == []
+    
+    def test_start_loads_jobs_from_database(self, temp_db, monkeypatch):
+        """Test that pending posts and their lanes are rebuilt from the posts table."""
+        from src.core.execution_queue import Priority
+        from src.core.scheduler import SchedulerManager
+        from src.data.models import Account, ScheduledPost
+        
+        account_id = temp_db.add_account(Account(id=None, platform="x", username="reload"))
+        run_at = datetime.now() + timedelta(days=1)
+        bulk_id = SchedulerManager().add_posts(
+            [ScheduledPost(id=None, account_id=account_id, content="bulk", scheduled_time=run_at)],
+            ["x"], priority=Priority.BULK, db=temp_db,
+        )[0]
+        requeued_id = temp_db.add_scheduled_post(ScheduledPost(
+            id=None, account_id=account_id, content="requeued",
+            scheduled_time=datetime.now() - timedelta(hours=1),
+        ))
+        assert temp_db.claim_post(requeued_id, "worker-a", 60)
+        assert temp_db.requeue_claimed_post(requeued_id, "worker-a")
+        
+        # A fresh manager knows nothing until it loads the database
+        manager = SchedulerManager()
+        assert manager.load_jobs(temp_db) == 2
+        
+        bulk = manager.engine.get_job(f"post_{bulk_id}")
+        assert bulk.priority == Priority.BULK
+        assert bulk.kwargs == {
+            "platform": "x", "account_id": account_id, "content": "bulk",
+            "media_paths": [], "post_id": bulk_id,
+        }
+        requeued = manager.engine.get_job(f"post_{requeued_id}")
+        assert requeued.run_time >= datetime.now() - timedelta(minutes=1)
+    
+    def test_import_does_not_load_sqlalchemy(self):
+        """Test that the scheduler no longer pulls in SQLAlchemy."""
+        import subprocess
+        import sys
+        
+        code = "import sys, src.core.scheduler; print('sqlalchemy' in sys.modules)"
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent.parent,
+        ).stdout
+        
+        assert output.strip() == "False"
+
+
+class TestScheduleSimulator:
+    """Test the virtual-time schedule simulator."""
+    
+    def test_simultaneous_posts_queue_for_workers(self):
+        """Test that posts beyond the worker count wait for a free worker."""
+        from src.core.scheduler_simulation import (
+            ScheduleSimulator, SimulatedPost, PlatformProfile
+        )
+        
+        profile = PlatformProfile(latency_mean=60, latency_stddev=0, min_latency=0, failure_rate=0)
+        simulator = ScheduleSimulator(
+            max_workers=3, misfire_grace_time=30, profiles={"facebook": profile}, seed=1
+        )
+        run_at = datetime(2030, 1, 1, 9, 0)
+        posts = [SimulatedPost(i, i, "facebook", run_at) for i in range(6)]
+        
+        report = simulator.run(posts)
+        
+        assert report.succeeded == 6
+        assert report.max_queue_depth == 3
+        assert report.missed_slots == 3
+        assert report.lateness_p50 == 30.0
+        assert report.max_lateness == 60.0
+    
+    def test_same_account_posts_are_serialized(self):
+        """Test that two posts of one account due together run one after the other."""
+        from src.core.scheduler_simulation import (
+            ScheduleSimulator, SimulatedPost, PlatformProfile
+        )
+        
+        profile = PlatformProfile(latency_mean=60, latency_stddev=0, min_latency=0, failure_rate=0)
+        simulator = ScheduleSimulator(max_workers=3, profiles={"facebook": profile}, seed=1)
+        run_at = datetime(2030, 1, 1, 9, 0)
+        
+        report = simulator.run([SimulatedPost(i, 7, "facebook", run_at) for i in range(2)])
+        
+        assert report.max_lateness == 60.0
+        assert report.simulated_span == timedelta(seconds=120)
+    
+    def test_interactive_slots_and_lanes(self):
+        """Test that reserved slots stay free and the scheduled lane goes before bulk."""
+        from src.core.scheduler_simulation import (
+            ScheduleSimulator, SimulatedPost, PlatformProfile
+        )
+        
+        profile = PlatformProfile(latency_mean=60, latency_stddev=0, min_latency=0, failure_rate=0)
+        simulator = ScheduleSimulator(
+            max_workers=2, interactive_slots=1, profiles={"facebook": profile}, seed=1
+        )
+        run_at = datetime(2030, 1, 1, 9, 0)
+        posts = [SimulatedPost(i, i, "facebook", run_at, lane="bulk") for i in range(2)]
+        posts.append(SimulatedPost(2, 2, "facebook", run_at + timedelta(seconds=1)))
+        
+        report = simulator.run(posts)
+        
+        # One background slot; the scheduled post starts before the waiting bulk post
+        assert report.background_limit == 1
+        assert report.max_lateness == 120.0
+    
+    def test_week_replays_quickly(self):
+        """Test that a week of 40 accounts x 10 posts/day replays in seconds."""
+        import time
+        from src.core.scheduler_simulation import ScheduleSimulator, generate_schedule
+        
+        posts = generate_schedule(accounts=40, posts_per_day=10, days=7, seed=1)
+        
+        start = time.perf_counter()
+        report = ScheduleSimulator(max_workers=3, seed=1).run(posts)
+        elapsed = time.perf_counter() - start
+        
+        assert report.total_posts == 2800
+        assert report.succeeded + report.failed == 2800
+        assert 0 < report.worker_utilization <= 1
+        assert elapsed < 5
+
+
+class TestSlotAllocator:
+    """Test launch slot spreading."""
+    
+    def test_same_time_posts_are_spread(self):
+        """Test that posts at the same round time get distinct launch slots."""
+        from src.core.slot_allocator import SlotAllocator
+        
+        allocator = SlotAllocator(account_spacing=300, launch_interval=30, max_jitter=900)
+        nine = datetime(2030, 1, 1, 9, 0)
+        
+        slots = [allocator.allocate(account_id, nine) for account_id in range(1, 5)]
+        
+        assert slots[0] == nine
+        assert [int((s - nine).total_seconds()) for s in slots] == [0, 30, 60, 90]
+    
+    def test_account_spacing_is_enforced(self):
+        """Test that one account's posts are kept apart."""
+        from src.core.slot_allocator import SlotAllocator
+        
+        allocator = SlotAllocator(account_spacing=300, launch_interval=30, max_jitter=900)
+        nine = datetime(2030, 1, 1, 9, 0)
+        
+        first = allocator.allocate(1, nine)
+        second = allocator.allocate(1, nine)
+        
+        assert (second - first).total_seconds() == 300
+    
+    def test_shift_is_bounded_by_jitter(self):
+        """Test that a post is never shifted beyond max_jitter."""
+        from src.core.slot_allocator import SlotAllocator
+        
+        allocator = SlotAllocator(account_spacing=0, launch_interval=60, max_jitter=120)
+        nine = datetime(2030, 1, 1, 9, 0)
+        
+        slots = [allocator.allocate(i, nine) for i in range(5)]
+        
+        assert max(slots) - nine <= timedelta(seconds=120)
+    
+    def test_assign_slots_keeps_requested_time(self, temp_db):
+        """Test that shifted posts remember their requested time."""
+        from src.core.slot_allocator import SlotAllocator, assign_slots
+        from src.data.models import Account, ScheduledPost
+        
+        account_id = temp_db.add_account(Account(id=None, platform="facebook", username="slots"))
+        nine = datetime(2030, 1, 1, 9, 0)
+        temp_db.add_scheduled_post(
+            ScheduledPost(id=None, account_id=account_id, content="existing", scheduled_time=nine)
+        )
+        post = ScheduledPost(id=None, account_id=account_id, content="new", scheduled_time=nine)
+        
+        assign_slots(temp_db, [post], SlotAllocator(300, 30, 900))
+        post_id = temp_db.add_scheduled_post(post)
+        
+        stored = temp_db.get_scheduled_post(post_id)
+        assert stored.requested_time == nine
+        assert stored.slot_shift_seconds == 300
+
+
+class TestExecutionMetrics:
+    """Test job lateness/duration instrumentation."""
+    
+    def test_execution_roundtrip(self, temp_db):
+        """Test that execution timings survive storage."""
+        from src.data.models import JobExecution
+        
+        nine = datetime(2030, 1, 1, 9, 0)
+        execution = JobExecution(
+            id=None,
+            job_id="post_7",
+            post_id=7,
+            platform="facebook",
+            scheduled_time=nine,
+            dequeued_at=nine + timedelta(seconds=2),
+            started_at=nine + timedelta(seconds=5),
+            finished_at=nine + timedelta(seconds=65),
+            status="success",
+        )
+        temp_db.add_job_execution(execution)
+        
+        stored = temp_db.get_job_executions(since=nine)
+        assert len(stored) == 1
+        assert stored[0].post_id == 7
+        assert stored[0].lateness_seconds == 5
+        assert stored[0].duration_seconds == 60
+        assert temp_db.get_job_executions(since=nine + timedelta(hours=1)) == []
+    
+    def test_stats_per_platform(self, temp_db):
+        """Test percentile computation and CSV export."""
+        from src.core.scheduler_metrics import (
+            ExecutionRecorder, compute_execution_stats, export_execution_metrics
+        )
+        from src.core.scheduler import post_id_from_job_id
+        
+        recorder = ExecutionRecorder(db=temp_db)
+        nine = datetime(2030, 1, 1, 9, 0)
+        for i in range(10):
+            scheduled = nine + timedelta(minutes=i)
+            recorder.job_finished(
+                f"post_{i}",
+                scheduled,
+                result={
+                    "status": "success" if i else "failed",
+                    "platform": "facebook",
+                    "started_at": scheduled + timedelta(seconds=i),
+                    "finished_at": scheduled + timedelta(seconds=i + 30),
+                },
+                post_id=post_id_from_job_id(f"post_{i}"),
+            )
+        recorder.job_finished("series_1", nine, error=RuntimeError("boom"))
+        
+        stats = {s.platform: s for s in compute_execution_stats(temp_db.get_job_executions())}
+        
+        assert stats["facebook"].runs == 10
+        assert stats["facebook"].failures == 1
+        assert stats["facebook"].lateness_p50 == pytest.approx(4.5)
+        assert stats["facebook"].duration_p99 == pytest.approx(30)
+        assert stats["unknown"].failures == 1
+        assert stats["unknown"].duration_p50 is None
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "metrics.csv"
+            assert export_execution_metrics(path, db=temp_db) == 11
+            assert "lateness_seconds" in path.read_text().splitlines()[0]
+    
+    def test_stats_skip_unfinished_runs(self, temp_db):
+        """Test that skipped, requeued and retried runs are counted but not in percentiles."""
+        from src.core.scheduler_metrics import ExecutionRecorder, compute_execution_stats
+        
+        recorder = ExecutionRecorder(db=temp_db)
+        nine = datetime(2030, 1, 1, 9, 0)
+        for i, status in enumerate(["success", "failed", "skipped", "requeued", "retry", "retry"]):
+            late = 60 if status in ("success", "failed") else 0
+            recorder.job_finished(
+                f"post_{i}",
+                nine,
+                result={
+                    "status": status,
+                    "platform": "facebook",
+                    "started_at": nine + timedelta(seconds=late),
+                    "finished_at": nine + timedelta(seconds=late + 1),
+                },
+            )
+        
+        [stats] = compute_execution_stats(temp_db.get_job_executions())
+        
+        assert stats.runs == 6
+        assert (stats.failures, stats.skipped, stats.requeued, stats.retries) == (1, 1, 1, 2)
+        assert stats.lateness_p50 == pytest.approx(60)
+        assert stats.duration_p99 == pytest.approx(1)
+
+
+class TestLeaseClaiming:
+    """Test lease-based claiming of due posts."""
+    
+    @pytest.fixture
+    def due_posts(self, temp_db):
+        """Add three posts that are already due."""
+        from src.data.models import Account, ScheduledPost
+        
+        account_id = temp_db.add_account(Account(id=None, platform="facebook", username="lease"))
+        past = datetime.now() - timedelta(minutes=1)
+        return temp_db.add_scheduled_posts([
+            ScheduledPost(id=None, account_id=account_id, content=f"due {i}", scheduled_time=past)
+            for i in range(3)
+        ])
+    
+    def test_claimed_post_is_not_claimed_twice(self, temp_db, due_posts):
+        """Test that a leased post is invisible to other workers."""
+        from src.data.models import PostStatusEnum
+        
+        claimed = temp_db.claim_due_posts("worker-a", lease_seconds=60, limit=1)
+        
+        assert len(claimed) == 1
+        assert claimed[0].status == PostStatusEnum.RUNNING
+        assert claimed[0].lease_owner == "worker-a"
+        assert claimed[0].attempts == 1
+        assert not temp_db.claim_post(claimed[0].id, "worker-b", 60)
+        others = temp_db.claim_due_posts("worker-b", lease_seconds=60, limit=10)
+        assert claimed[0].id not in {p.id for p in others}
+    
+    def test_expired_lease_is_reclaimed(self, temp_db, due_posts):
+        """Test that a crashed worker's post is picked up after its lease expires."""
+        from src.data.models import PostStatusEnum
+        
+        post_id = due_posts[0]
+        assert temp_db.claim_post(post_id, "worker-a", lease_seconds=-1)
+        
+        assert temp_db.claim_post(post_id, "worker-b", lease_seconds=60)
+        assert not temp_db.renew_lease(post_id, "worker-a", 60)
+        assert not temp_db.finish_claimed_post(post_id, "worker-a", PostStatusEnum.SUCCESS)
+        assert temp_db.finish_claimed_post(post_id, "worker-b", PostStatusEnum.SUCCESS, "ok")
+        
+        post = temp_db.get_scheduled_post(post_id)
+        assert post.status == PostStatusEnum.SUCCESS
+        assert post.lease_owner is None
+        assert post.attempts == 2
+    
+    def test_repeatedly_abandoned_post_fails(self, temp_db, due_posts):
+        """Test that posts abandoned max_attempts times are failed, not retried."""
+        from src.data.models import PostStatusEnum
+        
+        post_id = due_posts[0]
+        for owner in ("a", "b"):
+            assert temp_db.claim_post(post_id, owner, lease_seconds=-1)
+        
+        claimed = temp_db.claim_due_posts("c", lease_seconds=60, limit=10, max_attempts=2)
+        
+        assert post_id not in {p.id for p in claimed}
+        assert temp_db.get_scheduled_post(post_id).status == PostStatusEnum.FAILED
+    
+    def test_concurrent_workers_never_share_a_post(self, temp_db, due_posts):
+        """Test that workers on separate connections claim disjoint posts."""
+        import threading
+        from src.data.database import Database
+        
+        connections = [Database(temp_db.db_path) for _ in range(4)]
+        claims: dict[str, list[int]] = {}
+        
+        def claim(index: int):
+            owner = f"worker-{index}"
+            posts = connections[index].claim_due_posts(owner, lease_seconds=60, limit=3)
+            claims[owner] = [p.id for p in posts]
+        
+        threads = [threading.Thread(target=claim, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for db in connections:
+            db.close()
+        
+        all_claimed = [post_id for ids in claims.values() for post_id in ids]
+        assert sorted(all_claimed) == sorted(due_posts)
+    
+    def test_worker_keeps_lane_and_fails_missed_posts(self, temp_db, monkeypatch):
+        """Test that a lease worker queues posts in their lane and fails the ones too late."""
+        import src.core.lease_worker as lease_worker
+        import src.core.result_recorder as result_recorder
+        from concurrent.futures import Future
+        from src.config import config
+        from src.core.execution_queue import Priority
+        from src.data.models import Account, PostStatusEnum, ScheduledPost
+        
+        submitted = []
+        
+        class FakePipeline:
+            def submit(self, ctx, priority):
+                submitted.append((ctx.post_id, priority))
+                return Future()
+        
+        monkeypatch.setattr(lease_worker, "get_pipeline", lambda: FakePipeline())
+        monkeypatch.setattr(result_recorder, "get_database", lambda: temp_db)
+        account_id = temp_db.add_account(Account(id=None, platform="facebook", username="lanes"))
+        now = datetime.now()
+        late = now - timedelta(seconds=config.scheduler.misfire_grace_time + 60)
+        bulk_id, missed_id = temp_db.add_scheduled_posts([
+            ScheduledPost(id=None, account_id=account_id, content="bulk", scheduled_time=now, lane="bulk"),
+            ScheduledPost(id=None, account_id=account_id, content="late", scheduled_time=late),
+        ])
+        worker = lease_worker.LeaseWorker(max_workers=2, owner="worker-a", db=temp_db)
+        
+        assert worker.poll_once() == 1
+        result_recorder.get_result_recorder().flush()
+        
+        assert submitted == [(bulk_id, Priority.BULK)]
+        missed = temp_db.get_scheduled_post(missed_id)
+        assert missed.status == PostStatusEnum.FAILED
+        assert "Missed" in missed.result_message
+        lease_worker.get_lease_keeper().release(bulk_id)
+    
+    def test_scheduler_reloads_posts_left_running(self, temp_db):
+        """Test that posts abandoned by a crash get a job again, unless they were publishing."""
+        from src.core.scheduler import SchedulerManager
+        from src.data.models import Account, PostStatusEnum, ScheduledPost
+        
+        account_id = temp_db.add_account(Account(id=None, platform="facebook", username="crash"))
+        now = datetime.now()
+        running_id, publishing_id = temp_db.add_scheduled_posts([
+            ScheduledPost(id=None, account_id=account_id, content=c, scheduled_time=now - timedelta(hours=1))
+            for c in ("running", "publishing")
+        ])
+        for post_id in (running_id, publishing_id):
+            assert temp_db.claim_post(post_id, "crashed", lease_seconds=-1)
+        temp_db.connection.execute(
+            "UPDATE scheduled_posts SET checkpoint = 'publishing' WHERE id = ?", (publishing_id,)
+        )
+        manager = SchedulerManager()
+        
+        manager.load_jobs(db=temp_db)
+        
+        jobs = {job["id"]: job for job in manager.get_pending_jobs()}
+        assert jobs[f"post_{running_id}"]["next_run_time"] >= now
+        assert f"post_{publishing_id}" not in jobs
+        assert temp_db.get_scheduled_post(publishing_id).status == PostStatusEnum.FAILED
+    
+    def test_scheduled_job_skips_claimed_post(self, temp_db, due_posts, monkeypatch):
+        """Test that a job only publishes a post it managed to claim."""
+        import src.core.posting_pipeline as pipeline
+        import src.core.result_recorder as result_recorder
+        import src.core.scheduler_tasks as tasks
+        from src.config import config
+        from src.data.models import PostStatusEnum
+        
+        poster = _FakePoster()
+        published = poster.published
+        tasks.clear_shutdown()  # a scheduler stopped by an earlier test leaves it set
+        monkeypatch.setattr(config.scheduler, "coalesce_window", 0)
+        monkeypatch.setattr(pipeline, "get_database", lambda: temp_db)
+        monkeypatch.setattr(result_recorder, "get_database", lambda: temp_db)
+        monkeypatch.setattr(pipeline, "get_poster", lambda: poster)
+        taken, free = due_posts[0], due_posts[1]
+        temp_db.claim_post(taken, "other-host:1", lease_seconds=60)
+        
+        skipped = tasks.execute_scheduled_post("facebook", 1, "x", [], post_id=taken)
+        result = tasks.execute_scheduled_post("facebook", 1, "y", [], post_id=free)
+        
+        assert skipped["status"] == "skipped"
+        assert result["status"] == "success"
+        assert len(published) == 1
+        assert temp_db.get_scheduled_post(free).status == PostStatusEnum.SUCCESS
+
+
+class TestCoalescing:
+    """Test publishing several posts of one account in one session."""
+    
+    def test_posts_due_together_share_a_session(self, temp_db, monkeypatch):
+        """Test that posts within the window are published together but stored separately."""
+        import src.core.posting_pipeline as pipeline
+        import src.core.result_recorder as result_recorder
+        import src.core.scheduler_tasks as tasks
+        from src.config import config
+        from src.data.models import Account, PostStatusEnum, ScheduledPost
+        
+        poster = _FakePoster()
+        tasks.clear_shutdown()
+        monkeypatch.setattr(config.scheduler, "coalesce_window", 300)
+        monkeypatch.setattr(pipeline, "get_database", lambda: temp_db)
+        monkeypatch.setattr(result_recorder, "get_database", lambda: temp_db)
+        monkeypatch.setattr(pipeline, "get_poster", lambda: poster)
+        account_id = temp_db.add_account(Account(id=None, platform="facebook", username="batch"))
+        other_id = temp_db.add_account(Account(id=None, platform="facebook", username="other"))
+        now = datetime.now()
+        post_ids = temp_db.add_scheduled_posts([
+            ScheduledPost(id=None, account_id=account_id, content="first", scheduled_time=now),
+            ScheduledPost(id=None, account_id=account_id, content="second",
+                          scheduled_time=now + timedelta(minutes=2)),
+            ScheduledPost(id=None, account_id=account_id, content="third",
+                          scheduled_time=now + timedelta(minutes=4)),
+            ScheduledPost(id=None, account_id=account_id, content="much later",
+                          scheduled_time=now + timedelta(hours=1)),
+            ScheduledPost(id=None, account_id=other_id, content="other account", scheduled_time=now),
+        ])
+        
+        result = tasks.execute_scheduled_post("facebook", account_id, "first", [], post_id=post_ids[0])
+        
+        assert result["status"] == "success"
+        assert poster.sessions == 1
+        assert poster.published == ["first", "second", "third"]
+        statuses = [temp_db.get_scheduled_post(post_id).status for post_id in post_ids]
+        assert statuses == [PostStatusEnum.SUCCESS] * 3 + [PostStatusEnum.PENDING] * 2
+        assert all(temp_db.get_scheduled_post(post_id).lease_owner is None for post_id in post_ids[:3])
+        
+        # The coalesced posts' own jobs find them done
+        later = tasks.execute_scheduled_post("facebook", account_id, "second", [], post_id=post_ids[1])
+        assert later["status"] == "skipped"
+        assert len(poster.published) == 3
+    
+    def test_spaced_posts_added_together_share_a_session(self, temp_db, monkeypatch):
+        """Test that posts spread by the slot allocator are still close enough to coalesce."""
+        import src.core.posting_pipeline as pipeline
+        import src.core.result_recorder as result_recorder
+        import src.core.scheduler_tasks as tasks
+        from src.config import config
+        from src.core.scheduler import SchedulerManager
+        from src.data.models import Account, PostStatusEnum, ScheduledPost
+        
+        poster = _FakePoster()
+        tasks.clear_shutdown()
+        monkeypatch.setattr(pipeline, "get_database", lambda: temp_db)
+        monkeypatch.setattr(result_recorder, "get_database", lambda: temp_db)
+        monkeypatch.setattr(pipeline, "get_poster", lambda: poster)
+        account_id = temp_db.add_account(Account(id=None, platform="facebook", username="spaced"))
+        now = datetime.now()
+        manager = SchedulerManager()
+        
+        post_ids = manager.add_posts([
+            ScheduledPost(id=None, account_id=account_id, content=content, scheduled_time=now)
+            for content in ("first", "second")
+        ], ["facebook"] * 2, db=temp_db)
+        
+        posts = [temp_db.get_scheduled_post(post_id) for post_id in post_ids]
+        spacing = (posts[1].scheduled_time - posts[0].scheduled_time).total_seconds()
+        assert spacing == config.scheduler.account_spacing
+        result = tasks.execute_scheduled_post("facebook", account_id, "first", [], post_id=post_ids[0])
+        
+        assert result["status"] == "success"
+        assert poster.sessions == 1
+        assert poster.published == ["first", "second"]
+        assert [temp_db.get_scheduled_post(i).status for i in post_ids] == [PostStatusEnum.SUCCESS] * 2
+        assert not [e for e in config.validate() if "SCHEDULER_COALESCE_WINDOW" in e]
+    
+    def test_shutdown_requeues_rest_of_session(self, temp_db, monkeypatch):
+        """Test that posts not yet started when a shutdown begins are requeued."""
+        import src.core.posting_pipeline as pipeline
+        from src.core.posting_pipeline import PostContext, publish_stage
+        from src.data.models import Account, PostStatusEnum, ScheduledPost
+        
+        poster = _FakePoster()
+        monkeypatch.setattr(pipeline, "get_database", lambda: temp_db)
+        monkeypatch.setattr(pipeline, "get_poster", lambda: poster)
+        account_id = temp_db.add_account(Account(id=None, platform="facebook", username="stop"))
+        post_ids = temp_db.add_scheduled_posts([
+            ScheduledPost(id=None, account_id=account_id, content=f"post {i}", scheduled_time=datetime.now())
+            for i in range(3)
+        ])
+        contexts = []
+        for post_id in post_ids:
+            assert temp_db.claim_post(post_id, "worker-a", lease_seconds=60)
+            contexts.append(PostContext(
+                platform="facebook", account_id=account_id, content=f"post {post_id}",
+                post_id=post_id, owner="worker-a",
+            ))
+        leader = contexts[0]
+        leader.followers = contexts[1:]
+        
+        def checkpoint_then_stop(ctx):
+            allowed = original(ctx)
+            pipeline.request_shutdown()  # while the first post is publishing
+            return allowed
+        
+        original = pipeline._checkpoint
+        monkeypatch.setattr(pipeline, "_checkpoint", checkpoint_then_stop)
+        try:
+            publish_stage(leader)
+        finally:
+            pipeline.clear_shutdown()
+        
+        assert poster.published == [f"post {post_ids[0]}"]
+        assert [c.result["status"] for c in contexts] == ["success", "requeued", "requeued"]
+        requeued = [temp_db.get_scheduled_post(post_id) for post_id in post_ids[1:]]
+        assert [(p.status, p.checkpoint) for p in requeued] == [(PostStatusEnum.PENDING, "requeued")] * 2
+
+
+class _FakePoster:
+    """Stand-in for the Facebook poster that records what it publishes."""
+    
+    def __init__(self, delay: float = 0.0, expired: bool = False):
+        self.delay = delay
+        self.expired = expired  # The account's session is logged out
+        self.published: list[str] = []
+        self.verified: list[str] = []
+        self.sessions = 0  # multi-post sessions
+        self.parked: list[object] = []  # sessions opened by the session stage
+        self.closed: list[object] = []
+    
+    def _check_session(self, account, allow_login):
+        from src.utils.exceptions import SessionExpiredError
+        
+        if self.expired and not allow_login:
+            raise SessionExpiredError(f"facebook:{account}", "redirected to login")
+    
+    def open_facebook_session(self, account=None, headless=True):
+        self._check_session(account, allow_login=False)
+        session = object()
+        self.parked.append(session)
+        return session
+    
+    def close_facebook_session(self, session):
+        self.closed.append(session)
+    
+    def verify_facebook_post(self, session, content, is_reel=False, job_id=None):
+        self.verified.append(content)
+        return True, "verified"
+    
+    def post_to_facebook(self, content, media_paths, headless=True, job_id=None, account=None,
+                         allow_login=True, session=None, verify=True):
+        import time
+        if session is None:
+            self._check_session(account, allow_login)
+        time.sleep(self.delay)
+        self.published.append(content)
+        if verify:
+            self.verified.append(content)
+        return True, "ok"
+    
+    def post_many_to_facebook(self, posts, before_each=None, headless=True, account=None,
+                              allow_login=True, session=None):
+        self._check_session(account, allow_login)
+        self.sessions += 1
+        results = []
+        for index, post in enumerate(posts):
+            if before_each is not None and not before_each(index):
+                results.append(None)
+                continue
+            self.published.append(post.content)
+            results.append((True, "ok"))
+        return results
+
+
+def _slow_job(seconds: float) -> dict:
+    """Job used to keep an executor thread busy."""
+    import time
+    time.sleep(seconds)
+    return {"status": "success"}
+
+
+class TestGracefulShutdown:
+    """Test drain-and-checkpoint shutdown."""
+    
+    @pytest.fixture
+    def claimed_post(self, temp_db):
+        """Add a due post and claim it as worker-a."""
+        from src.data.models import Account, ScheduledPost
+        
+        account_id = temp_db.add_account(Account(id=None, platform="facebook", username="drain"))
+        post_id = temp_db.add_scheduled_post(ScheduledPost(
+            id=None, account_id=account_id, content="drain",
+            scheduled_time=datetime.now() - timedelta(hours=2),
+        ))
+        assert temp_db.claim_post(post_id, "worker-a", lease_seconds=60)
+        return post_id
+    
+    def test_unstarted_post_is_requeued_on_shutdown(self, temp_db, claimed_post, monkeypatch):
+        """Test that a claimed post is handed back instead of published during shutdown."""
+        import src.core.posting_pipeline as pipeline
+        import src.core.result_recorder as result_recorder
+        import src.core.scheduler_tasks as tasks
+        from src.data.models import PostStatusEnum
+        
+        poster = _FakePoster()
+        published = poster.published
+        monkeypatch.setattr(pipeline, "get_database", lambda: temp_db)
+        monkeypatch.setattr(result_recorder, "get_database", lambda: temp_db)
+        monkeypatch.setattr(pipeline, "get_poster", lambda: poster)
+        tasks.request_shutdown()
+        try:
+            result = tasks.execute_claimed_post(claimed_post, "worker-a", "facebook", 1, "x", [])
+        finally:
+            tasks.clear_shutdown()
+        
+        post = temp_db.get_scheduled_post(claimed_post)
+        assert result["status"] == "requeued"
+        assert published == []
+        assert post.status == PostStatusEnum.PENDING
+        assert post.checkpoint == "requeued"
+        assert post.attempts == 0
+        
+        # Requeued posts stay due even when older than the grace window
+        claimed = temp_db.claim_due_posts("worker-b", 60, limit=5, grace_seconds=60)
+        assert [p.id for p in claimed] == [claimed_post]
+    
+    def test_expired_session_defers_post_to_retry_lane(self, temp_db, claimed_post, monkeypatch):
+        """Test that a post whose session expired is retried later instead of waiting for a login."""
+        import src.core.posting_pipeline as pipeline
+        import src.core.result_recorder as result_recorder
+        import src.core.scheduler_tasks as tasks
+        from src.config import config
+        from src.data.models import PostStatusEnum
+        
+        poster = _FakePoster(expired=True)
+        monkeypatch.setattr(pipeline, "get_database", lambda: temp_db)
+        monkeypatch.setattr(result_recorder, "get_database", lambda: temp_db)
+        monkeypatch.setattr(pipeline, "get_poster", lambda: poster)
+        original = temp_db.get_scheduled_post(claimed_post).scheduled_time
+        
+        result = tasks.execute_claimed_post(claimed_post, "worker-a", "facebook", 1, "x", [])
+        
+        post = temp_db.get_scheduled_post(claimed_post)
+        assert result["status"] == "retry"
+        assert result["retry_post_ids"] == [claimed_post]
+        assert poster.published == []
+        assert post.status == PostStatusEnum.PENDING
+        assert post.lane == "retry"
+        assert post.requested_time == original
+        delay = (post.scheduled_time - datetime.now()).total_seconds()
+        assert 0 < delay <= config.scheduler.session_retry_delay
+        
+        # Once out of attempts the post fails instead
+        monkeypatch.setattr(config.scheduler, "max_attempts", 1)
+        assert temp_db.claim_post(claimed_post, "worker-a", lease_seconds=60)
+        result = tasks.execute_claimed_post(claimed_post, "worker-a", "facebook", 1, "x", [])
+        assert result["status"] == "failed"
+        assert "Session expired" in temp_db.get_scheduled_post(claimed_post).result_message
+    
+    def test_interrupted_publish_is_not_retried(self, temp_db, claimed_post):
+        """Test that a post whose owner died mid-publish is failed, not re-posted."""
+        from src.data.models import PostStatusEnum
+        
+        assert temp_db.mark_publishing(claimed_post, "worker-a")
+        assert not temp_db.requeue_claimed_post(claimed_post, "worker-a")
+        temp_db.renew_lease(claimed_post, "worker-a", lease_seconds=-1)
+        
+        assert temp_db.claim_due_posts("worker-b", 60, limit=5) == []
+        post = temp_db.get_scheduled_post(claimed_post)
+        assert post.status == PostStatusEnum.FAILED
+        assert "Interrupted while publishing" in post.result_message
+    
+    def test_stop_is_bounded_by_drain_timeout(self, temp_db, monkeypatch):
+        """Test that stop() returns after the drain window even if a job is still running."""
+        import time
+        from src.core.scheduler import SchedulerManager
+        from src.core.scheduler_engine import ScheduledJob
+        from src.data import database
+        
+        monkeypatch.setattr(database, "get_database", lambda: temp_db)
+        manager = SchedulerManager()
+        manager.start()
+        manager.engine.add_job(
+            ScheduledJob(id="slow", func=_slow_job, run_time=datetime.now(), kwargs={"seconds": 3})
+        )
+        deadline = time.monotonic() + 5
+        while not manager.in_flight_jobs() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert manager.in_flight_jobs() == ["slow"]
+        
+        started = time.monotonic()
+        manager.stop(drain_timeout=0.2)
+        
+        assert time.monotonic() - started < 1.5
+        assert not manager._started
+
+
+class TestExecutionQueue:
+    """Test the shared priority execution queue."""
+    
+    def test_lanes_are_served_in_priority_order(self):
+        """Test that interactive work jumps ahead of the scheduled backlog."""
+        import threading
+        from src.core.execution_queue import ExecutionQueue, Priority
+        
+        queue = ExecutionQueue(max_workers=1, interactive_slots=0)
+        gate = threading.Event()
+        order = []
+        
+        blocker = queue.submit(gate.wait, 5)
+        futures = [
+            queue.submit(order.append, lane, priority=priority)
+            for lane, priority in [
+                ("bulk", Priority.BULK),
+                ("scheduled", Priority.SCHEDULED),
+                ("retry", Priority.RETRY),
+                ("interactive", Priority.INTERACTIVE),
+            ]
+        ]
+        gate.set()
+        for future in [blocker, *futures]:
+            future.result(timeout=5)
+        queue.shutdown()
+        
+        assert order == ["interactive", "scheduled", "retry", "bulk"]
+    
+    def test_reserved_slot_keeps_interactive_unblocked(self):
+        """Test that a busy backlog cannot take the interactive slot."""
+        import threading
+        from src.core.execution_queue import ExecutionQueue, Priority
+        
+        queue = ExecutionQueue(max_workers=2, interactive_slots=1)
+        gate = threading.Event()
+        
+        first = queue.submit(gate.wait, 5)
+        second = queue.submit(lambda: "second")
+        interactive = queue.submit(lambda: "now", priority=Priority.INTERACTIVE)
+        
+        assert interactive.result(timeout=2) == "now"
+        assert not second.done()
+        assert queue.snapshot()["scheduled"] == {"waiting": 1, "running": 1}
+        gate.set()
+        assert second.result(timeout=5) == "second"
+        first.result(timeout=5)
+        queue.shutdown()
+    
+    def test_same_account_never_runs_concurrently(self):
+        """Test per-key exclusion and bounded waits."""
+        import threading
+        from src.core.execution_queue import ExecutionQueue, Priority, QueueTimeoutError
+        
+        queue = ExecutionQueue(max_workers=3, interactive_slots=0)
+        gate = threading.Event()
+        started = threading.Event()
+        
+        busy = queue.submit(lambda: started.set() or gate.wait(5), key="facebook:1")
+        # The interactive item below would otherwise overtake it
+        assert started.wait(2)
+        other = queue.submit(lambda: "other", key="facebook:2")
+        waiting = queue.submit(
+            lambda: "late", priority=Priority.INTERACTIVE, key="facebook:1", timeout=0.2
+        )
+        
+        assert other.result(timeout=2) == "other"
+        with pytest.raises(QueueTimeoutError):
+            waiting.result(timeout=2)
+        gate.set()
+        busy.result(timeout=5)
+        queue.shutdown()
+
+
+class TestPostingPipeline:
+    """Test staged post execution."""
+    
+    def test_next_post_is_ready_while_one_publishes(self, monkeypatch):
+        """Test that sessions are prepared while another post is publishing."""
+        import threading
+        import src.core.posting_pipeline as pipeline
+        from src.core.execution_queue import ExecutionQueue
+        
+        second_ready = threading.Event()
+        overlapped = []
+        
+        def session(ctx):
+            if ctx.account_id == 2:
+                second_ready.set()
+        
+        def publish(ctx):
+            if ctx.account_id == 1:
+                overlapped.append(second_ready.wait(5))
+            ctx.finish("success", "ok")
+        
+        monkeypatch.setitem(pipeline.STAGE_FUNCTIONS, "prepare", lambda ctx: None)
+        monkeypatch.setitem(pipeline.STAGE_FUNCTIONS, "session", session)
+        monkeypatch.setitem(pipeline.STAGE_FUNCTIONS, "publish", publish)
+        monkeypatch.setitem(pipeline.STAGE_FUNCTIONS, "record", lambda ctx: None)
+        
+        queue = ExecutionQueue(max_workers=1, interactive_slots=0)
+        stages = pipeline.PostingPipeline(prepare_workers=2, session_workers=2, queue=queue)
+        futures = [
+            stages.submit(pipeline.PostContext(platform="x", account_id=i, content=f"post {i}"))
+            for i in (1, 2)
+        ]
+        results = [f.result(timeout=10) for f in futures]
+        stages.shutdown()
+        queue.shutdown()
+        
+        assert overlapped == [True]
+        assert [r["status"] for r in results] == ["success", "success"]
+        assert set(results[0]["stage_seconds"]) == set(pipeline.STAGES)
+    
+    def test_facebook_session_is_parked_and_verified_separately(self, monkeypatch):
+        """Test that a Facebook post publishes on the parked page and is verified in its own stage."""
+        import src.core.posting_pipeline as pipeline
+        from src.core.execution_queue import ExecutionQueue
+        
+        poster = _FakePoster()
+        monkeypatch.setattr(pipeline, "get_poster", lambda: poster)
+        monkeypatch.setitem(pipeline.STAGE_FUNCTIONS, "prepare", lambda ctx: None)
+        monkeypatch.setitem(pipeline.STAGE_FUNCTIONS, "record", pipeline.verify_stage)
+        
+        queue = ExecutionQueue(max_workers=1, interactive_slots=0)
+        stages = pipeline.PostingPipeline(prepare_workers=1, session_workers=1, queue=queue, verify_workers=1)
+        result = stages.submit(pipeline.PostContext(platform="facebook", account_id=1, content="hi")).result(timeout=10)
+        stages.shutdown()
+        queue.shutdown()
+        
+        assert result["status"] == "success"
+        assert result["message"] == "verified"
+        assert poster.published == ["hi"]
+        assert poster.verified == ["hi"]  # by the verify stage, not while publishing
+        assert len(poster.parked) == 1
+        assert poster.closed == poster.parked
+    
+    def test_missing_facebook_media_fails_validation(self, tmp_path):
+        """Test that a Facebook post with a missing media file fails before publishing."""
+        from src.core.posting_pipeline import PostContext, _validate
+        
+        ctx = PostContext(platform="facebook", account_id=1, content="x",
+                          media_paths=[str(tmp_path / "gone.jpg")])
+        _validate(ctx)
+        
+        assert ctx.result["status"] == "failed"
+        assert "gone.jpg" in ctx.result["message"]
+    
+    def test_failed_stage_skips_to_record(self, monkeypatch):
+        """Test that a prepare failure never publishes but is still recorded."""
+        import src.core.posting_pipeline as pipeline
+        
+        poster = _FakePoster()
+        recorded = []
+        monkeypatch.setattr(pipeline, "get_poster", lambda: poster)
+        monkeypatch.setitem(pipeline.STAGE_FUNCTIONS, "record", recorded.append)
+        
+        result = pipeline.run_post_stages(
+            pipeline.PostContext(platform="myspace", account_id=1, content="x")
+        )
+        
+        assert result["status"] == "failed"
+        assert "Unknown platform" in result["message"]
+        assert poster.published == []
+        assert len(recorded) == 1
+
+
+class TestResultRecorder:
+    """Test batched persistence of post results."""
+    
+    def test_results_are_stored_in_one_batch(self, temp_db):
+        """Test that results arriving together are stored and reported together."""
+        import threading
+        from src.core.result_recorder import ResultRecorder
+        from src.data.models import Account, PostResult, PostStatusEnum, ScheduledPost
+        
+        account_id = temp_db.add_account(Account(id=None, platform="x", username="results"))
+        post_ids = temp_db.add_scheduled_posts([
+            ScheduledPost(id=None, account_id=account_id, content=f"post {i}",
+                          scheduled_time=datetime.now())
+            for i in range(3)
+        ])
+        for post_id in post_ids:
+            assert temp_db.claim_post(post_id, "worker-a", lease_seconds=60)
+        
+        batches = []
+        stored = threading.Event()
+        recorder = ResultRecorder(db=temp_db, flush_interval=0.2)
+        recorder.add_listener(lambda results: batches.append(results) or stored.set())
+        statuses = [PostStatusEnum.SUCCESS, PostStatusEnum.SUCCESS, PostStatusEnum.FAILED]
+        for post_id, status in zip(post_ids, statuses):
+            recorder.record(PostResult(
+                platform="x", account_id=account_id, status=status,
+                post_id=post_id, owner="worker-a", message="done",
+            ))
+        # A stale result from a worker that lost the lease is dropped
+        recorder.record(PostResult(
+            platform="x", account_id=account_id, status=PostStatusEnum.FAILED,
+            post_id=post_ids[0], owner="worker-b",
+        ))
+        
+        assert stored.wait(1.0)
+        recorder.stop()
+        
+        assert [len(batch) for batch in batches] == [3]
+        post = temp_db.get_scheduled_post(post_ids[2])
+        assert post.status == PostStatusEnum.FAILED
+        assert post.result_message == "done"
+        assert post.executed_at is not None
+        assert post.lease_owner is None
+        counts = temp_db.get_daily_post_counts(datetime.now().date().isoformat())
+        assert [(c.succeeded, c.failed) for c in counts] == [(2, 1)]
+    
+    def test_failed_write_backs_off_and_logs_once(self, caplog):
+        """Test that a failing database is retried with growing delays and reported once."""
+        import logging
+        import time
+        from src.core.result_recorder import RETRY_DELAY, ResultRecorder
+        from src.data.models import PostResult, PostStatusEnum
+        
+        class FlakyDatabase:
+            def __init__(self):
+                self.calls = 0
+            
+            def record_post_results(self, batch):
+                self.calls += 1
+                if self.calls <= 3:
+                    raise RuntimeError("database is locked")
+                return list(batch)
+        
+        recorder = ResultRecorder(db=FlakyDatabase())
+        result = PostResult(platform="x", account_id=1, status=PostStatusEnum.SUCCESS, post_id=1)
+        recorder._pending.append(result)
+        delays = []
+        with caplog.at_level(logging.DEBUG, logger="src.core.result_recorder"):
+            for _ in range(3):
+                assert recorder.flush() == []
+                delays.append(recorder._retry_at - time.monotonic())
+            assert recorder.flush() == [result]
+        
+        assert delays[0] <= RETRY_DELAY < delays[1] < delays[2]
+        assert len([r for r in caplog.records if r.levelno >= logging.ERROR]) == 1
+        assert recorder._retry_at == 0.0
+    
+    def test_rejected_result_is_dropped_after_split(self, caplog):
+        """Test that a batch failing repeatedly is split and only the bad result dropped."""
+        import logging
+        from src.core.result_recorder import SPLIT_AFTER_FAILURES, ResultRecorder
+        from src.data.models import PostResult, PostStatusEnum
+        
+        class PoisonDatabase:
+            def __init__(self, broken=False):
+                self.broken = broken
+            
+            def record_post_results(self, batch):
+                if self.broken or any(r.post_id == 2 for r in batch):
+                    raise RuntimeError("constraint failed")
+                return list(batch)
+        
+        results = [
+            PostResult(platform="x", account_id=1, status=PostStatusEnum.SUCCESS, post_id=i)
+            for i in (1, 2, 3)
+        ]
+        
+        # A database that rejects every result keeps the whole batch queued
+        recorder = ResultRecorder(db=PoisonDatabase(broken=True))
+        recorder._pending.extend(results)
+        for _ in range(SPLIT_AFTER_FAILURES + 1):
+            assert recorder.flush() == []
+        assert recorder._pending == results
+        
+        recorder = ResultRecorder(db=PoisonDatabase())
+        recorder._pending.extend(results)
+        for _ in range(SPLIT_AFTER_FAILURES - 1):
+            assert recorder.flush() == []
+        with caplog.at_level(logging.ERROR, logger="src.core.result_recorder"):
+            assert recorder.flush() == [results[0], results[2]]
+        
+        assert recorder._pending == []
+        assert recorder._failures == 0
+        assert any("post 2" in r.getMessage() for r in caplog.records)
+    
+    def test_unclaimed_result_only_updates_pending_post(self, temp_db):
+        """Test that results without a lease owner never overwrite a finished post."""
+        from src.core.result_recorder import ResultRecorder
+        from src.data.models import Account, PostResult, PostStatusEnum, ScheduledPost
+        
+        account_id = temp_db.add_account(Account(id=None, platform="x", username="missed"))
+        post_id = temp_db.add_scheduled_post(ScheduledPost(
+            id=None, account_id=account_id, content="missed", scheduled_time=datetime.now()
+        ))
+        recorder = ResultRecorder(db=temp_db)
+        missed = PostResult(
+            platform="x", account_id=account_id, status=PostStatusEnum.FAILED, post_id=post_id
+        )
+        
+        recorder.record(missed)
+        assert recorder.flush() == [missed]
+        recorder.record(PostResult(
+            platform="x", account_id=account_id, status=PostStatusEnum.SUCCESS, post_id=post_id
+        ))
+        assert recorder.flush() == []
+        recorder.stop()
+        
+        assert temp_db.get_scheduled_post(post_id).status == PostStatusEnum.FAILED
+
+
+class _ParkedDriver:
+    """Platform driver stand-in for pre-warming tests."""
+    
+    def __init__(self):
+        self.parked = False
+        self.closed = False
+        self.browser = self
+    
+    def park_on_post_page(self):
+        self.parked = True
+    
+    def close(self):
+        self.closed = True
+
+
+class TestPreflight:
+    """Test pre-flight checks ahead of fire time."""
+    
+    def test_flags_problems_once(self, temp_db, tmp_path):
+        """Test that problems are stored and only changed results are reported."""
+        from src.core.preflight import PreflightWorker
+        from src.data.models import Account, ScheduledPost
+        
+        account_id = temp_db.add_account(Account(
+            id=None, platform="x", username="preflight", encrypted_password=b"secret"
+        ))
+        soon = datetime.now() + timedelta(minutes=5)
+        bad_id = temp_db.add_scheduled_post(ScheduledPost(
+            id=None, account_id=account_id, content="x" * 300, scheduled_time=soon,
+            media_paths=[str(tmp_path / "gone.png")],
+        ))
+        good_id = temp_db.add_scheduled_post(ScheduledPost(
+            id=None, account_id=account_id, content="fine", scheduled_time=soon
+        ))
+        later_id = temp_db.add_scheduled_post(ScheduledPost(
+            id=None, account_id=account_id, content="later",
+            scheduled_time=datetime.now() + timedelta(hours=2),
+        ))
+        
+        reported = []
+        worker = PreflightWorker(db=temp_db, lead_minutes=10, prewarm_browsers=0)
+        worker.add_listener(reported.extend)
+        results = worker.check_once()
+        
+        assert [r.post_id for r in results] == [bad_id, good_id]
+        bad = temp_db.get_scheduled_post(bad_id)
+        assert bad.preflight_failed
+        assert "gone.png" in bad.preflight_message
+        assert "limit" in bad.preflight_message
+        assert temp_db.get_scheduled_post(good_id).preflight_message is None
+        assert temp_db.get_scheduled_post(later_id).preflight_at is None
+        
+        # Failing posts are checked again, but unchanged results are not reported
+        assert [r.post_id for r in worker.check_once()] == [bad_id]
+        assert len(reported) == 2
+    
+    def test_warm_browser_is_handed_to_session_stage(self, temp_db, monkeypatch):
+        """Test that a parked browser is used by its post and closed once stale."""
+        import src.core.preflight as preflight
+        from src.core.posting_pipeline import PostContext, session_stage
+        from src.data.models import Account, ScheduledPost
+        
+        drivers = []
+        
+        def fake_session_stage(ctx):
+            ctx.driver = _ParkedDriver()
+            drivers.append(ctx.driver)
+        
+        monkeypatch.setattr(preflight, "session_stage", fake_session_stage)
+        account_id = temp_db.add_account(Account(
+            id=None, platform="linkedin", username="warm", encrypted_password=b"secret"
+        ))
+        soon = datetime.now() + timedelta(minutes=5)
+        post_ids = temp_db.add_scheduled_posts([
+            ScheduledPost(id=None, account_id=account_id, content=f"post {i}", scheduled_time=soon)
+            for i in range(3)
+        ])
+        worker = preflight.PreflightWorker(db=temp_db, lead_minutes=10, prewarm_browsers=2)
+        monkeypatch.setattr(preflight, "_preflight_worker", worker)
+        
+        results = worker.check_once()
+        
+        assert [r.warmed for r in results] == [True, True, False]
+        assert worker.warm_posts == set(post_ids[:2])
+        assert all(d.parked for d in drivers)
+        
+        assert temp_db.claim_post(post_ids[0], "worker-a", lease_seconds=60)
+        ctx = PostContext(
+            platform="linkedin", account_id=account_id, content="post 0",
+            post_id=post_ids[0], owner="worker-a",
+        )
+        session_stage(ctx)
+        assert ctx.driver is drivers[0]
+        
+        # A cancelled post's browser is closed on the next sweep
+        temp_db.cancel_pending_post(post_ids[1])
+        worker.check_once()
+        assert drivers[1].closed
+        assert worker.warm_posts == {post_ids[2]}
+        worker.stop()
+        assert drivers[2].closed